@@ -182,10 +182,10 @@ Create a learning roadmap for "{topic}" based on the search results. Return only
             return self._get_mock_roadmap(topic)
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.openai_api_key)
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=self.openai_api_key)
             
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -0,0 +1,4 @@
+"""Benchmarks for the graph and scheduling utilities.
+
+Run from the service root with ``python -m benchmarks``; see ``--help``.
+"""
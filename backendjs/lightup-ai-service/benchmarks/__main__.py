@@ -0,0 +1,78 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from benchmarks.cases import select_cases
+from benchmarks.runner import DEFAULT_SIZES, QUICK_SIZES, compare, load_report, run_suite, save_report
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark GraphAnalyzer and TimeCalculator on synthetic roadmaps and schedules."
+    )
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--sizes", help="Comma-separated node counts (default: 10 to 100000)")
+    parser.add_argument("--quick", action="store_true", help=f"Only run sizes {', '.join(map(str, QUICK_SIZES))}")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Skip sizes predicted to take longer per call")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurement")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before a regression")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any result regressed")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    cases = select_cases(args.filter)
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    if not cases:
+        print(f"No benchmark matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    if args.sizes:
+        sizes = sorted(int(size) for size in args.sizes.split(","))
+    else:
+        sizes = list(QUICK_SIZES if args.quick else DEFAULT_SIZES)
+
+    print(f"Running {len(cases)} benchmark cases at sizes {sizes}")
+    report = run_suite(cases, sizes, args.max_seconds, memory=not args.no_memory)
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Results written to {args.output}")
+
+    status = 0
+    baseline = None if args.save_baseline else load_report(args.baseline)
+    if baseline is not None:
+        regressions = compare(report, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(
+                    f"  {regression['case']} n={regression['size']} {regression['metric']}: "
+                    f"{regression['baseline']} -> {regression['current']}"
+                )
+            status = 1 if args.check else 0
+        else:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
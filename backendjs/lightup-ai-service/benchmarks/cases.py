@@ -0,0 +1,85 @@
+"""Benchmark cases: a function under test, an input shape and how to build its input."""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks import generators
+from src.utils.graph_analyzer import GraphAnalyzer
+from src.utils.time_calculator import TimeCalculator
+
+# Study horizon of the long-horizon scheduling cases, in days
+HORIZON_DAYS = 365
+
+
+@dataclass
+class BenchmarkCase:
+    """One function benchmarked on one input shape across sizes."""
+
+    function: str
+    shape: str
+    setup: Callable[[int], Tuple[Any, ...]]  # size -> arguments, built outside the timed region
+    run: Callable[..., Any]
+
+    @property
+    def name(self) -> str:
+        return f"{self.function}[{self.shape}]"
+
+
+def _graph_case(function: str, shape: str) -> BenchmarkCase:
+    def setup(size: int) -> Tuple[Any, ...]:
+        roadmap = generators.make_roadmap(shape, size)
+        return roadmap.nodes, roadmap.edges
+
+    return BenchmarkCase(function=f"GraphAnalyzer.{function}", shape=shape, setup=setup, run=getattr(GraphAnalyzer, function))
+
+
+def _distribute_setup(size: int) -> Tuple[Any, ...]:
+    nodes = generators.study_nodes(generators.random_dag(size))
+    return nodes, generators.study_days(HORIZON_DAYS), 4.0, generators.user_progress(nodes)
+
+
+def _optimize_setup(size: int) -> Tuple[Any, ...]:
+    # A whole day's worth of small allocations, so every node gets a session
+    allocations = generators.daily_allocations(size, hours=0.25)
+    return sum(allocations.values()), allocations
+
+
+def _sequence_setup(size: int) -> Tuple[Any, ...]:
+    roadmap = generators.random_dag(size)
+    progress = generators.user_progress(generators.study_nodes(roadmap))
+    return roadmap.nodes, roadmap.edges, progress, 4.0
+
+
+def _weekly_setup(size: int) -> Tuple[Any, ...]:
+    # ``size`` node allocations spread evenly over the horizon
+    days = generators.study_days(HORIZON_DAYS)
+    schedule: Dict[str, Dict[str, float]] = {day: {} for day in days}
+    for index, hours in enumerate(generators.daily_allocations(size).values()):
+        schedule[days[index % len(days)]][f"n{index}"] = hours
+    return schedule, days[0]
+
+
+CASES: List[BenchmarkCase] = [
+    *(_graph_case("detect_cycles", shape) for shape in generators.SHAPES),
+    *(_graph_case("find_disconnected_components", shape) for shape in ("chain", "random_dag")),
+    *(_graph_case("calculate_learning_paths", shape) for shape in ("chain", "fan_out", "random_dag")),
+    *(_graph_case("calculate_critical_path", shape) for shape in ("chain", "random_dag")),
+    _graph_case("validate_prerequisites", "random_dag"),
+    _graph_case("calculate_graph_metrics", "random_dag"),
+    BenchmarkCase("GraphAnalyzer.suggest_optimal_sequence", "random_dag", _sequence_setup, GraphAnalyzer.suggest_optimal_sequence),
+    BenchmarkCase(
+        "TimeCalculator.distribute_study_time", f"{HORIZON_DAYS}_days", _distribute_setup, TimeCalculator.distribute_study_time
+    ),
+    BenchmarkCase(
+        "TimeCalculator.optimize_daily_schedule", "full_day", _optimize_setup, TimeCalculator.optimize_daily_schedule
+    ),
+    BenchmarkCase(
+        "TimeCalculator.calculate_weekly_breakdown", f"{HORIZON_DAYS}_days", _weekly_setup,
+        TimeCalculator.calculate_weekly_breakdown
+    ),
+]
+
+
+def select_cases(pattern: str = "") -> List[BenchmarkCase]:
+    """Cases whose name contains ``pattern`` (all cases if empty)."""
+    return [case for case in CASES if pattern.lower() in case.name.lower()]
@@ -0,0 +1,152 @@
+"""Synthetic roadmaps and study schedules for benchmarking."""
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.models.common import KnowledgeNodeInfo, NodeProgress, NodeStatus
+from src.models.roadmap import GeneratedNode, RoadmapEdge
+from src.utils.time_calculator import TimeCalculator
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Roadmap shapes understood by ``make_roadmap``
+SHAPES = ("chain", "fan_out", "random_dag", "planted_cycles")
+
+
+@dataclass
+class Roadmap:
+    """Nodes and edges of a synthetic roadmap."""
+
+    shape: str
+    nodes: List[GeneratedNode]
+    edges: List[RoadmapEdge]
+
+
+def _node_id(index: int) -> str:
+    return f"n{index}"
+
+
+def _build(shape: str, size: int, prerequisites: List[List[int]], rng: random.Random) -> Roadmap:
+    """Create nodes and matching edges from prerequisite indexes per node."""
+    nodes = []
+    edges = []
+    for index in range(size):
+        prereq_ids = [_node_id(prereq) for prereq in prerequisites[index]]
+        nodes.append(GeneratedNode(
+            id=_node_id(index),
+            title=f"Topic {index}",
+            description=f"Synthetic topic {index}",
+            prerequisites=prereq_ids,
+            estimated_hours=round(rng.uniform(0.5, 12.0), 1),
+            position={"x": float(index % 100) * 120, "y": float(index // 100) * 80},
+            difficulty=rng.choice(DIFFICULTIES)
+        ))
+        edges.extend(RoadmapEdge(**{"from": prereq, "to": _node_id(index)}) for prereq in prereq_ids)
+    return Roadmap(shape=shape, nodes=nodes, edges=edges)
+
+
+def chain(size: int, seed: int = 0) -> Roadmap:
+    """Each node depends on the one before it: the deepest possible graph."""
+    rng = random.Random(seed)
+    return _build("chain", size, [[index - 1] if index else [] for index in range(size)], rng)
+
+
+def fan_out(size: int, seed: int = 0) -> Roadmap:
+    """A single root every other node depends on: the widest possible graph."""
+    rng = random.Random(seed)
+    return _build("fan_out", size, [[0] if index else [] for index in range(size)], rng)
+
+
+def random_dag(size: int, avg_prerequisites: float = 2.0, window: int = 50, seed: int = 0) -> Roadmap:
+    """
+    A random acyclic graph resembling a generated roadmap.
+
+    Each node takes a few prerequisites from the ``window`` nodes before it,
+    which keeps the graph layered rather than collapsing onto the first nodes.
+    """
+    rng = random.Random(seed)
+    prerequisites = []
+    for index in range(size):
+        count = min(index, max(0, round(rng.gauss(avg_prerequisites, 1.0))))
+        candidates = range(max(0, index - window), index)
+        prerequisites.append(sorted(rng.sample(candidates, min(count, len(candidates)))))
+    return _build("random_dag", size, prerequisites, rng)
+
+
+def planted_cycles(size: int, cycles: int = 3, cycle_length: int = 5, seed: int = 0) -> Roadmap:
+    """A random DAG with back edges that close ``cycles`` cycles of about ``cycle_length`` nodes."""
+    roadmap = random_dag(size, seed=seed)
+    rng = random.Random(seed + 1)
+    prerequisites = [[int(prereq[1:]) for prereq in node.prerequisites] for node in roadmap.nodes]
+
+    for _ in range(min(cycles, size // (cycle_length + 1))):
+        # Walk forward along existing edges, then point the start back at the end
+        start = rng.randrange(0, size - cycle_length)
+        end = start
+        for _ in range(cycle_length - 1):
+            forward = [index for index in range(end + 1, min(size, end + 50)) if end in prerequisites[index]]
+            if not forward:
+                break
+            end = rng.choice(forward)
+        if end == start:
+            end = start + 1
+            prerequisites[end].append(start)
+        prerequisites[start].append(end)
+
+    return _build("planted_cycles", size, prerequisites, rng)
+
+
+def make_roadmap(shape: str, size: int, seed: int = 0) -> Roadmap:
+    """
+    Build a roadmap of a named shape.
+
+    Args:
+        shape: One of ``SHAPES``
+        size: Number of nodes
+        seed: Random seed
+
+    Returns:
+        Synthetic roadmap
+    """
+    builders = {"chain": chain, "fan_out": fan_out, "random_dag": random_dag, "planted_cycles": planted_cycles}
+    if shape not in builders:
+        raise ValueError(f"Unknown roadmap shape {shape!r}; use one of {', '.join(SHAPES)}")
+    return builders[shape](size, seed=seed)
+
+
+def study_nodes(roadmap: Roadmap) -> List[KnowledgeNodeInfo]:
+    """Convert roadmap nodes into the node info a study plan request carries."""
+    return [
+        KnowledgeNodeInfo(
+            id=node.id,
+            title=node.title,
+            description=node.description,
+            prerequisites=node.prerequisites,
+            estimated_hours=node.estimated_hours,
+            current_user_status=NodeStatus.NOT_STARTED
+        )
+        for node in roadmap.nodes
+    ]
+
+
+def user_progress(nodes: List[KnowledgeNodeInfo], started_share: float = 0.3, seed: int = 0) -> List[NodeProgress]:
+    """Random progress for a share of the nodes."""
+    rng = random.Random(seed)
+    statuses = (NodeStatus.COMPLETED, NodeStatus.NEXT, NodeStatus.NEEDS_REVIEW)
+    return [
+        NodeProgress(node_id=node.id, status=rng.choice(statuses), mastery_score=rng.randint(0, 100))
+        for node in nodes
+        if rng.random() < started_share
+    ]
+
+
+def study_days(days: int, start_date: str = "2025-01-06") -> List[str]:
+    """A long-horizon calendar of study days."""
+    return TimeCalculator.calculate_available_study_days(start_date, days)
+
+
+def daily_allocations(size: int, seed: int = 0, hours: Optional[float] = None) -> Dict[str, float]:
+    """Hours allocated per node on one day, as ``distribute_study_time`` returns them."""
+    rng = random.Random(seed)
+    return {_node_id(index): hours or round(rng.uniform(0.25, 2.0), 2) for index in range(size)}
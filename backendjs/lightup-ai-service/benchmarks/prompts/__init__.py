@@ -0,0 +1,4 @@
+"""Prompt cost benchmark: token counts per template section and replayed completions.
+
+Run from the service root with ``python -m benchmarks.prompts``; see ``--help``.
+"""
@@ -0,0 +1,82 @@
+"""Command line entry point: ``python -m benchmarks.prompts``."""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+from benchmarks.prompts.corpus import select_cases
+from benchmarks.prompts.runner import compare, record, run_suite, section_changes
+from benchmarks.runner import load_report, save_report
+from src.config.settings import settings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.prompts",
+        description="Count prompt tokens per template section and replay recorded completions."
+    )
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--cassettes", default=settings.llm_fake_cassette_dir, help="Directory of recorded completions")
+    parser.add_argument("--record", type=int, metavar="N", help="First record N real completions per case (billed)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Allowed relative growth before a regression")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any result regressed")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    cases = select_cases(args.filter)
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    if not cases:
+        print(f"No prompt case matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    if args.record:
+        print(f"Recording {args.record} completion(s) per case into {args.cassettes}")
+        asyncio.run(record(cases, args.cassettes, samples=args.record))
+
+    print(f"Measuring {len(cases)} prompt cases")
+    report = asyncio.run(run_suite(cases, args.cassettes))
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Results written to {args.output}")
+
+    status = 0
+    baseline = None if args.save_baseline else load_report(args.baseline)
+    if baseline is not None:
+        changes = section_changes(report, baseline)
+        if changes:
+            print(f"\nSection token changes against {args.baseline}:")
+            for change in changes:
+                delta = change["current"] - change["baseline"]
+                print(f"  {change['case']} {change['section']}: {change['baseline']} -> {change['current']} ({delta:+d})")
+
+        regressions = compare(report, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression['case']} {regression['metric']}: {regression['baseline']} -> {regression['current']}")
+            status = 1 if args.check else 0
+        else:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
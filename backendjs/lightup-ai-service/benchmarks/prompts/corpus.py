@@ -0,0 +1,222 @@
+"""Representative requests rendered through every prompt template, from small to huge."""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import generators
+from src.models.common import KnowledgeNodeInfo, NodeProgress
+from src.services.ai_assessment import ASSESSMENT_GENERATION_SCHEMA, EVALUATION_SCHEMA, QUESTION_TOP_UP_SCHEMA
+from src.services.ai_roadmap import ROADMAP_GENERATION_SCHEMA, ROADMAP_NODES_TOP_UP_SCHEMA
+from src.services.ai_study_plan import PLAN_ADJUSTMENT_SCHEMA, PLAN_GENERATION_SCHEMA
+from src.services.grading_batcher import BATCH_GRADING_SCHEMA
+from src.utils.prompt_templates import PromptTemplates
+
+SIZES = ("small", "medium", "large", "huge")
+
+QUESTION_TYPES = ("multiple_choice", "short_answer", "true_false")
+
+
+@dataclass
+class PromptCase:
+    """One template rendered for one representative request."""
+
+    template: str  # PromptTemplates method
+    size: str
+    render: Callable[[], str]
+    schema: Optional[Dict[str, Any]] = None  # expected_schema the service passes with the prompt
+    output_task: Optional[str] = None  # Output-size task the service reports
+    output_units: float = 1.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.template}[{self.size}]"
+
+
+def _nodes(count: int, seed: int = 0) -> List[KnowledgeNodeInfo]:
+    nodes = generators.study_nodes(generators.random_dag(count, seed=seed))
+    for node in nodes:
+        node.description = f"Understand and apply {node.title.lower()}: key ideas, worked examples and common pitfalls"
+    return nodes
+
+
+def _progress(nodes: List[KnowledgeNodeInfo]) -> List[NodeProgress]:
+    return generators.user_progress(nodes, started_share=0.5)
+
+
+def _questions(count: int, nodes: List[KnowledgeNodeInfo], answer_words: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generated questions with a student answer each, as the grading prompts receive them."""
+    rng = random.Random(seed)
+    questions = []
+    for index in range(count):
+        node = nodes[index % len(nodes)]
+        questions.append({
+            "id": f"q_{index:04d}",
+            "item_id": f"item_{index:04d}",
+            "node_id": node.id,
+            "question": f"Explain how {node.title.lower()} is used in practice and why it matters.",
+            "question_type": QUESTION_TYPES[index % len(QUESTION_TYPES)],
+            "correct_answer": f"A reference answer covering the main ideas of {node.title.lower()}.",
+            "points": 10,
+            "keywords": ["definition", "example", "trade-off"],
+            "answer": " ".join(rng.choice(("it", "uses", "the", "idea", "to", "solve", "problems", "because"))
+                               for _ in range(answer_words))
+        })
+    return questions
+
+
+def _assessment_generation(node_count: int, question_count: int) -> Callable[[], str]:
+    def render() -> str:
+        nodes = _nodes(node_count)
+        return PromptTemplates.assessment_generation_prompt(
+            nodes=nodes,
+            user_progress=[
+                NodeProgress(node_id=node.id, status=node.current_user_status) for node in nodes
+            ],
+            difficulty_level="medium",
+            question_count=question_count,
+            focus_areas=["fundamentals", "applications"]
+        )
+    return render
+
+
+def _assessment_evaluation(question_count: int, answer_words: int) -> Callable[[], str]:
+    def render() -> str:
+        questions = _questions(question_count, _nodes(max(3, question_count // 2)), answer_words)
+        return PromptTemplates.assessment_evaluation_prompt(
+            questions=questions,
+            user_answers=[{"question_id": q["id"], "answer": q["answer"]} for q in questions]
+        )
+    return render
+
+
+def _batch_grading(item_count: int, answer_words: int) -> Callable[[], str]:
+    def render() -> str:
+        return PromptTemplates.batch_grading_prompt(_questions(item_count, _nodes(8), answer_words))
+    return render
+
+
+def _question_top_up(node_count: int, existing: int, missing: int) -> Callable[[], str]:
+    def render() -> str:
+        nodes = _nodes(node_count)
+        return PromptTemplates.question_top_up_prompt(
+            nodes=nodes,
+            existing_questions=[q["question"] for q in _questions(existing, nodes, 0)],
+            difficulty_level="medium",
+            missing_count=missing
+        )
+    return render
+
+
+def _roadmap_generation(description_words: int, custom_input: Optional[str]) -> Callable[[], str]:
+    def render() -> str:
+        description = " ".join(["Learn to build and ship production web services in Python."] * max(1, description_words // 10))
+        return PromptTemplates.roadmap_generation_prompt(
+            course_title="Python Web Development",
+            course_description=description + "\n\nAdditional Context: ",
+            custom_input=custom_input,
+            target_hours=120,
+            difficulty_level="intermediate"
+        )
+    return render
+
+
+def _roadmap_nodes_top_up(existing: int, missing: int) -> Callable[[], str]:
+    def render() -> str:
+        roadmap = generators.random_dag(existing)
+        return PromptTemplates.roadmap_nodes_top_up_prompt(
+            course_title="Python Web Development",
+            existing_nodes=[node.model_dump() for node in roadmap.nodes],
+            missing_node_ids=[f"missing_{index}" for index in range(missing)]
+        )
+    return render
+
+
+def _study_plan_generation(node_count: int, days: int) -> Callable[[], str]:
+    def render() -> str:
+        nodes = _nodes(node_count)
+        return PromptTemplates.study_plan_generation_prompt(
+            course_info={"total_nodes": node_count, "completion_percentage": 30.0, "remaining_hours": 4.0 * node_count},
+            roadmap_data={"nodes": [node.model_dump() for node in nodes]},
+            user_progress=_progress(nodes),
+            target_days=days,
+            daily_hours=2.0,
+            start_date="2025-01-06",
+            preferences={"learning_style": "visual", "intensive_mode": False, "break_intervals": 25,
+                         "preferred_time_slots": ["morning", "evening"]}
+        )
+    return render
+
+
+def _plan_adjustment(days: int) -> Callable[[], str]:
+    def render() -> str:
+        weeks = max(1, days // 7)
+        return PromptTemplates.plan_adjustment_prompt(
+            original_plan={"summary": {
+                "total_days": days, "total_hours": days * 2.0, "nodes_to_complete": days // 2,
+                "estimated_completion_date": "2025-12-31",
+                "difficulty_distribution": {"easy": 10, "medium": 20, "hard": 5},
+                "weekly_breakdown": {f"week_{week + 1}": 14 for week in range(weeks)}
+            }},
+            feedback={
+                "completed_days": list(range(1, days // 2)),
+                "time_spent_minutes": {str(day): 110 for day in range(1, days // 2)},
+                "difficulty_feedback": {f"n{index}": ["too fast"] for index in range(days // 10)},
+                "preferred_adjustments": ["more practice", "shorter sessions"]
+            },
+            remaining_days=days - days // 2
+        )
+    return render
+
+
+def _missing_fields(node_count: int, question_count: int) -> Callable[[], str]:
+    def render() -> str:
+        original = _assessment_generation(node_count, question_count)()
+        questions = _questions(question_count, _nodes(node_count), 0)
+        return PromptTemplates.missing_fields_prompt(
+            original_prompt=original,
+            partial_response={"questions": questions},
+            missing_fields=["estimated_minutes"],
+            schema=ASSESSMENT_GENERATION_SCHEMA
+        )
+    return render
+
+
+CASES: List[PromptCase] = [
+    PromptCase("assessment_generation_prompt", "small", _assessment_generation(1, 5),
+               ASSESSMENT_GENERATION_SCHEMA, "assessment", 5),
+    PromptCase("assessment_generation_prompt", "medium", _assessment_generation(5, 6),
+               ASSESSMENT_GENERATION_SCHEMA, "assessment", 6),
+    PromptCase("assessment_generation_prompt", "large", _assessment_generation(20, 15),
+               ASSESSMENT_GENERATION_SCHEMA, "assessment", 15),
+    PromptCase("assessment_generation_prompt", "huge", _assessment_generation(60, 15),
+               ASSESSMENT_GENERATION_SCHEMA, "assessment", 15),
+    PromptCase("assessment_evaluation_prompt", "small", _assessment_evaluation(3, 10), EVALUATION_SCHEMA, "evaluation", 3),
+    PromptCase("assessment_evaluation_prompt", "medium", _assessment_evaluation(6, 40), EVALUATION_SCHEMA, "evaluation", 6),
+    PromptCase("assessment_evaluation_prompt", "large", _assessment_evaluation(15, 150), EVALUATION_SCHEMA, "evaluation", 15),
+    PromptCase("batch_grading_prompt", "small", _batch_grading(1, 20), BATCH_GRADING_SCHEMA, "batch_grading", 1),
+    PromptCase("batch_grading_prompt", "medium", _batch_grading(8, 40), BATCH_GRADING_SCHEMA, "batch_grading", 8),
+    PromptCase("batch_grading_prompt", "large", _batch_grading(32, 80), BATCH_GRADING_SCHEMA, "batch_grading", 32),
+    PromptCase("question_top_up_prompt", "small", _question_top_up(3, 4, 2), QUESTION_TOP_UP_SCHEMA, "question_top_up", 2),
+    PromptCase("question_top_up_prompt", "large", _question_top_up(60, 12, 3), QUESTION_TOP_UP_SCHEMA, "question_top_up", 3),
+    PromptCase("roadmap_generation_prompt", "small", _roadmap_generation(10, None), ROADMAP_GENERATION_SCHEMA, "roadmap"),
+    PromptCase("roadmap_generation_prompt", "large", _roadmap_generation(300, "Focus on Django, REST APIs and deployment"),
+               ROADMAP_GENERATION_SCHEMA, "roadmap"),
+    PromptCase("roadmap_nodes_top_up_prompt", "small", _roadmap_nodes_top_up(10, 2),
+               ROADMAP_NODES_TOP_UP_SCHEMA, "roadmap_nodes_top_up", 2),
+    PromptCase("roadmap_nodes_top_up_prompt", "huge", _roadmap_nodes_top_up(500, 25),
+               ROADMAP_NODES_TOP_UP_SCHEMA, "roadmap_nodes_top_up", 25),
+    PromptCase("study_plan_generation_prompt", "small", _study_plan_generation(10, 7), PLAN_GENERATION_SCHEMA, "study_plan", 7),
+    PromptCase("study_plan_generation_prompt", "medium", _study_plan_generation(50, 30), PLAN_GENERATION_SCHEMA, "study_plan", 30),
+    PromptCase("study_plan_generation_prompt", "large", _study_plan_generation(200, 90), PLAN_GENERATION_SCHEMA, "study_plan", 90),
+    PromptCase("study_plan_generation_prompt", "huge", _study_plan_generation(1000, 365), PLAN_GENERATION_SCHEMA, "study_plan", 365),
+    PromptCase("plan_adjustment_prompt", "medium", _plan_adjustment(30), PLAN_ADJUSTMENT_SCHEMA, "plan_adjustment", 15),
+    PromptCase("plan_adjustment_prompt", "huge", _plan_adjustment(365), PLAN_ADJUSTMENT_SCHEMA, "plan_adjustment", 183),
+    PromptCase("missing_fields_prompt", "medium", _missing_fields(5, 6)),
+    PromptCase("continuation_prompt", "small", PromptTemplates.continuation_prompt),
+]
+
+
+def select_cases(pattern: str = "") -> List[PromptCase]:
+    """Cases whose name contains ``pattern`` (all cases if empty)."""
+    return [case for case in CASES if pattern.lower() in case.name.lower()]
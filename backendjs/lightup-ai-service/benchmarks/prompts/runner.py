@@ -0,0 +1,342 @@
+"""Token counting per prompt section, replay of recorded completions, and baseline comparison."""
+
+import json
+import platform
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+from benchmarks.prompts.corpus import PromptCase
+from src.config.settings import settings
+from src.services.fake_llm import CassetteStore, FakeLLMProvider, cassette_key
+from src.services.llm_client import llm_client, schema_instructions
+from src.utils.json_repair import JSONRepair
+from src.utils.schema_validator import compile_schema
+
+# Upper-case heading lines ("KNOWLEDGE NODES:", "RESPONSE FORMAT (JSON):") start a section
+SECTION_HEADING = re.compile(r"^([A-Z][A-Z0-9 _/&-]{2,}(?: \([^)\n]*\))?):", re.MULTILINE)
+
+# Replay outcomes that still yield a usable response without another call
+SUCCESS_OUTCOMES = ("clean", "repaired", "pruned")
+OUTCOMES = SUCCESS_OUTCOMES + ("missing_fields", "invalid", "unparseable")
+
+# Largest drop in replay success rate not reported as a regression
+MAX_SUCCESS_RATE_DROP = 0.05
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when installed, otherwise estimates them as the LLM client does."""
+
+    def __init__(self, model: str):
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            self.name = f"tiktoken/{self._encoding.name}"
+        else:
+            self._encoding = None
+            self.name = "estimate/4-chars"
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text) // 4 + 1
+
+
+def split_sections(prompt: str) -> List[Tuple[str, str]]:
+    """
+    Split a rendered prompt at its upper-case headings.
+
+    Text before the first heading is the ``preamble``; a heading that appears
+    more than once (e.g. in a prompt wrapping another) is reported once per
+    occurrence and summed by the caller.
+
+    Returns:
+        (section name, text) pairs in prompt order
+    """
+    sections = []
+    matches = list(SECTION_HEADING.finditer(prompt))
+    preamble = prompt[:matches[0].start()] if matches else prompt
+    if preamble.strip():
+        sections.append(("preamble", preamble))
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(prompt)
+        name = re.sub(r"[^a-z0-9]+", "_", match.group(1).lower()).strip("_")
+        sections.append((name, prompt[match.start():end]))
+    return sections
+
+
+def _system_message(case: PromptCase, structured: bool) -> str:
+    """System message the LLM client sends with the case's prompt."""
+    if case.schema is None or structured:
+        return ""
+    return schema_instructions(case.schema)
+
+
+def _schema_payload(case: PromptCase, structured: bool) -> str:
+    """Schema text sent with the prompt: system message suffix, or the structured-output schema."""
+    if case.schema is None:
+        return ""
+    if not structured:
+        return schema_instructions(case.schema)
+    compiled = compile_schema(case.schema)
+    return json.dumps(compiled.strict_schema or compiled.schema)
+
+
+def measure_case(case: PromptCase, counter: TokenCounter, structured: bool) -> Dict[str, Any]:
+    """
+    Render a case and count its input tokens, in total and per section.
+
+    The schema sent alongside the prompt is its own ``schema`` section.
+
+    Returns:
+        Characters, input tokens and tokens per section
+    """
+    prompt = case.render()
+    sections: Counter = Counter()
+    for name, text in split_sections(prompt):
+        sections[name] += counter.count(text)
+    schema = _schema_payload(case, structured)
+    if schema:
+        sections["schema"] = counter.count(schema)
+    return {
+        "chars": len(prompt) + len(schema),
+        "input_tokens": sum(sections.values()),
+        "sections": dict(sections)
+    }
+
+
+def classify(text: str, schema: Dict[str, Any]) -> str:
+    """
+    Run a completion through the client's parse, repair and validation steps.
+
+    Returns:
+        ``clean``, ``repaired`` (syntax fixed locally), ``pruned`` (invalid
+        items dropped), ``missing_fields`` (would need a follow-up call),
+        ``invalid`` or ``unparseable``
+    """
+    try:
+        parsed, repairs = JSONRepair.parse(text)
+    except ValueError:
+        return "unparseable"
+    if isinstance(parsed, dict) and any(field not in parsed for field in schema.get("required", [])):
+        return "missing_fields"
+    _, dropped, errors = compile_schema(schema).prune(parsed)
+    if errors:
+        return "invalid"
+    if dropped:
+        return "pruned"
+    return "repaired" if repairs else "clean"
+
+
+async def replay_case(
+    case: PromptCase,
+    store: CassetteStore,
+    counter: TokenCounter,
+    structured: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    Replay every completion recorded for a case's exact prompt.
+
+    Truncated recordings are followed through their recorded continuations,
+    as the client would, before parsing. A changed template changes the
+    prompt, so its completions have to be recorded again.
+
+    Returns:
+        Outcome counts, success rate and mean output tokens, or None for
+        cases without a response schema
+    """
+    if case.schema is None:
+        return None
+    prompt = case.render()
+    system_message = _system_message(case, structured)
+    recordings = await store.recordings(cassette_key(prompt, system_message, "json"))
+
+    outcomes: Counter = Counter()
+    output_tokens = []
+    continuations = 0
+    for recording in recordings:
+        text = recording["text"]
+        truncated = recording.get("truncated", False)
+        for _ in range(settings.llm_max_continuations if not structured else 0):
+            if not truncated:
+                break
+            rest = await store.next_recording(cassette_key(prompt, system_message, "json", text))
+            if rest is None:
+                break
+            text += rest["text"]
+            truncated = rest.get("truncated", False)
+            continuations += 1
+        outcomes[classify(text, case.schema)] += 1
+        output_tokens.append(counter.count(text))
+
+    samples = len(recordings)
+    return {
+        "samples": samples,
+        "outcomes": {outcome: outcomes[outcome] for outcome in OUTCOMES if outcomes[outcome]},
+        "success_rate": round(sum(outcomes[o] for o in SUCCESS_OUTCOMES) / samples, 3) if samples else None,
+        "output_tokens_mean": round(sum(output_tokens) / samples, 1) if samples else None,
+        "continuations": continuations
+    }
+
+
+async def run_suite(
+    cases: List[PromptCase],
+    cassette_dir: str,
+    structured: Optional[bool] = None,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Measure every case and replay its recorded completions.
+
+    Args:
+        cases: Cases to run
+        cassette_dir: Directory of recorded completions
+        structured: Whether schemas go out as structured outputs (default: the setting)
+        log: Progress output
+
+    Returns:
+        Report with ``environment`` and per-case ``results``
+    """
+    structured = settings.llm_structured_outputs if structured is None else structured
+    counter = TokenCounter(settings.openai_model)
+    store = CassetteStore(cassette_dir)
+
+    results = {}
+    for case in cases:
+        result = measure_case(case, counter, structured)
+        replay = await replay_case(case, store, counter, structured)
+        if replay is not None:
+            result["replay"] = replay
+        results[case.name] = result
+
+        replay_note = ""
+        if replay and replay["samples"]:
+            replay_note = (
+                f"  {replay['samples']:>3} replayed, {replay['success_rate']:.0%} usable,"
+                f" ~{replay['output_tokens_mean']:.0f} output tokens"
+            )
+        elif replay is not None:
+            replay_note = "  no recordings"
+        log(f"  {case.name:<45} {result['input_tokens']:>8} input tokens{replay_note}")
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "tokenizer": counter.name,
+            "model": settings.openai_model,
+            "structured_outputs": structured,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+
+
+async def record(
+    cases: List[PromptCase],
+    cassette_dir: str,
+    samples: int = 1,
+    log: Callable[[str], None] = print
+) -> None:
+    """
+    Record real completions for each case through the LLM client.
+
+    Calls go through ``generate_completion`` exactly as the services make
+    them, with the fake provider in record mode storing each provider call.
+    This needs provider credentials and is billed.
+
+    Args:
+        cases: Cases to record (those without a schema are skipped)
+        cassette_dir: Directory to store recordings in
+        samples: Completions to record per case
+        log: Progress output
+    """
+    structured = settings.llm_structured_outputs
+    recorder = FakeLLMProvider(mode="record", cassette_dir=cassette_dir)
+    previous, llm_client.fake_provider = llm_client.fake_provider, recorder
+    try:
+        for case in cases:
+            if case.schema is None:
+                continue
+            compiled = compile_schema(case.schema)
+            for _ in range(samples):
+                await llm_client.generate_completion(
+                    prompt=case.render(),
+                    response_format="json",
+                    system_message=_system_message(case, structured),
+                    json_schema=compiled if structured else None,
+                    response_schema=compiled,
+                    output_task=case.output_task,
+                    output_units=case.output_units
+                )
+            log(f"  {case.name:<45} recorded {samples}")
+    finally:
+        llm_client.fake_provider = previous
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.02) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline, case by case.
+
+    Input sizes are deterministic, so any growth beyond ``tolerance`` counts.
+    Tokens are compared when both reports used the same tokenizer, characters
+    otherwise. Replays regress when mean output tokens grow beyond
+    ``tolerance`` or the usable share drops by more than five points.
+
+    Args:
+        report: New results from ``run_suite``
+        baseline: Earlier results from ``run_suite``
+        tolerance: Allowed relative increase
+
+    Returns:
+        Regressions, each with the case, metric and both values
+    """
+    same_tokenizer = report["environment"].get("tokenizer") == baseline.get("environment", {}).get("tokenizer")
+    size_metric = "input_tokens" if same_tokenizer else "chars"
+    regressions = []
+
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if result[size_metric] > base[size_metric] * (1 + tolerance):
+            regressions.append({"case": name, "metric": size_metric, "baseline": base[size_metric], "current": result[size_metric]})
+
+        replay, base_replay = result.get("replay") or {}, base.get("replay") or {}
+        if not replay.get("samples") or not base_replay.get("samples"):
+            continue
+        if same_tokenizer and replay["output_tokens_mean"] > base_replay["output_tokens_mean"] * (1 + tolerance):
+            regressions.append({
+                "case": name, "metric": "output_tokens_mean",
+                "baseline": base_replay["output_tokens_mean"], "current": replay["output_tokens_mean"]
+            })
+        if replay["success_rate"] < base_replay["success_rate"] - MAX_SUCCESS_RATE_DROP:
+            regressions.append({
+                "case": name, "metric": "success_rate",
+                "baseline": base_replay["success_rate"], "current": replay["success_rate"]
+            })
+    return regressions
+
+
+def section_changes(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-section token differences from the baseline, to show where a template change landed."""
+    changes = []
+    for name, result in report["results"].items():
+        base_sections = baseline.get("results", {}).get(name, {}).get("sections")
+        if base_sections is None:
+            continue
+        for section in sorted(set(result["sections"]) | set(base_sections)):
+            current, previous = result["sections"].get(section, 0), base_sections.get(section, 0)
+            if current != previous:
+                changes.append({"case": name, "section": section, "baseline": previous, "current": current})
+    return changes
@@ -0,0 +1,225 @@
+"""Time and peak-memory measurement, baselines and regression checks."""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.cases import BenchmarkCase
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+QUICK_SIZES = (10, 100, 1000)
+
+# Repeat fast runs until this much time was spent measuring, up to MAX_REPEATS
+MIN_MEASURE_SECONDS = 0.2
+MAX_REPEATS = 20
+
+# Differences below this are noise, never reported as regressions
+MIN_REGRESSION_SECONDS = 0.001
+
+
+def measure_time(run: Callable[..., Any], args: Tuple[Any, ...]) -> Dict[str, float]:
+    """
+    Time a call, repeating fast calls to get a stable figure.
+
+    Args:
+        run: Function under test
+        args: Its arguments
+
+    Returns:
+        Best and median seconds per call, and the number of calls timed
+    """
+    timings: List[float] = []
+    spent = 0.0
+    while not timings or (spent < MIN_MEASURE_SECONDS and len(timings) < MAX_REPEATS):
+        gc.collect()
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        spent += elapsed
+    return {"seconds": min(timings), "median_seconds": statistics.median(timings), "repeats": len(timings)}
+
+
+def measure_peak_memory(run: Callable[..., Any], args: Tuple[Any, ...]) -> int:
+    """
+    Measure memory allocated at the peak of a call, beyond what its inputs hold.
+
+    Runs the call once more under tracemalloc, which slows it down, so this is
+    kept separate from the timed runs.
+
+    Returns:
+        Peak bytes allocated during the call
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def _growth_exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """Slope of log(time) over log(size) between the last two measured sizes."""
+    if len(points) < 2:
+        return None
+    (small, small_time), (large, large_time) = points[-2], points[-1]
+    if small_time <= 0 or large_time <= 0 or large == small:
+        return None
+    return math.log(large_time / small_time) / math.log(large / small)
+
+
+def run_case(
+    case: BenchmarkCase,
+    sizes: List[int],
+    max_seconds: float,
+    memory: bool = True,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Benchmark one case at increasing sizes.
+
+    A size is skipped when the growth seen so far predicts a single call would
+    take longer than ``max_seconds``; such results are recorded as skipped.
+
+    Args:
+        case: Case to run
+        sizes: Input sizes in increasing order
+        max_seconds: Predicted time per call above which a size is skipped
+        memory: Also measure peak memory
+        log: Progress output
+
+    Returns:
+        Results per size, keyed by the size as a string, and the growth exponent
+    """
+    results: Dict[str, Any] = {}
+    points: List[Tuple[int, float]] = []
+
+    for size in sizes:
+        if points:
+            exponent = max(1.0, _growth_exponent(points) or 1.0)
+            last_size, last_time = points[-1]
+            predicted = last_time * (size / last_size) ** exponent
+            if predicted > max_seconds:
+                results[str(size)] = {"skipped": f"predicted {predicted:.1f}s exceeds {max_seconds:g}s"}
+                log(f"  {case.name:<60} n={size:<7} skipped (predicted {predicted:.1f}s)")
+                continue
+
+        args = case.setup(size)
+        try:
+            result: Dict[str, Any] = measure_time(case.run, args)
+            if memory:
+                result["peak_kb"] = round(measure_peak_memory(case.run, args) / 1024, 1)
+        except RecursionError:
+            results[str(size)] = {"error": "RecursionError"}
+            log(f"  {case.name:<60} n={size:<7} RecursionError")
+            break
+        except Exception as e:
+            results[str(size)] = {"error": f"{type(e).__name__}: {e}"}
+            log(f"  {case.name:<60} n={size:<7} {type(e).__name__}")
+            break
+
+        result["seconds"] = round(result["seconds"], 6)
+        result["median_seconds"] = round(result["median_seconds"], 6)
+        results[str(size)] = result
+        points.append((size, result["seconds"]))
+        memory_note = f"  peak {result['peak_kb']:>10.1f} KiB" if memory else ""
+        log(f"  {case.name:<60} n={size:<7} {result['seconds'] * 1000:>11.3f} ms{memory_note}")
+
+    exponent = _growth_exponent(points)
+    if exponent is not None:
+        log(f"  {case.name:<60} time grows ~n^{exponent:.2f}")
+    return {"sizes": results, "growth_exponent": round(exponent, 2) if exponent is not None else None}
+
+
+def run_suite(
+    cases: List[BenchmarkCase],
+    sizes: List[int],
+    max_seconds: float,
+    memory: bool = True,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Run every case and collect the results with a description of the machine.
+
+    Returns:
+        Report with ``environment`` and per-case ``results``
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = run_case(case, sizes, max_seconds, memory=memory, log=log)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "recursion_limit": sys.getrecursionlimit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "max_seconds": max_seconds,
+        "results": results
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline.
+
+    A result regresses when it is more than ``tolerance`` slower (or uses more
+    than ``tolerance`` more peak memory) than the baseline, or when it errors
+    where the baseline did not. Tiny absolute differences are ignored.
+
+    Args:
+        report: New results from ``run_suite``
+        baseline: Earlier results from ``run_suite``
+        tolerance: Allowed relative increase
+
+    Returns:
+        Regressions, each with the case, size, metric and both values
+    """
+    regressions = []
+    for name, case_result in report["results"].items():
+        base_sizes = baseline.get("results", {}).get(name, {}).get("sizes", {})
+        for size, result in case_result["sizes"].items():
+            base = base_sizes.get(size)
+            if not base or "skipped" in base or "skipped" in result:
+                continue
+            if "error" in result and "error" not in base:
+                regressions.append({"case": name, "size": size, "metric": "error", "baseline": None, "current": result["error"]})
+                continue
+            if "error" in result or "error" in base:
+                continue
+
+            seconds, base_seconds = result["seconds"], base["seconds"]
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append({"case": name, "size": size, "metric": "seconds", "baseline": base_seconds, "current": seconds})
+
+            peak, base_peak = result.get("peak_kb"), base.get("peak_kb")
+            if peak is not None and base_peak is not None and peak > base_peak * (1 + tolerance) and peak - base_peak > 64:
+                regressions.append({"case": name, "size": size, "metric": "peak_kb", "baseline": base_peak, "current": peak})
+    return regressions
+
+
+def load_report(path: str) -> Optional[Dict[str, Any]]:
+    """Read a stored report, or None if the file does not exist."""
+    try:
+        with open(path, encoding="utf-8") as report_file:
+            return json.load(report_file)
+    except FileNotFoundError:
+        return None
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """Write a report as indented JSON."""
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+        report_file.write("\n")
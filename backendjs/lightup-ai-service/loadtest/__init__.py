@@ -0,0 +1,4 @@
+"""End-to-end load tests against a locally started service.
+
+Run from the service root with ``python -m loadtest``; see ``--help``.
+"""
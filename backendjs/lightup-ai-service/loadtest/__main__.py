@@ -0,0 +1,104 @@
+"""Command line entry point: ``python -m loadtest``."""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+from benchmarks.runner import load_report, save_report
+from loadtest.runner import compare, run_suite
+from loadtest.scenarios import DEFAULT_STAGES, QUICK_STAGES, parse_stages, select_scenarios
+from loadtest.server import LocalServer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description="Load test the API end to end against a local service using the fake LLM provider."
+    )
+    parser.add_argument("-k", "--filter", default="", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--stages", help="Concurrency ramp as users:seconds pairs (default: 1:10,8:15,32:15)")
+    parser.add_argument("--quick", action="store_true", help="Short ramp of 1 and 8 users")
+    parser.add_argument("--url", help="Test a service already running at this URL instead of starting one")
+    parser.add_argument("--pid", type=int, help="Process id of the service at --url, for worker memory")
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn workers of the started service")
+    parser.add_argument("--fake-latency-ms", type=float, default=200.0, help="Fake provider time to first token")
+    parser.add_argument("--fake-tokens-per-second", type=float, default=0.0, help="Fake provider output rate (0: instant)")
+    parser.add_argument("--server-log", help="Write the started service's output to this file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for request choice and bodies")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative change before a regression")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any result regressed")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    scenarios = select_scenarios(args.filter)
+    if args.list:
+        for scenario in scenarios:
+            print(f"{scenario.name:<10} {scenario.description}")
+        return 0
+    if not scenarios:
+        print(f"No scenario matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    stages = parse_stages(args.stages) if args.stages else list(QUICK_STAGES if args.quick else DEFAULT_STAGES)
+    config = {
+        "workers": args.workers,
+        "fake_latency_ms": args.fake_latency_ms,
+        "fake_tokens_per_second": args.fake_tokens_per_second,
+        "seed": args.seed
+    }
+
+    names = ", ".join(scenario.name for scenario in scenarios)
+    if args.url:
+        config = {"url": args.url}
+        print(f"Running {names} against {args.url} with stages {stages}")
+        report = asyncio.run(run_suite(args.url, scenarios, stages, pid=args.pid, config=config, seed=args.seed))
+    else:
+        server = LocalServer(workers=args.workers, env={
+            "LLM_FAKE_LATENCY_MS": str(args.fake_latency_ms),
+            "LLM_FAKE_TOKENS_PER_SECOND": str(args.fake_tokens_per_second),
+            "LLM_FAKE_SEED": str(args.seed)
+        }, log_path=args.server_log)
+        print(f"Starting the service with {args.workers} worker(s) on {server.url}")
+        with server:
+            print(f"Running {names} with stages {stages}")
+            report = asyncio.run(run_suite(server.url, scenarios, stages, pid=server.pid, config=config, seed=args.seed))
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Results written to {args.output}")
+
+    status = 0
+    baseline = None if args.save_baseline else load_report(args.baseline)
+    if baseline is not None:
+        if baseline.get("config") != report["config"]:
+            print(f"\nNote: {args.baseline} was recorded with different settings: {baseline.get('config')}")
+        regressions = compare(report, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(
+                    f"  {regression['scenario']} users={regression['stage']} {regression['metric']}: "
+                    f"{regression['baseline']} -> {regression['current']}"
+                )
+            status = 1 if args.check else 0
+        else:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
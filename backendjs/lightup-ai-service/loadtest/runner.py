@@ -0,0 +1,318 @@
+"""Closed-loop load generation, latency and memory reports, and baseline comparison."""
+
+import asyncio
+import math
+import os
+import platform
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from loadtest.scenarios import OPERATIONS, SEED_OPERATIONS, Operation, Scenario, Session
+from loadtest.server import worker_rss_bytes
+
+# Per-request timeout; generation endpoints carry their own deadlines well below this
+REQUEST_TIMEOUT = 120.0
+
+# Seconds between worker memory samples
+RSS_SAMPLE_INTERVAL = 0.5
+
+# Differences below these are noise, never reported as regressions
+MIN_REGRESSION_MS = 5.0
+MIN_REGRESSION_RSS_MB = 16.0
+MAX_ERROR_RATE_INCREASE = 0.01
+
+PERCENTILES = (50, 95, 99)
+
+# Header naming each virtual user; LocalServer sets RATE_LIMIT_CLIENT_HEADER to trust it
+CLIENT_ID_HEADER = "X-Client-ID"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    summary = {f"p{q}_ms": percentile(latencies, q) for q in PERCENTILES}
+    summary["max_ms"] = max(latencies) if latencies else None
+    return {key: round(value, 2) if value is not None else None for key, value in summary.items()}
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    operation: Operation,
+    session: Session,
+    client_id: str
+) -> Optional[Tuple[str, float]]:
+    """
+    Make one call of an operation as one client.
+
+    Returns:
+        Status (the HTTP code, or the exception name if no response came back)
+        and latency in milliseconds; None if the operation had nothing to act on
+    """
+    request = operation.build(session)
+    if request is None:
+        return None
+    path, body = request
+
+    start = time.perf_counter()
+    try:
+        response = await client.request(
+            operation.method, path, json=body, headers={CLIENT_ID_HEADER: client_id}
+        )
+    except httpx.HTTPError as e:
+        return type(e).__name__, (time.perf_counter() - start) * 1000
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    if response.is_success and operation.record is not None:
+        operation.record(session, response.json())
+    return str(response.status_code), latency_ms
+
+
+async def seed_session(client: httpx.AsyncClient, session: Session) -> List[str]:
+    """
+    Create one resource of each kind so views and evaluations have ids to use.
+
+    Returns:
+        Failures, as ``operation: status`` lines
+    """
+    failures = []
+    for name in SEED_OPERATIONS:
+        result = await _send(client, OPERATIONS[name], session, "load-seed")
+        if result is not None and not result[0].startswith("2"):
+            failures.append(f"{name}: {result[0]}")
+    return failures
+
+
+async def _sample_rss(pid: Optional[int], peak: Dict[str, int], stop: asyncio.Event) -> None:
+    while pid is not None and not stop.is_set():
+        rss = worker_rss_bytes(pid)
+        if rss is not None:
+            peak["bytes"] = max(peak.get("bytes", 0), rss)
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    session: Session,
+    users: int,
+    seconds: float,
+    pid: Optional[int] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Drive a scenario with a fixed number of concurrent users for a while.
+
+    Each user identifies as its own client and sends its next request as soon
+    as the previous one completes.
+    Latency percentiles cover successful requests only; failures are counted
+    by status so a fast error cannot flatter the figures.
+
+    Args:
+        client: Client bound to the service URL
+        scenario: Operation mix to draw from
+        session: Ids created so far
+        users: Concurrent users
+        seconds: Stage duration
+        pid: Server process id, for worker memory
+        seed: Random seed for the users' choices
+
+    Returns:
+        Throughput, error rate, status counts, latency percentiles overall and
+        per operation, and peak worker RSS
+    """
+    outcomes: List[Tuple[str, str, float]] = []
+    deadline = time.monotonic() + seconds
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            operation = scenario.choose(rng)
+            result = await _send(client, operation, session, f"load-user-{index}")
+            if result is None:
+                await asyncio.sleep(0)
+                continue
+            outcomes.append((operation.name, *result))
+
+    peak: Dict[str, int] = {}
+    stop_sampling = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(pid, peak, stop_sampling))
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(user(index) for index in range(users)))
+    finally:
+        elapsed = time.monotonic() - started
+        stop_sampling.set()
+        await sampler
+
+    statuses = Counter(status for _, status, _ in outcomes)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    by_operation: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+    for name, status, latency_ms in outcomes:
+        by_operation[name].append((status, latency_ms))
+
+    operations = {}
+    for name, results in sorted(by_operation.items()):
+        operation_errors = sum(1 for status, _ in results if not status.startswith("2"))
+        operations[name] = {
+            "requests": len(results),
+            "errors": operation_errors,
+            **_latency_summary([latency for status, latency in results if status.startswith("2")])
+        }
+
+    return {
+        "users": users,
+        "seconds": round(elapsed, 2),
+        "requests": len(outcomes),
+        "throughput_rps": round(len(outcomes) / elapsed, 2) if elapsed > 0 else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(outcomes), 4) if outcomes else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency": _latency_summary([latency for _, status, latency in outcomes if status.startswith("2")]),
+        "operations": operations,
+        "rss_mb_peak": round(peak["bytes"] / 2**20, 1) if "bytes" in peak else None
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    stages: List[Tuple[int, float]],
+    pid: Optional[int] = None,
+    seed: int = 0,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Seed a scenario's resources, then run each stage of the ramp in turn.
+
+    Returns:
+        Results per stage, keyed by the number of users as a string
+    """
+    session = Session(rng=random.Random(seed), variants=scenario.variants)
+    seed_failures = await seed_session(client, session)
+    for failure in seed_failures:
+        log(f"  {scenario.name:<10} seeding failed: {failure}")
+
+    results: Dict[str, Any] = {}
+    for users, seconds in stages:
+        stage = await run_stage(client, scenario, session, users, seconds, pid=pid, seed=seed)
+        results[str(users)] = stage
+        latency = stage["latency"]
+        rss = f"  rss {stage['rss_mb_peak']:>7.1f} MiB" if stage["rss_mb_peak"] is not None else ""
+        log(
+            f"  {scenario.name:<10} users={users:<4} {stage['throughput_rps']:>8.1f} req/s"
+            f"  p50 {_ms(latency['p50_ms'])}  p95 {_ms(latency['p95_ms'])}  p99 {_ms(latency['p99_ms'])}"
+            f"  errors {stage['error_rate']:>6.1%}{rss}"
+        )
+    return {"description": scenario.description, "seed_failures": seed_failures, "stages": results}
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:>8.1f}ms" if value is not None else "       -  "
+
+
+async def run_suite(
+    url: str,
+    scenarios: List[Scenario],
+    stages: List[Tuple[int, float]],
+    pid: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+    seed: int = 0,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """
+    Run every scenario against a service and collect the results.
+
+    Args:
+        url: Base URL of the service
+        scenarios: Scenarios to run, in order
+        stages: Concurrency ramp, as (users, seconds) pairs
+        pid: Server process id, for worker memory
+        config: Server settings recorded with the results
+        seed: Random seed
+        log: Progress output
+
+    Returns:
+        Report with ``environment``, ``config`` and per-scenario ``results``
+    """
+    max_users = max(users for users, _ in stages)
+    # Drop idle connections before uvicorn's 5s keep-alive timeout, so none is reused as the server closes it
+    limits = httpx.Limits(max_connections=max_users, max_keepalive_connections=max_users, keepalive_expiry=2.0)
+    results = {}
+    async with httpx.AsyncClient(base_url=url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(client, scenario, stages, pid=pid, seed=seed, log=log)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "config": config or {},
+        "stages": [list(stage) for stage in stages],
+        "results": results
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline, stage by stage.
+
+    A stage regresses when a latency percentile or peak worker RSS grows by
+    more than ``tolerance``, when throughput drops by more than ``tolerance``,
+    or when the error rate rises by more than a percentage point. Tiny
+    absolute differences are ignored.
+
+    Args:
+        report: New results from ``run_suite``
+        baseline: Earlier results from ``run_suite``
+        tolerance: Allowed relative change
+
+    Returns:
+        Regressions, each with the scenario, stage, metric and both values
+    """
+    regressions = []
+
+    def regressed(scenario: str, stage: str, metric: str, base: Any, current: Any) -> None:
+        regressions.append({"scenario": scenario, "stage": stage, "metric": metric, "baseline": base, "current": current})
+
+    for name, scenario_result in report["results"].items():
+        base_stages = baseline.get("results", {}).get(name, {}).get("stages", {})
+        for users, result in scenario_result["stages"].items():
+            base = base_stages.get(users)
+            if not base:
+                continue
+
+            for key in (f"p{q}_ms" for q in PERCENTILES):
+                current, previous = result["latency"].get(key), base["latency"].get(key)
+                if current is not None and previous is not None and \
+                        current > previous * (1 + tolerance) and current - previous > MIN_REGRESSION_MS:
+                    regressed(name, users, key, previous, current)
+
+            throughput, base_throughput = result["throughput_rps"], base["throughput_rps"]
+            if throughput < base_throughput * (1 - tolerance):
+                regressed(name, users, "throughput_rps", base_throughput, throughput)
+
+            if result["error_rate"] > base["error_rate"] + MAX_ERROR_RATE_INCREASE:
+                regressed(name, users, "error_rate", base["error_rate"], result["error_rate"])
+
+            rss, base_rss = result.get("rss_mb_peak"), base.get("rss_mb_peak")
+            if rss is not None and base_rss is not None and \
+                    rss > base_rss * (1 + tolerance) and rss - base_rss > MIN_REGRESSION_RSS_MB:
+                regressed(name, users, "rss_mb_peak", base_rss, rss)
+    return regressions
@@ -0,0 +1,203 @@
+"""Load test scenarios: weighted mixes of API operations and their concurrency ramps."""
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks import generators
+
+# Concurrency ramp of a full run: (concurrent users, seconds) per stage
+DEFAULT_STAGES: Tuple[Tuple[int, float], ...] = ((1, 10.0), (8, 15.0), (32, 15.0))
+QUICK_STAGES: Tuple[Tuple[int, float], ...] = ((1, 3.0), (8, 5.0))
+
+# Request body variants per operation; repeats of a variant can be served from the caches
+DEFAULT_VARIANTS = 20
+
+# Nodes per synthetic roadmap sent in assessment and study plan requests
+REQUEST_NODES = 12
+
+
+@dataclass
+class Session:
+    """Ids created during a run, shared by every virtual user so reads target real resources."""
+
+    rng: random.Random
+    variants: int = DEFAULT_VARIANTS
+    roadmap_ids: List[str] = field(default_factory=list)
+    assessments: List[Dict[str, Any]] = field(default_factory=list)  # assessment_id and question ids
+    plan_ids: List[str] = field(default_factory=list)
+
+    def variant(self) -> int:
+        return self.rng.randrange(self.variants)
+
+
+# Builders return (path, JSON body or None); None instead of a tuple means nothing to act on yet
+RequestBuilder = Callable[[Session], Optional[Tuple[str, Optional[Dict[str, Any]]]]]
+
+
+@dataclass
+class Operation:
+    """One API call a virtual user can make."""
+
+    name: str
+    method: str
+    build: RequestBuilder
+    record: Optional[Callable[[Session, Dict[str, Any]], None]] = None  # Keep ids from a successful response
+
+
+def _request_nodes(variant: int) -> List[Dict[str, Any]]:
+    roadmap = generators.random_dag(REQUEST_NODES, seed=variant)
+    return [node.model_dump(mode="json") for node in generators.study_nodes(roadmap)]
+
+
+def _roadmap_body(session: Session) -> Tuple[str, Dict[str, Any]]:
+    variant = session.variant()
+    return "/ai/generate-roadmap", {
+        "course_title": f"Load Test Course {variant}",
+        "course_description": "Synthetic course used by the load test",
+        "search_enabled": False,
+        "target_hours": 40 + variant % 100,
+        "difficulty_level": "beginner"
+    }
+
+
+def _assessment_body(session: Session) -> Tuple[str, Dict[str, Any]]:
+    variant = session.variant()
+    return "/ai/generate-assessment", {
+        "user_course_id": f"load_course_{variant}",
+        "nodes": _request_nodes(variant)[:3],
+        "difficulty_level": "medium",
+        "question_count": 6
+    }
+
+
+def _evaluation_body(session: Session) -> Optional[Tuple[str, Dict[str, Any]]]:
+    if not session.assessments:
+        return None
+    assessment = session.rng.choice(session.assessments)
+    return "/ai/evaluate-assessment", {
+        "assessment_id": assessment["assessment_id"],
+        "answers": [
+            {"question_id": question_id, "answer": f"Answer {session.variant()}", "time_taken_seconds": 30}
+            for question_id in assessment["question_ids"]
+        ]
+    }
+
+
+def _study_plan_body(session: Session) -> Tuple[str, Dict[str, Any]]:
+    variant = session.variant()
+    roadmap = generators.random_dag(REQUEST_NODES, seed=variant)
+    nodes = generators.study_nodes(roadmap)
+    return "/ai/generate-study-plan", {
+        "user_course_id": f"load_course_{variant}",
+        "roadmap": {
+            "nodes": [node.model_dump(mode="json") for node in nodes],
+            "edges": [edge.model_dump(by_alias=True) for edge in roadmap.edges],
+            "total_estimated_hours": round(sum(node.estimated_hours for node in nodes), 1)
+        },
+        "user_progress": [progress.model_dump(mode="json") for progress in generators.user_progress(nodes, seed=variant)],
+        "time_constraints": {"target_days": 14, "daily_hours": 2.0, "start_date": "2025-01-06"}
+    }
+
+
+def _view(template: str, ids: Callable[[Session], List[Any]]) -> RequestBuilder:
+    def build(session: Session) -> Optional[Tuple[str, None]]:
+        available = ids(session)
+        if not available:
+            return None
+        return template.format(session.rng.choice(available)), None
+
+    return build
+
+
+def _keep_roadmap(session: Session, body: Dict[str, Any]) -> None:
+    session.roadmap_ids.append(body["roadmap_id"])
+
+
+def _keep_assessment(session: Session, body: Dict[str, Any]) -> None:
+    session.assessments.append({
+        "assessment_id": body["assessment_id"],
+        "question_ids": [question["id"] for question in body["questions"]]
+    })
+
+
+def _keep_plan(session: Session, body: Dict[str, Any]) -> None:
+    session.plan_ids.append(body["plan_id"])
+
+
+def _assessment_ids(session: Session) -> List[str]:
+    return [assessment["assessment_id"] for assessment in session.assessments]
+
+
+OPERATIONS: Dict[str, Operation] = {operation.name: operation for operation in [
+    Operation("generate_roadmap", "POST", _roadmap_body, _keep_roadmap),
+    Operation("generate_assessment", "POST", _assessment_body, _keep_assessment),
+    Operation("evaluate_assessment", "POST", _evaluation_body),
+    Operation("generate_study_plan", "POST", _study_plan_body, _keep_plan),
+    Operation("get_roadmap", "GET", _view("/ai/roadmap/{}", lambda s: s.roadmap_ids)),
+    Operation("get_roadmap_metrics", "GET", _view("/ai/roadmap/{}/metrics", lambda s: s.roadmap_ids)),
+    Operation("get_roadmap_visualization", "GET", _view("/ai/roadmap/{}/visualization", lambda s: s.roadmap_ids)),
+    Operation("get_assessment", "GET", _view("/ai/assessment/{}", _assessment_ids)),
+    Operation("get_assessment_analytics", "GET", _view("/ai/assessment/{}/analytics", _assessment_ids)),
+    Operation("get_study_plan", "GET", _view("/ai/study-plan/{}", lambda s: s.plan_ids)),
+    Operation("get_study_plan_summary", "GET", _view("/ai/study-plan/{}/summary", lambda s: s.plan_ids)),
+    Operation("get_study_plan_calendar", "GET", _view("/ai/study-plan/{}/calendar", lambda s: s.plan_ids)),
+]}
+
+# Writes run once before a scenario is measured, so reads and evaluations have ids to use
+SEED_OPERATIONS = ("generate_roadmap", "generate_assessment", "generate_study_plan")
+
+
+@dataclass
+class Scenario:
+    """A weighted operation mix driven through a concurrency ramp."""
+
+    name: str
+    description: str
+    mix: Dict[str, float]  # Operation name -> relative weight
+    variants: int = DEFAULT_VARIANTS
+
+    def choose(self, rng: random.Random) -> Operation:
+        names = list(self.mix)
+        return OPERATIONS[rng.choices(names, weights=[self.mix[name] for name in names])[0]]
+
+
+_VIEWS = [name for name in OPERATIONS if name.startswith("get_")]
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "mixed",
+        "Typical traffic: mostly reads, some generation and grading",
+        {
+            "generate_roadmap": 5, "generate_assessment": 10, "evaluate_assessment": 10, "generate_study_plan": 5,
+            **{name: 70 / len(_VIEWS) for name in _VIEWS}
+        }
+    ),
+    Scenario(
+        "generate",
+        "Only the LLM-backed writes, each body distinct: concurrency limits and serialization",
+        {"generate_roadmap": 1, "generate_assessment": 1, "evaluate_assessment": 1, "generate_study_plan": 1},
+        variants=1_000_000
+    ),
+    Scenario(
+        "cached",
+        "The same few generation requests repeated: response cache hit path",
+        {"generate_roadmap": 1, "generate_assessment": 1, "generate_study_plan": 1},
+        variants=3
+    ),
+    Scenario("views", "Only the GET views of generated resources", {name: 1 for name in _VIEWS}),
+]
+
+
+def select_scenarios(pattern: str = "") -> List[Scenario]:
+    """Scenarios whose name contains ``pattern`` (all scenarios if empty)."""
+    return [scenario for scenario in SCENARIOS if pattern.lower() in scenario.name.lower()]
+
+
+def parse_stages(text: str) -> List[Tuple[int, float]]:
+    """Parse ``users:seconds`` pairs, e.g. ``1:10,8:20,32:20``."""
+    stages = []
+    for stage in text.split(","):
+        users, seconds = stage.split(":")
+        stages.append((int(users), float(seconds)))
+    return stages
@@ -0,0 +1,149 @@
+"""Start the service locally with the fake LLM provider and measure its memory."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import IO, Dict, List, Optional
+
+import httpx
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds to wait for /health after starting the server
+STARTUP_TIMEOUT = 30.0
+
+
+def free_port() -> int:
+    """A TCP port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    """Direct child processes, from /proc (Linux only)."""
+    children: List[int] = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as children_file:
+                children.extend(int(child) for child in children_file.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def worker_rss_bytes(pid: int) -> Optional[int]:
+    """
+    Resident memory of the processes serving requests.
+
+    With ``--workers`` uvicorn forks worker processes and the parent only
+    supervises them, so the workers are counted and the parent is not.
+
+    Returns:
+        Summed RSS in bytes, or None where /proc is unavailable
+    """
+    workers = _children(pid) or [pid]
+    sizes = [size for size in (_rss_bytes(worker) for worker in workers) if size is not None]
+    return sum(sizes) if sizes else None
+
+
+class LocalServer:
+    """The service under uvicorn in a subprocess, answering LLM calls with the fake provider."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        env: Optional[Dict[str, str]] = None,
+        port: Optional[int] = None,
+        log_path: Optional[str] = None
+    ):
+        """
+        Initialize the server settings.
+
+        Args:
+            workers: Uvicorn worker processes
+            env: Environment overrides, e.g. fake provider settings
+            port: Port to listen on (a free one if not given)
+            log_path: File for the service's output (discarded if not given)
+        """
+        self.workers = workers
+        self.log_path = log_path
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **os.environ,
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "load-test"),
+            "LLM_FAKE_MODE": "synthesize",
+            "LLM_FAKE_SEED": "0",
+            "LOG_LEVEL": "WARNING",
+            # Virtual users send far more than a real client would; load shedding stays on
+            "RATE_LIMIT_REQUESTS": "1000000",
+            # The harness stands in for a trusted proxy, so each virtual user gets its own bucket
+            "RATE_LIMIT_CLIENT_HEADER": "X-Client-ID",
+            **(env or {})
+        }
+        self.process: Optional[subprocess.Popen] = None
+        self._log_file: Optional[IO[bytes]] = None
+
+    def start(self) -> None:
+        """Start uvicorn and wait until /health answers."""
+        command = [
+            sys.executable, "-m", "uvicorn", "src.main:app",
+            "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning", "--no-access-log"
+        ]
+        if self.workers > 1:
+            command += ["--workers", str(self.workers)]
+        self._log_file = open(self.log_path or os.devnull, "wb")
+        self.process = subprocess.Popen(
+            command, cwd=SERVICE_ROOT, env=self.env, stdout=self._log_file, stderr=subprocess.STDOUT
+        )
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Service exited with status {self.process.returncode} during startup")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"Service did not become healthy within {STARTUP_TIMEOUT:g}s")
+
+    def stop(self) -> None:
+        """Stop the server, killing it if it does not exit promptly."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    def __enter__(self) -> "LocalServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
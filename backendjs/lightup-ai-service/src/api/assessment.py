@@ -1,9 +1,9 @@
 """Assessment API endpoints."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from fastapi.responses import JSONResponse
 
 from src.models.assessment import (
@@ -14,6 +14,8 @@ from src.models.assessment import (
     GeneratedQuestion
 )
 from src.services.ai_assessment import ai_assessment_service
+from src.services.idempotency import REPLAYED_HEADER, idempotency_cache
+from src.utils.deadline import DeadlineExceeded, deadline_scope
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -26,7 +28,9 @@ assessment_store: Dict[str, AssessmentResponse] = {}
 
 @router.post("/generate-assessment", response_model=AssessmentResponse)
 async def generate_assessment(
-    request: AssessmentGenerationRequest
+    request: AssessmentGenerationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
 ) -> AssessmentResponse:
     """
     Generate an AI-powered assessment based on knowledge nodes.
@@ -34,8 +38,13 @@ async def generate_assessment(
     This endpoint analyzes the provided knowledge nodes and user progress
     to create a tailored assessment with appropriate difficulty and coverage.
 
+    Retries carrying the same ``Idempotency-Key`` header receive the first
+    request's assessment instead of generating a new one.
+
     Args:
         request: Assessment generation parameters including nodes, difficulty, and preferences
+        response: Outgoing response, used to flag replays
+        idempotency_key: Optional client-chosen key identifying retries of one request
 
     Returns:
         Generated assessment with questions and evaluation criteria
@@ -67,8 +76,16 @@ async def generate_assessment(
                 detail="Question count must be between 3 and 15"
             )
 
-        # Generate assessment
-        assessment = await ai_assessment_service.generate_assessment(request)
+        # Generate assessment within the configured time budget
+        with deadline_scope(settings.assessment_generation_timeout):
+            assessment, replayed = await idempotency_cache.run(
+                "generate-assessment",
+                idempotency_key,
+                request,
+                lambda: ai_assessment_service.generate_assessment(request)
+            )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
 
         # Store assessment for later evaluation
         assessment_store[assessment.assessment_id] = assessment
@@ -78,7 +95,8 @@ async def generate_assessment(
             extra={
                 "assessment_id": assessment.assessment_id,
                 "question_count": len(assessment.questions),
-                "estimated_minutes": assessment.estimated_minutes
+                "estimated_minutes": assessment.estimated_minutes,
+                "degraded": assessment.degraded
             }
         )
 
@@ -88,6 +106,13 @@ async def generate_assessment(
         logger.warning(f"Assessment generation validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+    except DeadlineExceeded as e:
+        logger.warning(f"Assessment generation timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Assessment generation timed out. Please try again."
+        )
+
     except Exception as e:
         logger.error(f"Assessment generation failed: {e}")
         raise HTTPException(
@@ -140,18 +165,21 @@ async def evaluate_assessment(
         if missing_answers:
             logger.warning(f"Missing answers for questions: {missing_answers}")
 
-        # Evaluate assessment
-        evaluation = await ai_assessment_service.evaluate_assessment(
-            request,
-            original_assessment.questions
-        )
+        # Evaluate assessment within the configured time budget
+        with deadline_scope(settings.assessment_generation_timeout):
+            evaluation = await ai_assessment_service.evaluate_assessment(
+                request,
+                original_assessment.questions,
+                original_assessment.evaluation_criteria
+            )
 
         logger.info(
             "Assessment evaluated successfully",
             extra={
                 "assessment_id": request.assessment_id,
                 "total_score": evaluation.total_score,
-                "percentage": evaluation.percentage
+                "percentage": evaluation.percentage,
+                "degraded": evaluation.degraded
             }
         )
 
@@ -160,6 +188,13 @@ async def evaluate_assessment(
     except HTTPException:
         raise
 
+    except DeadlineExceeded as e:
+        logger.warning(f"Assessment evaluation timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Assessment evaluation timed out. Please try again."
+        )
+
     except Exception as e:
         logger.error(f"Assessment evaluation failed: {e}")
         raise HTTPException(
@@ -0,0 +1,208 @@
+"""Admin debugging endpoints: stored profiles, allocation tracing and cache sizes."""
+
+import asyncio
+import logging
+import tracemalloc
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from src.services.ai_assessment import ai_assessment_service
+from src.services.ai_roadmap import ai_roadmap_service
+from src.services.ai_study_plan import ai_study_plan_service
+from src.services.idempotency import idempotency_cache
+from src.utils.profiling import (
+    ADMIN_TOKEN_HEADER,
+    cache_memory_report,
+    is_admin,
+    request_profiler,
+    top_allocations
+)
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(
+    admin_token: Optional[str] = Header(default=None, alias=ADMIN_TOKEN_HEADER)
+) -> None:
+    """Reject callers without the admin token; hide the endpoints when none is configured."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Debug endpoints are not enabled")
+    if not is_admin(admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_admin)])
+
+# Snapshot growth is reported against, set by POST /debug/memory/snapshot
+_baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+def _service_caches() -> Dict[str, Any]:
+    """In-memory caches whose size is reported."""
+    return {
+        "assessment_questions": ai_assessment_service.question_cache,
+        "assessment_evaluations": ai_assessment_service.evaluation_cache,
+        "assessment_scores": ai_assessment_service.score_cache,
+        "question_bank": ai_assessment_service.question_bank,
+        "roadmaps": ai_roadmap_service.roadmap_cache,
+        "study_plans": ai_study_plan_service.plan_cache,
+        "idempotency": idempotency_cache.responses
+    }
+
+
+@router.get("/profiles")
+async def list_profiles() -> Dict[str, Any]:
+    """
+    List stored request profiles and tracemalloc snapshots, newest first.
+
+    A request is profiled when it is sent with ``X-Profile: cprofile`` or
+    ``X-Profile: sample`` (or ``?profile=``) and the admin token, while
+    profiling is enabled. The response names the profile in ``X-Profile-Id``.
+
+    Returns:
+        Stored files and profiler statistics
+    """
+    return {
+        "enabled": settings.profiling_enabled,
+        "profiles": request_profiler.list_files(),
+        "stats": request_profiler.stats
+    }
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str) -> FileResponse:
+    """
+    Download a stored profile.
+
+    ``.pstats`` files load with ``pstats.Stats``, ``.speedscope.json`` files
+    open in speedscope and ``.tracemalloc`` files load with
+    ``tracemalloc.Snapshot.load``.
+
+    Args:
+        profile_id: Id from ``X-Profile-Id`` or the profile list
+
+    Returns:
+        The profile file
+    """
+    path = request_profiler.path_for(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, filename=profile_id)
+
+
+@router.get("/memory/caches")
+async def cache_sizes() -> Dict[str, Any]:
+    """
+    Report the entry count and approximate memory of each in-memory cache.
+
+    Large caches are measured on a sample of entries and extrapolated.
+
+    Returns:
+        Entries and approximate bytes per cache
+    """
+    return {"caches": cache_memory_report(_service_caches())}
+
+
+@router.get("/memory/tracemalloc")
+async def tracemalloc_status() -> Dict[str, Any]:
+    """
+    Report whether allocations are traced and how much memory is traced.
+
+    Returns:
+        Tracing state, traced and peak bytes
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "has_baseline": _baseline_snapshot is not None
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    frames: int = Query(default=1, ge=1, le=50, description="Stack frames stored per allocation")
+) -> Dict[str, Any]:
+    """
+    Start tracing allocations.
+
+    Tracing slows allocation-heavy code down noticeably; stop it when done.
+
+    Args:
+        frames: Stack frames stored per allocation
+
+    Returns:
+        Tracing state
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.info("tracemalloc started", extra={"frames": frames})
+    return await tracemalloc_status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc() -> Dict[str, Any]:
+    """
+    Stop tracing allocations and drop the baseline snapshot.
+
+    Returns:
+        Tracing state
+    """
+    global _baseline_snapshot
+
+    _baseline_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("tracemalloc stopped")
+    return await tracemalloc_status()
+
+
+@router.post("/memory/snapshot")
+async def take_memory_snapshot() -> Dict[str, Any]:
+    """
+    Write a tracemalloc snapshot to the profile directory and keep it as the growth baseline.
+
+    Returns:
+        Id of the stored snapshot
+    """
+    global _baseline_snapshot
+
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc is not tracing")
+
+    snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+    snapshot_id = await asyncio.to_thread(request_profiler.save_snapshot, snapshot)
+    _baseline_snapshot = snapshot
+    return {"snapshot_id": snapshot_id}
+
+
+@router.get("/memory/top")
+async def top_allocators(
+    limit: int = Query(default=20, ge=1, le=200, description="Allocation sites to return"),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+    since_snapshot: bool = Query(default=False, description="Report growth since the last snapshot")
+) -> Dict[str, Any]:
+    """
+    List the allocation sites holding the most traced memory.
+
+    Args:
+        limit: Allocation sites to return
+        group_by: Group allocations by ``lineno``, ``filename`` or ``traceback``
+        since_snapshot: Report growth since the last ``POST /debug/memory/snapshot``
+
+    Returns:
+        Allocation sites, largest first
+    """
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc is not tracing")
+    if since_snapshot and _baseline_snapshot is None:
+        raise HTTPException(status_code=409, detail="No snapshot taken yet")
+
+    baseline = _baseline_snapshot if since_snapshot else None
+    allocations = await asyncio.to_thread(top_allocations, limit, group_by, baseline)
+    return {"group_by": group_by, "since_snapshot": since_snapshot, "allocations": allocations}
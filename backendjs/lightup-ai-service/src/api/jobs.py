@@ -0,0 +1,173 @@
+"""Background job API endpoints for long-running generations."""
+
+import logging
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.models.jobs import JobRecord, JobSubmissionResponse
+from src.models.roadmap import RoadmapGenerationRequest, RoadmapGenerationResponse
+from src.models.study_plan import StudyPlanRequest, StudyPlanResponse
+from src.services.ai_roadmap import ai_roadmap_service
+from src.services.ai_study_plan import ai_study_plan_service
+from src.services.job_manager import JobQueueFull, job_manager
+from src.utils.deadline import deadline_scope
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# How often an event stream re-reads a job run by another worker
+EVENTS_POLL_SECONDS = 1.0
+
+# Polls without a change before a keep-alive comment is sent
+EVENTS_KEEPALIVE_POLLS = 15
+
+
+async def _run_study_plan(request: StudyPlanRequest) -> StudyPlanResponse:
+    """Generate a study plan as a background job."""
+    with deadline_scope(settings.study_plan_generation_timeout):
+        return await ai_study_plan_service.generate_study_plan(request)
+
+
+async def _run_roadmap(request: RoadmapGenerationRequest) -> RoadmapGenerationResponse:
+    """Generate a roadmap as a background job."""
+    return await ai_roadmap_service.generate_roadmap(request)
+
+
+job_manager.register("study_plan", _run_study_plan)
+job_manager.register("roadmap", _run_roadmap)
+
+
+async def _submit(http_request: Request, kind: str, request, user_key=None) -> JSONResponse:
+    """Queue a job and describe where to follow it."""
+    try:
+        job = await job_manager.submit(kind, request, user_key=user_key)
+    except JobQueueFull as e:
+        logger.warning(f"Job rejected: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many generation jobs are queued. Please retry shortly.",
+            headers={"Retry-After": str(settings.llm_timeout)}
+        )
+
+    submission = JobSubmissionResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=http_request.url_for("get_job", job_id=job.job_id).path,
+        events_url=http_request.url_for("stream_job_events", job_id=job.job_id).path
+    )
+    return JSONResponse(status_code=202, content=submission.model_dump(mode="json"))
+
+
+@router.post("/jobs/study-plan", response_model=JobSubmissionResponse, status_code=202)
+async def submit_study_plan_job(http_request: Request, request: StudyPlanRequest) -> JSONResponse:
+    """
+    Queue study plan generation and return a job id immediately.
+
+    Args:
+        http_request: Incoming HTTP request, used to build job URLs
+        request: Study plan generation parameters
+
+    Returns:
+        Job id with status and event stream URLs
+
+    Raises:
+        HTTPException: 503 if the job queue is full
+    """
+    logger.info(
+        "Study plan job requested",
+        extra={"user_course_id": request.user_course_id, "node_count": len(request.roadmap.nodes)}
+    )
+    return await _submit(http_request, "study_plan", request, user_key=request.user_course_id)
+
+
+@router.post("/jobs/roadmap", response_model=JobSubmissionResponse, status_code=202)
+async def submit_roadmap_job(http_request: Request, request: RoadmapGenerationRequest) -> JSONResponse:
+    """
+    Queue roadmap generation and return a job id immediately.
+
+    Args:
+        http_request: Incoming HTTP request, used to build job URLs
+        request: Roadmap generation parameters
+
+    Returns:
+        Job id with status and event stream URLs
+
+    Raises:
+        HTTPException: 503 if the job queue is full
+    """
+    logger.info("Roadmap job requested", extra={"course_title": request.course_title})
+    return await _submit(http_request, "roadmap", request)
+
+
+@router.get("/jobs/{job_id}", response_model=JobRecord, name="get_job")
+async def get_job(job_id: str) -> JobRecord:
+    """
+    Get the status of a job, including its result once finished.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job record
+
+    Raises:
+        HTTPException: 404 if the job is unknown or expired
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/events", name="stream_job_events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    """
+    Stream job status changes as server-sent events.
+
+    Each event is named after the new status and carries the job record;
+    the stream ends after the succeeded or failed event.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        ``text/event-stream`` response
+
+    Raises:
+        HTTPException: 404 if the job is unknown or expired
+    """
+    if await job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events() -> AsyncIterator[str]:
+        last_status = None
+        idle_polls = 0
+        while True:
+            job = await job_manager.get(job_id)
+            if job is None:
+                yield 'event: error\ndata: {"detail": "Job not found"}\n\n'
+                return
+
+            if job.status != last_status:
+                last_status = job.status
+                idle_polls = 0
+                yield f"event: {job.status.value}\ndata: {job.model_dump_json()}\n\n"
+                if job.finished:
+                    return
+            else:
+                idle_polls += 1
+                if idle_polls >= EVENTS_KEEPALIVE_POLLS:
+                    idle_polls = 0
+                    yield ": keep-alive\n\n"
+
+            await job_manager.wait_for_update(job_id, EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,9 +1,9 @@
 """Roadmap API endpoints."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from fastapi.responses import JSONResponse
 
 from src.models.roadmap import (
@@ -13,6 +13,7 @@ from src.models.roadmap import (
     RoadmapValidationResponse
 )
 from src.services.ai_roadmap import ai_roadmap_service
+from src.services.idempotency import REPLAYED_HEADER, idempotency_cache
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -22,7 +23,9 @@ router = APIRouter()
 
 @router.post("/generate-roadmap", response_model=RoadmapGenerationResponse)
 async def generate_roadmap(
-    request: RoadmapGenerationRequest
+    request: RoadmapGenerationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
 ) -> RoadmapGenerationResponse:
     """
     Generate an AI-powered learning roadmap.
@@ -31,8 +34,13 @@ async def generate_roadmap(
     prerequisites, and optimal learning paths based on the course requirements
     and user preferences.
 
+    Retries carrying the same ``Idempotency-Key`` header receive the first
+    request's roadmap instead of generating a new one.
+
     Args:
         request: Roadmap generation parameters including course details and preferences
+        response: Outgoing response, used to flag replays
+        idempotency_key: Optional client-chosen key identifying retries of one request
 
     Returns:
         Generated roadmap with nodes, edges, and metadata
@@ -71,7 +79,14 @@ async def generate_roadmap(
             )
 
         # Generate roadmap
-        roadmap = await ai_roadmap_service.generate_roadmap(request)
+        roadmap, replayed = await idempotency_cache.run(
+            "generate-roadmap",
+            idempotency_key,
+            request,
+            lambda: ai_roadmap_service.generate_roadmap(request)
+        )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
 
         logger.info(
             "Roadmap generated successfully",
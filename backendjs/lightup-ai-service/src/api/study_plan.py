@@ -1,9 +1,9 @@
 """Study plan API endpoints."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from fastapi.responses import JSONResponse
 
 from src.models.study_plan import (
@@ -13,6 +13,8 @@ from src.models.study_plan import (
     StudyPlanAdjustmentResponse
 )
 from src.services.ai_study_plan import ai_study_plan_service
+from src.services.idempotency import REPLAYED_HEADER, idempotency_cache
+from src.utils.deadline import DeadlineExceeded, deadline_scope
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -22,7 +24,9 @@ router = APIRouter()
 
 @router.post("/generate-study-plan", response_model=StudyPlanResponse)
 async def generate_study_plan(
-    request: StudyPlanRequest
+    request: StudyPlanRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
 ) -> StudyPlanResponse:
     """
     Generate an AI-powered personalized study plan.
@@ -31,8 +35,13 @@ async def generate_study_plan(
     and time constraints to create an optimized study schedule with daily
     activities and milestones.
 
+    Retries carrying the same ``Idempotency-Key`` header receive the first
+    request's plan instead of generating a new one.
+
     Args:
         request: Study plan generation parameters including roadmap, progress, and constraints
+        response: Outgoing response, used to flag replays
+        idempotency_key: Optional client-chosen key identifying retries of one request
 
     Returns:
         Generated study plan with daily schedule and recommendations
@@ -70,8 +79,16 @@ async def generate_study_plan(
                 detail="Daily hours must be between 0.5 and 12"
             )
 
-        # Generate study plan
-        study_plan = await ai_study_plan_service.generate_study_plan(request)
+        # Generate study plan within the configured time budget
+        with deadline_scope(settings.study_plan_generation_timeout):
+            study_plan, replayed = await idempotency_cache.run(
+                "generate-study-plan",
+                idempotency_key,
+                request,
+                lambda: ai_study_plan_service.generate_study_plan(request)
+            )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
 
         logger.info(
             "Study plan generated successfully",
@@ -89,6 +106,13 @@ async def generate_study_plan(
         logger.warning(f"Study plan generation validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+    except DeadlineExceeded as e:
+        logger.warning(f"Study plan generation timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Study plan generation timed out. Please try again."
+        )
+
     except Exception as e:
         logger.error(f"Study plan generation failed: {e}")
         raise HTTPException(
@@ -140,15 +164,17 @@ async def adjust_study_plan(
                 detail="At least one completed day is required for adjustment"
             )
 
-        # Adjust study plan
-        adjustment = await ai_study_plan_service.adjust_study_plan(request)
+        # Adjust study plan within the configured time budget
+        with deadline_scope(settings.study_plan_generation_timeout):
+            adjustment = await ai_study_plan_service.adjust_study_plan(request)
 
         logger.info(
             "Study plan adjusted successfully",
             extra={
                 "adjustment_id": adjustment.id,
                 "adjusted_plan_id": adjustment.adjusted_plan_id,
-                "changes_count": len(adjustment.changes_made)
+                "changes_count": len(adjustment.changes_made),
+                "degraded": adjustment.degraded
             }
         )
 
@@ -158,6 +184,13 @@ async def adjust_study_plan(
         logger.warning(f"Study plan adjustment validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+    except DeadlineExceeded as e:
+        logger.warning(f"Study plan adjustment timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Study plan adjustment timed out. Please try again."
+        )
+
     except Exception as e:
         logger.error(f"Study plan adjustment failed: {e}")
         raise HTTPException(
@@ -0,0 +1,47 @@
+"""LLM token usage and cost API endpoints."""
+
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query
+
+from src.api.debug import require_admin
+from src.services.usage_tracker import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+# Usage is broken down per learner and can be reset, so every endpoint needs the admin token
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/usage")
+async def get_usage(
+    top_users: int = Query(default=20, ge=0, le=500, description="Highest-cost users to include")
+) -> Dict[str, Any]:
+    """
+    Summarize LLM token usage and estimated cost since start-up (requires the admin token).
+
+    Usage is broken down by route, service operation, model and user.
+    Cached and reasoning tokens are included in the input and output counts.
+
+    Args:
+        top_users: Number of highest-cost users to include
+
+    Returns:
+        Usage totals and breakdowns
+    """
+    return usage_tracker.summary(top_users=top_users)
+
+
+@router.post("/usage/reset")
+async def reset_usage() -> Dict[str, Any]:
+    """
+    Reset usage accounting (requires the admin token).
+
+    Returns:
+        Totals recorded before the reset
+    """
+    totals = usage_tracker.totals.to_dict()
+    usage_tracker.reset()
+    logger.info("Usage accounting reset", extra=totals)
+    return {"reset": True, "previous_totals": totals}
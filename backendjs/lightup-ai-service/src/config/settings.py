@@ -1,7 +1,7 @@
 """Configuration settings for the AI service."""
 
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     ai_service_port: int = Field(default=8001, description="Port for AI service")
     ai_service_host: str = Field(default="0.0.0.0", description="Host for AI service")
     log_level: str = Field(default="INFO", description="Logging level")
+    log_queue_enabled: bool = Field(default=True, description="Format and write logs on a background thread")
+    log_request_sample_rate: float = Field(default=1.0, description="Share of successful requests whose start/complete lines are logged")
     environment: str = Field(default="development", description="Environment")
 
     # OpenAI Configuration
@@ -28,6 +30,27 @@ class Settings(BaseSettings):
     openai_model: str = Field(default="gpt-4-turbo-preview", description="OpenAI model")
     openai_max_tokens: int = Field(default=4000, description="Max tokens for OpenAI")
     openai_temperature: float = Field(default=0.7, description="Temperature for OpenAI")
+    llm_structured_outputs: bool = Field(
+        default=False,
+        description="Use provider-native structured outputs (OpenAI json_schema, Anthropic tool use); needs a supporting model"
+    )
+    llm_output_headroom: float = Field(default=1.3, description="Multiplier on the predicted output size when setting max_tokens")
+    llm_output_min_tokens: int = Field(default=256, description="Lower bound for a predicted max_tokens")
+    llm_output_window: int = Field(default=200, description="Recent completions per task used to fit the output-size model")
+    llm_max_continuations: int = Field(default=2, description="Follow-up calls to finish a completion cut off by max_tokens")
+
+    # Fake LLM Provider (offline load and latency testing)
+    llm_fake_mode: str = Field(default="off", description="Serve LLM calls locally: off, synthesize, replay or record")
+    llm_fake_cassette_dir: str = Field(default="cassettes", description="Directory of recorded completions for replay/record")
+    llm_fake_strict: bool = Field(default=False, description="In replay mode, fail on prompts with no recording instead of synthesizing")
+    llm_fake_latency_ms: float = Field(default=800.0, description="Median simulated time to first token (0 disables)")
+    llm_fake_latency_sigma: float = Field(default=0.5, description="Spread of the log-normal simulated time to first token")
+    llm_fake_tokens_per_second: float = Field(default=60.0, description="Simulated output streaming rate (0 for instant)")
+    llm_fake_replay_timing: bool = Field(default=True, description="Replay recorded latency instead of simulating it")
+    llm_fake_truncation_rate: float = Field(default=0.0, description="Share of simulated completions cut short at max_tokens")
+    llm_fake_rate_limit_rate: float = Field(default=0.0, description="Share of simulated calls answered with a 429")
+    llm_fake_retry_after: float = Field(default=1.0, description="retry-after seconds sent with simulated 429s")
+    llm_fake_seed: Optional[int] = Field(default=None, description="Random seed for reproducible simulated runs")
 
     # Anthropic Configuration (optional)
     anthropic_api_key: Optional[str] = Field(default=None, description="Anthropic API key")
@@ -42,10 +65,71 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis URL")
     redis_enabled: bool = Field(default=True, description="Enable Redis caching")
     cache_ttl: int = Field(default=3600, description="Cache TTL in seconds")
+    score_cache_max_entries: int = Field(default=10000, description="Max cached per-question evaluation scores")
+    response_cache_max_entries: int = Field(default=1000, description="Max generated assessments, evaluations and roadmaps kept per in-memory cache")
+    plan_store_max_entries: int = Field(default=100000, description="Max study plans kept; plans are stored only here, so an evicted plan can no longer be fetched or adjusted")
+    owner_cache_max_entries: int = Field(default=10000, description="Max assessment and plan owners remembered for LLM fairness")
+
+    # Grading Batch Settings
+    grading_batch_window_ms: int = Field(default=50, description="Window for batching open-ended grading across requests (0 disables)")
+    grading_batch_max_items: int = Field(default=20, description="Answers per grading batch before flushing early")
+
+    # Question Bank Settings
+    question_bank_enabled: bool = Field(default=True, description="Assemble assessments from pre-generated questions")
+    question_bank_target_per_node: int = Field(default=10, description="Questions per node and difficulty kept in stock")
+    question_bank_max_per_node: int = Field(default=50, description="Max questions per node, difficulty and type")
+    question_bank_max_users: int = Field(default=10000, description="Learners whose seen questions are remembered")
+    question_bank_max_nodes: int = Field(default=5000, description="Nodes kept in the bank before the least recent is dropped")
+    question_bank_refill_batch: int = Field(default=5, description="Questions generated per background refill call")
+
+    # Background Jobs
+    job_workers: int = Field(default=4, description="Concurrent background generation jobs per process")
+    job_queue_size: int = Field(default=100, description="Jobs waiting for a worker before submissions are refused")
+    job_ttl_seconds: int = Field(default=3600, description="How long finished job records are kept")
+    job_timeout: int = Field(default=600, description="Overall time budget for a background job in seconds")
+    job_store: str = Field(default="memory", description="Job record store: memory or redis (uses redis_url)")
+
+    # Idempotency
+    idempotency_ttl_seconds: int = Field(default=86400, description="How long a response is replayed for a repeated Idempotency-Key")
+    idempotency_max_entries: int = Field(default=10000, description="Max stored responses for Idempotency-Key replay")
+
+    # Metrics
+    metrics_enabled: bool = Field(default=True, description="Expose Prometheus metrics at /metrics")
+
+    # Event Loop Monitoring
+    loop_monitor_enabled: bool = Field(default=True, description="Sample event loop lag and watch for blocking callbacks")
+    loop_monitor_interval: float = Field(default=0.5, description="Seconds between event loop lag samples")
+    loop_block_threshold: float = Field(default=0.25, description="Loop stall in seconds after which the blocking stack is logged (0 disables)")
+
+    # Usage Accounting
+    llm_prices: Dict[str, List[float]] = Field(
+        default_factory=dict,
+        description="USD per million tokens as [input, cached input, output] by model-name prefix; extends the built-in table"
+    )
+    usage_max_users: int = Field(default=10000, description="Users tracked in usage accounting before the least active are dropped")
+
+    # Timing
+    server_timing_enabled: bool = Field(default=False, description="Always send Server-Timing; otherwise only when X-Request-Timings is set")
+    slow_request_threshold: float = Field(default=10.0, description="Requests slower than this many seconds are logged with a stage breakdown (0 disables)")
+
+    # Profiling and Debug Endpoints
+    admin_token: Optional[str] = Field(default=None, description="Token for /ai/debug endpoints and request profiling (unset disables them)")
+    profiling_enabled: bool = Field(default=False, description="Profile requests that send X-Profile with the admin token")
+    profile_output_dir: str = Field(default="profiles", description="Directory request profiles and tracemalloc snapshots are written to")
+    profile_sample_interval: float = Field(default=0.005, description="Seconds between stack samples in sample mode")
+    profile_max_files: int = Field(default=50, description="Stored profiles and snapshots kept before the oldest are deleted")
+
+    # Tracing
+    trace_export_path: Optional[str] = Field(default=None, description="Append request traces as JSON lines to this file (unset disables)")
 
     # Rate Limiting
     rate_limit_requests: int = Field(default=100, description="Rate limit requests")
     rate_limit_period: int = Field(default=60, description="Rate limit period in seconds")
+    rate_limit_client_header: Optional[str] = Field(default=None, description="Header a trusted proxy sets to identify the client (unset keys limits by peer address)")
+    admission_enabled: bool = Field(default=True, description="Enforce rate limits and shed load on /ai write requests")
+    admission_max_in_flight: int = Field(default=64, description="Concurrent /ai write requests before new ones are shed")
+    admission_max_llm_queue: int = Field(default=50, description="LLM calls waiting for a slot before new requests are shed (0 disables)")
+    admission_latency_target: float = Field(default=30.0, description="Average request latency in seconds above which the in-flight cap is halved")
 
     # Timeouts
     llm_timeout: int = Field(default=60, description="LLM timeout in seconds")
@@ -53,6 +137,14 @@ class Settings(BaseSettings):
     assessment_generation_timeout: int = Field(default=120, description="Assessment generation timeout")
     study_plan_generation_timeout: int = Field(default=180, description="Study plan generation timeout")
 
+    # LLM Concurrency
+    llm_concurrency_initial: int = Field(default=4, description="Initial concurrent LLM calls")
+    llm_concurrency_min: int = Field(default=1, description="Minimum concurrent LLM calls")
+    llm_concurrency_max: int = Field(default=32, description="Maximum concurrent LLM calls")
+    llm_tokens_per_minute: int = Field(default=0, description="Tokens-per-minute budget (0 disables)")
+    llm_latency_tolerance: float = Field(default=2.0, description="Latency increase over baseline treated as overload")
+    llm_background_share: float = Field(default=0.5, description="Share of LLM concurrency background work may use")
+
     @property
     def is_development(self) -> bool:
         """Check if running in development mode."""
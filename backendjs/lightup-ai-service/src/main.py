@@ -1,6 +1,7 @@
 """Main FastAPI application for LightUp AI service."""
 
 import logging
+import random
 import time
 from contextlib import asynccontextmanager
 from typing import Dict, Any
@@ -9,11 +10,35 @@ import uvicorn
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.routing import Match
 
 from src.config.settings import settings
-from src.api import assessment, study_plan, roadmap
-from src.utils.logging_config import setup_logging
+from src.api import assessment, study_plan, roadmap, jobs, usage, debug
+from src.services.admission import admission_controller
+from src.services.ai_assessment import ai_assessment_service
+from src.services.ai_roadmap import ai_roadmap_service
+from src.services.ai_study_plan import ai_study_plan_service
+from src.services.idempotency import idempotency_cache
+from src.services.job_manager import job_manager
+from src.services.llm_limiter import llm_limiter
+from src.utils.logging_config import setup_logging, shutdown_logging
+from src.utils.loop_monitor import loop_monitor
+from src.utils.metrics import metrics
+from src.utils.profiling import (
+    ADMIN_TOKEN_HEADER,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_MODES,
+    PROFILE_QUERY_PARAM,
+    is_admin,
+    request_profiler
+)
+from src.utils.request_context import current_request, request_scope
+from src.utils.tracing import (
+    client_identity, export_trace, format_traceparent, request_context_from_headers, trace_exporter
+)
+from src.utils.timing import server_timing_header, stage_breakdown
 
 
 @asynccontextmanager
@@ -25,10 +50,21 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 LightUp AI Service starting up...")
 
     # Initialize services here if needed
+    if settings.question_bank_enabled:
+        ai_assessment_service.question_bank.start()
+    job_manager.start()
+    loop_monitor.start()
+
     yield
 
     # Shutdown
+    await loop_monitor.stop()
+    if trace_exporter is not None:
+        trace_exporter.close()
+    await job_manager.stop()
+    await ai_assessment_service.question_bank.stop()
     logger.info("🛑 LightUp AI Service shutting down...")
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -56,59 +92,180 @@ if settings.is_production:
         allowed_hosts=["localhost", "127.0.0.1", "0.0.0.0"]
     )
 
+# Request profiling middleware (innermost, so the profile covers only the handler)
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Run a request under a profiler when an admin asks for it."""
+    mode = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    if not mode or not settings.profiling_enabled:
+        return await call_next(request)
+
+    if not is_admin(request.headers.get(ADMIN_TOKEN_HEADER)):
+        return JSONResponse(status_code=403, content={"detail": "Profiling requires the admin token"})
+    if mode not in PROFILE_MODES:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": f"Unknown profile mode {mode!r}; use one of {', '.join(PROFILE_MODES)}"}
+        )
+
+    context = current_request()
+    label = context.request_id if context else "request"
+    async with request_profiler.profile(mode, label) as run:
+        response = await call_next(request)
+
+    if run.profile_id:
+        response.headers[PROFILE_ID_HEADER] = run.profile_id
+    elif run.skipped_reason:
+        response.headers[PROFILE_ID_HEADER] = f"skipped:{run.skipped_reason}"
+    return response
+
+
+# Methods that only read state and are never rate limited or shed
+ADMISSION_EXEMPT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def route_template(request: Request) -> str:
+    """
+    Route template a request will be dispatched to.
+
+    Middleware runs before routing, so the route is matched here the way the
+    router will match it; a method mismatch shares the path's template.
+    """
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match != Match.NONE:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+# Admission control middleware
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Rate limit and shed /ai write requests before they queue for the LLM."""
+    if (
+        not settings.admission_enabled
+        or request.method in ADMISSION_EXEMPT_METHODS
+        or not request.url.path.startswith("/ai/")
+    ):
+        return await call_next(request)
+
+    client = client_identity(request.headers, request.client.host if request.client else None)
+    # Buckets are keyed by route template so path parameters do not create one per id
+    decision = admission_controller.check(client, route_template(request))
+    if not decision.admitted:
+        return JSONResponse(
+            status_code=decision.status_code,
+            content={"detail": decision.reason},
+            headers={"Retry-After": str(decision.retry_after)}
+        )
+
+    start_time = time.monotonic()
+    try:
+        return await call_next(request)
+    finally:
+        admission_controller.release(time.monotonic() - start_time)
+
+
+# Request header asking for a Server-Timing stage breakdown in the response
+TIMINGS_REQUEST_HEADER = "X-Request-Timings"
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all requests with timing information."""
     start_time = time.time()
 
-    # Generate request ID
-    request_id = f"req_{int(start_time * 1000000)}"
-
-    # Log request start
-    logger = logging.getLogger(__name__)
-    logger.info(
-        f"Request started",
-        extra={
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "client_ip": request.client.host if request.client else None
-        }
+    # Reuse the caller's request ID and trace if sent, otherwise generate them
+    context = request_context_from_headers(
+        request.headers,
+        generated_id=f"req_{int(start_time * 1000000)}",
+        scope=request.scope,
+        peer=request.client.host if request.client else None
     )
+    request_id = context.request_id
 
-    # Process request
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-
-        # Log request completion
-        logger.info(
-            f"Request completed",
-            extra={
-                "request_id": request_id,
-                "status_code": response.status_code,
-                "process_time": f"{process_time:.4f}s"
-            }
-        )
+    # At high request rates only a sample of routine start/complete lines is logged
+    sampled = settings.log_request_sample_rate >= 1.0 or random.random() < settings.log_request_sample_rate
 
-        # Add custom headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = f"{process_time:.4f}"
+    # Everything logged or called while the request runs is tagged with its context
+    with request_scope(context):
+        # Log request start
+        logger = logging.getLogger(__name__)
+        if sampled:
+            logger.info(
+                f"Request started",
+                extra={
+                    "request_id": request_id,
+                    "method": request.method,
+                    "url": str(request.url),
+                    "client_ip": request.client.host if request.client else None
+                }
+            )
 
-        return response
+        # Process request
+        try:
+            response = await call_next(request)
+            process_time = time.time() - start_time
 
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Request failed",
-            extra={
-                "request_id": request_id,
-                "error": str(e),
-                "process_time": f"{process_time:.4f}s"
-            }
-        )
-        raise
+            # Label by route template so path parameters do not explode cardinality
+            metrics.observe_request(request.method, context.route, response.status_code, process_time)
+
+            # Log request completion (errors are always logged)
+            if sampled or response.status_code >= 400:
+                logger.info(
+                    f"Request completed",
+                    extra={
+                        "request_id": request_id,
+                        "status_code": response.status_code,
+                        "process_time": f"{process_time:.4f}s",
+                        **({"llm_usage": context.usage} if context.usage else {})
+                    }
+                )
+
+            # Add custom headers
+            response.headers["X-Request-ID"] = request_id
+            response.headers["X-Process-Time"] = f"{process_time:.4f}"
+            response.headers["traceparent"] = format_traceparent(context.trace_id, context.span_id)
+
+            breakdown = stage_breakdown(context)
+            if settings.server_timing_enabled or request.headers.get(TIMINGS_REQUEST_HEADER):
+                response.headers["Server-Timing"] = server_timing_header(breakdown, process_time * 1000)
+
+            if settings.slow_request_threshold and process_time >= settings.slow_request_threshold:
+                logger.warning(
+                    "Slow request",
+                    extra={
+                        "request_id": request_id,
+                        "method": request.method,
+                        "route": context.route,
+                        "process_time": f"{process_time:.4f}s",
+                        "timings": breakdown
+                    }
+                )
+
+            export_trace(
+                context,
+                f"{request.method} {context.route}",
+                process_time,
+                status_code=response.status_code,
+                **({"llm_usage": context.usage} if context.usage else {})
+            )
+
+            return response
+
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error(
+                f"Request failed",
+                extra={
+                    "request_id": request_id,
+                    "error": str(e),
+                    "process_time": f"{process_time:.4f}s"
+                }
+            )
+            export_trace(context, f"{request.method} {context.route}", process_time, error=type(e).__name__)
+            raise
 
 
 # Global exception handler
@@ -155,10 +312,36 @@ async def health_check() -> Dict[str, Any]:
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Expose service, LLM, cache and event loop metrics for Prometheus."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are not enabled")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+metrics.register_cache("assessment_questions", ai_assessment_service.question_cache)
+metrics.register_cache("assessment_evaluations", ai_assessment_service.evaluation_cache)
+metrics.register_cache("assessment_scores", ai_assessment_service.score_cache)
+metrics.register_cache("roadmaps", ai_roadmap_service.roadmap_cache)
+metrics.register_cache("study_plans", ai_study_plan_service.plan_cache)
+metrics.register_cache("idempotency", idempotency_cache.responses)
+metrics.register_gauge("ai_llm_in_flight", "LLM calls currently running", lambda: llm_limiter.in_flight)
+metrics.register_gauge("ai_llm_waiting", "LLM calls waiting for a concurrency slot", lambda: llm_limiter.waiting)
+metrics.register_gauge("ai_llm_concurrency_limit", "Current adaptive LLM concurrency limit", lambda: llm_limiter.limit)
+metrics.register_gauge("ai_requests_in_flight", "Admitted /ai write requests in progress", lambda: admission_controller.in_flight)
+metrics.register_gauge("ai_jobs_queued", "Background jobs waiting for a worker", lambda: job_manager.snapshot()["queued"])
+
+
 # Include API routers
 app.include_router(assessment.router, prefix="/ai", tags=["Assessment"])
 app.include_router(study_plan.router, prefix="/ai", tags=["Study Plan"])
 app.include_router(roadmap.router, prefix="/ai", tags=["Roadmap"])
+app.include_router(jobs.router, prefix="/ai", tags=["Jobs"])
+app.include_router(usage.router, prefix="/ai", tags=["Usage"])
+app.include_router(debug.router, prefix="/ai", tags=["Debug"], include_in_schema=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""Background generation job models."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a generation job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobRecord(BaseModel):
+    """Persisted state of a generation job."""
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "job_id": "job_3f2a9c1d",
+                "kind": "study_plan",
+                "status": "succeeded",
+                "created_at": "2024-01-15T10:00:00",
+                "started_at": "2024-01-15T10:00:01",
+                "finished_at": "2024-01-15T10:01:12",
+                "result": {"plan_id": "plan_123"},
+                "error": None
+            }
+        }
+    )
+
+    job_id: str = Field(..., description="Unique job identifier")
+    kind: str = Field(..., description="Generation type, e.g. study_plan or roadmap")
+    status: JobStatus = Field(default=JobStatus.QUEUED, description="Current job status")
+    user_key: Optional[str] = Field(default=None, description="Submitting user or course, if known")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Submission time")
+    started_at: Optional[datetime] = Field(default=None, description="When a worker picked the job up")
+    finished_at: Optional[datetime] = Field(default=None, description="When the job succeeded or failed")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="Generation response once succeeded")
+    error: Optional[str] = Field(default=None, description="Failure reason once failed")
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a terminal state."""
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobSubmissionResponse(BaseModel):
+    """Response returned when a job is accepted."""
+
+    job_id: str = Field(..., description="Unique job identifier")
+    status: JobStatus = Field(..., description="Initial job status")
+    status_url: str = Field(..., description="URL to poll for job status and result")
+    events_url: str = Field(..., description="Server-sent events stream of status changes")
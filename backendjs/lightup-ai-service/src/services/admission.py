@@ -0,0 +1,179 @@
+"""Admission control: per-client rate limiting and overload shedding."""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.services.llm_limiter import llm_limiter
+from src.utils.cache import LRUCache
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the request latency average
+LATENCY_SMOOTHING = 0.2
+
+
+class TokenBucket:
+    """Token bucket allowing bursts of ``capacity`` refilled at ``rate`` per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = max(1.0, capacity)
+        self.rate = max(rate, 1e-9)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take one token.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+
+@dataclass
+class AdmissionDecision:
+    """Outcome of an admission check."""
+    admitted: bool
+    status_code: int = 200
+    retry_after: int = 0
+    reason: str = ""
+
+
+class AdmissionController:
+    """Decide whether a request may start work, and track the work in flight."""
+
+    def __init__(
+        self,
+        rate_requests: int = 100,
+        rate_period: int = 60,
+        max_in_flight: int = 64,
+        max_llm_queue: int = 50,
+        latency_target: float = 30.0,
+        max_clients: int = 10000
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            rate_requests: Requests allowed per client and route in each period
+            rate_period: Rate limit period in seconds
+            max_in_flight: Concurrent admitted requests before new ones are shed
+            max_llm_queue: LLM calls waiting for a slot before new requests are shed
+            latency_target: Average request latency above which the in-flight cap is halved
+            max_clients: Rate limit buckets kept before evicting idle clients
+        """
+        self.rate_requests = rate_requests
+        self.rate_period = rate_period
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_llm_queue = max_llm_queue
+        self.latency_target = latency_target
+        self._buckets: LRUCache[TokenBucket] = LRUCache(max_entries=max_clients, ttl_seconds=rate_period * 2)
+        self._in_flight = 0
+        self._latency: Optional[float] = None
+        self.stats = {"admitted": 0, "rate_limited": 0, "shed": 0}
+
+    @property
+    def in_flight(self) -> int:
+        """Admitted requests that have not finished."""
+        return self._in_flight
+
+    @property
+    def in_flight_limit(self) -> int:
+        """Current in-flight cap, halved while requests are slower than the target."""
+        if self._latency is not None and self._latency > self.latency_target:
+            return max(1, self.max_in_flight // 2)
+        return self.max_in_flight
+
+    def check(self, client: str, route: str) -> AdmissionDecision:
+        """
+        Check a request against overload and the client's rate limit.
+
+        Overload is checked first so a shed request does not spend the
+        client's rate limit tokens.
+
+        Args:
+            client: Client identity
+            route: Route the request targets
+
+        Returns:
+            Admission decision; admitted requests must call ``release`` when done
+        """
+        overload = self._overload_reason()
+        if overload:
+            self.stats["shed"] += 1
+            logger.warning("Request shed", extra={"route": route, "reason": overload, "in_flight": self._in_flight})
+            return AdmissionDecision(False, 503, self._shed_retry_after(), overload)
+
+        if self.rate_requests > 0:
+            key = (client, route)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_requests, self.rate_requests / max(1, self.rate_period))
+                self._buckets.set(key, bucket)
+            wait = bucket.take()
+            if wait > 0:
+                self.stats["rate_limited"] += 1
+                logger.info("Request rate limited", extra={"client": client, "route": route})
+                return AdmissionDecision(False, 429, max(1, math.ceil(wait)), "Rate limit exceeded")
+
+        self._in_flight += 1
+        self.stats["admitted"] += 1
+        return AdmissionDecision(True)
+
+    def release(self, duration: float) -> None:
+        """
+        Mark an admitted request as finished.
+
+        Args:
+            duration: Request latency in seconds
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+        if self._latency is None:
+            self._latency = duration
+        else:
+            self._latency += LATENCY_SMOOTHING * (duration - self._latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return admission state and statistics."""
+        return {
+            "in_flight": self._in_flight,
+            "in_flight_limit": self.in_flight_limit,
+            "average_latency": round(self._latency, 3) if self._latency is not None else None,
+            "clients": len(self._buckets),
+            **self.stats
+        }
+
+    def _overload_reason(self) -> str:
+        """Return why new work should be shed, or an empty string."""
+        if self._in_flight >= self.in_flight_limit:
+            return "Too many requests in progress"
+        if self.max_llm_queue > 0 and llm_limiter.waiting >= self.max_llm_queue:
+            return "AI provider queue is full"
+        return ""
+
+    def _shed_retry_after(self) -> int:
+        """Suggest a retry delay of about one average request latency."""
+        latency = self._latency if self._latency is not None else 1.0
+        return int(min(settings.llm_timeout, max(1, math.ceil(latency))))
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    rate_requests=settings.rate_limit_requests,
+    rate_period=settings.rate_limit_period,
+    max_in_flight=settings.admission_max_in_flight,
+    max_llm_queue=settings.admission_max_llm_queue,
+    latency_target=settings.admission_latency_target
+)
@@ -1,5 +1,6 @@
 """AI-powered assessment generation and evaluation service."""
 
+import asyncio
 import json
 import logging
 from datetime import datetime
@@ -15,22 +16,127 @@ from src.models.assessment import (
     EvaluationCriteria,
     QuestionScore,
     NodeScore,
+    QuestionType,
     UserAnswer
 )
-from src.services.llm_client import llm_client
+from src.models.common import DifficultyLevel, KnowledgeNodeInfo, NodeProgress
+from src.services.grading_batcher import grading_batcher
+from src.services.llm_client import DEADLINE_RESERVE_SECONDS, llm_client
+from src.services.llm_limiter import LLMPriority
+from src.services.question_bank import QuestionBank
+from src.utils.answer_grader import AnswerGrader
+from src.utils.cache import LRUCache
+from src.utils.deadline import DeadlineExceeded, within_deadline
 from src.utils.prompt_templates import PromptTemplates
+from src.utils.timing import StageClock
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Expected LLM output for question generation
+ASSESSMENT_GENERATION_SCHEMA = {
+    "type": "object",
+    "required": ["questions", "estimated_minutes"],
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "node_id", "question", "question_type", "points", "difficulty", "explanation", "keywords"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "node_id": {"type": "string"},
+                    "question": {"type": "string"},
+                    "question_type": {"type": "string", "enum": [t.value for t in QuestionType]},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "correct_answer": {"type": "string"},
+                    "points": {"type": "integer", "minimum": 1},
+                    "difficulty": {"type": "string", "enum": [d.value for d in DifficultyLevel]},
+                    "explanation": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        },
+        "estimated_minutes": {"type": "integer"}
+    }
+}
+
+# Expected LLM output when topping up missing questions
+QUESTION_TOP_UP_SCHEMA = {
+    "type": "object",
+    "required": ["questions"],
+    "properties": {"questions": ASSESSMENT_GENERATION_SCHEMA["properties"]["questions"]}
+}
+
+# Expected LLM output for open-ended grading; totals are computed locally from the merged scores
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "required": ["question_scores", "node_scores", "overall_feedback"],
+    "properties": {
+        "question_scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["question_id", "score", "max_score", "feedback", "is_correct"],
+                "properties": {
+                    "question_id": {"type": "string"},
+                    "score": {"type": "number", "minimum": 0},
+                    "max_score": {"type": "integer", "minimum": 1},
+                    "feedback": {"type": "string"},
+                    "is_correct": {"type": "boolean"}
+                }
+            }
+        },
+        "node_scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["node_id", "score", "feedback", "recommended_action"],
+                "properties": {
+                    "node_id": {"type": "string"},
+                    "score": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "feedback": {"type": "string"},
+                    "recommended_action": {"type": "string"},
+                    "areas_to_improve": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        },
+        "overall_feedback": {"type": "string"},
+        "study_recommendations": {"type": "array", "items": {"type": "string"}}
+    }
+}
+
 
 class AIAssessmentService:
     """Service for AI-powered assessment generation and evaluation."""
 
     def __init__(self):
         """Initialize the assessment service."""
-        self.question_cache = {}  # Simple in-memory cache
-        self.evaluation_cache = {}
+        self.question_cache: LRUCache[AssessmentResponse] = LRUCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
+        self.evaluation_cache: LRUCache[AssessmentEvaluationResponse] = LRUCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
+        # assessment_id -> user_course_id for LLM fairness
+        self.assessment_owners: LRUCache[str] = LRUCache(
+            max_entries=settings.owner_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
+        # (question fingerprint, normalized answer) -> score, shared across users
+        self.score_cache: LRUCache[QuestionScore] = LRUCache(
+            max_entries=settings.score_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
+        self.question_bank = QuestionBank(
+            generator=self._generate_bank_questions,
+            target_per_node=settings.question_bank_target_per_node,
+            max_per_node=settings.question_bank_max_per_node,
+            max_users=settings.question_bank_max_users,
+            max_nodes=settings.question_bank_max_nodes
+        )
 
     async def generate_assessment(
         self,
@@ -58,13 +164,45 @@ class AIAssessmentService:
                 }
             )
 
+            clock = StageClock("assessment")
+
             # Create cache key
             cache_key = self._create_cache_key(request)
 
-            # Check cache first
-            if cache_key in self.question_cache:
-                logger.info("Returning cached assessment")
-                return self.question_cache[cache_key]
+            # Check cache first (the question bank supersedes it when enabled)
+            if not settings.question_bank_enabled:
+                cached = self.question_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Returning cached assessment")
+                    return cached
+
+            # Assemble from the question bank when it has enough unseen questions
+            if settings.question_bank_enabled:
+                banked_questions = self.question_bank.sample(
+                    nodes=request.nodes,
+                    difficulty=request.difficulty_level.value,
+                    count=request.question_count,
+                    user_key=request.user_course_id,
+                    focus_areas=request.focus_areas
+                )
+                if banked_questions is not None:
+                    response = self._build_assessment_response(
+                        banked_questions, len(banked_questions) * 3, start_time
+                    )
+                    self.assessment_owners.set(response.assessment_id, request.user_course_id)
+                    clock.lap("question_bank")
+
+                    logger.info(
+                        "Assessment assembled from question bank",
+                        extra={
+                            "assessment_id": response.assessment_id,
+                            "question_count": len(banked_questions),
+                            "processing_time": response.processing_time_seconds
+                        }
+                    )
+                    return response
+
+            clock.lap("lookup")
 
             # Generate user progress data for context
             user_progress = self._extract_user_progress(request.nodes)
@@ -77,68 +215,48 @@ class AIAssessmentService:
                 question_count=request.question_count,
                 focus_areas=request.focus_areas
             )
-
-            # Define expected JSON schema
-            expected_schema = {
-                "type": "object",
-                "required": ["questions", "estimated_minutes"],
-                "properties": {
-                    "questions": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "required": ["id", "node_id", "question", "question_type", "points", "difficulty", "explanation", "keywords"],
-                            "properties": {
-                                "id": {"type": "string"},
-                                "node_id": {"type": "string"},
-                                "question": {"type": "string"},
-                                "question_type": {"type": "string"},
-                                "options": {"type": "array"},
-                                "correct_answer": {"type": "string"},
-                                "points": {"type": "integer"},
-                                "difficulty": {"type": "string"},
-                                "explanation": {"type": "string"},
-                                "keywords": {"type": "array"}
-                            }
-                        }
-                    },
-                    "estimated_minutes": {"type": "integer"}
-                }
-            }
+            clock.lap("prompt")
 
             # Generate assessment using LLM
-            ai_response = await llm_client.generate_json_completion(
-                prompt=prompt,
-                expected_schema=expected_schema,
-                max_tokens=4000,
-                temperature=0.7
-            )
-
-            # Process and validate the response
+            try:
+                ai_response = await llm_client.generate_json_completion(
+                    prompt=prompt,
+                    expected_schema=ASSESSMENT_GENERATION_SCHEMA,
+                    temperature=0.7,
+                    output_task="assessment",
+                    output_units=request.question_count,
+                    priority=LLMPriority.INTERACTIVE,
+                    user_key=request.user_course_id
+                )
+            except DeadlineExceeded:
+                fallback = self._deadline_fallback(request, cache_key, start_time)
+                if fallback is None:
+                    raise
+                return fallback
+            clock.lap("generate")
+
+            # Process and validate the response, topping up any invalid or missing questions
             questions = self._process_generated_questions(ai_response["questions"], request.nodes)
+            shortfall = request.question_count - len(questions)
+            if shortfall > 0:
+                questions += await self._top_up_questions(request, questions, shortfall)
+            clock.lap("process")
             estimated_minutes = ai_response.get("estimated_minutes", len(questions) * 3)
 
-            # Create evaluation criteria
-            evaluation_criteria = EvaluationCriteria(
-                scoring_method="weighted",
-                partial_credit=True,
-                keyword_weights=self._calculate_keyword_weights(questions),
-                time_factor=0.1
-            )
+            if settings.question_bank_enabled:
+                self.question_bank.add_questions(questions, request.nodes)
+                self.question_bank.mark_seen(request.user_course_id, questions)
 
-            # Create response
-            assessment_id = str(uuid4())
-            response = AssessmentResponse(
-                id=assessment_id,
-                assessment_id=assessment_id,
-                questions=questions,
-                estimated_minutes=max(10, estimated_minutes),
-                evaluation_criteria=evaluation_criteria,
-                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds()
-            )
+            # A remaining shortfall (top-up failed or ran out of time) is returned as a partial result
+            degraded = len(questions) < request.question_count
+            response = self._build_assessment_response(questions, estimated_minutes, start_time, degraded=degraded)
+            assessment_id = response.assessment_id
 
             # Cache the result
-            self.question_cache[cache_key] = response
+            if not degraded:
+                self.question_cache.set(cache_key, response)
+            self.assessment_owners.set(assessment_id, request.user_course_id)
+            clock.lap("store")
 
             logger.info(
                 "Assessment generation completed",
@@ -146,6 +264,7 @@ class AIAssessmentService:
                     "assessment_id": assessment_id,
                     "question_count": len(questions),
                     "estimated_minutes": estimated_minutes,
+                    "degraded": degraded,
                     "processing_time": response.processing_time_seconds
                 }
             )
@@ -167,19 +286,26 @@ class AIAssessmentService:
     async def evaluate_assessment(
         self,
         request: AssessmentEvaluationRequest,
-        original_questions: List[GeneratedQuestion]
+        original_questions: List[GeneratedQuestion],
+        evaluation_criteria: Optional[EvaluationCriteria] = None
     ) -> AssessmentEvaluationResponse:
         """
-        Evaluate user answers using AI.
+        Evaluate user answers, grading objective questions locally.
+
+        Multiple-choice, true/false and keyword-gradable short answers are
+        scored without the LLM; only open-ended answers are sent, in a single
+        batched request.
 
         Args:
             request: Evaluation request with user answers
             original_questions: Original generated questions
+            evaluation_criteria: Scoring criteria from the generated assessment
 
         Returns:
             Evaluation response with scores and feedback
         """
         start_time = datetime.utcnow()
+        criteria = evaluation_criteria or EvaluationCriteria()
 
         try:
             logger.info(
@@ -193,88 +319,127 @@ class AIAssessmentService:
             # Create cache key for evaluation
             cache_key = f"eval_{request.assessment_id}_{hash(str(sorted([(a.question_id, a.answer) for a in request.answers])))}"
 
-            if cache_key in self.evaluation_cache:
+            cached = self.evaluation_cache.get(cache_key)
+            if cached is not None:
                 logger.info("Returning cached evaluation")
-                return self.evaluation_cache[cache_key]
+                return cached
 
-            # Prepare questions and answers for evaluation
-            questions_dict = {q.id: q for q in original_questions}
-            evaluation_data = []
+            answers_by_question = {ans.question_id: ans for ans in request.answers}
+
+            # Score objective questions locally, collect the rest for the LLM
+            local_scores: Dict[str, QuestionScore] = {}
+            open_ended: List[GeneratedQuestion] = []
+            cached_count = 0
 
             for question in original_questions:
-                user_answer = next(
-                    (ans for ans in request.answers if ans.question_id == question.id),
-                    None
+                user_answer = answers_by_question.get(question.id)
+                answer_text = user_answer.answer if user_answer else None
+
+                if AnswerGrader.can_grade_locally(question, answer_text):
+                    local_scores[question.id] = AnswerGrader.grade(
+                        question,
+                        answer_text,
+                        keyword_weights=criteria.keyword_weights,
+                        partial_credit=criteria.partial_credit
+                    )
+                    continue
+
+                # Reuse a score given to the same answer on the same question content
+                cached_score = self.score_cache.get(self._score_cache_key(question, answer_text))
+                if cached_score is not None:
+                    local_scores[question.id] = cached_score.model_copy(update={"question_id": question.id})
+                    cached_count += 1
+                else:
+                    open_ended.append(question)
+
+            ai_evaluation: Dict[str, Any] = {}
+            degraded = False
+            try:
+                if open_ended and settings.grading_batch_window_ms > 0:
+                    ai_evaluation = await within_deadline(
+                        self._grade_with_batcher(open_ended, answers_by_question),
+                        reserve=DEADLINE_RESERVE_SECONDS,
+                        stage="batched grading"
+                    )
+                elif open_ended:
+                    ai_evaluation = await self._evaluate_open_ended(request, open_ended, answers_by_question)
+            except DeadlineExceeded as e:
+                # Fall back to provisional keyword scores for whatever the LLM did not grade
+                degraded = True
+                logger.warning(
+                    "Deadline exceeded during open-ended grading",
+                    extra={"assessment_id": request.assessment_id, "ungraded": len(open_ended), "error": str(e)}
                 )
-                evaluation_data.append({
-                    "id": question.id,
-                    "node_id": question.node_id,
-                    "question": question.question,
-                    "question_type": question.question_type,
-                    "correct_answer": question.correct_answer,
-                    "points": question.points,
-                    "keywords": question.keywords,
-                    "user_answer": user_answer.answer if user_answer else "Not answered"
-                })
-
-            # Generate evaluation prompt
-            prompt = PromptTemplates.assessment_evaluation_prompt(
-                questions=evaluation_data,
-                user_answers=[{
-                    "question_id": ans.question_id,
-                    "answer": ans.answer,
-                    "time_taken": getattr(ans, 'time_taken_seconds', None)
-                } for ans in request.answers]
-            )
 
-            # Define evaluation schema
-            evaluation_schema = {
-                "type": "object",
-                "required": ["question_scores", "node_scores", "total_score", "max_score", "percentage", "overall_feedback"],
-                "properties": {
-                    "question_scores": {"type": "array"},
-                    "node_scores": {"type": "array"},
-                    "total_score": {"type": "number"},
-                    "max_score": {"type": "integer"},
-                    "percentage": {"type": "number"},
-                    "overall_feedback": {"type": "string"},
-                    "study_recommendations": {"type": "array"}
-                }
-            }
+            # Merge results in question order
+            open_ended_by_id = {question.id: question for question in open_ended}
+            llm_scores = {}
+            for score in ai_evaluation.get("question_scores", []):
+                try:
+                    question_score = QuestionScore(**score)
+                except Exception as e:
+                    logger.warning(f"Discarding invalid question score from LLM: {e}")
+                    continue
 
-            # Get AI evaluation
-            ai_evaluation = await llm_client.generate_json_completion(
-                prompt=prompt,
-                expected_schema=evaluation_schema,
-                max_tokens=3000,
-                temperature=0.3  # Lower temperature for more consistent scoring
-            )
+                question = open_ended_by_id.get(question_score.question_id)
+                if question is None:
+                    continue
+                llm_scores[question.id] = question_score
+                self.score_cache.set(
+                    self._score_cache_key(question, answers_by_question[question.id].answer),
+                    question_score
+                )
 
-            # Process the evaluation results
-            question_scores = [
-                QuestionScore(**score) for score in ai_evaluation["question_scores"]
-            ]
+            question_scores = []
+            for question in original_questions:
+                score = local_scores.get(question.id) or llm_scores.get(question.id)
+                if score is None and degraded:
+                    score = self._provisional_score(question, answers_by_question[question.id].answer, criteria)
+                if score is None:
+                    score = QuestionScore(
+                        question_id=question.id,
+                        score=0,
+                        max_score=question.points,
+                        feedback="This answer could not be evaluated.",
+                        is_correct=False
+                    )
+                question_scores.append(score)
+
+            llm_node_scores = {}
+            for score in ai_evaluation.get("node_scores", []):
+                try:
+                    llm_node_scores[score["node_id"]] = NodeScore(**score)
+                except Exception as e:
+                    logger.warning(f"Discarding invalid node score from LLM: {e}")
 
-            node_scores = [
-                NodeScore(**score) for score in ai_evaluation["node_scores"]
-            ]
+            node_scores = AnswerGrader.build_node_scores(original_questions, question_scores, llm_node_scores)
+
+            total_score = sum(score.score for score in question_scores)
+            max_score = sum(score.max_score for score in question_scores)
+            percentage = round(100 * total_score / max_score, 1) if max_score else 0.0
+
+            study_recommendations = ai_evaluation.get("study_recommendations") or \
+                AnswerGrader.study_recommendations(node_scores)
 
             # Create evaluation response
             evaluation_id = str(uuid4())
             response = AssessmentEvaluationResponse(
                 id=evaluation_id,
-                total_score=ai_evaluation["total_score"],
-                max_score=ai_evaluation["max_score"],
-                percentage=ai_evaluation["percentage"],
+                total_score=total_score,
+                max_score=max_score,
+                percentage=percentage,
                 question_scores=question_scores,
                 node_scores=node_scores,
-                overall_feedback=ai_evaluation["overall_feedback"],
-                study_recommendations=ai_evaluation.get("study_recommendations", []),
-                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds()
+                overall_feedback=ai_evaluation.get("overall_feedback") or
+                AnswerGrader.overall_feedback(total_score, max_score, node_scores),
+                study_recommendations=study_recommendations,
+                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds(),
+                degraded=degraded
             )
 
             # Cache the result
-            self.evaluation_cache[cache_key] = response
+            if not degraded:
+                self.evaluation_cache.set(cache_key, response)
 
             logger.info(
                 "Assessment evaluation completed",
@@ -282,6 +447,10 @@ class AIAssessmentService:
                     "evaluation_id": evaluation_id,
                     "total_score": response.total_score,
                     "percentage": response.percentage,
+                    "locally_graded": len(local_scores) - cached_count,
+                    "cache_graded": cached_count,
+                    "llm_graded": len(open_ended),
+                    "degraded": degraded,
                     "processing_time": response.processing_time_seconds
                 }
             )
@@ -300,6 +469,185 @@ class AIAssessmentService:
             )
             raise
 
+    @staticmethod
+    def _provisional_score(
+        question: GeneratedQuestion,
+        answer: Optional[str],
+        criteria: EvaluationCriteria
+    ) -> QuestionScore:
+        """Score an open-ended answer by keyword coverage when the LLM ran out of time."""
+        score = AnswerGrader.grade(
+            question,
+            answer,
+            keyword_weights=criteria.keyword_weights,
+            partial_credit=criteria.partial_credit
+        )
+        return score.model_copy(update={"feedback": f"Provisional score from a keyword check. {score.feedback}"})
+
+    async def _grade_with_batcher(
+        self,
+        questions: List[GeneratedQuestion],
+        answers_by_question: Dict[str, UserAnswer]
+    ) -> Dict[str, Any]:
+        """Grade open-ended answers through the cross-request micro-batcher."""
+        results = await asyncio.gather(*(
+            grading_batcher.grade(question, answers_by_question[question.id].answer)
+            for question in questions
+        ))
+
+        question_scores = []
+        for question, result in zip(questions, results):
+            if result is None:
+                continue
+            try:
+                score = min(float(result.get("score", 0)), question.points)
+            except (TypeError, ValueError):
+                continue
+            question_scores.append({
+                "question_id": question.id,
+                "score": max(0.0, score),
+                "max_score": question.points,
+                "feedback": result.get("feedback", ""),
+                "is_correct": bool(result.get("is_correct", score >= question.points * 0.6))
+            })
+
+        # Node and overall feedback are derived locally since batches span requests
+        return {"question_scores": question_scores}
+
+    async def _evaluate_open_ended(
+        self,
+        request: AssessmentEvaluationRequest,
+        questions: List[GeneratedQuestion],
+        answers_by_question: Dict[str, UserAnswer]
+    ) -> Dict[str, Any]:
+        """Grade open-ended answers with a single batched LLM request."""
+        evaluation_data = []
+        user_answers = []
+
+        for question in questions:
+            user_answer = answers_by_question[question.id]
+            evaluation_data.append({
+                "id": question.id,
+                "node_id": question.node_id,
+                "question": question.question,
+                "question_type": question.question_type,
+                "correct_answer": question.correct_answer,
+                "points": question.points,
+                "keywords": question.keywords,
+                "user_answer": user_answer.answer
+            })
+            user_answers.append({
+                "question_id": user_answer.question_id,
+                "answer": user_answer.answer,
+                "time_taken": user_answer.time_taken_seconds
+            })
+
+        prompt = PromptTemplates.assessment_evaluation_prompt(
+            questions=evaluation_data,
+            user_answers=user_answers
+        )
+
+        return await llm_client.generate_json_completion(
+            prompt=prompt,
+            expected_schema=EVALUATION_SCHEMA,
+            temperature=0.3,  # Lower temperature for more consistent scoring
+            output_task="evaluation",
+            output_units=len(evaluation_data),
+            priority=LLMPriority.INTERACTIVE,
+            user_key=self.assessment_owners.get(request.assessment_id, request.assessment_id)
+        )
+
+    def _build_assessment_response(
+        self,
+        questions: List[GeneratedQuestion],
+        estimated_minutes: int,
+        start_time: datetime,
+        degraded: bool = False
+    ) -> AssessmentResponse:
+        """Wrap questions in an assessment response with evaluation criteria."""
+        evaluation_criteria = EvaluationCriteria(
+            scoring_method="weighted",
+            partial_credit=True,
+            keyword_weights=self._calculate_keyword_weights(questions),
+            time_factor=0.1
+        )
+
+        assessment_id = str(uuid4())
+        return AssessmentResponse(
+            id=assessment_id,
+            assessment_id=assessment_id,
+            questions=questions,
+            estimated_minutes=max(10, estimated_minutes),
+            evaluation_criteria=evaluation_criteria,
+            processing_time_seconds=(datetime.utcnow() - start_time).total_seconds(),
+            degraded=degraded
+        )
+
+    def _deadline_fallback(
+        self,
+        request: AssessmentGenerationRequest,
+        cache_key: str,
+        start_time: datetime
+    ) -> Optional[AssessmentResponse]:
+        """Return the best assessment available without the LLM once the deadline has run out."""
+        cached = self.question_cache.get(cache_key)
+        if cached is not None:
+            logger.warning("Deadline exceeded, returning cached assessment", extra={"user_course_id": request.user_course_id})
+            return cached.model_copy(update={"degraded": True})
+
+        if not settings.question_bank_enabled:
+            return None
+
+        banked_questions = self.question_bank.sample(
+            nodes=request.nodes,
+            difficulty=request.difficulty_level.value,
+            count=request.question_count,
+            user_key=request.user_course_id,
+            focus_areas=request.focus_areas,
+            allow_partial=True
+        )
+        if not banked_questions:
+            return None
+
+        response = self._build_assessment_response(
+            banked_questions, len(banked_questions) * 3, start_time, degraded=True
+        )
+        self.assessment_owners.set(response.assessment_id, request.user_course_id)
+        logger.warning(
+            "Deadline exceeded, returning partial assessment from question bank",
+            extra={
+                "assessment_id": response.assessment_id,
+                "question_count": len(banked_questions),
+                "requested_count": request.question_count
+            }
+        )
+        return response
+
+    async def _generate_bank_questions(self, node: KnowledgeNodeInfo, difficulty: str) -> List[GeneratedQuestion]:
+        """Generate questions for a single node to top up the question bank."""
+        prompt = PromptTemplates.assessment_generation_prompt(
+            nodes=[node],
+            user_progress=self._extract_user_progress([node]),
+            difficulty_level=difficulty,
+            question_count=settings.question_bank_refill_batch
+        )
+
+        ai_response = await llm_client.generate_json_completion(
+            prompt=prompt,
+            expected_schema=ASSESSMENT_GENERATION_SCHEMA,
+            temperature=0.9,  # Higher temperature for variety across refills
+            output_task="assessment",
+            output_units=settings.question_bank_refill_batch,
+            priority=LLMPriority.BACKGROUND,
+            user_key="question_bank"
+        )
+
+        return self._process_generated_questions(ai_response["questions"], [node])
+
+    def _score_cache_key(self, question: GeneratedQuestion, answer: Optional[str]) -> tuple:
+        """Create a per-question score cache key shared across assessments and users."""
+        return (AnswerGrader.question_fingerprint(question), AnswerGrader.answer_key(question, answer))
+
     def _create_cache_key(self, request: AssessmentGenerationRequest) -> str:
         """Create a cache key for assessment generation."""
         node_ids = sorted([node.id for node in request.nodes])
@@ -307,28 +655,71 @@ class AIAssessmentService:
 
         return f"assess_{hash(str(node_ids))}_{request.difficulty_level.value}_{request.question_count}_{hash(str(focus_areas))}"
 
-    def _extract_user_progress(self, nodes: List[Any]) -> List[Dict[str, Any]]:
+    def _extract_user_progress(self, nodes: List[Any]) -> List[NodeProgress]:
         """Extract user progress from nodes for prompt context."""
         progress = []
 
         for node in nodes:
-            progress.append({
-                "node_id": node.id,
-                "status": node.current_user_status,
-                "mastery_score": 0,  # Default, would be updated from actual progress
-                "study_time_minutes": 0
-            })
+            progress.append(NodeProgress(
+                node_id=node.id,
+                status=node.current_user_status,
+                mastery_score=0,  # Default, would be updated from actual progress
+                study_time_minutes=0
+            ))
 
         return progress
 
+    async def _top_up_questions(
+        self,
+        request: AssessmentGenerationRequest,
+        questions: List[GeneratedQuestion],
+        missing_count: int
+    ) -> List[GeneratedQuestion]:
+        """Generate only the questions missing from a partially valid response."""
+        logger.info(
+            "Topping up assessment questions",
+            extra={"user_course_id": request.user_course_id, "missing_count": missing_count}
+        )
+
+        prompt = PromptTemplates.question_top_up_prompt(
+            nodes=request.nodes,
+            existing_questions=[question.question for question in questions],
+            difficulty_level=request.difficulty_level.value,
+            missing_count=missing_count
+        )
+
+        try:
+            ai_response = await llm_client.generate_json_completion(
+                prompt=prompt,
+                expected_schema=QUESTION_TOP_UP_SCHEMA,
+                temperature=0.7,
+                output_task="question_top_up",
+                output_units=missing_count,
+                max_retries=1,
+                priority=LLMPriority.INTERACTIVE,
+                user_key=request.user_course_id
+            )
+        except Exception as e:
+            logger.warning(f"Question top-up failed, returning {len(questions)} questions: {e}")
+            return []
+
+        top_up = self._process_generated_questions(
+            ai_response.get("questions", []),
+            request.nodes,
+            existing_ids=[question.id for question in questions]
+        )
+        return top_up[:missing_count]
+
     def _process_generated_questions(
         self,
         raw_questions: List[Dict[str, Any]],
-        nodes: List[Any]
+        nodes: List[Any],
+        existing_ids: Optional[List[str]] = None
     ) -> List[GeneratedQuestion]:
         """Process and validate generated questions."""
         questions = []
         node_ids = {node.id for node in nodes}
+        used_ids = set(existing_ids or [])
 
         for i, q in enumerate(raw_questions):
             try:
@@ -337,12 +728,17 @@ class AIAssessmentService:
                     logger.warning(f"Question {i} references invalid node_id: {q.get('node_id')}")
                     continue
 
+                # Keep ids unique across the assessment, including topped-up questions
+                question_id = q.get("id")
+                if not question_id or question_id in used_ids:
+                    question_id = f"q_{uuid4().hex[:8]}"
+
                 # Set default values and validate
                 question = GeneratedQuestion(
-                    id=q.get("id", f"q_{uuid4().hex[:8]}"),
+                    id=question_id,
                     node_id=q["node_id"],
                     question=q["question"],
-                    question_type=q["question_type"],
+                    question_type=q.get("question_type") or ("multiple_choice" if q.get("options") else "short_answer"),
                     options=q.get("options"),
                     correct_answer=q.get("correct_answer"),
                     points=q.get("points", 10),
@@ -353,6 +749,7 @@ class AIAssessmentService:
                 )
 
                 questions.append(question)
+                used_ids.add(question_id)
 
             except Exception as e:
                 logger.warning(f"Failed to process question {i}: {e}")
@@ -452,15 +849,17 @@ class AIAssessmentService:
 
     def clear_cache(self) -> Dict[str, int]:
         """Clear assessment caches and return stats."""
-        question_count = len(self.question_cache)
-        evaluation_count = len(self.evaluation_cache)
-
-        self.question_cache.clear()
-        self.evaluation_cache.clear()
+        question_count = self.question_cache.clear()
+        evaluation_count = self.evaluation_cache.clear()
+        self.assessment_owners.clear()
+        score_count = self.score_cache.clear()
+        bank_count = self.question_bank.clear()
 
         return {
             "cleared_questions": question_count,
-            "cleared_evaluations": evaluation_count
+            "cleared_evaluations": evaluation_count,
+            "cleared_question_scores": score_count,
+            "cleared_bank_questions": bank_count
         }
 
 
@@ -16,19 +16,75 @@ from src.models.roadmap import (
 )
 from src.models.common import RoadmapEdge
 from src.services.llm_client import llm_client
+from src.services.llm_limiter import LLMPriority
 from src.utils.prompt_templates import PromptTemplates
 from src.utils.graph_analyzer import GraphAnalyzer
+from src.utils.timing import StageClock
+from src.utils.cache import LRUCache
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Expected LLM output for roadmap generation
+ROADMAP_GENERATION_SCHEMA = {
+    "type": "object",
+    "required": ["roadmap_id", "title", "nodes", "edges", "metadata"],
+    "properties": {
+        "roadmap_id": {"type": "string"},
+        "title": {"type": "string"},
+        "nodes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "title", "description", "prerequisites", "estimated_hours", "position", "difficulty"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "prerequisites": {"type": "array", "items": {"type": "string"}},
+                    "estimated_hours": {"type": "number"},
+                    "position": {
+                        "type": "object",
+                        "properties": {"x": {"type": "number"}, "y": {"type": "number"}}
+                    },
+                    "difficulty": {"type": "string"},
+                    "resources": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        },
+        "edges": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["from", "to"],
+                "properties": {
+                    "from": {"type": "string"},
+                    "to": {"type": "string"},
+                    "type": {"type": "string"}
+                }
+            }
+        },
+        "metadata": {"type": "object"}
+    }
+}
+
+# Expected LLM output when topping up referenced but missing nodes
+ROADMAP_NODES_TOP_UP_SCHEMA = {
+    "type": "object",
+    "required": ["nodes"],
+    "properties": {"nodes": ROADMAP_GENERATION_SCHEMA["properties"]["nodes"]}
+}
+
 
 class AIRoadmapService:
     """Service for AI-powered roadmap generation and validation."""
 
     def __init__(self):
         """Initialize the roadmap service."""
-        self.roadmap_cache = {}  # Simple in-memory cache
+        self.roadmap_cache: LRUCache[RoadmapGenerationResponse] = LRUCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
         self.search_client = None  # Would initialize search client here
 
     async def generate_roadmap(
@@ -57,18 +113,22 @@ class AIRoadmapService:
                 }
             )
 
+            clock = StageClock("roadmap")
+
             # Create cache key
             cache_key = self._create_cache_key(request)
 
             # Check cache first
-            if cache_key in self.roadmap_cache:
+            cached = self.roadmap_cache.get(cache_key)
+            if cached is not None:
                 logger.info("Returning cached roadmap")
-                return self.roadmap_cache[cache_key]
+                return cached
 
             # Gather additional context if search is enabled
             search_context = ""
             if request.search_enabled and request.custom_input:
                 search_context = await self._gather_search_context(request)
+                clock.lap("search")
 
             # Create enhanced prompt with search context
             enhanced_prompt = PromptTemplates.roadmap_generation_prompt(
@@ -78,49 +138,25 @@ class AIRoadmapService:
                 target_hours=request.target_hours,
                 difficulty_level=request.difficulty_level
             )
-
-            # Define expected schema for roadmap
-            roadmap_schema = {
-                "type": "object",
-                "required": ["roadmap_id", "title", "nodes", "edges", "metadata"],
-                "properties": {
-                    "roadmap_id": {"type": "string"},
-                    "title": {"type": "string"},
-                    "nodes": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "required": ["id", "title", "description", "prerequisites", "estimated_hours", "position", "difficulty"],
-                            "properties": {
-                                "id": {"type": "string"},
-                                "title": {"type": "string"},
-                                "description": {"type": "string"},
-                                "prerequisites": {"type": "array"},
-                                "estimated_hours": {"type": "number"},
-                                "position": {"type": "object"},
-                                "difficulty": {"type": "string"},
-                                "resources": {"type": "array"}
-                            }
-                        }
-                    },
-                    "edges": {"type": "array"},
-                    "metadata": {"type": "object"}
-                }
-            }
+            clock.lap("prompt")
 
             # Generate roadmap using LLM
             ai_response = await llm_client.generate_json_completion(
                 prompt=enhanced_prompt,
-                expected_schema=roadmap_schema,
-                max_tokens=4000,
-                temperature=0.7
+                expected_schema=ROADMAP_GENERATION_SCHEMA,
+                temperature=0.7,
+                output_task="roadmap",
+                priority=LLMPriority.STANDARD
             )
+            clock.lap("generate")
 
             # Process and validate the generated roadmap
             processed_roadmap = await self._process_generated_roadmap(
                 ai_response,
-                request.target_hours
+                request.target_hours,
+                course_title=request.course_title
             )
+            clock.lap("process")
 
             # Validate the roadmap structure
             validation_result = await self.validate_roadmap(
@@ -137,6 +173,7 @@ class AIRoadmapService:
                     processed_roadmap,
                     validation_result.issues
                 )
+            clock.lap("validate")
 
             # Create response
             roadmap_id = str(uuid4())
@@ -151,7 +188,7 @@ class AIRoadmapService:
             )
 
             # Cache the result
-            self.roadmap_cache[cache_key] = response
+            self.roadmap_cache.set(cache_key, response)
 
             logger.info(
                 "Roadmap generation completed",
@@ -275,43 +312,33 @@ class AIRoadmapService:
     async def _process_generated_roadmap(
         self,
         ai_response: Dict[str, Any],
-        target_hours: Optional[int]
+        target_hours: Optional[int],
+        course_title: Optional[str] = None
     ) -> Dict[str, Any]:
         """Process and enhance the generated roadmap."""
         # Process nodes
+        raw_nodes = ai_response.get("nodes", [])
         processed_nodes = []
-        total_hours = 0
-
-        for i, node_data in enumerate(ai_response.get("nodes", [])):
-            try:
-                # Ensure proper positioning if not provided
-                if "position" not in node_data or not node_data["position"]:
-                    node_data["position"] = self._calculate_node_position(i, len(ai_response["nodes"]))
-
-                # Validate and adjust estimated hours
-                estimated_hours = node_data.get("estimated_hours", 4.0)
-                if estimated_hours < 0.5:
-                    estimated_hours = 0.5
-                elif estimated_hours > 40:
-                    estimated_hours = 40.0
-
-                node = GeneratedNode(
-                    id=node_data.get("id", f"node_{uuid4().hex[:8]}"),
-                    title=node_data["title"],
-                    description=node_data["description"],
-                    prerequisites=node_data.get("prerequisites", []),
-                    estimated_hours=estimated_hours,
-                    position=node_data["position"],
-                    difficulty=node_data.get("difficulty", "medium"),
-                    resources=node_data.get("resources", [])
-                )
 
+        for i, node_data in enumerate(raw_nodes):
+            node = self._build_node(node_data, i, len(raw_nodes))
+            if node is not None:
                 processed_nodes.append(node)
-                total_hours += estimated_hours
 
-            except Exception as e:
-                logger.warning(f"Failed to process node {i}: {e}")
-                continue
+        # Generate only the nodes that are referenced but missing or invalid
+        missing_ids = self._find_missing_node_ids(processed_nodes, ai_response.get("edges", []))
+        if missing_ids and course_title:
+            processed_nodes += await self._top_up_missing_nodes(course_title, processed_nodes, missing_ids)
+
+        # Drop references that could not be resolved
+        node_ids = {node.id for node in processed_nodes}
+        for node in processed_nodes:
+            dangling = [prereq for prereq in node.prerequisites if prereq not in node_ids]
+            if dangling:
+                logger.warning(f"Removing dangling prerequisites from node {node.id}: {dangling}")
+                node.prerequisites = [prereq for prereq in node.prerequisites if prereq in node_ids]
+
+        total_hours = sum(node.estimated_hours for node in processed_nodes)
 
         # Adjust hours if target is specified
         if target_hours and total_hours > 0:
@@ -323,11 +350,15 @@ class AIRoadmapService:
         processed_edges = []
         for edge_data in ai_response.get("edges", []):
             try:
-                edge = RoadmapEdge(
-                    from_node=edge_data["from"],
-                    to_node=edge_data["to"],
-                    relationship_type=edge_data.get("type", "prerequisite")
-                )
+                if edge_data["from"] not in node_ids or edge_data["to"] not in node_ids:
+                    logger.warning(f"Skipping edge with unknown node: {edge_data['from']} -> {edge_data['to']}")
+                    continue
+
+                edge = RoadmapEdge(**{
+                    "from": edge_data["from"],
+                    "to": edge_data["to"],
+                    "relationship_type": edge_data.get("type", "prerequisite")
+                })
                 processed_edges.append(edge)
             except Exception as e:
                 logger.warning(f"Failed to process edge: {e}")
@@ -350,6 +381,101 @@ class AIRoadmapService:
             "metadata": metadata
         }
 
+    def _build_node(self, node_data: Dict[str, Any], index: int, total_nodes: int) -> Optional[GeneratedNode]:
+        """Build a node from LLM output, filling defaults; returns None if unusable."""
+        try:
+            # Ensure proper positioning if not provided
+            if "position" not in node_data or not node_data["position"]:
+                node_data["position"] = self._calculate_node_position(index, total_nodes)
+
+            # Validate and adjust estimated hours
+            estimated_hours = node_data.get("estimated_hours", 4.0)
+            if estimated_hours < 0.5:
+                estimated_hours = 0.5
+            elif estimated_hours > 40:
+                estimated_hours = 40.0
+
+            return GeneratedNode(
+                id=node_data.get("id", f"node_{uuid4().hex[:8]}"),
+                title=node_data["title"],
+                description=node_data.get("description") or node_data["title"],
+                prerequisites=node_data.get("prerequisites", []),
+                estimated_hours=estimated_hours,
+                position=node_data["position"],
+                difficulty=node_data.get("difficulty", "medium"),
+                resources=node_data.get("resources", [])
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to process node {index}: {e}")
+            return None
+
+    def _find_missing_node_ids(
+        self,
+        nodes: List[GeneratedNode],
+        raw_edges: List[Dict[str, Any]]
+    ) -> List[str]:
+        """Find node ids referenced by prerequisites or edges but not defined."""
+        node_ids = {node.id for node in nodes}
+        referenced = []
+
+        for node in nodes:
+            referenced.extend(node.prerequisites)
+        for edge in raw_edges:
+            if isinstance(edge, dict):
+                referenced.extend([edge.get("from"), edge.get("to")])
+
+        missing = []
+        for node_id in referenced:
+            if node_id and isinstance(node_id, str) and node_id not in node_ids and node_id not in missing:
+                missing.append(node_id)
+        return missing
+
+    async def _top_up_missing_nodes(
+        self,
+        course_title: str,
+        nodes: List[GeneratedNode],
+        missing_ids: List[str]
+    ) -> List[GeneratedNode]:
+        """Generate definitions for referenced nodes missing from the response."""
+        logger.info("Topping up missing roadmap nodes", extra={"missing_node_ids": missing_ids})
+
+        prompt = PromptTemplates.roadmap_nodes_top_up_prompt(
+            course_title=course_title,
+            existing_nodes=[
+                {"id": node.id, "title": node.title, "prerequisites": node.prerequisites}
+                for node in nodes
+            ],
+            missing_node_ids=missing_ids
+        )
+
+        try:
+            ai_response = await llm_client.generate_json_completion(
+                prompt=prompt,
+                expected_schema=ROADMAP_NODES_TOP_UP_SCHEMA,
+                temperature=0.7,
+                output_task="roadmap_nodes_top_up",
+                output_units=len(missing_ids),
+                max_retries=1,
+                priority=LLMPriority.STANDARD
+            )
+        except Exception as e:
+            logger.warning(f"Roadmap node top-up failed: {e}")
+            return []
+
+        wanted = set(missing_ids)
+        total_nodes = len(nodes) + len(missing_ids)
+        added = []
+        for i, node_data in enumerate(ai_response.get("nodes", [])):
+            if not isinstance(node_data, dict) or node_data.get("id") not in wanted:
+                continue
+            node = self._build_node(node_data, len(nodes) + i, total_nodes)
+            if node is not None:
+                added.append(node)
+                wanted.discard(node.id)
+
+        return added
+
     def _calculate_node_position(self, index: int, total_nodes: int) -> Dict[str, float]:
         """Calculate node position for visualization."""
         import math
@@ -485,9 +611,7 @@ class AIRoadmapService:
 
     def clear_cache(self) -> Dict[str, int]:
         """Clear the roadmap cache."""
-        count = len(self.roadmap_cache)
-        self.roadmap_cache.clear()
-        return {"cleared_roadmaps": count}
+        return {"cleared_roadmaps": self.roadmap_cache.clear()}
 
 
 # Global roadmap service instance
@@ -19,20 +19,67 @@ from src.models.study_plan import (
 )
 from src.models.common import ActivityType, Priority, KnowledgeNodeInfo, NodeProgress
 from src.services.llm_client import llm_client
+from src.services.llm_limiter import LLMPriority
 from src.utils.prompt_templates import PromptTemplates
 from src.utils.time_calculator import TimeCalculator
 from src.utils.graph_analyzer import GraphAnalyzer
+from src.utils.deadline import DeadlineExceeded
+from src.utils.timing import StageClock, span
+from src.utils.cache import LRUCache
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Expected LLM output for study plan generation
+PLAN_GENERATION_SCHEMA = {
+    "type": "object",
+    "required": ["daily_schedule"],
+    "properties": {
+        "daily_schedule": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["day", "date", "total_study_minutes", "activities", "daily_goal"],
+                "properties": {
+                    "day": {"type": "integer"},
+                    "date": {"type": "string"},
+                    "total_study_minutes": {"type": "integer"},
+                    "activities": {"type": "array"},
+                    "daily_goal": {"type": "string"},
+                    "color_theme": {"type": "string"},
+                    "milestones": {"type": "array"}
+                }
+            }
+        }
+    }
+}
+
+# Expected LLM output for plan adjustment
+PLAN_ADJUSTMENT_SCHEMA = {
+    "type": "object",
+    "required": ["adjusted_plan_id", "changes_made", "updated_schedule", "impact_analysis"],
+    "properties": {
+        "adjusted_plan_id": {"type": "string"},
+        "changes_made": {"type": "array"},
+        "updated_schedule": {"type": "array"},
+        "impact_analysis": {"type": "string"}
+    }
+}
+
 
 class AIStudyPlanService:
     """Service for AI-powered study plan generation and management."""
 
     def __init__(self):
         """Initialize the study plan service."""
-        self.plan_cache = {}  # Simple in-memory cache for plans
+        # Plans are only kept here and are fetched and adjusted later, so they have their own
+        # much larger bound than the response caches and do not expire
+        self.plan_cache: LRUCache[StudyPlanResponse] = LRUCache(max_entries=settings.plan_store_max_entries)
+        # plan_id -> user_course_id for LLM fairness
+        self.plan_owners: LRUCache[str] = LRUCache(
+            max_entries=settings.owner_cache_max_entries,
+            ttl_seconds=settings.cache_ttl
+        )
         self.color_themes = [
             "#4CAF50", "#2196F3", "#FF9800", "#9C27B0", "#F44336",
             "#009688", "#795548", "#607D8B", "#E91E63", "#3F51B5"
@@ -64,11 +111,15 @@ class AIStudyPlanService:
                 }
             )
 
+            clock = StageClock("study_plan")
+
             # Validate and preprocess the request
             self._validate_study_plan_request(request)
+            clock.lap("validate")
 
             # Analyze current progress and requirements
             analysis = self._analyze_learning_requirements(request)
+            clock.lap("analyze")
 
             # Check if plan is realistic
             realism_check = TimeCalculator.estimate_realistic_completion(
@@ -84,6 +135,7 @@ class AIStudyPlanService:
                 target_days=realism_check["recommended_days"],
                 exclude_weekends=request.time_constraints.exclude_weekends
             )
+            clock.lap("estimate")
 
             # Create optimized learning sequence
             learning_sequence = self._create_learning_sequence(
@@ -91,9 +143,22 @@ class AIStudyPlanService:
                 edges=request.roadmap.edges,
                 user_progress=request.user_progress
             )
+            clock.lap("sequence")
 
-            # Generate the initial plan structure using AI
-            ai_plan = await self._generate_ai_plan(request, analysis, study_days, learning_sequence)
+            # Generate the initial plan structure using AI, or algorithmically if out of time
+            degraded = False
+            try:
+                ai_plan = await self._generate_ai_plan(request, analysis, study_days, learning_sequence)
+            except DeadlineExceeded as e:
+                degraded = True
+                logger.warning(
+                    "Deadline exceeded, falling back to algorithmic study plan",
+                    extra={"user_course_id": request.user_course_id, "error": str(e)}
+                )
+                ai_plan = self._build_algorithmic_plan(
+                    request, study_days, learning_sequence, realism_check["recommended_daily_hours"]
+                )
+            clock.lap("generate")
 
             # Optimize the plan with time calculations
             optimized_plan = self._optimize_plan_timing(
@@ -102,6 +167,7 @@ class AIStudyPlanService:
                 daily_hours=realism_check["recommended_daily_hours"],
                 preferences=request.preferences
             )
+            clock.lap("optimize")
 
             # Create the final response
             plan_id = str(uuid4())
@@ -111,6 +177,7 @@ class AIStudyPlanService:
                 realism_check,
                 request.roadmap.nodes
             )
+            clock.lap("summarize")
 
             # Generate recommendations
             recommendations = self._generate_recommendations(
@@ -118,6 +185,7 @@ class AIStudyPlanService:
                 realism_check,
                 analysis
             )
+            clock.lap("recommend")
 
             response = StudyPlanResponse(
                 id=plan_id,
@@ -126,11 +194,13 @@ class AIStudyPlanService:
                 summary=summary,
                 recommendations=recommendations,
                 adaptability_score=self._calculate_adaptability_score(request, realism_check),
-                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds()
+                processing_time_seconds=(datetime.utcnow() - start_time).total_seconds(),
+                degraded=degraded
             )
 
             # Cache the plan
-            self.plan_cache[plan_id] = response
+            self.plan_cache.set(plan_id, response)
+            self.plan_owners.set(plan_id, request.user_course_id)
 
             logger.info(
                 "Study plan generation completed",
@@ -138,6 +208,7 @@ class AIStudyPlanService:
                     "plan_id": plan_id,
                     "total_days": len(optimized_plan),
                     "total_hours": summary.total_hours,
+                    "degraded": degraded,
                     "processing_time": response.processing_time_seconds
                 }
             )
@@ -197,23 +268,22 @@ class AIStudyPlanService:
             )
 
             # Generate AI adjustment
-            adjustment_schema = {
-                "type": "object",
-                "required": ["adjusted_plan_id", "changes_made", "updated_schedule", "impact_analysis"],
-                "properties": {
-                    "adjusted_plan_id": {"type": "string"},
-                    "changes_made": {"type": "array"},
-                    "updated_schedule": {"type": "array"},
-                    "impact_analysis": {"type": "string"}
-                }
-            }
-
-            ai_adjustment = await llm_client.generate_json_completion(
-                prompt=prompt,
-                expected_schema=adjustment_schema,
-                max_tokens=4000,
-                temperature=0.5
-            )
+            try:
+                ai_adjustment = await llm_client.generate_json_completion(
+                    prompt=prompt,
+                    expected_schema=PLAN_ADJUSTMENT_SCHEMA,
+                    temperature=0.5,
+                    output_task="plan_adjustment",
+                    output_units=request.remaining_days,
+                    priority=LLMPriority.STANDARD,
+                    user_key=self.plan_owners.get(request.plan_id, request.plan_id)
+                )
+            except DeadlineExceeded as e:
+                logger.warning(
+                    "Deadline exceeded, returning unadjusted remaining schedule",
+                    extra={"plan_id": request.plan_id, "error": str(e)}
+                )
+                return self._unadjusted_plan_response(request, original_plan, start_time)
 
             # Process the adjusted schedule
             updated_schedule = [
@@ -243,7 +313,10 @@ class AIStudyPlanService:
                 recommendations=original_plan.recommendations,
                 adaptability_score=original_plan.adaptability_score
             )
-            self.plan_cache[adjusted_plan_id] = adjusted_plan
+            self.plan_cache.set(adjusted_plan_id, adjusted_plan)
+            owner = self.plan_owners.get(request.plan_id)
+            if owner is not None:
+                self.plan_owners.set(adjusted_plan_id, owner)
 
             logger.info(
                 "Study plan adjustment completed",
@@ -319,6 +392,71 @@ class AIStudyPlanService:
             "completion_percentage": completed_hours / (completed_hours + total_hours_needed) if (completed_hours + total_hours_needed) > 0 else 0
         }
 
+    def _unadjusted_plan_response(
+        self,
+        request: StudyPlanAdjustmentRequest,
+        original_plan: StudyPlanResponse,
+        start_time: datetime
+    ) -> StudyPlanAdjustmentResponse:
+        """Return the remaining original schedule when the adjustment ran out of time."""
+        completed_days = set(request.feedback.completed_days)
+        remaining_schedule = [
+            day for day in original_plan.daily_schedule
+            if day.day not in completed_days
+        ][:request.remaining_days]
+
+        return StudyPlanAdjustmentResponse(
+            id=str(uuid4()),
+            adjusted_plan_id=request.plan_id,
+            changes_made=[],
+            updated_schedule=remaining_schedule,
+            impact_analysis="The plan could not be adjusted in time; the remaining schedule is unchanged.",
+            processing_time_seconds=(datetime.utcnow() - start_time).total_seconds(),
+            degraded=True
+        )
+
+    def _build_algorithmic_plan(
+        self,
+        request: StudyPlanRequest,
+        study_days: List[str],
+        learning_sequence: List[str],
+        daily_hours: float
+    ) -> List[Dict[str, Any]]:
+        """Build a schedule in the AI response format from the time-distribution heuristics."""
+        allocations = TimeCalculator.distribute_study_time(
+            nodes=request.roadmap.nodes,
+            available_days=study_days,
+            daily_hours=daily_hours,
+            user_progress=request.user_progress
+        )
+        titles = {node.id: node.title for node in request.roadmap.nodes}
+        statuses = {progress.node_id: progress.status for progress in request.user_progress}
+        order = {node_id: index for index, node_id in enumerate(learning_sequence)}
+
+        plan = []
+        for day in study_days:
+            day_allocations = sorted(allocations.get(day, {}).items(), key=lambda item: order.get(item[0], len(order)))
+            activities = [
+                {
+                    "node_id": node_id,
+                    "activity_type": "review" if statuses.get(node_id) == "needs_review" else "learn",
+                    "estimated_minutes": max(15, min(240, round(hours * 60))),
+                    "description": f"Study {titles.get(node_id, node_id)}",
+                    "priority": "medium"
+                }
+                for node_id, hours in day_allocations
+            ]
+            plan.append({
+                "activities": activities,
+                "daily_goal": f"Progress on {', '.join(titles.get(node_id, node_id) for node_id, _ in day_allocations)}"
+                if activities else "Catch up or review"
+            })
+
+        # Trailing days without allocations are not part of the plan
+        while plan and not plan[-1]["activities"]:
+            plan.pop()
+        return plan
+
     def _create_learning_sequence(
         self,
         nodes: List[KnowledgeNodeInfo],
@@ -349,45 +487,26 @@ class AIStudyPlanService:
         }
 
         # Create prompt
-        prompt = PromptTemplates.study_plan_generation_prompt(
-            course_info=course_info,
-            roadmap_data=request.roadmap.model_dump(),
-            user_progress=request.user_progress,
-            target_days=len(study_days),
-            daily_hours=request.time_constraints.daily_hours,
-            start_date=study_days[0] if study_days else None,
-            preferences=request.preferences.model_dump() if request.preferences else None
-        )
+        with span("study_plan.prompt"):
+            prompt = PromptTemplates.study_plan_generation_prompt(
+                course_info=course_info,
+                roadmap_data=request.roadmap.model_dump(),
+                user_progress=request.user_progress,
+                target_days=len(study_days),
+                daily_hours=request.time_constraints.daily_hours,
+                start_date=study_days[0] if study_days else None,
+                preferences=request.preferences.model_dump() if request.preferences else None
+            )
 
         # Generate plan
-        plan_schema = {
-            "type": "object",
-            "required": ["daily_schedule"],
-            "properties": {
-                "daily_schedule": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "required": ["day", "date", "total_study_minutes", "activities", "daily_goal"],
-                        "properties": {
-                            "day": {"type": "integer"},
-                            "date": {"type": "string"},
-                            "total_study_minutes": {"type": "integer"},
-                            "activities": {"type": "array"},
-                            "daily_goal": {"type": "string"},
-                            "color_theme": {"type": "string"},
-                            "milestones": {"type": "array"}
-                        }
-                    }
-                }
-            }
-        }
-
         ai_response = await llm_client.generate_json_completion(
             prompt=prompt,
-            expected_schema=plan_schema,
-            max_tokens=4000,
-            temperature=0.6
+            expected_schema=PLAN_GENERATION_SCHEMA,
+            temperature=0.6,
+            output_task="study_plan",
+            output_units=len(study_days),
+            priority=LLMPriority.STANDARD,
+            user_key=request.user_course_id
         )
 
         return ai_response["daily_schedule"]
@@ -504,7 +623,7 @@ class AIStudyPlanService:
             nodes_to_complete=len(nodes),
             estimated_completion_date=study_days[-1] if study_days else date.today().strftime("%Y-%m-%d"),
             difficulty_distribution=difficulty_dist,
-            weekly_breakdown=weekly_breakdown
+            weekly_breakdown={week: round(hours) for week, hours in weekly_breakdown.items()}
         )
 
     def _generate_recommendations(
@@ -605,8 +724,8 @@ class AIStudyPlanService:
 
     def clear_cache(self) -> Dict[str, int]:
         """Clear the plan cache."""
-        count = len(self.plan_cache)
-        self.plan_cache.clear()
+        count = self.plan_cache.clear()
+        self.plan_owners.clear()
         return {"cleared_plans": count}
 
 
@@ -0,0 +1,419 @@
+"""Offline LLM provider: replays recorded completions or synthesizes schema-valid ones."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.services.llm_client import CompletionResult
+from src.utils.schema_validator import CompiledSchema
+
+logger = logging.getLogger(__name__)
+
+FAKE_MODES = ("synthesize", "replay", "record")
+
+# Array length used when a schema sets no bounds
+DEFAULT_ARRAY_ITEMS = 3
+
+# Cut-short completions remembered for their continuation call
+MAX_UNFINISHED = 1000
+
+# Placeholder dates for synthesized date fields
+SYNTHETIC_START_DATE = "2025-01-06"
+
+# Prompt lines naming ids a response must refer back to, by the field that holds them
+REFERENCE_PATTERNS = {
+    "node_id": re.compile(r"^(?:Node ID: |- )([\w.-]+)(?:$|: )", re.MULTILINE),
+    "question_id": re.compile(r"^Question ID: (\S+)$", re.MULTILINE),
+    "item_id": re.compile(r"^Item ID: (\S+)$", re.MULTILINE)
+}
+
+
+class CassetteMiss(LookupError):
+    """Raised in strict replay mode when no recording matches a prompt."""
+
+
+class FakeRateLimitError(Exception):
+    """Simulated 429 response, shaped like the provider SDK errors."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Simulated rate limit (retry after {retry_after:g}s)")
+        self.response = SimpleNamespace(headers={"retry-after": f"{retry_after:g}"})
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token), as the LLM client uses."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _digest(*parts: Optional[str]) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update((part or "").encode())
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def cassette_key(
+    prompt: str,
+    system_message: Optional[str] = None,
+    response_format: Optional[str] = None,
+    partial: Optional[str] = None
+) -> str:
+    """
+    Key a completion by everything that shapes its output except the model.
+
+    Args:
+        prompt: User prompt
+        system_message: System message, including any embedded schema
+        response_format: ``json`` or None
+        partial: Output being continued, if any
+
+    Returns:
+        Hex digest identifying the recording
+    """
+    return _digest(prompt, system_message, response_format, partial)[:32]
+
+
+class CassetteStore:
+    """Recorded completions on disk, one JSON file per prompt key."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._loaded: Dict[str, List[Dict[str, Any]]] = {}
+        self._replay_index: Dict[str, int] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    async def recordings(self, key: str) -> List[Dict[str, Any]]:
+        """All recordings for a key, oldest first."""
+        if key not in self._loaded:
+            self._loaded[key] = await asyncio.to_thread(self._read, key)
+        return list(self._loaded[key])
+
+    async def next_recording(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the next recording for a key, cycling through repeated recordings.
+
+        Args:
+            key: Key from ``cassette_key``
+
+        Returns:
+            Recorded completion, or None if nothing was recorded for the key
+        """
+        if key not in self._loaded:
+            self._loaded[key] = await asyncio.to_thread(self._read, key)
+        recordings = self._loaded[key]
+        if not recordings:
+            return None
+        index = self._replay_index.get(key, 0)
+        self._replay_index[key] = index + 1
+        return recordings[index % len(recordings)]
+
+    async def append(self, key: str, recording: Dict[str, Any]) -> None:
+        """Add a recording for a key and write the key's file."""
+        if key not in self._loaded:
+            self._loaded[key] = await asyncio.to_thread(self._read, key)
+        self._loaded[key].append(recording)
+        await asyncio.to_thread(self._write, key, list(self._loaded[key]))
+
+    def _read(self, key: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as cassette:
+                return json.load(cassette).get("completions", [])
+        except FileNotFoundError:
+            return []
+
+    def _write(self, key: str, recordings: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(key), "w", encoding="utf-8") as cassette:
+            json.dump({"key": key, "completions": recordings}, cassette, indent=2, ensure_ascii=False)
+
+
+def referenced_ids(prompt: str) -> Dict[str, List[str]]:
+    """Ids listed in a prompt, by the response field that refers to them."""
+    ids = {}
+    for name, pattern in REFERENCE_PATTERNS.items():
+        found = list(dict.fromkeys(pattern.findall(prompt)))
+        if found:
+            ids[name] = found
+    return ids
+
+
+class SchemaSynthesizer:
+    """Build JSON documents that satisfy a JSON schema, with plausible placeholder values."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.ids: Dict[str, List[str]] = {}
+
+    def document(self, schema: Dict[str, Any], ids: Optional[Dict[str, List[str]]] = None) -> Any:
+        """
+        Synthesize a value for a schema.
+
+        Args:
+            schema: JSON schema to satisfy
+            ids: Known ids by field name (e.g. ``node_id``), used instead of placeholders
+
+        Returns:
+            Document satisfying the schema
+        """
+        self.ids = ids or {}
+        return self._value(schema, "value", 0)
+
+    def _value(self, schema: Dict[str, Any], name: str, index: int) -> Any:
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if "const" in schema:
+            return schema["const"]
+
+        kind = schema.get("type", "object" if "properties" in schema else "string")
+        if isinstance(kind, list):
+            kind = next((option for option in kind if option != "null"), "null")
+
+        if kind == "object":
+            properties = schema.get("properties", {})
+            return {key: self._value(subschema, key, index) for key, subschema in properties.items()}
+        if kind == "array":
+            low = schema.get("minItems", 0)
+            high = schema.get("maxItems", max(low, DEFAULT_ARRAY_ITEMS))
+            count = min(high, max(low, DEFAULT_ARRAY_ITEMS))
+            item_name = name[:-1] if name.endswith("s") else name
+            return [self._value(schema.get("items", {}), item_name, item) for item in range(count)]
+        if kind == "integer":
+            low = int(schema.get("minimum", 1))
+            return self.rng.randint(low, int(schema.get("maximum", low + 59)))
+        if kind == "number":
+            low = float(schema.get("minimum", 0.5))
+            return round(self.rng.uniform(low, float(schema.get("maximum", low + 9.5))), 1)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(schema, name, index)
+
+    def _string(self, schema: Dict[str, Any], name: str, index: int) -> str:
+        if schema.get("format") == "date" or name == "date":
+            return SYNTHETIC_START_DATE
+        if self.ids.get(name):
+            return self.ids[name][index % len(self.ids[name])]
+        if name == "id" or name.endswith("_id"):
+            return f"{name.removesuffix('_id') or 'item'}_{index + 1}"
+        words = self.rng.randint(4, 16)
+        return f"Synthetic {name.replace('_', ' ')} {index + 1}: " + " ".join(
+            self.rng.choice(("learn", "practice", "review", "concept", "example", "apply", "build", "test"))
+            for _ in range(words)
+        )
+
+
+class FakeLLMProvider:
+    """
+    Stand-in for the provider network call, used for offline load and latency testing.
+
+    ``synthesize`` builds schema-valid JSON (or filler text); ``replay`` serves
+    completions recorded earlier, falling back to synthesis on a miss unless
+    strict; ``record`` makes the real call and stores the result for replay.
+    Every mode except ``record`` simulates latency, 429s and truncation.
+    """
+
+    def __init__(
+        self,
+        mode: str = "synthesize",
+        cassette_dir: str = "cassettes",
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 60.0,
+        truncation_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        replay_timing: bool = True,
+        strict: bool = False,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the fake provider.
+
+        Args:
+            mode: ``synthesize``, ``replay`` or ``record``
+            cassette_dir: Directory recordings are read from and written to
+            latency_ms: Median time to first token (0 for none)
+            latency_sigma: Spread of the log-normal time to first token
+            tokens_per_second: Simulated output streaming rate (0 for instant)
+            truncation_rate: Share of completions cut short as if by max_tokens
+            rate_limit_rate: Share of calls answered with a simulated 429
+            retry_after: ``retry-after`` seconds sent with simulated 429s
+            replay_timing: Replay recorded latency instead of sampling it
+            strict: In replay mode, raise ``CassetteMiss`` instead of synthesizing
+            seed: Random seed for reproducible runs
+        """
+        if mode not in FAKE_MODES:
+            raise ValueError(f"Unknown fake LLM mode {mode!r}; use one of {', '.join(FAKE_MODES)}")
+        self.mode = mode
+        self.store = CassetteStore(cassette_dir)
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.truncation_rate = truncation_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.replay_timing = replay_timing
+        self.strict = strict
+        self.rng = random.Random(seed)
+        self.synthesizer = SchemaSynthesizer(self.rng)
+        # Full text of completions that were cut short, keyed by the text emitted so far
+        self._unfinished: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"calls": 0, "replayed": 0, "synthesized": 0, "recorded": 0, "rate_limited": 0, "truncated": 0}
+
+    async def complete(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+        response_format: Optional[str],
+        max_tokens: Optional[int],
+        response_schema: Optional[CompiledSchema],
+        partial: Optional[str],
+        real_call: Callable[[], Awaitable[CompletionResult]]
+    ) -> CompletionResult:
+        """
+        Produce a completion in place of a provider call.
+
+        Args:
+            prompt: User prompt
+            system_message: System message
+            response_format: ``json`` or None
+            max_tokens: Output token cap
+            response_schema: Schema the output must satisfy, for synthesis
+            partial: Output being continued, if any
+            real_call: The real provider call, used in record mode
+
+        Returns:
+            Completion result
+
+        Raises:
+            FakeRateLimitError: For a simulated 429
+            CassetteMiss: In strict replay mode when nothing was recorded
+        """
+        self.stats["calls"] += 1
+        key = cassette_key(prompt, system_message, response_format, partial)
+
+        if self.mode == "record":
+            started = time.monotonic()
+            result = await real_call()
+            await self.store.append(key, {
+                "text": result.text,
+                "input_tokens": result.input_tokens,
+                "output_tokens": result.output_tokens,
+                "truncated": result.truncated,
+                "latency_seconds": round(time.monotonic() - started, 3),
+                "prompt_preview": prompt[:200]
+            })
+            self.stats["recorded"] += 1
+            return result
+
+        if self.rng.random() < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            await asyncio.sleep(self._first_token_delay() * 0.1)
+            raise FakeRateLimitError(self.retry_after)
+
+        recorded_latency = None
+        text = self._continue(partial) if partial else None
+        if text is None:
+            recording = await self.store.next_recording(key) if self.mode == "replay" else None
+            if recording is not None:
+                self.stats["replayed"] += 1
+                text = recording["text"]
+                recorded_latency = recording.get("latency_seconds")
+            elif self.mode == "replay" and self.strict:
+                raise CassetteMiss(f"No recording for prompt key {key}")
+            else:
+                self.stats["synthesized"] += 1
+                text = self._synthesize(prompt, response_format, response_schema, max_tokens)
+
+        emitted, truncated = self._truncate(text, max_tokens)
+        if truncated:
+            self.stats["truncated"] += 1
+            self._unfinished[_digest((partial or "") + emitted)] = text[len(emitted):]
+            while len(self._unfinished) > MAX_UNFINISHED:
+                self._unfinished.popitem(last=False)
+
+        output_tokens = _estimate_tokens(emitted)
+        if recorded_latency is not None and self.replay_timing:
+            delay = recorded_latency
+        else:
+            delay = self._first_token_delay()
+            if self.tokens_per_second > 0:
+                delay += output_tokens / self.tokens_per_second
+        await asyncio.sleep(delay)
+
+        input_tokens = _estimate_tokens(prompt) + _estimate_tokens(system_message) + _estimate_tokens(partial)
+        return CompletionResult(
+            text=emitted,
+            total_tokens=input_tokens + output_tokens,
+            output_tokens=output_tokens,
+            truncated=truncated,
+            input_tokens=input_tokens
+        )
+
+    def _continue(self, partial: str) -> Optional[str]:
+        """Rest of a completion that was cut short, if this call continues one."""
+        return self._unfinished.pop(_digest(partial), None)
+
+    def _synthesize(
+        self,
+        prompt: str,
+        response_format: Optional[str],
+        response_schema: Optional[CompiledSchema],
+        max_tokens: Optional[int]
+    ) -> str:
+        if response_schema is not None:
+            return json.dumps(self.synthesizer.document(response_schema.schema, referenced_ids(prompt)))
+        if response_format == "json":
+            return json.dumps({"result": "synthetic"})
+        # Plain text sized to a share of the output budget; starts with OK for health checks
+        words = max(1, min(max_tokens or 200, 400) // 2)
+        return "OK. " + " ".join(self.rng.choice(("lorem", "ipsum", "dolor", "sit", "amet")) for _ in range(words))
+
+    def _truncate(self, text: str, max_tokens: Optional[int]) -> Tuple[str, bool]:
+        """Cut text at the token cap, or at random for simulated truncation."""
+        if max_tokens and _estimate_tokens(text) > max_tokens:
+            return text[:max_tokens * 4], True
+        if len(text) > 20 and self.rng.random() < self.truncation_rate:
+            return text[:int(len(text) * self.rng.uniform(0.3, 0.9))], True
+        return text, False
+
+    def _first_token_delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.rng.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+
+def fake_provider_from_settings() -> Optional[FakeLLMProvider]:
+    """Build the fake provider configured by LLM_FAKE_MODE, or None when it is off."""
+    if settings.llm_fake_mode == "off":
+        return None
+    logger.warning(f"LLM calls are served by the fake provider in {settings.llm_fake_mode} mode")
+    return FakeLLMProvider(
+        mode=settings.llm_fake_mode,
+        cassette_dir=settings.llm_fake_cassette_dir,
+        latency_ms=settings.llm_fake_latency_ms,
+        latency_sigma=settings.llm_fake_latency_sigma,
+        tokens_per_second=settings.llm_fake_tokens_per_second,
+        truncation_rate=settings.llm_fake_truncation_rate,
+        rate_limit_rate=settings.llm_fake_rate_limit_rate,
+        retry_after=settings.llm_fake_retry_after,
+        replay_timing=settings.llm_fake_replay_timing,
+        strict=settings.llm_fake_strict,
+        seed=settings.llm_fake_seed
+    )
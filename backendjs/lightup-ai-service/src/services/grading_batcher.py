@@ -0,0 +1,191 @@
+"""Cross-request micro-batching of open-ended answer grading."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.models.assessment import GeneratedQuestion
+from src.services.llm_client import llm_client
+from src.services.llm_limiter import LLMPriority
+from src.utils.answer_grader import AnswerGrader
+from src.utils.deadline import detached_context
+from src.utils.prompt_templates import PromptTemplates
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Expected LLM output for a grading batch
+BATCH_GRADING_SCHEMA = {
+    "type": "object",
+    "required": ["results"],
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["item_id", "score", "feedback", "is_correct"],
+                "properties": {
+                    "item_id": {"type": "string"},
+                    "score": {"type": "number", "minimum": 0},
+                    "feedback": {"type": "string"},
+                    "is_correct": {"type": "boolean"}
+                }
+            }
+        }
+    }
+}
+
+
+@dataclass
+class _PendingItem:
+    """An answer waiting to be graded, shared by every request that submitted it."""
+
+    item_id: str
+    question: GeneratedQuestion
+    answer: str
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+class GradingBatcher:
+    """Collect open-ended answers for a short window and grade them in one LLM call."""
+
+    def __init__(self, max_wait_ms: int = 50, max_items: int = 20):
+        """
+        Initialize the batcher.
+
+        Args:
+            max_wait_ms: How long the first pending answer waits for others to join
+            max_items: Batch size that triggers an immediate flush
+        """
+        self.max_wait = max_wait_ms / 1000
+        self.max_items = max(1, max_items)
+        self._pending: Dict[tuple, _PendingItem] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._next_id = 0
+        self.stats = {"batches": 0, "items": 0, "deduplicated": 0, "failed_batches": 0}
+
+    async def grade(self, question: GeneratedQuestion, answer: str) -> Optional[Dict[str, Any]]:
+        """
+        Grade one answer as part of the next batch.
+
+        Identical answers to identical questions submitted in the same window
+        share a single batch slot.
+
+        Args:
+            question: The open-ended question
+            answer: The student's answer
+
+        Returns:
+            Score dict with ``score``, ``feedback`` and ``is_correct``,
+            or None if the LLM omitted the item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (AnswerGrader.question_fingerprint(question), AnswerGrader.answer_key(question, answer))
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.futures.append(future)
+            self.stats["deduplicated"] += 1
+        else:
+            self._next_id += 1
+            self._pending[key] = _PendingItem(f"item_{self._next_id}", question, answer, [future])
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send all pending answers as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items = list(self._pending.values())
+        self._pending = {}
+        if not items:
+            return
+
+        # The batch serves several requests, so no single caller's deadline may cancel it
+        task = detached_context().run(asyncio.create_task, self._grade_batch(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _grade_batch(self, items: List[_PendingItem]) -> None:
+        """Grade a batch and fan results out to every waiting request."""
+        self.stats["batches"] += 1
+        self.stats["items"] += len(items)
+
+        prompt = PromptTemplates.batch_grading_prompt([
+            {
+                "item_id": item.item_id,
+                "question": item.question.question,
+                "question_type": item.question.question_type,
+                "correct_answer": item.question.correct_answer,
+                "keywords": item.question.keywords,
+                "points": item.question.points,
+                "answer": item.answer
+            }
+            for item in items
+        ])
+
+        try:
+            response = await llm_client.generate_json_completion(
+                prompt=prompt,
+                expected_schema=BATCH_GRADING_SCHEMA,
+                temperature=0.3,
+                output_task="batch_grading",
+                output_units=len(items),
+                priority=LLMPriority.INTERACTIVE,
+                user_key="grading_batch"
+            )
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error("Batch grading failed", extra={"error": str(e), "batch_size": len(items)})
+            for item in items:
+                for future in item.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        results = {
+            result.get("item_id"): result
+            for result in response.get("results", [])
+            if isinstance(result, dict)
+        }
+
+        logger.info(
+            "Batch grading completed",
+            extra={
+                "batch_size": len(items),
+                "waiting_requests": sum(len(item.futures) for item in items),
+                "missing_results": sum(1 for item in items if item.item_id not in results)
+            }
+        )
+
+        for item in items:
+            result = results.get(item.item_id)
+            for future in item.futures:
+                if not future.done():
+                    future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return batching statistics."""
+        return {
+            "pending": len(self._pending),
+            "in_flight_batches": len(self._tasks),
+            **self.stats,
+            "average_batch_size": round(self.stats["items"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0
+        }
+
+
+# Global grading batcher instance
+grading_batcher = GradingBatcher(
+    max_wait_ms=settings.grading_batch_window_ms,
+    max_items=settings.grading_batch_max_items
+)
@@ -0,0 +1,152 @@
+"""Idempotency-Key support for expensive generation endpoints."""
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from src.utils.cache import LRUCache
+from src.utils.request_context import current_request
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Longest Idempotency-Key accepted
+MAX_KEY_LENGTH = 255
+
+# Response header marking a replayed response
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyReused(ValueError):
+    """Raised when an Idempotency-Key is reused with a different request body."""
+
+
+class IdempotencyCache:
+    """Replay the first response for retries that carry the same Idempotency-Key."""
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a completed response is replayed
+            max_entries: Completed responses kept before evicting the oldest
+        """
+        self._completed: LRUCache[Tuple[str, Any]] = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+        self.stats = {"executed": 0, "replayed": 0, "joined": 0, "conflicts": 0}
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        request: BaseModel,
+        operation: Callable[[], Awaitable[T]]
+    ) -> Tuple[T, bool]:
+        """
+        Run ``operation`` once per (scope, client, key), replaying its result for retries.
+
+        Keys are scoped to the calling client of the current request, so one
+        client cannot replay another's response by guessing its key. A retry
+        that arrives while the first request is still running waits for it
+        instead of starting a second generation; if the first request is
+        cancelled, one waiter runs the operation instead. Failed and degraded
+        results are not stored, so a later retry runs again.
+
+        Args:
+            scope: Endpoint name the key is valid for
+            key: Idempotency-Key header value (None runs the operation directly)
+            request: Request body, fingerprinted to detect key reuse
+            operation: Zero-argument coroutine factory doing the work
+
+        Returns:
+            Tuple of (result, whether it was replayed)
+
+        Raises:
+            IdempotencyKeyReused: If the key was used with a different body
+            ValueError: If the key is empty or too long
+        """
+        if key is None:
+            return await operation(), False
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        context = current_request()
+        cache_key = (scope, context.client if context else None, key)
+        fingerprint = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+        while True:
+            completed = self._completed.get(cache_key)
+            if completed is not None:
+                self._check_fingerprint(completed[0], fingerprint, key)
+                self.stats["replayed"] += 1
+                logger.info("Replaying idempotent response", extra={"scope": scope})
+                return completed[1], True
+
+            in_flight = self._in_flight.get(cache_key)
+            if in_flight is None:
+                break
+            self._check_fingerprint(in_flight[0], fingerprint, key)
+            self.stats["joined"] += 1
+            logger.info("Waiting for in-flight idempotent request", extra={"scope": scope})
+            try:
+                return await asyncio.shield(in_flight[1]), True
+            except asyncio.CancelledError:
+                # Only the first request was cancelled, not this one: take its place
+                if not in_flight[1].cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on a failure; mark it retrieved to avoid asyncio warnings
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[cache_key] = (fingerprint, future)
+        self.stats["executed"] += 1
+
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._in_flight.pop(cache_key, None)
+
+        future.set_result(result)
+        if not getattr(result, "degraded", False):
+            self._completed.set(cache_key, (fingerprint, result))
+        return result, False
+
+    def _check_fingerprint(self, stored: str, fingerprint: str, key: str) -> None:
+        """Reject a key reused for a different request body."""
+        if stored != fingerprint:
+            self.stats["conflicts"] += 1
+            raise IdempotencyKeyReused(f"Idempotency-Key '{key}' was already used with a different request")
+
+    @property
+    def responses(self) -> LRUCache:
+        """Completed responses available for replay."""
+        return self._completed
+
+    def clear(self) -> int:
+        """Forget completed responses, returning how many were dropped."""
+        return self._completed.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return cache size and replay statistics."""
+        return {"completed": len(self._completed), "in_flight": len(self._in_flight), **self.stats}
+
+
+# Global idempotency cache instance
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_max_entries
+)
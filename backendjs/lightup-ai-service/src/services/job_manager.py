@@ -0,0 +1,304 @@
+"""Background job execution for long-running generations."""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from src.models.jobs import JobRecord, JobStatus
+from src.utils.cache import LRUCache
+from src.utils.deadline import DeadlineExceeded, deadline_scope
+from src.utils.request_context import RequestContext, current_request, request_scope
+from src.utils.timing import stage_breakdown
+from src.utils.tracing import export_trace
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[BaseModel], Awaitable[BaseModel]]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job queue cannot accept more work."""
+
+
+# Error recorded for jobs still waiting for a worker when the pool stops
+SHUTDOWN_ERROR = "Service shut down before the job ran"
+
+
+class JobStore(ABC):
+    """Persistence for job records, shared by every worker that answers status queries."""
+
+    @abstractmethod
+    async def save(self, job: JobRecord) -> None:
+        """Create or replace a job record."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return a job record, or None if unknown or expired."""
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return store statistics."""
+        return {"backend": type(self).__name__}
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store; status is only visible to this worker."""
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 10000):
+        self._jobs: LRUCache[JobRecord] = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def save(self, job: JobRecord) -> None:
+        self._jobs.set(job.job_id, job)
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        return self._jobs.get(job_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": "memory", "jobs": len(self._jobs)}
+
+
+class RedisJobStore(JobStore):
+    """Redis-backed job store so any worker can answer status queries."""
+
+    def __init__(self, url: str, ttl_seconds: int = 3600, prefix: str = "ai_job:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def save(self, job: JobRecord) -> None:
+        await self._redis.set(self.prefix + job.job_id, job.model_dump_json(), ex=self.ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        data = await self._redis.get(self.prefix + job_id)
+        return JobRecord.model_validate_json(data) if data else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def create_job_store() -> JobStore:
+    """Create the job store selected by ``settings.job_store``."""
+    if settings.job_store == "redis":
+        try:
+            return RedisJobStore(settings.redis_url, ttl_seconds=settings.job_ttl_seconds)
+        except ImportError:
+            logger.warning("Redis job store not available - redis package not installed, using memory store")
+    return InMemoryJobStore(ttl_seconds=settings.job_ttl_seconds)
+
+
+class JobManager:
+    """Run registered generation handlers on a bounded local worker pool."""
+
+    def __init__(self, store: JobStore, workers: int = 4, max_queue: int = 100):
+        """
+        Initialize the job manager.
+
+        Args:
+            store: Where job records are persisted
+            workers: Number of concurrent worker tasks
+            max_queue: Jobs that may wait for a worker before submissions are refused
+        """
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._reserved = 0  # Queue slots held by submissions still saving their record
+        self._worker_tasks: List[asyncio.Task] = []
+        self._updates: Dict[str, asyncio.Event] = {}
+        self.stats = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        Register the coroutine that runs jobs of ``kind``.
+
+        Args:
+            kind: Job type name
+            handler: Coroutine function taking the request model and returning a response model
+        """
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """Start the worker pool."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker_tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+        logger.info("Job workers started", extra={"workers": self.workers})
+
+    async def stop(self) -> None:
+        """Stop the worker pool; jobs still queued are marked failed so clients stop waiting."""
+        if not self._worker_tasks:
+            return
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        queue, self._queue = self._queue, None
+        abandoned = 0
+        while not queue.empty():
+            job, _, _ = queue.get_nowait()
+            await self._update(job, status=JobStatus.FAILED, finished_at=datetime.utcnow(), error=SHUTDOWN_ERROR)
+            abandoned += 1
+        logger.info("Job workers stopped", extra={"abandoned_jobs": abandoned})
+
+    async def submit(self, kind: str, request: BaseModel, user_key: Optional[str] = None) -> JobRecord:
+        """
+        Queue a job and return its record immediately.
+
+        Args:
+            kind: Registered job type
+            request: Request model passed to the handler
+            user_key: Submitting user or course, if known
+
+        Returns:
+            The queued job record
+
+        Raises:
+            ValueError: If ``kind`` has no registered handler
+            JobQueueFull: If the queue is at capacity
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        self.start()
+        queue = self._queue
+        # Reserve the slot before saving: the save may yield, and other submissions must not take it
+        if queue.qsize() + self._reserved >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise JobQueueFull(f"Job queue is full ({self.max_queue} waiting)")
+
+        job = JobRecord(job_id=f"job_{uuid4().hex}", kind=kind, user_key=user_key)
+        self._reserved += 1
+        try:
+            await self.store.save(job)
+        finally:
+            self._reserved -= 1
+
+        if self._queue is not queue:
+            # The pool stopped while the record was being saved
+            await self._update(job, status=JobStatus.FAILED, finished_at=datetime.utcnow(), error=SHUTDOWN_ERROR)
+            return job
+
+        self._updates[job.job_id] = asyncio.Event()
+        # The job continues the submitting request's trace
+        queue.put_nowait((job, request, current_request()))
+        self.stats["submitted"] += 1
+
+        logger.info("Job queued", extra={"job_id": job.job_id, "kind": kind, "queued": queue.qsize()})
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return the current record of a job."""
+        return await self.store.get(job_id)
+
+    async def wait_for_update(self, job_id: str, timeout: float) -> None:
+        """
+        Wait until a job run by this process changes state, or ``timeout`` passes.
+
+        Jobs run elsewhere are not signalled locally, so callers simply re-read
+        the store after the timeout.
+        """
+        event = self._updates.get(job_id)
+        try:
+            if event is None:
+                await asyncio.sleep(timeout)
+            else:
+                await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return worker pool and queue statistics."""
+        return {
+            "workers": len(self._worker_tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "store": self.store.snapshot(),
+            **self.stats
+        }
+
+    async def _worker_loop(self) -> None:
+        """Run queued jobs until cancelled."""
+        while True:
+            job, request, submitter = await self._queue.get()
+            try:
+                await self._run(job, request, submitter)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: JobRecord, request: BaseModel, submitter: Optional[RequestContext] = None) -> None:
+        """Run one job and persist each state change."""
+        await self._update(job, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+
+        context = RequestContext(request_id=job.job_id, name=f"job:{job.kind}", user_key=job.user_key)
+        if submitter is not None:
+            context.trace_id, context.parent_span_id = submitter.trace_id, submitter.span_id
+
+        try:
+            with deadline_scope(settings.job_timeout), request_scope(context):
+                try:
+                    response = await self._handlers[job.kind](request)
+                finally:
+                    export_trace(context, context.name, time.perf_counter() - context.started_at, job_id=job.job_id)
+        except asyncio.CancelledError:
+            await self._update(job, status=JobStatus.FAILED, finished_at=datetime.utcnow(), error="Job was cancelled")
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            error, level = self._describe_failure(e)
+            logger.log(level, "Job failed", extra={"job_id": job.job_id, "kind": job.kind, "error": str(e)})
+            await self._update(job, status=JobStatus.FAILED, finished_at=datetime.utcnow(), error=error)
+            return
+
+        self.stats["succeeded"] += 1
+        await self._update(
+            job,
+            status=JobStatus.SUCCEEDED,
+            finished_at=datetime.utcnow(),
+            result=response.model_dump(mode="json", by_alias=True)
+        )
+        logger.info(
+            "Job succeeded",
+            extra={"job_id": job.job_id, "kind": job.kind, "timings": stage_breakdown(context)}
+        )
+
+    async def _update(self, job: JobRecord, **changes: Any) -> None:
+        """Persist a state change and wake local subscribers."""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        await self.store.save(job)
+
+        event = self._updates.get(job.job_id)
+        if event is not None:
+            event.set()
+            if job.finished:
+                del self._updates[job.job_id]
+            else:
+                self._updates[job.job_id] = asyncio.Event()
+
+    @staticmethod
+    def _describe_failure(error: Exception) -> Tuple[str, int]:
+        """Map an exception to a client-safe message and log level."""
+        if isinstance(error, DeadlineExceeded):
+            return "Generation timed out", logging.WARNING
+        if isinstance(error, ValueError):
+            return str(error), logging.WARNING
+        return "Generation failed", logging.ERROR
+
+
+# Global job manager instance
+job_manager = JobManager(
+    store=create_job_store(),
+    workers=settings.job_workers,
+    max_queue=settings.job_queue_size
+)
@@ -3,7 +3,9 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Union
 from datetime import datetime
 
 import openai
@@ -11,10 +13,72 @@ from openai import AsyncOpenAI
 import httpx
 
 from src.config.settings import settings
+from src.services.llm_limiter import LLMPriority, llm_limiter
+from src.services.output_estimator import output_estimator
+from src.services.usage_tracker import TokenUsage, usage_tracker
+from src.utils.json_repair import JSONRepair
+from src.utils.prompt_templates import PromptTemplates
+from src.utils.deadline import DeadlineExceeded, sleep_within_deadline, within_deadline
+from src.utils.metrics import metrics
+from src.utils.schema_validator import CompiledSchema, compile_schema
+from src.utils.timing import StageClock, span
+from src.utils.tracing import outbound_trace_headers
 
 
 logger = logging.getLogger(__name__)
 
+# Name of the structured-output schema / forced tool sent to providers
+STRUCTURED_OUTPUT_NAME = "structured_response"
+
+# Time kept back from a request deadline so callers can still assemble a fallback
+DEADLINE_RESERVE_SECONDS = 0.5
+
+# Schema types a missing-field follow-up may fill in; anything else is re-requested with the full prompt
+SCALAR_TYPES = {"string", "integer", "number", "boolean", "null"}
+
+
+@dataclass
+class CompletionResult:
+    """Raw result of a single provider call."""
+
+    text: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    total_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    truncated: bool = False  # Stopped by max_tokens rather than finishing
+    input_tokens: Optional[int] = None  # Including cached prompt tokens
+    cached_tokens: int = 0
+    reasoning_tokens: int = 0
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token) used for budgeting."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider exception is a 429 rate-limit response."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def schema_instructions(schema: Dict[str, Any]) -> str:
+    """System message suffix asking for JSON that follows ``schema``, used when structured outputs are off."""
+    return f"\n\nPlease respond with valid JSON following this schema: {json.dumps(schema, indent=2)}"
+
+
+def _model_name(provider: str, model: Optional[str]) -> str:
+    """Resolve the model a provider call uses, for metric labels."""
+    if model:
+        return model
+    return settings.anthropic_model if provider == "anthropic" else settings.openai_model
+
+
+def _error_headers(error: Exception) -> Mapping[str, str]:
+    """Extract response headers from a provider exception, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers if headers is not None else {}
+
 
 class LLMClient:
     """Client for interacting with various LLM providers."""
@@ -26,6 +90,17 @@ class LLMClient:
             timeout=settings.llm_timeout
         )
         self.anthropic_client = None
+        self.stats = {
+            "json_parse_failures": 0,  # Completions that were not valid JSON as returned
+            "json_repairs": 0,  # ... of which were recovered locally
+            "json_repair_failures": 0,  # ... of which needed a new completion
+            "field_top_ups": 0,
+            "schema_failures": 0,
+            "schema_items_dropped": 0,
+            "truncated_completions": 0,
+            "continuations": 0
+        }
+        self._anthropic_tools_supported = True
 
         # Initialize Anthropic client if API key is provided
         if settings.anthropic_api_key:
@@ -38,6 +113,12 @@ class LLMClient:
             except ImportError:
                 logger.warning("Anthropic client not available - anthropic package not installed")
 
+        # Local stand-in for provider calls, for offline load and latency testing
+        self.fake_provider = None
+        if settings.llm_fake_mode != "off":
+            from src.services.fake_llm import fake_provider_from_settings
+            self.fake_provider = fake_provider_from_settings()
+
     async def generate_completion(
         self,
         prompt: str,
@@ -46,7 +127,13 @@ class LLMClient:
         temperature: Optional[float] = None,
         response_format: Optional[str] = None,
         system_message: Optional[str] = None,
-        provider: str = "openai"
+        provider: str = "openai",
+        priority: LLMPriority = LLMPriority.STANDARD,
+        user_key: Optional[str] = None,
+        json_schema: Optional[CompiledSchema] = None,
+        output_task: Optional[str] = None,
+        output_units: float = 1.0,
+        response_schema: Optional[CompiledSchema] = None
     ) -> str:
         """
         Generate a completion using the specified LLM provider.
@@ -54,29 +141,74 @@ class LLMClient:
         Args:
             prompt: The prompt to send to the LLM
             model: Model to use (defaults to configured model)
-            max_tokens: Maximum tokens to generate
+            max_tokens: Maximum tokens to generate (predicted from ``output_task`` when omitted)
             temperature: Temperature for generation
             response_format: Expected response format (json, text)
             system_message: System message to guide the LLM
             provider: LLM provider to use (openai, anthropic)
+            priority: Dispatch lane (interactive, standard, background)
+            user_key: Fairness key within the lane, usually the user_course_id
+            json_schema: Schema for provider-native structured output, if enabled
+            output_task: Task name for the output-size model, e.g. ``assessment``
+            output_units: Request size in the task's unit (questions, days, ...)
+            response_schema: Schema the response should satisfy; lets the fake provider synthesize one
 
         Returns:
             Generated completion as string
         """
         start_time = datetime.utcnow()
 
+        if max_tokens is None and output_task:
+            max_tokens = output_estimator.max_tokens(output_task, output_units)
+
         try:
-            if provider == "openai":
-                response = await self._generate_openai_completion(
-                    prompt, model, max_tokens, temperature, response_format, system_message
-                )
-            elif provider == "anthropic" and self.anthropic_client:
-                response = await self._generate_anthropic_completion(
-                    prompt, model, max_tokens, temperature, system_message
-                )
-            else:
+            simulated = self.fake_provider is not None and self.fake_provider.mode != "record"
+            if provider not in ("openai", "anthropic") or (
+                provider == "anthropic" and not self.anthropic_client and not simulated
+            ):
                 raise ValueError(f"Unsupported provider: {provider}")
 
+            response = ""
+            output_tokens = 0
+            continuations = 0
+            while True:
+                # Queueing and the provider call both count against the request deadline
+                try:
+                    result = await within_deadline(
+                        self._limited_completion(
+                            provider, prompt, model, max_tokens, temperature, response_format,
+                            system_message, json_schema, priority, user_key, partial=response or None,
+                            operation=output_task or "completion", response_schema=response_schema
+                        ),
+                        reserve=DEADLINE_RESERVE_SECONDS,
+                        stage="LLM completion"
+                    )
+                except DeadlineExceeded:
+                    if not continuations:
+                        raise
+                    # Out of time mid-continuation: hand back the truncated text for local repair
+                    logger.warning("Deadline reached during continuation", extra={"continuations": continuations})
+                    break
+                response += result.text
+                output_tokens += result.output_tokens or _estimate_tokens(result.text)
+
+                if not result.truncated:
+                    break
+                self.stats["truncated_completions"] += 1
+
+                # Structured outputs and tool calls cannot be resumed mid-document
+                if json_schema is not None or continuations >= settings.llm_max_continuations:
+                    logger.warning(
+                        "LLM completion truncated at max_tokens",
+                        extra={"max_tokens": max_tokens, "continuations": continuations, "output_task": output_task}
+                    )
+                    break
+                continuations += 1
+                self.stats["continuations"] += 1
+
+            if output_task:
+                output_estimator.record(output_task, output_units, output_tokens, truncated=result.truncated)
+
             processing_time = (datetime.utcnow() - start_time).total_seconds()
 
             logger.info(
@@ -86,7 +218,10 @@ class LLMClient:
                     "model": model or "default",
                     "processing_time": processing_time,
                     "prompt_length": len(prompt),
-                    "response_length": len(response)
+                    "response_length": len(response),
+                    "max_tokens": max_tokens,
+                    "output_tokens": output_tokens,
+                    "continuations": continuations
                 }
             )
 
@@ -104,6 +239,84 @@ class LLMClient:
             )
             raise
 
+    async def _limited_completion(
+        self,
+        provider: str,
+        prompt: str,
+        model: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        response_format: Optional[str],
+        system_message: Optional[str],
+        json_schema: Optional[CompiledSchema],
+        priority: LLMPriority,
+        user_key: Optional[str],
+        partial: Optional[str] = None,
+        operation: str = "completion",
+        response_schema: Optional[CompiledSchema] = None
+    ) -> CompletionResult:
+        """Make one provider call through the process-wide adaptive limiter and account for its usage."""
+        estimated_tokens = (
+            _estimate_tokens(prompt)
+            + _estimate_tokens(system_message)
+            + _estimate_tokens(partial)
+            + (max_tokens or settings.openai_max_tokens)
+        )
+        started = time.monotonic()
+        clock = StageClock("llm")
+        async with llm_limiter.acquire(estimated_tokens, priority, user_key) as permit:
+            clock.lap("queue", priority=priority.value)
+            try:
+                if provider == "openai":
+                    call = lambda: self._generate_openai_completion(
+                        prompt, model, max_tokens, temperature, response_format, system_message, json_schema, partial
+                    )
+                else:
+                    call = lambda: self._generate_anthropic_completion(
+                        prompt, model, max_tokens, temperature, system_message, json_schema, partial
+                    )
+                if self.fake_provider is not None:
+                    result = await self.fake_provider.complete(
+                        prompt, system_message, response_format, max_tokens,
+                        response_schema or json_schema, partial, real_call=call
+                    )
+                else:
+                    result = await call()
+            except Exception as e:
+                clock.lap("network", provider=provider, operation=operation, error=type(e).__name__)
+                rate_limited = _is_rate_limit_error(e)
+                if rate_limited:
+                    permit.record_rate_limited(_error_headers(e))
+                else:
+                    permit.record_failure()
+                metrics.observe_llm_call(
+                    provider, _model_name(provider, model), "rate_limited" if rate_limited else "error",
+                    time.monotonic() - started
+                )
+                raise
+            permit.record_success(result.headers, result.total_tokens, result.output_tokens)
+            clock.lap("network", provider=provider, operation=operation, output_tokens=result.output_tokens)
+
+        model_name = _model_name(provider, model)
+        metrics.observe_llm_call(
+            provider, model_name, "truncated" if result.truncated else "success",
+            time.monotonic() - started, result.input_tokens, result.output_tokens
+        )
+        if result.input_tokens is not None or result.output_tokens is not None:
+            usage_tracker.record(
+                provider,
+                model_name,
+                operation,
+                TokenUsage(
+                    input_tokens=result.input_tokens or 0,
+                    output_tokens=result.output_tokens or 0,
+                    cached_tokens=result.cached_tokens,
+                    reasoning_tokens=result.reasoning_tokens
+                ),
+                user_key=user_key
+            )
+        return result
+
     async def _generate_openai_completion(
         self,
         prompt: str,
@@ -111,9 +324,11 @@ class LLMClient:
         max_tokens: Optional[int],
         temperature: Optional[float],
         response_format: Optional[str],
-        system_message: Optional[str]
-    ) -> str:
-        """Generate completion using OpenAI API."""
+        system_message: Optional[str],
+        json_schema: Optional[CompiledSchema] = None,
+        partial: Optional[str] = None
+    ) -> CompletionResult:
+        """Generate completion using OpenAI API, continuing ``partial`` output if given."""
         messages = []
 
         if system_message:
@@ -121,6 +336,12 @@ class LLMClient:
 
         messages.append({"role": "user", "content": prompt})
 
+        if partial:
+            # JSON mode would force a fresh document, so the continuation is plain text
+            messages.append({"role": "assistant", "content": partial})
+            messages.append({"role": "user", "content": PromptTemplates.continuation_prompt()})
+            response_format = None
+
         kwargs = {
             "model": model or settings.openai_model,
             "messages": messages,
@@ -128,12 +349,39 @@ class LLMClient:
             "temperature": temperature or settings.openai_temperature,
         }
 
-        if response_format == "json":
+        trace_headers = outbound_trace_headers()
+        if trace_headers:
+            kwargs["extra_headers"] = trace_headers
+
+        if response_format == "json" and json_schema is not None:
+            # Strict mode only when the schema fits its restrictions
+            kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": STRUCTURED_OUTPUT_NAME,
+                    "strict": json_schema.strict_compatible,
+                    "schema": json_schema.strict_schema or json_schema.schema
+                }
+            }
+        elif response_format == "json":
             kwargs["response_format"] = {"type": "json_object"}
 
-        response = await self.openai_client.chat.completions.create(**kwargs)
-
-        return response.choices[0].message.content or ""
+        raw_response = await self.openai_client.chat.completions.with_raw_response.create(**kwargs)
+        response = raw_response.parse()
+        usage = getattr(response, "usage", None)
+
+        choice = response.choices[0]
+
+        return CompletionResult(
+            text=choice.message.content or "",
+            headers=raw_response.headers,
+            total_tokens=getattr(usage, "total_tokens", None),
+            output_tokens=getattr(usage, "completion_tokens", None),
+            truncated=getattr(choice, "finish_reason", None) == "length",
+            input_tokens=getattr(usage, "prompt_tokens", None),
+            cached_tokens=getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None) or 0,
+            reasoning_tokens=getattr(getattr(usage, "completion_tokens_details", None), "reasoning_tokens", None) or 0
+        )
 
     async def _generate_anthropic_completion(
         self,
@@ -141,9 +389,11 @@ class LLMClient:
         model: Optional[str],
         max_tokens: Optional[int],
         temperature: Optional[float],
-        system_message: Optional[str]
-    ) -> str:
-        """Generate completion using Anthropic API."""
+        system_message: Optional[str],
+        json_schema: Optional[CompiledSchema] = None,
+        partial: Optional[str] = None
+    ) -> CompletionResult:
+        """Generate completion using Anthropic API, continuing ``partial`` output if given."""
         if not self.anthropic_client:
             raise ValueError("Anthropic client not initialized")
 
@@ -157,9 +407,64 @@ class LLMClient:
         if system_message:
             kwargs["system"] = system_message
 
-        response = await self.anthropic_client.messages.create(**kwargs)
+        trace_headers = outbound_trace_headers()
+        if trace_headers:
+            kwargs["extra_headers"] = trace_headers
+
+        if partial:
+            # Prefilled assistant turn: the model resumes from the last character
+            kwargs["messages"].append({"role": "assistant", "content": partial.rstrip()})
+
+        # Structured output through a single forced tool call
+        if json_schema is not None and self._anthropic_tools_supported:
+            kwargs["tools"] = [{
+                "name": STRUCTURED_OUTPUT_NAME,
+                "description": "Return the response in the required structure.",
+                "input_schema": json_schema.schema
+            }]
+            kwargs["tool_choice"] = {"type": "tool", "name": STRUCTURED_OUTPUT_NAME}
+        elif json_schema is not None:
+            kwargs["system"] = (system_message or "") + schema_instructions(json_schema.schema)
 
-        return response.content[0].text if response.content else ""
+        try:
+            raw_response = await self.anthropic_client.messages.with_raw_response.create(**kwargs)
+        except TypeError:
+            if "tools" not in kwargs:
+                raise
+            logger.warning("Installed anthropic package does not support tool use - falling back to JSON prompting")
+            self._anthropic_tools_supported = False
+            kwargs.pop("tools")
+            kwargs.pop("tool_choice")
+            kwargs["system"] = (system_message or "") + schema_instructions(json_schema.schema)
+            raw_response = await self.anthropic_client.messages.with_raw_response.create(**kwargs)
+
+        response = raw_response.parse()
+        usage = getattr(response, "usage", None)
+        output_tokens = getattr(usage, "output_tokens", None)
+        # Anthropic reports prompt-cache reads and writes separately from input_tokens
+        cached_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+        input_tokens = getattr(usage, "input_tokens", None)
+        if input_tokens is not None:
+            input_tokens += cached_tokens + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+
+        text = ""
+        for block in response.content or []:
+            if getattr(block, "type", None) == "tool_use":
+                text = json.dumps(block.input)
+                break
+            if getattr(block, "text", None):
+                text = block.text
+                break
+
+        return CompletionResult(
+            text=text,
+            headers=raw_response.headers,
+            total_tokens=(input_tokens or 0) + (output_tokens or 0) if usage else None,
+            output_tokens=output_tokens,
+            truncated=getattr(response, "stop_reason", None) == "max_tokens",
+            input_tokens=input_tokens,
+            cached_tokens=cached_tokens
+        )
 
     async def generate_json_completion(
         self,
@@ -182,9 +487,15 @@ class LLMClient:
         Returns:
             Parsed JSON response
         """
+        compiled_schema = compile_schema(expected_schema) if expected_schema else None
+        structured = compiled_schema is not None and settings.llm_structured_outputs
+
         system_message = kwargs.get('system_message', '')
-        if expected_schema:
-            system_message += f"\n\nPlease respond with valid JSON following this schema: {json.dumps(expected_schema, indent=2)}"
+        if expected_schema and not structured:
+            system_message += schema_instructions(expected_schema)
+
+        provider = kwargs.get("provider", "openai")
+        metric_model = _model_name(provider, model)
 
         for attempt in range(max_retries + 1):
             try:
@@ -193,16 +504,34 @@ class LLMClient:
                     model=model,
                     response_format="json",
                     system_message=system_message,
+                    json_schema=compiled_schema if structured else None,
+                    response_schema=compiled_schema,
                     **{k: v for k, v in kwargs.items() if k != 'system_message'}
                 )
 
-                # Parse JSON response
-                parsed_response = json.loads(response)
-
-                # Basic schema validation if provided
-                if expected_schema:
-                    self._validate_json_schema(parsed_response, expected_schema)
-
+                # Parse JSON response, recovering fixable syntax and truncation locally
+                with span("llm.parse"):
+                    parsed_response = self._parse_json_response(response)
+                if structured and compiled_schema.strict_compatible:
+                    parsed_response = compiled_schema.strip_optional_nulls(parsed_response)
+
+                # Ask only for omitted scalar fields; omitted content needs the whole prompt again
+                if expected_schema and isinstance(parsed_response, dict):
+                    missing_fields = self._missing_required_fields(parsed_response, expected_schema)
+                    structural = [f for f in missing_fields if not self._is_scalar_field(expected_schema, f)]
+                    if structural:
+                        raise ValueError(f"Response omitted required fields: {', '.join(structural)}")
+                    if missing_fields:
+                        parsed_response = await self._top_up_missing_fields(
+                            prompt, parsed_response, missing_fields, expected_schema, model, kwargs
+                        )
+
+                # Full schema validation, dropping invalid array items
+                if compiled_schema:
+                    with span("llm.validate"):
+                        parsed_response = self._validate_json_schema(parsed_response, compiled_schema)
+
+                metrics.observe_llm_retries(provider, metric_model, "invalid_json", attempt)
                 return parsed_response
 
             except (json.JSONDecodeError, ValueError) as e:
@@ -212,15 +541,104 @@ class LLMClient:
                     )
                     continue
                 else:
+                    metrics.observe_llm_retries(provider, metric_model, "invalid_json", attempt)
                     logger.error(f"JSON parsing failed after {max_retries + 1} attempts: {e}")
                     raise ValueError(f"Failed to generate valid JSON response: {e}")
 
-    def _validate_json_schema(self, data: Dict[str, Any], schema: Dict[str, Any]) -> None:
-        """Basic JSON schema validation."""
-        required_fields = schema.get('required', [])
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"Missing required field: {field}")
+    def _parse_json_response(self, response: str) -> Any:
+        """Parse a JSON completion, repairing it before giving up on the response."""
+        try:
+            parsed, repairs = JSONRepair.parse(response)
+        except ValueError:
+            self.stats["json_parse_failures"] += 1
+            self.stats["json_repair_failures"] += 1
+            metrics.count_json_parse_failure("failed")
+            raise
+
+        if repairs:
+            self.stats["json_parse_failures"] += 1
+            self.stats["json_repairs"] += 1
+            metrics.count_json_parse_failure("repaired")
+            logger.info("Recovered malformed JSON completion", extra={"repairs": repairs})
+
+        return parsed
+
+    async def _top_up_missing_fields(
+        self,
+        prompt: str,
+        partial_response: Dict[str, Any],
+        missing_fields: List[str],
+        schema: Dict[str, Any],
+        model: Optional[str],
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Request only the required scalar fields missing from a parsed response and merge them in.
+
+        The follow-up carries an outline of the response, not the original
+        prompt's data, so it is only used for fields derivable from that
+        outline (counts, totals, feedback text, ids).
+        """
+        logger.info("Requesting missing JSON fields", extra={"missing_fields": missing_fields})
+
+        top_up_kwargs = {
+            k: v for k, v in kwargs.items()
+            if k not in ("system_message", "max_tokens", "output_task", "output_units")
+        }
+        response = await self.generate_completion(
+            prompt=PromptTemplates.missing_fields_prompt(prompt, partial_response, missing_fields, schema),
+            model=model,
+            response_format="json",
+            max_tokens=min(kwargs.get("max_tokens") or 1000, 1000),
+            **top_up_kwargs
+        )
+
+        fields = self._parse_json_response(response)
+        if not isinstance(fields, dict):
+            raise ValueError("Missing-field follow-up did not return an object")
+
+        merged = dict(partial_response)
+        merged.update({field: fields[field] for field in missing_fields if field in fields})
+        self.stats["field_top_ups"] += 1
+        return merged
+
+    @staticmethod
+    def _is_scalar_field(schema: Dict[str, Any], field: str) -> bool:
+        """Whether a top-level field holds a single value rather than generated content."""
+        field_type = schema.get("properties", {}).get(field, {}).get("type")
+        types = field_type if isinstance(field_type, list) else [field_type]
+        return bool(field_type) and all(t in SCALAR_TYPES for t in types)
+
+    @staticmethod
+    def _missing_required_fields(data: Dict[str, Any], schema: Dict[str, Any]) -> List[str]:
+        """Return required top-level fields absent from ``data``."""
+        return [field for field in schema.get("required", []) if field not in data]
+
+    def _validate_json_schema(self, data: Any, schema: CompiledSchema) -> Any:
+        """
+        Validate a response against the compiled schema.
+
+        Invalid array items are dropped so callers can top up the shortfall;
+        any other violation raises.
+
+        Args:
+            data: Parsed response
+            schema: Compiled expected schema
+
+        Returns:
+            The response with invalid array items removed
+        """
+        pruned, dropped, errors = schema.prune(data)
+
+        if dropped:
+            self.stats["schema_items_dropped"] += dropped
+            logger.warning("Dropped invalid items from JSON response", extra={"dropped_items": dropped})
+
+        if errors:
+            self.stats["schema_failures"] += 1
+            raise ValueError(f"Schema validation failed: {'; '.join(errors[:5])}")
+
+        return pruned
 
     async def generate_with_retry(
         self,
@@ -232,6 +650,8 @@ class LLMClient:
         """
         Generate completion with exponential backoff retry logic.
 
+        Retries and backoff sleeps stop once the request deadline is reached.
+
         Args:
             prompt: The prompt to send
             max_retries: Maximum retry attempts
@@ -242,10 +662,17 @@ class LLMClient:
             Generated completion
         """
         last_exception = None
+        provider = kwargs.get("provider", "openai")
+        metric_model = _model_name(provider, kwargs.get("model"))
 
         for attempt in range(max_retries + 1):
             try:
-                return await self.generate_completion(prompt, **kwargs)
+                response = await self.generate_completion(prompt, **kwargs)
+                metrics.observe_llm_retries(provider, metric_model, "error", attempt)
+                return response
+
+            except DeadlineExceeded:
+                raise
 
             except Exception as e:
                 last_exception = e
@@ -256,8 +683,9 @@ class LLMClient:
                         f"LLM request failed (attempt {attempt + 1}/{max_retries + 1}): {e}. "
                         f"Retrying in {delay:.1f} seconds..."
                     )
-                    await asyncio.sleep(delay)
+                    await sleep_within_deadline(delay)
                 else:
+                    metrics.observe_llm_retries(provider, metric_model, "error", attempt)
                     logger.error(f"LLM request failed after {max_retries + 1} attempts")
 
         raise last_exception or Exception("Unknown error in LLM generation")
@@ -265,20 +693,30 @@ class LLMClient:
     async def batch_generate(
         self,
         prompts: List[str],
-        concurrent_limit: int = 5,
+        concurrent_limit: Optional[int] = None,
         **kwargs
     ) -> List[str]:
         """
         Generate completions for multiple prompts concurrently.
 
+        Concurrency is governed by the shared adaptive limiter; ``concurrent_limit``
+        only caps this batch further when given. Batches run in the background
+        lane unless a priority is passed explicitly.
+
         Args:
             prompts: List of prompts to process
-            concurrent_limit: Maximum concurrent requests
+            concurrent_limit: Optional per-batch cap on concurrent requests
             **kwargs: Additional arguments for completion
 
         Returns:
             List of generated completions
         """
+        kwargs.setdefault("priority", LLMPriority.BACKGROUND)
+
+        if concurrent_limit is None:
+            tasks = [self.generate_completion(prompt, **kwargs) for prompt in prompts]
+            return await asyncio.gather(*tasks, return_exceptions=False)
+
         semaphore = asyncio.Semaphore(concurrent_limit)
 
         async def generate_single(prompt: str) -> str:
@@ -297,7 +735,10 @@ class LLMClient:
         """
         health_status = {
             "timestamp": datetime.utcnow().isoformat(),
-            "providers": {}
+            "providers": {},
+            "limiter": llm_limiter.snapshot(),
+            "json": dict(self.stats),
+            "output_size": output_estimator.snapshot()
         }
 
         # Check OpenAI
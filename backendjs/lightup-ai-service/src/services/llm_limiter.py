@@ -0,0 +1,533 @@
+"""Adaptive concurrency limiter shared by every outbound LLM call."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Tuple
+
+from src.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}T")
+
+# Headers giving when the request or token window resets, OpenAI first, then Anthropic
+REQUEST_RESET_HEADERS = ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset")
+TOKEN_RESET_HEADERS = (
+    "x-ratelimit-reset-tokens",
+    "anthropic-ratelimit-tokens-reset",
+    "anthropic-ratelimit-input-tokens-reset",
+    "anthropic-ratelimit-output-tokens-reset",
+)
+
+
+class LLMPriority(str, Enum):
+    """Priority lanes for LLM work."""
+    INTERACTIVE = "interactive"
+    STANDARD = "standard"
+    BACKGROUND = "background"
+
+
+# Relative share of provider capacity each lane receives under contention
+PRIORITY_WEIGHTS: Dict[LLMPriority, float] = {
+    LLMPriority.INTERACTIVE: 8.0,
+    LLMPriority.STANDARD: 3.0,
+    LLMPriority.BACKGROUND: 1.0,
+}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a provider reset/retry duration into seconds.
+
+    Accepts plain seconds (``"2"``, ``"0.5"``) as sent in ``retry-after``,
+    OpenAI-style durations (``"20ms"``, ``"1s"``, ``"6m0s"``) as sent in
+    ``x-ratelimit-reset-*`` and RFC 3339 timestamps as sent in
+    ``anthropic-ratelimit-*-reset``.
+
+    Args:
+        value: Raw header value
+
+    Returns:
+        Duration in seconds, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    if _TIMESTAMP.match(value):
+        try:
+            reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _reset_duration(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    """Return the first parseable reset duration among ``names``; zero is a valid value."""
+    for name in names:
+        duration = parse_reset_duration(headers.get(name))
+        if duration is not None:
+            return duration
+    return None
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    """Read an integer header, ignoring malformed values."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Waiter:
+    """A queued caller waiting for a slot."""
+
+    __slots__ = ("future", "priority", "flow", "start_tag")
+
+    def __init__(self, future: asyncio.Future, priority: LLMPriority, flow: Tuple[str, str], start_tag: float):
+        self.future = future
+        self.priority = priority
+        self.flow = flow
+        self.start_tag = start_tag
+
+
+class LimiterPermit:
+    """A single admitted LLM call; reports its outcome back to the limiter."""
+
+    def __init__(
+        self,
+        limiter: "AdaptiveConcurrencyLimiter",
+        estimated_tokens: int,
+        concurrency: int,
+        priority: LLMPriority = LLMPriority.STANDARD
+    ):
+        """Initialize the permit."""
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.priority = priority
+        self.concurrency_at_start = concurrency
+        self.started_at = time.monotonic()
+        self.outcome: Optional[str] = None
+        self._budget_entry: Optional[List[float]] = None
+
+    def record_success(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        total_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None
+    ) -> None:
+        """Record a successful provider response."""
+        self.outcome = "success"
+        if total_tokens is not None and self._budget_entry is not None:
+            self._budget_entry[1] = float(total_tokens)
+        self.limiter._on_success(self, time.monotonic() - self.started_at, headers or {}, output_tokens)
+
+    def record_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Record a 429 / rate-limit response from the provider."""
+        self.outcome = "rate_limited"
+        self.limiter._on_rate_limited(headers or {})
+
+    def record_failure(self) -> None:
+        """Record a non rate-limit failure (no effect on the limit)."""
+        self.outcome = "failure"
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter for LLM providers.
+
+    The limit grows additively while calls succeed at a latency close to the
+    observed baseline and shrinks multiplicatively on rate-limit responses or
+    when latency degrades past ``latency_tolerance`` times the baseline.
+    ``x-ratelimit-*`` / ``retry-after`` headers pause admission until the
+    provider window resets, and an optional tokens-per-minute budget delays
+    calls that would overrun it.
+
+    Queued callers are served by weighted fair queuing: each (priority, user)
+    flow is charged its estimated tokens divided by the lane weight and the
+    smallest finish tag goes next, so interactive work overtakes standard work
+    and one heavy user cannot monopolise a lane. Background calls are only admitted when no
+    other lane is waiting and at most ``background_share`` of the limit is in use.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        tokens_per_minute: int = 0,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.5,
+        latency_backoff_ratio: float = 0.9,
+        default_retry_after: float = 1.0,
+        budget_window: float = 60.0,
+        background_share: float = 0.5
+    ):
+        """Initialize the limiter."""
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.tokens_per_minute = tokens_per_minute
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.latency_backoff_ratio = latency_backoff_ratio
+        self.default_retry_after = default_retry_after
+        self.budget_window = budget_window
+        self.background_share = background_share
+
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self._queue: List[Tuple[float, int, _Waiter]] = []
+        self._background_queue: List[Tuple[float, int, _Waiter]] = []
+        self._waiting: Dict[LLMPriority, int] = {priority: 0 for priority in LLMPriority}
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[Tuple[str, str], float] = {}
+        self._sequence = itertools.count()
+        self._baseline_latency: Optional[float] = None
+        self._blocked_until = 0.0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._token_window: Deque[List[float]] = deque()
+        self._provider_tokens_remaining: Optional[int] = None
+        self._provider_tokens_reset_at = 0.0
+
+        self.stats: Dict[str, int] = {
+            "admitted": 0,
+            "succeeded": 0,
+            "rate_limited": 0,
+            "latency_backoffs": 0,
+            "budget_waits": 0
+        }
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Number of calls queued for a slot."""
+        return sum(self._waiting.values())
+
+    @property
+    def background_limit(self) -> int:
+        """Slots background work may occupy."""
+        return max(1, int(self.limit * self.background_share))
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        estimated_tokens: int = 0,
+        priority: LLMPriority = LLMPriority.STANDARD,
+        user_key: Optional[str] = None
+    ) -> AsyncIterator[LimiterPermit]:
+        """
+        Wait for a concurrency slot and token budget, then yield a permit.
+
+        Args:
+            estimated_tokens: Expected prompt + completion tokens for the call
+            priority: Lane the call is queued in
+            user_key: Fairness key (usually the user_course_id) within the lane
+
+        Yields:
+            Permit used to report the call outcome
+        """
+        priority = LLMPriority(priority)
+        await self._acquire_slot(priority, user_key or "", estimated_tokens)
+        permit = LimiterPermit(self, estimated_tokens, self._in_flight, priority)
+        try:
+            permit._budget_entry = await self._reserve_budget(estimated_tokens)
+            permit.started_at = time.monotonic()
+            self.stats["admitted"] += 1
+            yield permit
+        finally:
+            self._release(priority)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the limiter state for health and debugging output."""
+        self._prune_budget(time.monotonic())
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "background_in_flight": self._background_in_flight,
+            "waiting": self.waiting,
+            "waiting_by_priority": {priority.value: count for priority, count in self._waiting.items()},
+            "baseline_latency": self._baseline_latency,
+            "tokens_last_window": int(sum(entry[1] for entry in self._token_window)),
+            "tokens_per_minute": self.tokens_per_minute,
+            "blocked_for_seconds": max(0.0, self._blocked_until - time.monotonic()),
+            **self.stats
+        }
+
+    async def _acquire_slot(self, priority: LLMPriority, user_key: str, estimated_tokens: int) -> None:
+        """Wait until a slot is available for ``priority`` and admission is not paused."""
+        while True:
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if self._can_admit(priority) and not self._has_waiters_ahead(priority):
+                self._take_slot(priority)
+                return
+
+            waiter = self._enqueue(priority, user_key, estimated_tokens)
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # The slot was handed over just before cancellation
+                    self._release(priority)
+                else:
+                    self._waiting[priority] -= 1
+                raise
+            return
+
+    def _can_admit(self, priority: LLMPriority) -> bool:
+        """Check whether a call of ``priority`` fits in the current limit."""
+        if self._in_flight >= self.limit:
+            return False
+        if priority == LLMPriority.BACKGROUND:
+            return self._background_in_flight < self.background_limit
+        return True
+
+    def _has_waiters_ahead(self, priority: LLMPriority) -> bool:
+        """Check whether queued callers should be served before a new arrival."""
+        foreground_waiting = self._waiting[LLMPriority.INTERACTIVE] + self._waiting[LLMPriority.STANDARD]
+        if priority == LLMPriority.BACKGROUND:
+            return foreground_waiting > 0 or self._waiting[LLMPriority.BACKGROUND] > 0
+        return foreground_waiting > 0
+
+    def _take_slot(self, priority: LLMPriority) -> None:
+        """Account for an admitted call."""
+        self._in_flight += 1
+        if priority == LLMPriority.BACKGROUND:
+            self._background_in_flight += 1
+
+    def _enqueue(self, priority: LLMPriority, user_key: str, estimated_tokens: int) -> _Waiter:
+        """Queue a caller ordered by its weighted fair queuing finish tag."""
+        flow = (priority.value, user_key)
+        start_tag = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        cost = max(1.0, estimated_tokens / 1000.0) / PRIORITY_WEIGHTS[priority]
+        finish_tag = start_tag + cost
+        self._flow_finish[flow] = finish_tag
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, flow, start_tag)
+        queue = self._background_queue if priority == LLMPriority.BACKGROUND else self._queue
+        heapq.heappush(queue, (finish_tag, next(self._sequence), waiter))
+        self._waiting[priority] += 1
+        return waiter
+
+    def _release(self, priority: LLMPriority = LLMPriority.STANDARD) -> None:
+        """Return a slot and hand it to the next waiter."""
+        self._in_flight = max(0, self._in_flight - 1)
+        if priority == LLMPriority.BACKGROUND:
+            self._background_in_flight = max(0, self._background_in_flight - 1)
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to queued callers in fair-queuing order."""
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            if self.waiting and self._wake_handle is None:
+                self._wake_handle = asyncio.get_running_loop().call_later(delay, self._on_unblocked)
+            return
+
+        while self._in_flight < self.limit:
+            waiter = self._pop_waiter(self._queue)
+            if waiter is None and self._can_admit(LLMPriority.BACKGROUND):
+                waiter = self._pop_waiter(self._background_queue)
+            if waiter is None:
+                break
+
+            self._waiting[waiter.priority] -= 1
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._take_slot(waiter.priority)
+            waiter.future.set_result(None)
+
+        if not self.waiting and len(self._flow_finish) > 1024:
+            # Idle flows carry no fairness debt; drop them to bound memory
+            self._flow_finish = {
+                flow: finish for flow, finish in self._flow_finish.items() if finish > self._virtual_time
+            }
+
+    @staticmethod
+    def _pop_waiter(queue: List[Tuple[float, int, _Waiter]]) -> Optional[_Waiter]:
+        """Pop the next live waiter from a queue, skipping cancelled ones."""
+        while queue:
+            _, _, waiter = heapq.heappop(queue)
+            if not waiter.future.done():
+                return waiter
+        return None
+
+    def _on_unblocked(self) -> None:
+        """Timer callback once a provider-imposed pause has elapsed."""
+        self._wake_handle = None
+        self._wake_waiters()
+
+    async def _reserve_budget(self, tokens: int) -> Optional[List[float]]:
+        """Wait until ``tokens`` fit in the rolling budget, then reserve them."""
+        waited = False
+        while True:
+            now = time.monotonic()
+            delay = self._budget_delay(tokens, now)
+            if delay <= 0:
+                break
+            if not waited:
+                self.stats["budget_waits"] += 1
+                waited = True
+            await asyncio.sleep(delay)
+
+        if self.tokens_per_minute <= 0:
+            return None
+
+        entry = [time.monotonic(), float(tokens)]
+        self._token_window.append(entry)
+        return entry
+
+    def _budget_delay(self, tokens: int, now: float) -> float:
+        """Seconds to wait before ``tokens`` can be spent."""
+        delay = 0.0
+
+        if (
+            self._provider_tokens_remaining is not None
+            and now < self._provider_tokens_reset_at
+            and tokens > self._provider_tokens_remaining
+        ):
+            delay = self._provider_tokens_reset_at - now
+
+        if self.tokens_per_minute <= 0:
+            return delay
+
+        self._prune_budget(now)
+        used = sum(entry[1] for entry in self._token_window)
+        if used + tokens <= self.tokens_per_minute or not self._token_window:
+            return delay
+
+        # Find when enough of the window expires to fit this call
+        freed = 0.0
+        for started, spent in self._token_window:
+            freed += spent
+            if used - freed + tokens <= self.tokens_per_minute:
+                return max(delay, started + self.budget_window - now)
+
+        return max(delay, self._token_window[-1][0] + self.budget_window - now)
+
+    def _prune_budget(self, now: float) -> None:
+        """Drop budget entries older than the window."""
+        while self._token_window and self._token_window[0][0] <= now - self.budget_window:
+            self._token_window.popleft()
+
+    def _on_success(
+        self,
+        permit: LimiterPermit,
+        latency: float,
+        headers: Mapping[str, str],
+        output_tokens: Optional[int]
+    ) -> None:
+        """Adjust the limit after a successful call."""
+        self.stats["succeeded"] += 1
+        self._apply_headers(headers)
+
+        # Normalise by output size so long generations are not mistaken for overload
+        sample = latency / max(1, output_tokens) if output_tokens else latency
+
+        if self._baseline_latency is None or sample < self._baseline_latency:
+            self._baseline_latency = sample
+        else:
+            # Let the baseline drift slowly so it tracks provider-wide changes
+            self._baseline_latency += 0.01 * (sample - self._baseline_latency)
+
+        if sample > self._baseline_latency * self.latency_tolerance:
+            self._limit = max(self.min_limit, self._limit * self.latency_backoff_ratio)
+            self.stats["latency_backoffs"] += 1
+        elif permit.concurrency_at_start * 2 >= self.limit:
+            # Only grow when the current limit is actually being used
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+        self._wake_waiters()
+
+    def _on_rate_limited(self, headers: Mapping[str, str]) -> None:
+        """Back off after a rate-limit response."""
+        self.stats["rate_limited"] += 1
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+
+        retry_after = _reset_duration(headers, "retry-after", *REQUEST_RESET_HEADERS, *TOKEN_RESET_HEADERS)
+        if retry_after is None:
+            retry_after = self.default_retry_after
+        self._pause(retry_after)
+        self._apply_headers(headers)
+
+        logger.warning(
+            "LLM provider rate limited; reducing concurrency",
+            extra={"previous_limit": previous, "limit": self.limit, "retry_after": retry_after}
+        )
+
+    def _apply_headers(self, headers: Mapping[str, str]) -> None:
+        """Honour provider rate-limit headers."""
+        if not headers:
+            return
+
+        now = time.monotonic()
+
+        remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        if remaining_requests is None:
+            remaining_requests = _header_int(headers, "anthropic-ratelimit-requests-remaining")
+        if remaining_requests is not None and remaining_requests <= 0:
+            reset = _reset_duration(headers, *REQUEST_RESET_HEADERS)
+            self._pause(reset if reset is not None else self.default_retry_after)
+
+        remaining_tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+        if remaining_tokens is None:
+            remaining_tokens = _header_int(headers, "anthropic-ratelimit-tokens-remaining")
+        if remaining_tokens is not None:
+            reset = _reset_duration(headers, *TOKEN_RESET_HEADERS)
+            self._provider_tokens_remaining = remaining_tokens
+            self._provider_tokens_reset_at = now + (reset if reset is not None else self.default_retry_after)
+
+    def _pause(self, seconds: float) -> None:
+        """Stop admitting new calls for ``seconds``."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+# Global limiter shared by all LLM calls in the process
+llm_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.llm_concurrency_initial,
+    min_limit=settings.llm_concurrency_min,
+    max_limit=settings.llm_concurrency_max,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    latency_tolerance=settings.llm_latency_tolerance,
+    background_share=settings.llm_background_share
+)
@@ -0,0 +1,145 @@
+"""Per-task output-size model used to size ``max_tokens`` for LLM calls."""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src.config.settings import settings
+
+# Starting (tokens, tokens per unit) per task until enough usage is recorded.
+# Units are the request dimension that drives output size for that task.
+DEFAULT_PRIORS: Dict[str, Tuple[float, float]] = {
+    "roadmap": (2800.0, 0.0),  # units: one roadmap (prompt asks for 8-15 nodes)
+    "roadmap_nodes_top_up": (200.0, 300.0),  # units: missing nodes
+    "assessment": (300.0, 250.0),  # units: questions
+    "question_top_up": (200.0, 400.0),  # units: missing questions
+    "evaluation": (400.0, 150.0),  # units: answers graded
+    "batch_grading": (300.0, 200.0),  # units: answers graded
+    "study_plan": (300.0, 250.0),  # units: study days
+    "plan_adjustment": (400.0, 250.0)  # units: remaining days
+}
+
+# Observations needed before the fitted model replaces the prior
+MIN_SAMPLES = 8
+
+# A response that still hit the limit needed at least this much more than it got
+TRUNCATION_INFLATION = 1.5
+
+
+class OutputSizeEstimator:
+    """Predict output tokens from request shape, fitted on recorded usage."""
+
+    def __init__(
+        self,
+        priors: Optional[Dict[str, Tuple[float, float]]] = None,
+        window: int = 200,
+        headroom: float = 1.3,
+        min_tokens: int = 256
+    ):
+        """
+        Initialize the estimator.
+
+        Args:
+            priors: (base tokens, tokens per unit) per task used until fitted
+            window: Recent observations kept per task
+            headroom: Multiplier applied to the prediction to avoid truncation
+            min_tokens: Floor for any returned limit
+        """
+        self.priors = dict(DEFAULT_PRIORS if priors is None else priors)
+        self.window = max(MIN_SAMPLES, window)
+        self.headroom = max(1.0, headroom)
+        self.min_tokens = min_tokens
+        self._observations: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._models: Dict[str, Tuple[float, float]] = {}
+        self.stats = {"observations": 0, "truncated": 0}
+
+    def predict(self, task: str, units: float = 1.0) -> float:
+        """
+        Predict the output tokens a call will need.
+
+        Args:
+            task: Task name, e.g. ``assessment``
+            units: Request size in the task's unit (questions, days, ...)
+
+        Returns:
+            Expected output tokens
+        """
+        base, per_unit = self._models.get(task) or self.priors.get(task, (float(settings.openai_max_tokens), 0.0))
+        return max(0.0, base + per_unit * units)
+
+    def max_tokens(self, task: str, units: float = 1.0, ceiling: Optional[int] = None) -> int:
+        """
+        Return the ``max_tokens`` to request for a call.
+
+        Args:
+            task: Task name
+            units: Request size in the task's unit
+            ceiling: Upper bound (defaults to the configured provider maximum)
+
+        Returns:
+            Predicted tokens plus headroom, clamped to [min_tokens, ceiling]
+        """
+        ceiling = ceiling or settings.openai_max_tokens
+        limit = math.ceil(self.predict(task, units) * self.headroom)
+        return max(min(self.min_tokens, ceiling), min(limit, ceiling))
+
+    def record(self, task: str, units: float, output_tokens: int, truncated: bool = False) -> None:
+        """
+        Record the output size a completed call actually used and refit.
+
+        Args:
+            task: Task name
+            units: Request size in the task's unit
+            output_tokens: Output tokens across the call and any continuations
+            truncated: Whether the output was still cut off by the limit
+        """
+        if output_tokens <= 0:
+            return
+
+        observed = float(output_tokens)
+        if truncated:
+            observed *= TRUNCATION_INFLATION
+            self.stats["truncated"] += 1
+
+        observations = self._observations.setdefault(task, deque(maxlen=self.window))
+        observations.append((float(units), observed))
+        self.stats["observations"] += 1
+
+        if len(observations) >= MIN_SAMPLES:
+            self._models[task] = self._fit(observations)
+
+    @staticmethod
+    def _fit(observations: Deque[Tuple[float, float]]) -> Tuple[float, float]:
+        """Least-squares line through (units, tokens), or the mean ratio if units never vary."""
+        count = len(observations)
+        mean_units = sum(units for units, _ in observations) / count
+        mean_tokens = sum(tokens for _, tokens in observations) / count
+        variance = sum((units - mean_units) ** 2 for units, _ in observations)
+
+        if variance < 1e-9:
+            return (0.0, mean_tokens / mean_units) if mean_units else (mean_tokens, 0.0)
+
+        covariance = sum((units - mean_units) * (tokens - mean_tokens) for units, tokens in observations)
+        per_unit = max(0.0, covariance / variance)
+        return max(0.0, mean_tokens - per_unit * mean_units), per_unit
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current model per task."""
+        tasks = {}
+        for task in sorted(set(self.priors) | set(self._observations)):
+            base, per_unit = self._models.get(task) or self.priors.get(task, (0.0, 0.0))
+            tasks[task] = {
+                "base_tokens": round(base, 1),
+                "tokens_per_unit": round(per_unit, 1),
+                "samples": len(self._observations.get(task, ())),
+                "fitted": task in self._models
+            }
+        return {"headroom": self.headroom, **self.stats, "tasks": tasks}
+
+
+# Global output-size estimator instance
+output_estimator = OutputSizeEstimator(
+    window=settings.llm_output_window,
+    headroom=settings.llm_output_headroom,
+    min_tokens=settings.llm_output_min_tokens
+)
@@ -0,0 +1,315 @@
+"""Pre-generated question bank with background refill."""
+
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from src.models.assessment import GeneratedQuestion
+from src.models.common import KnowledgeNodeInfo
+from src.utils.answer_grader import AnswerGrader
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# (node_id, difficulty, question_type)
+BankKey = Tuple[str, str, str]
+
+# A banked question with the fingerprint computed when it was added
+BankedQuestion = Tuple[str, GeneratedQuestion]
+
+# Banked questions for one node: difficulty -> question_type -> questions
+NodeStock = Dict[str, Dict[str, List[BankedQuestion]]]
+
+# Generates fresh questions for one node at one difficulty
+QuestionGenerator = Callable[[KnowledgeNodeInfo, str], Awaitable[List[GeneratedQuestion]]]
+
+
+class QuestionBank:
+    """Question store indexed by node, difficulty and question type."""
+
+    def __init__(
+        self,
+        generator: QuestionGenerator,
+        target_per_node: int = 10,
+        max_per_node: int = 50,
+        max_users: int = 10000,
+        max_nodes: int = 5000,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the question bank.
+
+        Args:
+            generator: Coroutine producing new questions for a node and difficulty
+            target_per_node: Stock per (node, difficulty) the refill worker maintains
+            max_per_node: Stock per (node, difficulty, type) above which the oldest questions are dropped
+            max_users: Learners whose seen questions are remembered before the least recent is forgotten
+            max_nodes: Nodes kept before the least recently used one and its questions are dropped
+            seed: Optional random seed for reproducible sampling
+        """
+        self.generator = generator
+        self.target_per_node = target_per_node
+        self.max_per_node = max_per_node
+        self.max_nodes = max(1, max_nodes)
+        self._questions: Dict[str, NodeStock] = {}
+        self._fingerprints: Dict[str, GeneratedQuestion] = {}
+        # Node ids come from clients, so nodes are bounded least-recently-used first
+        self._nodes: "OrderedDict[str, Optional[KnowledgeNodeInfo]]" = OrderedDict()
+        self._seen: LRUCache[Set[str]] = LRUCache(max_entries=max_users)  # user_key -> question fingerprints
+        self._refill_queue: Optional[asyncio.Queue] = None
+        self._refill_pending: Set[Tuple[str, str]] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._random = random.Random(seed)
+        self.stats = {"hits": 0, "misses": 0, "refills": 0, "refill_failures": 0}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add_questions(self, questions: List[GeneratedQuestion], nodes: Optional[List[KnowledgeNodeInfo]] = None) -> int:
+        """
+        Add questions to the bank, skipping duplicates.
+
+        Args:
+            questions: Validated questions to store
+            nodes: Nodes the questions were generated for, remembered for refills
+
+        Returns:
+            Number of questions added
+        """
+        for node in nodes or []:
+            self._touch(node.id, node)
+
+        added = 0
+        for question in questions:
+            fingerprint = AnswerGrader.question_fingerprint(question)
+            if fingerprint in self._fingerprints:
+                continue
+
+            node_id, difficulty, question_type = self._key(question)
+            self._touch(node_id)
+            by_type = self._questions.setdefault(node_id, {}).setdefault(difficulty, {})
+            bucket = by_type.setdefault(question_type, [])
+            bucket.append((fingerprint, question))
+            self._fingerprints[fingerprint] = question
+            added += 1
+
+            if len(bucket) > self.max_per_node:
+                evicted_fingerprint, _ = bucket.pop(0)
+                self._fingerprints.pop(evicted_fingerprint, None)
+
+        return added
+
+    def sample(
+        self,
+        nodes: List[KnowledgeNodeInfo],
+        difficulty: str,
+        count: int,
+        user_key: Optional[str] = None,
+        focus_areas: Optional[List[str]] = None,
+        allow_partial: bool = False
+    ) -> Optional[List[GeneratedQuestion]]:
+        """
+        Assemble an assessment from banked questions.
+
+        Questions are spread across nodes round-robin, alternating question
+        types within a node, preferring focus-area matches and skipping
+        anything ``user_key`` has already seen.
+
+        Args:
+            nodes: Nodes to cover
+            difficulty: Difficulty level
+            count: Number of questions required
+            user_key: Key identifying the learner for seen-filtering
+            focus_areas: Topics to prefer
+            allow_partial: Return fewer than ``count`` questions rather than None
+
+        Returns:
+            Questions with fresh ids, or None if the bank cannot supply ``count``
+            (or, with ``allow_partial``, any questions at all)
+        """
+        seen = (self._seen.get(user_key) if user_key else None) or set()
+        focus = [area.casefold() for area in focus_areas or []]
+
+        candidates = [self._candidates(node.id, difficulty, seen, focus) for node in nodes]
+        available = sum(len(node_candidates) for node_candidates in candidates)
+        if available < count:
+            self.stats["misses"] += 1
+            self.request_refill(nodes, difficulty)
+            if not allow_partial or not available:
+                return None
+            count = available
+
+        selected: List[BankedQuestion] = []
+        while len(selected) < count:
+            for node_candidates in candidates:
+                if node_candidates and len(selected) < count:
+                    selected.append(node_candidates.pop(0))
+
+        if user_key:
+            self._remember_seen(user_key, (fingerprint for fingerprint, _ in selected))
+
+        self.stats["hits"] += 1
+        self.request_refill(nodes, difficulty)
+
+        return [
+            question.model_copy(update={"id": f"q_{uuid4().hex[:8]}"})
+            for _, question in selected
+        ]
+
+    def mark_seen(self, user_key: str, questions: List[GeneratedQuestion]) -> None:
+        """Record questions a learner has been given."""
+        self._remember_seen(user_key, (AnswerGrader.question_fingerprint(question) for question in questions))
+
+    def _remember_seen(self, user_key: str, fingerprints: Iterable[str]) -> None:
+        """Add fingerprints to a learner's seen set, marking the learner recently used."""
+        seen = self._seen.get(user_key)
+        if seen is None:
+            seen = set()
+        seen.update(fingerprints)
+        self._seen.set(user_key, seen)
+
+    def stock(self, node_id: str, difficulty: str) -> int:
+        """Return the number of banked questions for a node and difficulty."""
+        return sum(len(questions) for questions in self._by_type(node_id, difficulty).values())
+
+    def request_refill(self, nodes: List[KnowledgeNodeInfo], difficulty: str) -> None:
+        """Queue background generation for nodes whose stock is below target."""
+        for node in nodes:
+            self._touch(node.id, node)
+            refill_key = (node.id, difficulty)
+
+            if self._refill_queue is None or refill_key in self._refill_pending:
+                continue
+            if self.stock(node.id, difficulty) >= self.target_per_node:
+                continue
+
+            self._refill_pending.add(refill_key)
+            self._refill_queue.put_nowait(refill_key)
+
+    def start(self) -> None:
+        """Start the background refill worker."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._refill_queue = asyncio.Queue()
+        self._refill_pending.clear()
+        self._worker = asyncio.create_task(self._refill_loop())
+        logger.info("Question bank refill worker started")
+
+    async def stop(self) -> None:
+        """Stop the background refill worker."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._refill_queue = None
+        logger.info("Question bank refill worker stopped")
+
+    def clear(self) -> int:
+        """Remove all banked questions and seen history, returning the question count."""
+        count = len(self._fingerprints)
+        self._questions.clear()
+        self._fingerprints.clear()
+        self._seen.clear()
+        return count
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return bank size and usage statistics."""
+        return {
+            "questions": len(self._fingerprints),
+            "nodes": len(self._questions),
+            "pending_refills": len(self._refill_pending),
+            **self.stats
+        }
+
+    async def _refill_loop(self) -> None:
+        """Generate questions for queued (node, difficulty) pairs until cancelled."""
+        while True:
+            node_id, difficulty = await self._refill_queue.get()
+            try:
+                node = self._nodes.get(node_id)
+                if node is None or self.stock(node_id, difficulty) >= self.target_per_node:
+                    continue
+
+                questions = await self.generator(node, difficulty)
+                added = self.add_questions(questions)
+                self.stats["refills"] += 1
+                logger.info(
+                    "Question bank refilled",
+                    extra={"node_id": node_id, "difficulty": difficulty, "added": added}
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["refill_failures"] += 1
+                logger.warning(
+                    "Question bank refill failed",
+                    extra={"node_id": node_id, "difficulty": difficulty, "error": str(e)}
+                )
+            finally:
+                self._refill_pending.discard((node_id, difficulty))
+
+    def _candidates(
+        self,
+        node_id: str,
+        difficulty: str,
+        seen: Set[str],
+        focus: List[str]
+    ) -> List[BankedQuestion]:
+        """Unseen questions for a node, interleaved by type with focus matches first."""
+        by_type = []
+        for questions in self._by_type(node_id, difficulty).values():
+            unseen = [banked for banked in questions if banked[0] not in seen]
+            self._random.shuffle(unseen)
+            if unseen:
+                by_type.append(unseen)
+
+        interleaved = []
+        while by_type:
+            for questions in list(by_type):
+                interleaved.append(questions.pop(0))
+                if not questions:
+                    by_type.remove(questions)
+
+        if focus:
+            # Stable sort keeps the type interleaving within each group
+            interleaved.sort(key=lambda banked: not self._matches_focus(banked[1], focus))
+        return interleaved
+
+    def _by_type(self, node_id: str, difficulty: str) -> Dict[str, List[BankedQuestion]]:
+        """Banked questions for a node and difficulty, by question type."""
+        return self._questions.get(node_id, {}).get(difficulty, {})
+
+    def _touch(self, node_id: str, node: Optional[KnowledgeNodeInfo] = None) -> None:
+        """Mark a node recently used, dropping the least recent nodes and their questions when full."""
+        if node is not None:
+            self._nodes[node_id] = node
+        elif node_id not in self._nodes:
+            self._nodes[node_id] = None
+        self._nodes.move_to_end(node_id)
+
+        while len(self._nodes) > self.max_nodes:
+            evicted_id, _ = self._nodes.popitem(last=False)
+            for by_type in self._questions.pop(evicted_id, {}).values():
+                for questions in by_type.values():
+                    for fingerprint, _ in questions:
+                        self._fingerprints.pop(fingerprint, None)
+
+    @staticmethod
+    def _matches_focus(question: GeneratedQuestion, focus: List[str]) -> bool:
+        """Check whether a question touches any focus area."""
+        text = " ".join([question.question, *question.keywords]).casefold()
+        return any(area in text for area in focus)
+
+    @staticmethod
+    def _key(question: GeneratedQuestion) -> BankKey:
+        """Index key for a question."""
+        difficulty = getattr(question.difficulty, "value", question.difficulty)
+        question_type = getattr(question.question_type, "value", question.question_type)
+        return question.node_id, difficulty, question_type
@@ -0,0 +1,191 @@
+"""Token usage and cost accounting by route, operation, model and user."""
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.utils.cache import LRUCache
+from src.utils.metrics import metrics
+from src.utils.request_context import current_request
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens as (input, cached input, output), matched by longest model-name prefix
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "gpt-4-1106": (10.00, 10.00, 30.00),
+    "gpt-4-0125": (10.00, 10.00, 30.00),
+    "gpt-4": (30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "claude-3-opus": (15.00, 1.50, 75.00),
+    "claude-3-5-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-haiku": (0.25, 0.03, 1.25),
+}
+
+# Attribution used when neither the call nor the request names a user
+UNATTRIBUTED = "unattributed"
+
+
+@dataclass
+class TokenUsage:
+    """Token counts of one or more LLM calls; cached and reasoning tokens are subsets."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0  # Input tokens served from the provider's prompt cache
+    reasoning_tokens: int = 0  # Output tokens spent on hidden reasoning
+    calls: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, other: "TokenUsage") -> None:
+        """Accumulate another usage record into this one."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_tokens += other.cached_tokens
+        self.reasoning_tokens += other.reasoning_tokens
+        self.calls += other.calls
+        self.cost_usd += other.cost_usd
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the usage with cost rounded for display."""
+        data = asdict(self)
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+class UsageTracker:
+    """Aggregate LLM token usage and cost in memory."""
+
+    def __init__(self, prices: Mapping[str, Sequence[float]], max_users: int = 10000):
+        """
+        Initialize the tracker.
+
+        Args:
+            prices: USD per million tokens as (input, cached input, output) by model-name prefix
+            max_users: Users tracked before the least recently active are dropped
+        """
+        self.prices = {model: tuple(price) for model, price in prices.items()}
+        self._prefixes = sorted(self.prices, key=len, reverse=True)
+        self.totals = TokenUsage()
+        self.by_route: Dict[str, TokenUsage] = {}
+        self.by_operation: Dict[str, TokenUsage] = {}
+        self.by_model: Dict[str, TokenUsage] = {}
+        self.by_user: LRUCache[TokenUsage] = LRUCache(max_entries=max_users)
+        self.unpriced_models: Set[str] = set()
+
+    def cost(self, model: str, usage: TokenUsage) -> float:
+        """
+        Price a usage record.
+
+        Args:
+            model: Model name as sent to the provider
+            usage: Token counts
+
+        Returns:
+            Cost in USD, or 0.0 for models without a known price
+        """
+        price = next((self.prices[prefix] for prefix in self._prefixes if model.startswith(prefix)), None)
+        if price is None:
+            if model not in self.unpriced_models:
+                self.unpriced_models.add(model)
+                logger.warning("No token price configured for model", extra={"model": model})
+            return 0.0
+
+        input_price, cached_price, output_price = price
+        uncached = max(0, usage.input_tokens - usage.cached_tokens)
+        return (uncached * input_price + usage.cached_tokens * cached_price + usage.output_tokens * output_price) / 1e6
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        operation: str,
+        usage: TokenUsage,
+        user_key: Optional[str] = None
+    ) -> TokenUsage:
+        """
+        Record one provider call against the current request.
+
+        Args:
+            provider: LLM provider
+            model: Model name
+            operation: Service operation, e.g. ``assessment`` or ``batch_grading``
+            usage: Token counts of the call (cost is filled in)
+            user_key: User the call was made for, if known
+
+        Returns:
+            The usage with ``calls`` and ``cost_usd`` set
+        """
+        usage.calls = 1
+        usage.cost_usd = self.cost(model, usage)
+
+        context = current_request()
+        route = context.route if context else "background"
+        user = user_key or (context.user_key if context else None) or UNATTRIBUTED
+
+        self.totals.add(usage)
+        self.by_route.setdefault(route, TokenUsage()).add(usage)
+        self.by_operation.setdefault(operation, TokenUsage()).add(usage)
+        self.by_model.setdefault(f"{provider}:{model}", TokenUsage()).add(usage)
+        user_usage = self.by_user.get(user)
+        if user_usage is None:
+            user_usage = TokenUsage()
+            self.by_user.set(user, user_usage)
+        user_usage.add(usage)
+
+        if context is not None:
+            for name, value in asdict(usage).items():
+                context.usage[name] = context.usage.get(name, 0) + value
+
+        metrics.count_llm_usage(provider, model, route, operation, usage)
+        return usage
+
+    def summary(self, top_users: int = 20) -> Dict[str, Any]:
+        """
+        Summarize usage since start-up.
+
+        Args:
+            top_users: Number of highest-cost users to include
+
+        Returns:
+            Totals plus breakdowns by route, operation, model and top users
+        """
+        users: List[Tuple[str, TokenUsage]] = sorted(
+            self.by_user.items(),
+            key=lambda item: item[1].cost_usd,
+            reverse=True
+        )
+        return {
+            "totals": self.totals.to_dict(),
+            "by_route": self._breakdown(self.by_route),
+            "by_operation": self._breakdown(self.by_operation),
+            "by_model": self._breakdown(self.by_model),
+            "top_users": {key: usage.to_dict() for key, usage in users[:top_users]},
+            "tracked_users": len(self.by_user),
+            "unpriced_models": sorted(self.unpriced_models)
+        }
+
+    def reset(self) -> None:
+        """Forget all recorded usage."""
+        self.totals = TokenUsage()
+        self.by_route.clear()
+        self.by_operation.clear()
+        self.by_model.clear()
+        self.by_user.clear()
+
+    @staticmethod
+    def _breakdown(groups: Dict[str, TokenUsage]) -> Dict[str, Dict[str, Any]]:
+        """Order a breakdown by cost, most expensive first."""
+        ordered = sorted(groups.items(), key=lambda item: item[1].cost_usd, reverse=True)
+        return {key: usage.to_dict() for key, usage in ordered}
+
+
+# Global usage tracker instance
+usage_tracker = UsageTracker(
+    prices={**MODEL_PRICES, **settings.llm_prices},
+    max_users=settings.usage_max_users
+)
@@ -0,0 +1,354 @@
+"""Local grading utilities for objective assessment questions."""
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.models.assessment import GeneratedQuestion, NodeScore, QuestionScore, QuestionType
+
+# Question types that can be scored without the LLM
+LOCALLY_GRADED_TYPES = {
+    QuestionType.MULTIPLE_CHOICE,
+    QuestionType.TRUE_FALSE,
+    QuestionType.SHORT_ANSWER,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_OPTION_LETTER = re.compile(r"^\(?([a-z])[\).:]?$")
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+_TRUE_VALUES = {"true", "t", "yes", "y", "1", "correct", "right"}
+_FALSE_VALUES = {"false", "f", "no", "n", "0", "incorrect", "wrong"}
+
+# Share of weighted keywords a short answer must cover to count as correct
+SHORT_ANSWER_PASS_RATIO = 0.6
+
+
+class AnswerGrader:
+    """Utility class for scoring objective and short answers locally."""
+
+    @staticmethod
+    def normalize_answer(answer: Optional[str]) -> str:
+        """
+        Normalize an answer for comparison.
+
+        Collapses whitespace, case-folds and strips surrounding punctuation.
+
+        Args:
+            answer: Raw answer text
+
+        Returns:
+            Normalized answer
+        """
+        if not answer:
+            return ""
+        text = _WHITESPACE.sub(" ", answer).strip().casefold()
+        return text.strip(" .!?;,'\"`")
+
+    @staticmethod
+    def resolve_option(question: GeneratedQuestion, answer: Optional[str]) -> str:
+        """
+        Normalize a multiple-choice answer, mapping option letters to option text.
+
+        Args:
+            question: The multiple-choice question
+            answer: Raw answer, e.g. ``"B"``, ``"(b)"`` or the option text
+
+        Returns:
+            Normalized option text
+        """
+        normalized = AnswerGrader.normalize_answer(answer)
+        match = _OPTION_LETTER.match(normalized)
+        if match and question.options:
+            index = ord(match.group(1)) - ord("a")
+            if 0 <= index < len(question.options):
+                return AnswerGrader.normalize_answer(question.options[index])
+        return normalized
+
+    @staticmethod
+    def question_fingerprint(question: GeneratedQuestion) -> str:
+        """
+        Hash the gradable content of a question, ignoring its id.
+
+        Identical questions in different assessments share a fingerprint.
+
+        Args:
+            question: The question to fingerprint
+
+        Returns:
+            Hex digest of the question content
+        """
+        content = json.dumps([
+            question.question.strip(),
+            str(question.question_type),
+            question.options or [],
+            question.correct_answer,
+            sorted(question.keywords),
+            question.points
+        ], sort_keys=True)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def answer_key(question: GeneratedQuestion, answer: Optional[str]) -> str:
+        """
+        Normalize an answer into a cache key component.
+
+        Option letters resolve to option text and true/false synonyms collapse.
+
+        Args:
+            question: The question being answered
+            answer: The user's answer
+
+        Returns:
+            Normalized answer key
+        """
+        if question.question_type == QuestionType.MULTIPLE_CHOICE:
+            return AnswerGrader.resolve_option(question, answer)
+        if question.question_type == QuestionType.TRUE_FALSE:
+            parsed = AnswerGrader._parse_boolean(answer)
+            if parsed is not None:
+                return str(parsed).lower()
+        return AnswerGrader.normalize_answer(answer)
+
+    @staticmethod
+    def can_grade_locally(question: GeneratedQuestion, answer: Optional[str]) -> bool:
+        """
+        Check whether a question/answer pair can be scored without the LLM.
+
+        Args:
+            question: The question being answered
+            answer: The user's answer (None if unanswered)
+
+        Returns:
+            True if the pair can be graded locally
+        """
+        if not AnswerGrader.normalize_answer(answer):
+            return True  # Unanswered questions score zero regardless of type
+
+        if question.question_type not in LOCALLY_GRADED_TYPES:
+            return False
+
+        if question.question_type == QuestionType.SHORT_ANSWER:
+            return bool(question.correct_answer or question.keywords)
+
+        return bool(question.correct_answer)
+
+    @staticmethod
+    def grade(
+        question: GeneratedQuestion,
+        answer: Optional[str],
+        keyword_weights: Optional[Dict[str, float]] = None,
+        partial_credit: bool = True
+    ) -> QuestionScore:
+        """
+        Score a single answer locally.
+
+        Args:
+            question: The question being answered
+            answer: The user's answer (None if unanswered)
+            keyword_weights: Keyword importance weights from the evaluation criteria
+            partial_credit: Whether short answers may earn partial credit
+
+        Returns:
+            Question score with feedback
+        """
+        if not AnswerGrader.normalize_answer(answer):
+            return QuestionScore(
+                question_id=question.id,
+                score=0,
+                max_score=question.points,
+                feedback="No answer provided.",
+                is_correct=False
+            )
+
+        if question.question_type == QuestionType.MULTIPLE_CHOICE:
+            is_correct = (
+                AnswerGrader.resolve_option(question, answer)
+                == AnswerGrader.resolve_option(question, question.correct_answer)
+            )
+            return AnswerGrader._binary_score(question, is_correct)
+
+        if question.question_type == QuestionType.TRUE_FALSE:
+            is_correct = (
+                AnswerGrader._parse_boolean(answer) is not None
+                and AnswerGrader._parse_boolean(answer) == AnswerGrader._parse_boolean(question.correct_answer)
+            )
+            return AnswerGrader._binary_score(question, is_correct)
+
+        return AnswerGrader._grade_short_answer(question, answer, keyword_weights or {}, partial_credit)
+
+    @staticmethod
+    def build_node_scores(
+        questions: List[GeneratedQuestion],
+        question_scores: List[QuestionScore],
+        node_feedback: Optional[Dict[str, NodeScore]] = None
+    ) -> List[NodeScore]:
+        """
+        Aggregate question scores into per-node scores.
+
+        Args:
+            questions: Assessment questions
+            question_scores: Scores for those questions
+            node_feedback: Optional LLM node scores whose feedback text is reused
+
+        Returns:
+            Node scores in question order
+        """
+        node_feedback = node_feedback or {}
+        scores_by_question = {score.question_id: score for score in question_scores}
+        earned: Dict[str, float] = defaultdict(float)
+        possible: Dict[str, int] = defaultdict(int)
+        missed_keywords: Dict[str, List[str]] = defaultdict(list)
+
+        for question in questions:
+            score = scores_by_question.get(question.id)
+            if score is None:
+                continue
+            earned[question.node_id] += score.score
+            possible[question.node_id] += score.max_score
+            if not score.is_correct:
+                for keyword in question.keywords:
+                    if keyword not in missed_keywords[question.node_id]:
+                        missed_keywords[question.node_id].append(keyword)
+
+        node_scores = []
+        for node_id in possible:
+            percentage = int(round(100 * earned[node_id] / possible[node_id])) if possible[node_id] else 0
+            llm_score = node_feedback.get(node_id)
+            areas = list(llm_score.areas_to_improve) if llm_score else []
+            areas += [keyword for keyword in missed_keywords[node_id] if keyword not in areas]
+
+            node_scores.append(NodeScore(
+                node_id=node_id,
+                score=min(100, max(0, percentage)),
+                feedback=llm_score.feedback if llm_score else AnswerGrader._node_feedback(percentage),
+                recommended_action="continue" if percentage >= 80 else "review",
+                areas_to_improve=areas[:5]
+            ))
+
+        return node_scores
+
+    @staticmethod
+    def overall_feedback(total_score: float, max_score: int, node_scores: List[NodeScore]) -> str:
+        """Summarize performance when no LLM feedback is available."""
+        percentage = 100 * total_score / max_score if max_score else 0
+        feedback = f"You scored {total_score:g} out of {max_score} ({percentage:.0f}%)."
+
+        if node_scores:
+            strongest = max(node_scores, key=lambda node: node.score)
+            weakest = min(node_scores, key=lambda node: node.score)
+            if weakest.score < 80 and weakest.node_id != strongest.node_id:
+                feedback += f" Strongest area: {strongest.node_id}. Focus next on {weakest.node_id}."
+            elif weakest.score < 80:
+                feedback += f" Review {weakest.node_id} before moving on."
+            else:
+                feedback += " Solid understanding across all assessed topics."
+
+        return feedback
+
+    @staticmethod
+    def study_recommendations(node_scores: List[NodeScore]) -> List[str]:
+        """Generate recommendations for nodes that need review."""
+        recommendations = []
+        for node in node_scores:
+            if node.recommended_action != "review":
+                continue
+            if node.areas_to_improve:
+                recommendations.append(f"Review {node.node_id}, focusing on: {', '.join(node.areas_to_improve)}")
+            else:
+                recommendations.append(f"Review {node.node_id} before moving on")
+        return recommendations
+
+    @staticmethod
+    def _binary_score(question: GeneratedQuestion, is_correct: bool) -> QuestionScore:
+        """Build an all-or-nothing score."""
+        if is_correct:
+            feedback = "Correct."
+        else:
+            feedback = f"Incorrect. The correct answer is: {question.correct_answer}."
+            if question.explanation:
+                feedback += f" {question.explanation}"
+
+        return QuestionScore(
+            question_id=question.id,
+            score=question.points if is_correct else 0,
+            max_score=question.points,
+            feedback=feedback,
+            is_correct=is_correct
+        )
+
+    @staticmethod
+    def _parse_boolean(answer: Optional[str]) -> Optional[bool]:
+        """Interpret a true/false answer."""
+        normalized = AnswerGrader.normalize_answer(answer)
+        if normalized in _TRUE_VALUES:
+            return True
+        if normalized in _FALSE_VALUES:
+            return False
+        return None
+
+    @staticmethod
+    def _grade_short_answer(
+        question: GeneratedQuestion,
+        answer: str,
+        keyword_weights: Dict[str, float],
+        partial_credit: bool
+    ) -> QuestionScore:
+        """Score a short answer by exact match or weighted keyword coverage."""
+        normalized = AnswerGrader.normalize_answer(answer)
+
+        if question.correct_answer and normalized == AnswerGrader.normalize_answer(question.correct_answer):
+            return AnswerGrader._binary_score(question, True)
+
+        answer_tokens = set(_TOKEN.findall(normalized))
+        keywords = question.keywords or _TOKEN.findall(AnswerGrader.normalize_answer(question.correct_answer))
+
+        total_weight = 0.0
+        matched_weight = 0.0
+        missed = []
+        for keyword in keywords:
+            weight = keyword_weights.get(keyword, 1.0)
+            total_weight += weight
+            keyword_tokens = _TOKEN.findall(keyword.casefold())
+            if keyword_tokens and all(token in answer_tokens for token in keyword_tokens):
+                matched_weight += weight
+            else:
+                missed.append(keyword)
+
+        coverage = matched_weight / total_weight if total_weight else 0.0
+        is_correct = coverage >= SHORT_ANSWER_PASS_RATIO
+
+        if partial_credit:
+            score = round(question.points * coverage, 1)
+        else:
+            score = question.points if is_correct else 0
+
+        if not missed:
+            feedback = "Correct - all key concepts covered."
+        elif is_correct:
+            feedback = f"Mostly correct. Consider also mentioning: {', '.join(missed)}."
+        else:
+            feedback = f"Missing key concepts: {', '.join(missed)}."
+            if question.correct_answer:
+                feedback += f" Expected answer: {question.correct_answer}."
+
+        return QuestionScore(
+            question_id=question.id,
+            score=score,
+            max_score=question.points,
+            feedback=feedback,
+            is_correct=is_correct
+        )
+
+    @staticmethod
+    def _node_feedback(percentage: float) -> str:
+        """Describe node mastery from a percentage score."""
+        if percentage >= 90:
+            return "Excellent understanding of this topic."
+        if percentage >= 80:
+            return "Good understanding of this topic."
+        if percentage >= 50:
+            return "Partial understanding; some concepts need review."
+        return "This topic needs more study before moving on."
@@ -0,0 +1,82 @@
+"""In-memory LRU cache with TTL and hit/miss statistics."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Bounded least-recently-used cache with optional per-entry expiry."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the oldest
+            ttl_seconds: Entry lifetime in seconds (None or 0 disables expiry)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds or None
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value for ``key`` and mark it recently used."""
+        entry = self._lookup(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def items(self) -> List[Tuple[Hashable, V]]:
+        """Return live (key, value) pairs, oldest first, without touching recency or stats."""
+        now = time.monotonic()
+        return [(key, entry[1]) for key, entry in self._entries.items() if entry[0] > now]
+
+    def clear(self) -> int:
+        """Remove all entries and return how many were removed."""
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return size and hit-rate statistics."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, V]]:
+        """Return the live entry for ``key``, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
@@ -0,0 +1,149 @@
+"""Per-request deadlines propagated through context variables."""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the current request has used up its time budget."""
+
+
+class Deadline:
+    """Absolute point in time by which a request must finish."""
+
+    def __init__(self, seconds: float):
+        """
+        Start a deadline.
+
+        Args:
+            seconds: Time budget from now
+        """
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return time.monotonic() >= self.expires_at
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the current request, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run the enclosed block under a deadline.
+
+    A nested scope never extends an enclosing deadline; ``None`` or a
+    non-positive budget leaves the current deadline unchanged.
+
+    Args:
+        seconds: Time budget for the block
+
+    Yields:
+        The deadline in effect
+    """
+    outer = _current.get()
+    deadline = outer
+    if seconds and seconds > 0:
+        candidate = Deadline(seconds)
+        if outer is None or candidate.expires_at < outer.expires_at:
+            deadline = candidate
+
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left for the current request, or None without a deadline."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def check_deadline(stage: str = "request") -> None:
+    """
+    Raise if the current request is out of time.
+
+    Args:
+        stage: What was about to run, for the error message
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    deadline = _current.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"Deadline of {deadline.budget:g}s exceeded before {stage}")
+
+
+async def within_deadline(awaitable: Awaitable[T], reserve: float = 0.0, stage: str = "request") -> T:
+    """
+    Await ``awaitable``, cancelling it when the current deadline arrives.
+
+    Args:
+        awaitable: Coroutine or future to await
+        reserve: Seconds kept back so the caller can still build a fallback
+        stage: What is running, for the error message
+
+    Returns:
+        The awaitable's result
+
+    Raises:
+        DeadlineExceeded: If the deadline (minus ``reserve``) passes first
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return await awaitable
+
+    timeout = deadline.remaining() - reserve
+    if timeout <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(f"Deadline of {deadline.budget:g}s exceeded before {stage}")
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Deadline of {deadline.budget:g}s exceeded during {stage}") from None
+
+
+async def sleep_within_deadline(delay: float, stage: str = "retry") -> None:
+    """
+    Sleep for ``delay`` seconds unless that would overrun the deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline would pass during the sleep
+    """
+    remaining = remaining_time()
+    if remaining is not None and delay >= remaining:
+        raise DeadlineExceeded(f"Not enough time left for {stage} backoff")
+    await asyncio.sleep(delay)
+
+
+def detached_context() -> contextvars.Context:
+    """
+    Return a copy of the current context without a deadline.
+
+    Used for work that outlives or is shared across requests, such as
+    cross-request batches, so one caller's deadline does not cancel it.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return context
@@ -328,7 +328,8 @@ class GraphAnalyzer:
         # Sort by difficulty and estimated hours to create a balanced sequence
         def sort_key(node_id: str) -> Tuple[int, float]:
             node = node_lookup[node_id]
-            difficulty_weight = {"easy": 1, "medium": 2, "hard": 3}.get(node.difficulty, 2)
+            # Study plan requests pass KnowledgeNodeInfo, which has no difficulty
+            difficulty_weight = {"easy": 1, "medium": 2, "hard": 3}.get(getattr(node, "difficulty", None), 2)
             return (difficulty_weight, node.estimated_hours)
 
         available_nodes.sort(key=sort_key)
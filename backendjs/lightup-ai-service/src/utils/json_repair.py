@@ -0,0 +1,236 @@
+"""Tolerant parsing of malformed or truncated JSON from LLM completions."""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+# Upper bound on truncation points tried when closing a cut-off document
+MAX_TRUNCATION_ATTEMPTS = 64
+
+
+class JSONRepair:
+    """Utility class for recovering JSON the model almost got right."""
+
+    @staticmethod
+    def parse(text: str) -> Tuple[Any, List[str]]:
+        """
+        Parse JSON, repairing common LLM output problems if needed.
+
+        Handles markdown fences, surrounding prose, trailing commas, comments,
+        Python literals, raw newlines inside strings and truncated output.
+
+        Args:
+            text: Raw completion text
+
+        Returns:
+            Tuple of (parsed value, list of repairs applied)
+
+        Raises:
+            ValueError: If the text cannot be recovered
+        """
+        try:
+            return json.loads(text), []
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+        if not text or not text.strip():
+            raise ValueError("Empty completion")
+
+        repairs: List[str] = []
+        candidate = JSONRepair._strip_wrapping(text, repairs)
+
+        cleaned, stack, in_string, cut_points = JSONRepair._clean(candidate, repairs)
+        try:
+            if not stack and not in_string:
+                return json.loads(cleaned), repairs
+        except json.JSONDecodeError:
+            pass
+
+        # Truncated output: back off to the last complete element or member and close the brackets.
+        # The text after it may be a cut-off string, number or key, so it is never completed.
+        if stack or in_string:
+            repairs.append("closed_truncated")
+            for cut in reversed(cut_points[-MAX_TRUNCATION_ATTEMPTS:]):
+                prefix, prefix_stack, _, _ = JSONRepair._clean(cleaned[:cut], [])
+                closed = JSONRepair._close(prefix, prefix_stack)
+                if closed is not None:
+                    if cleaned[cut:].strip():
+                        repairs.append("dropped_partial_element")
+                    return closed, repairs
+
+        raise ValueError(f"Unrecoverable JSON after repairs: {', '.join(repairs) or 'none'}")
+
+    @staticmethod
+    def _strip_wrapping(text: str, repairs: List[str]) -> str:
+        """Remove markdown fences and prose around the JSON document."""
+        fenced = _FENCE.search(text)
+        if fenced and "```" in text:
+            text = fenced.group(1)
+            repairs.append("stripped_fence")
+
+        starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+        if not starts:
+            raise ValueError("No JSON object or array found")
+
+        start = min(starts)
+        if text[:start].strip():
+            repairs.append("stripped_prefix")
+        text = text[start:]
+
+        end = JSONRepair._document_end(text)
+        if end is not None and text[end:].strip():
+            repairs.append("stripped_suffix")
+            text = text[:end]
+
+        return text
+
+    @staticmethod
+    def _document_end(text: str) -> Optional[int]:
+        """Return the index just past the first complete top-level value, if any."""
+        depth = 0
+        in_string = False
+        escaped = False
+
+        for index, char in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+
+        return None
+
+    @staticmethod
+    def _clean(text: str, repairs: List[str]) -> Tuple[str, List[str], bool, List[int]]:
+        """
+        Fix syntax slips in a single pass.
+
+        Truncation points are output offsets where the text so far ends on a
+        complete element or member: after a closing bracket or a string value,
+        before a comma, and before an opening bracket (dropping that element).
+
+        Returns:
+            Tuple of (cleaned text, open bracket stack, whether a string is open,
+            output offsets usable as truncation points)
+        """
+        out: List[str] = []
+        size = 0  # Characters in out; chunks such as literals and escapes are longer than one
+        stack: List[str] = []
+        cut_points: List[int] = []
+        in_string = False
+        value_string = False  # Whether the open string is a value rather than an object key
+        escaped = False
+        index = 0
+        length = len(text)
+
+        def note(repair: str) -> None:
+            if repair not in repairs:
+                repairs.append(repair)
+
+        while index < length:
+            char = text[index]
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if value_string:
+                        out.append(char)
+                        size += 1
+                        cut_points.append(size)
+                        index += 1
+                        continue
+                elif char in "\n\r\t":
+                    out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[char])
+                    size += 2
+                    note("escaped_control_chars")
+                    index += 1
+                    continue
+                out.append(char)
+                size += 1
+                index += 1
+                continue
+
+            if char == '"':
+                in_string = True
+                previous = next((chunk for chunk in reversed(out) if not chunk.isspace()), "")
+                value_string = (bool(stack) and stack[-1] == "]") or previous == ":"
+            elif char in "{[":
+                cut_points.append(size)
+                stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                # Drop a trailing comma before the closer
+                while out and out[-1].isspace():
+                    size -= len(out.pop())
+                if out and out[-1] == ",":
+                    size -= len(out.pop())
+                    note("removed_trailing_comma")
+                if stack:
+                    stack.pop()
+                out.append(char)
+                size += 1
+                cut_points.append(size)
+                index += 1
+                continue
+            elif char == ",":
+                cut_points.append(size)
+            elif char == "/" and text.startswith("//", index):
+                newline = text.find("\n", index)
+                index = length if newline < 0 else newline
+                note("removed_comments")
+                continue
+            elif char == "/" and text.startswith("/*", index):
+                close = text.find("*/", index + 2)
+                index = length if close < 0 else close + 2
+                note("removed_comments")
+                continue
+            elif char.isalpha():
+                word_end = index
+                while word_end < length and text[word_end].isalpha():
+                    word_end += 1
+                word = _LITERALS.get(text[index:word_end])
+                if word is not None:
+                    note("converted_literals")
+                else:
+                    word = text[index:word_end]
+                out.append(word)
+                size += len(word)
+                index = word_end
+                continue
+
+            out.append(char)
+            size += 1
+            index += 1
+
+        return "".join(out), stack, in_string, cut_points
+
+    @staticmethod
+    def _close(text: str, stack: List[str]) -> Optional[Any]:
+        """Close the open brackets after a truncation point, returning the parsed value or None."""
+        text = text.rstrip()
+        # A dangling separator is dropped; a dangling key cannot be completed
+        if text.endswith(","):
+            text = text[:-1]
+        elif text.endswith(":"):
+            return None
+
+        try:
+            return json.loads(text + "".join(reversed(stack)))
+        except json.JSONDecodeError:
+            return None
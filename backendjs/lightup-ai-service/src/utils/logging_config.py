@@ -1,10 +1,48 @@
 """Logging configuration for the AI service."""
 
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from src.config.settings import settings
+from src.utils.request_context import current_request
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED_RECORD_KEYS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+# Listener draining the log queue on a background thread, if queueing is enabled
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _encode_json(data: Dict[str, Any]) -> str:
+    """Serialize a log entry, falling back to ``str`` for unknown types."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag every record with the request and trace it was logged for."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = current_request()
+        if not hasattr(record, "request_id"):
+            record.request_id = context.request_id if context else "-"
+        if context is not None and not hasattr(record, "trace_id"):
+            record.trace_id = context.trace_id
+        return True
 
 
 class JSONFormatter(logging.Formatter):
@@ -21,32 +59,53 @@ class JSONFormatter(logging.Formatter):
 
         # Add extra fields from the record
         for key, value in record.__dict__.items():
-            if key not in ["name", "msg", "args", "levelname", "levelno", "pathname",
-                          "filename", "module", "lineno", "funcName", "created",
-                          "msecs", "relativeCreated", "thread", "threadName",
-                          "processName", "process", "getMessage", "exc_info",
-                          "exc_text", "stack_info"]:
+            if key not in _RESERVED_RECORD_KEYS:
                 log_data[key] = value
 
-        # Add exception info if present
+        # Add exception info if present (already rendered if the record was queued)
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
 
         # Add file info for development
         if settings.is_development:
             log_data["file"] = f"{record.filename}:{record.lineno}"
             log_data["function"] = record.funcName
 
-        return str(log_data).replace("'", '"')
+        return _encode_json(log_data)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records for a background listener while keeping ``extra`` fields intact."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Make a record safe to format on another thread.
+
+        Unlike the stock handler this does not pre-format the whole line, so
+        the listener's formatter still sees the message, extra fields and
+        exception separately. Message arguments and tracebacks are rendered now.
+        """
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
 
 
 def setup_logging() -> None:
     """Set up logging configuration."""
+    global _listener
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, settings.log_level.upper()))
 
     # Remove existing handlers
+    shutdown_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
@@ -59,12 +118,23 @@ def setup_logging() -> None:
         formatter = JSONFormatter()
     else:
         formatter = logging.Formatter(
-            fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            fmt="%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
 
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+
+    if settings.log_queue_enabled:
+        # Format and write on a listener thread, off the event loop; the context
+        # filter stays on the calling thread, where the request context is visible
+        queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(RequestContextFilter())
+        root_logger.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(queue_handler.queue, console_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        console_handler.addFilter(RequestContextFilter())
+        root_logger.addHandler(console_handler)
 
     # Configure specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -73,4 +143,13 @@ def setup_logging() -> None:
 
     # Log startup message
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured for {settings.environment} environment")
\ No newline at end of file
+    logger.info(f"Logging configured for {settings.environment} environment")
+
+
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
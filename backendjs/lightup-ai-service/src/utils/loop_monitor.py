@@ -0,0 +1,134 @@
+"""Event loop lag monitoring and detection of callbacks that block the loop."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+from src.utils.metrics import ServiceMetrics, metrics
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept when logging the stack of a blocking callback
+STACK_LIMIT = 40
+
+
+class LoopMonitor:
+    """
+    Measure event loop scheduling lag and report callbacks that block the loop.
+
+    A probe task on the loop sleeps for ``interval`` and records how late it
+    wakes up. Each wake-up also refreshes a heartbeat; a watchdog thread that
+    sees the heartbeat go stale for longer than ``block_threshold`` captures the
+    loop thread's current stack, i.e. the code that is holding the loop, and
+    logs it once per stall.
+    """
+
+    def __init__(self, metrics: ServiceMetrics, interval: float = 0.5, block_threshold: float = 0.25):
+        """
+        Initialize the monitor.
+
+        Args:
+            metrics: Metrics the lag samples and stalls are recorded in
+            interval: Seconds between lag samples (0 disables the monitor)
+            block_threshold: Stall in seconds after which the blocking stack is logged (0 disables)
+        """
+        self.metrics = metrics
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self.stats: Dict[str, Any] = {"samples": 0, "last_lag": 0.0, "max_lag": 0.0, "blocks": 0}
+
+    @property
+    def running(self) -> bool:
+        """Whether the probe is sampling."""
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start sampling on the running loop and, if enabled, the watchdog thread."""
+        if self._task is not None or self.interval <= 0:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._probe())
+
+        if self.block_threshold > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling and the watchdog thread."""
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return monitor statistics."""
+        return {
+            **self.stats,
+            "running": self.running,
+            "interval": self.interval,
+            "block_threshold": self.block_threshold
+        }
+
+    async def _probe(self) -> None:
+        while True:
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - scheduled)
+            self._heartbeat = now
+
+            self.stats["samples"] += 1
+            self.stats["last_lag"] = round(lag, 4)
+            self.stats["max_lag"] = max(self.stats["max_lag"], round(lag, 4))
+            self.metrics.observe_loop_lag(lag)
+
+    def _watch(self) -> None:
+        """Watchdog thread: log the loop's stack when the probe stops waking up."""
+        check_every = min(self.interval, self.block_threshold) / 2
+        reported_heartbeat = None
+
+        while not self._stopping.wait(check_every):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.block_threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # Report each stall once, while the blocking code is still on the stack
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+
+            self.stats["blocks"] += 1
+            self.metrics.count_loop_block()
+            # JSON logs carry the stack as a field; plain-text logs need it in the message
+            message = f"Event loop blocked for {stalled:.3f}s (still running)"
+            if not settings.is_production:
+                message += f"\n{stack}"
+            logger.warning(message, extra={"blocked_seconds": round(stalled, 3), "stack": stack})
+
+
+# Global event loop monitor, started with the application
+loop_monitor = LoopMonitor(
+    metrics,
+    interval=settings.loop_monitor_interval if settings.loop_monitor_enabled else 0,
+    block_threshold=settings.loop_block_threshold
+)
@@ -0,0 +1,200 @@
+"""Prometheus metrics for requests, LLM calls, caches and the event loop."""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 180)
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class _StatsCollector:
+    """Read cache statistics and gauges from live objects at scrape time."""
+
+    def __init__(self):
+        self.caches: Dict[str, Any] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def collect(self) -> Iterator[Any]:
+        entries = GaugeMetricFamily("ai_cache_entries", "Entries held by a cache", labels=["cache"])
+        events = CounterMetricFamily("ai_cache_events", "Cache lookups and evictions", labels=["cache", "event"])
+        for name, cache in self.caches.items():
+            entries.add_metric([name], len(cache))
+            stats = getattr(cache, "stats", None)
+            if isinstance(stats, dict):
+                for event in ("hits", "misses", "evictions"):
+                    if event in stats:
+                        events.add_metric([name, event], stats[event])
+        yield entries
+        yield events
+
+        for name, (description, read) in self.gauges.items():
+            gauge = GaugeMetricFamily(name, description)
+            try:
+                gauge.add_metric([], float(read()))
+            except Exception as e:
+                logger.debug(f"Metric {name} unavailable: {e}")
+                continue
+            yield gauge
+
+
+class ServiceMetrics:
+    """Service metrics on a dedicated registry; every call is a no-op without prometheus-client."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the metrics.
+
+        Args:
+            enabled: Record metrics (ignored when prometheus-client is not installed)
+        """
+        self.enabled = enabled and PROMETHEUS_AVAILABLE
+        if enabled and not PROMETHEUS_AVAILABLE:
+            logger.warning("Metrics not available - prometheus-client package not installed")
+        if not self.enabled:
+            return
+
+        self.registry = CollectorRegistry()
+        self.request_duration = Histogram(
+            "ai_http_request_duration_seconds", "HTTP request latency",
+            ["method", "route", "status"], buckets=REQUEST_BUCKETS, registry=self.registry
+        )
+        self.llm_duration = Histogram(
+            "ai_llm_call_duration_seconds", "Latency of a single provider call, including limiter wait",
+            ["provider", "model", "outcome"], buckets=LLM_LATENCY_BUCKETS, registry=self.registry
+        )
+        self.llm_tokens = Histogram(
+            "ai_llm_tokens", "Tokens per provider call",
+            ["provider", "model", "direction"], buckets=TOKEN_BUCKETS, registry=self.registry
+        )
+        self.llm_retries = Histogram(
+            "ai_llm_retries", "Re-requests per generation, by what triggered them",
+            ["provider", "model", "reason"], buckets=RETRY_BUCKETS, registry=self.registry
+        )
+        self.llm_usage_tokens = Counter(
+            "ai_llm_usage_tokens", "Tokens billed, by route and service operation",
+            ["provider", "model", "route", "operation", "kind"], registry=self.registry
+        )
+        self.llm_cost = Counter(
+            "ai_llm_cost_usd", "Estimated LLM spend in USD, by route and service operation",
+            ["provider", "model", "route", "operation"], registry=self.registry
+        )
+        self.json_parse_failures = Counter(
+            "ai_llm_json_parse_failures", "Completions that were not valid JSON as returned",
+            ["outcome"], registry=self.registry
+        )
+        self.loop_lag = Histogram(
+            "ai_event_loop_lag_seconds", "Delay of event loop callbacks beyond their scheduled time",
+            buckets=LOOP_LAG_BUCKETS, registry=self.registry
+        )
+        self.loop_lag_last = Gauge(
+            "ai_event_loop_lag_last_seconds", "Most recent event loop lag sample", registry=self.registry
+        )
+        self.loop_blocks = Counter(
+            "ai_event_loop_blocks", "Stalls in which a callback held the event loop past the block threshold",
+            registry=self.registry
+        )
+        self._stats = _StatsCollector()
+        self.registry.register(self._stats)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        """Record an HTTP request."""
+        if self.enabled:
+            self.request_duration.labels(method, route, str(status)).observe(seconds)
+
+    def observe_llm_call(
+        self,
+        provider: str,
+        model: str,
+        outcome: str,
+        seconds: float,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None
+    ) -> None:
+        """Record a single provider call and its token usage."""
+        if not self.enabled:
+            return
+        self.llm_duration.labels(provider, model, outcome).observe(seconds)
+        if input_tokens is not None:
+            self.llm_tokens.labels(provider, model, "input").observe(input_tokens)
+        if output_tokens is not None:
+            self.llm_tokens.labels(provider, model, "output").observe(output_tokens)
+
+    def count_llm_usage(self, provider: str, model: str, route: str, operation: str, usage: Any) -> None:
+        """Count the tokens and cost of a provider call (``usage`` is a ``TokenUsage``)."""
+        if not self.enabled:
+            return
+        for kind in ("input", "output", "cached", "reasoning"):
+            tokens = getattr(usage, f"{kind}_tokens")
+            if tokens:
+                self.llm_usage_tokens.labels(provider, model, route, operation, kind).inc(tokens)
+        if usage.cost_usd:
+            self.llm_cost.labels(provider, model, route, operation).inc(usage.cost_usd)
+
+    def observe_llm_retries(self, provider: str, model: str, reason: str, retries: int) -> None:
+        """Record how many re-requests a generation needed (``reason``: ``error`` or ``invalid_json``)."""
+        if self.enabled:
+            self.llm_retries.labels(provider, model, reason).observe(retries)
+
+    def count_json_parse_failure(self, outcome: str) -> None:
+        """Count a malformed JSON completion (``repaired`` or ``failed``)."""
+        if self.enabled:
+            self.json_parse_failures.labels(outcome).inc()
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        """Record an event loop lag sample."""
+        if self.enabled:
+            self.loop_lag.observe(seconds)
+            self.loop_lag_last.set(seconds)
+
+    def count_loop_block(self) -> None:
+        """Count a callback that blocked the event loop."""
+        if self.enabled:
+            self.loop_blocks.inc()
+
+    def register_cache(self, name: str, cache: Any) -> None:
+        """
+        Expose a cache's size and, if it keeps ``stats``, its hits, misses and evictions.
+
+        Args:
+            name: Cache label value
+            cache: Any sized object, e.g. an ``LRUCache`` or dict
+        """
+        if self.enabled:
+            self._stats.caches[name] = cache
+
+    def register_gauge(self, name: str, description: str, read: Callable[[], float]) -> None:
+        """Expose a value read at scrape time."""
+        if self.enabled:
+            self._stats.gauges[name] = (description, read)
+
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            Tuple of (body, content type)
+
+        Raises:
+            RuntimeError: If metrics are disabled or prometheus-client is missing
+        """
+        if not self.enabled:
+            raise RuntimeError("Metrics are not enabled")
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+# Global metrics instance
+metrics = ServiceMetrics(enabled=settings.metrics_enabled)
@@ -0,0 +1,440 @@
+"""On-demand request profiling, allocation tracing and cache size estimates."""
+
+import asyncio
+import cProfile
+import dataclasses
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Request header (or query parameter) asking for a profiled request, and its modes
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_MODES = ("cprofile", "sample")
+
+# Response header naming the stored profile
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Request header carrying the admin token for profiling and debug endpoints
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+# File suffix per profile mode
+_PROFILE_SUFFIXES = {"cprofile": ".pstats", "sample": ".speedscope.json", "tracemalloc": ".tracemalloc"}
+
+# Allocations made by tracemalloc and the import system are left out of reports
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+# Characters allowed in stored profile file names
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """
+    Check a caller-supplied admin token.
+
+    Args:
+        token: Value of the admin token header
+
+    Returns:
+        True if an admin token is configured and the given one matches
+    """
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+class SamplingProfiler:
+    """Sample the stack of one thread at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            thread_id: Thread whose stack is sampled, normally the event loop's
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self._frames: Dict[Tuple[str, str, int], int] = {}
+        self._samples: List[List[int]] = []
+        self._weights: List[float] = []
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stopped_at = time.perf_counter()
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        """
+        Export the samples in the speedscope file format.
+
+        Args:
+            name: Profile name shown in speedscope
+
+        Returns:
+            Speedscope document with one sampled, wall-clock profile
+        """
+        frames = [None] * len(self._frames)
+        for (function, filename, line), index in self._frames.items():
+            frames[index] = {"name": function, "file": filename, "line": line}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "lightup-ai-service",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(self._stopped_at - self._started_at, 6),
+                "samples": self._samples,
+                "weights": self._weights
+            }]
+        }
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                index = self._frames.get(key)
+                if index is None:
+                    index = self._frames[key] = len(self._frames)
+                stack.append(index)
+                frame = frame.f_back
+            stack.reverse()
+
+            self._samples.append(stack)
+            self._weights.append(round(now - last, 6))
+            last = now
+
+
+@dataclasses.dataclass
+class ProfileRun:
+    """A profiled request; ``profile_id`` is set once the profile is stored."""
+
+    mode: str
+    label: str
+    profile_id: Optional[str] = None
+    skipped_reason: Optional[str] = None
+
+
+class RequestProfiler:
+    """
+    Profile individual requests and keep the results in a local directory.
+
+    Both profilers observe the whole event loop thread, so concurrent requests
+    show up in a profile as well. Only one request is profiled at a time.
+    """
+
+    def __init__(self, output_dir: str, sample_interval: float = 0.005, max_files: int = 50):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory profiles and tracemalloc snapshots are written to
+            sample_interval: Seconds between samples in ``sample`` mode
+            max_files: Stored files kept before the oldest are deleted
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.max_files = max_files
+        self._active = False
+        self.stats = {"profiled": 0, "skipped": 0, "write_errors": 0}
+
+    @property
+    def busy(self) -> bool:
+        """Whether a request is being profiled."""
+        return self._active
+
+    @asynccontextmanager
+    async def profile(self, mode: str, label: str) -> AsyncIterator[ProfileRun]:
+        """
+        Profile the enclosed block and store the result.
+
+        Args:
+            mode: ``cprofile`` (deterministic, pstats output) or ``sample`` (speedscope output)
+            label: Request id or other label included in the profile id
+
+        Yields:
+            The run; its ``profile_id`` is set on exit unless profiling was skipped
+        """
+        run = ProfileRun(mode=mode, label=label)
+        if self._active:
+            run.skipped_reason = "busy"
+            self.stats["skipped"] += 1
+            yield run
+            return
+
+        self._active = True
+        started = time.perf_counter()
+        profiler: Any
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), self.sample_interval)
+            profiler.start()
+
+        try:
+            yield run
+        finally:
+            if mode == "cprofile":
+                profiler.disable()
+            else:
+                await asyncio.to_thread(profiler.stop)
+            self._active = False
+
+            run.profile_id = self._new_id(f"{label}-{mode}", mode)
+            try:
+                await asyncio.to_thread(self._write, profiler, run)
+                self.stats["profiled"] += 1
+                logger.info(
+                    "Request profiled",
+                    extra={"profile_id": run.profile_id, "duration": f"{time.perf_counter() - started:.4f}s"}
+                )
+            except OSError as e:
+                self.stats["write_errors"] += 1
+                logger.warning(f"Failed to write profile {run.profile_id}: {e}")
+                run.profile_id = None
+
+    def save_snapshot(self, snapshot: "tracemalloc.Snapshot") -> str:
+        """
+        Write a tracemalloc snapshot (blocking).
+
+        Args:
+            snapshot: Snapshot to write
+
+        Returns:
+            Id of the stored snapshot, loadable with ``tracemalloc.Snapshot.load``
+        """
+        snapshot_id = self._new_id("memory", "tracemalloc")
+        os.makedirs(self.output_dir, exist_ok=True)
+        snapshot.dump(os.path.join(self.output_dir, snapshot_id))
+        self._prune()
+        return snapshot_id
+
+    def list_files(self) -> List[Dict[str, Any]]:
+        """List stored profiles and snapshots, newest first."""
+        if not os.path.isdir(self.output_dir):
+            return []
+        files = []
+        for entry in os.scandir(self.output_dir):
+            if entry.is_file() and entry.name.endswith(tuple(_PROFILE_SUFFIXES.values())):
+                info = entry.stat()
+                files.append({"id": entry.name, "bytes": info.st_size, "created_at": info.st_mtime})
+        return sorted(files, key=lambda item: item["created_at"], reverse=True)
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        """
+        Resolve a stored profile id to its file.
+
+        Args:
+            profile_id: Id as returned in ``X-Profile-Id``
+
+        Returns:
+            File path, or None if the id is malformed or unknown
+        """
+        if _UNSAFE_NAME_CHARS.search(profile_id) or profile_id.startswith("."):
+            return None
+        path = os.path.join(self.output_dir, profile_id)
+        return path if os.path.isfile(path) else None
+
+    def _new_id(self, label: str, mode: str) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return _UNSAFE_NAME_CHARS.sub("_", f"{stamp}-{label}") + _PROFILE_SUFFIXES[mode]
+
+    def _write(self, profiler: Any, run: ProfileRun) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, run.profile_id)
+        if run.mode == "cprofile":
+            profiler.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as profile_file:
+                json.dump(profiler.to_speedscope(run.label), profile_file)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest stored files beyond ``max_files``."""
+        for stale in self.list_files()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.output_dir, stale["id"]))
+            except OSError:
+                pass
+
+
+def top_allocations(
+    limit: int = 20,
+    group_by: str = "lineno",
+    baseline: Optional["tracemalloc.Snapshot"] = None
+) -> List[Dict[str, Any]]:
+    """
+    List the largest live allocations traced by tracemalloc (blocking).
+
+    Args:
+        limit: Number of entries to return
+        group_by: ``lineno``, ``filename`` or ``traceback``
+        baseline: Earlier snapshot to report growth against
+
+    Returns:
+        Allocation sites with size and block count (and their growth if a baseline is given)
+
+    Raises:
+        RuntimeError: If tracemalloc is not tracing
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    results = []
+    if baseline is not None:
+        for stat in snapshot.compare_to(baseline.filter_traces(_TRACE_FILTERS), group_by)[:limit]:
+            results.append({
+                "location": _format_trace(stat.traceback, group_by),
+                "size_kb": round(stat.size / 1024, 1),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            })
+    else:
+        for stat in snapshot.statistics(group_by)[:limit]:
+            results.append({
+                "location": _format_trace(stat.traceback, group_by),
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count
+            })
+    return results
+
+
+def _format_trace(trace: "tracemalloc.Traceback", group_by: str) -> str:
+    if group_by == "filename":
+        return trace[0].filename
+    if group_by == "traceback":
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in trace)
+    return f"{trace[0].filename}:{trace[0].lineno}"
+
+
+def approximate_size(obj: Any, sample: int = 200) -> int:
+    """
+    Estimate the memory held by an object and everything it contains.
+
+    Containers are followed, as are attributes of the object itself, Pydantic
+    models and dataclasses; other objects count only their own size. Large
+    containers are measured on a sample of ``sample`` items and extrapolated.
+    Objects reachable twice are counted once.
+
+    Args:
+        obj: Cache or other object to measure
+        sample: Items measured per container before extrapolating
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set()
+
+    def measure(value: Any, depth: int, follow_attributes: bool = False) -> int:
+        if id(value) in seen or depth > 32:
+            return 0
+        seen.add(id(value))
+        size = sys.getsizeof(value, 0)
+
+        if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+            return size
+        if isinstance(value, dict):
+            return size + _measure_items([part for pair in list(value.items()) for part in pair], depth)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return size + _measure_items(list(value), depth)
+        if hasattr(value, "items") and hasattr(value, "__len__") and not isinstance(value, BaseModel):
+            try:
+                # Mapping-like caches such as LRUCache
+                return size + _measure_items(list(value.items()), depth)
+            except TypeError:
+                pass
+        if callable(value) or isinstance(value, type):
+            return size
+
+        is_record = isinstance(value, BaseModel) or dataclasses.is_dataclass(value)
+        if (follow_attributes or is_record) and hasattr(value, "__dict__"):
+            return size + measure(vars(value), depth + 1)
+        return size
+
+    def _measure_items(items: List[Any], depth: int) -> int:
+        if not items:
+            return 0
+        measured = items if len(items) <= sample else items[:sample]
+        total = sum(measure(item, depth + 1) for item in measured)
+        return int(total * len(items) / len(measured))
+
+    try:
+        return measure(obj, 0, follow_attributes=True)
+    except RuntimeError:
+        # A container changed size while it was being read; a retry usually succeeds
+        seen.clear()
+        return measure(obj, 0, follow_attributes=True)
+
+
+def cache_memory_report(caches: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Report the entry count and approximate size of each cache.
+
+    Args:
+        caches: Caches by name
+
+    Returns:
+        ``entries`` and ``approx_bytes`` per cache name
+    """
+    report = {}
+    for name, cache in caches.items():
+        report[name] = {
+            "entries": len(cache) if hasattr(cache, "__len__") else None,
+            "approx_bytes": approximate_size(cache)
+        }
+    return report
+
+
+# Global request profiler, used when PROFILING_ENABLED and ADMIN_TOKEN are set
+request_profiler = RequestProfiler(
+    settings.profile_output_dir,
+    sample_interval=settings.profile_sample_interval,
+    max_files=settings.profile_max_files
+)
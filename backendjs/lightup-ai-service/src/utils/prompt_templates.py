@@ -1,8 +1,34 @@
 """Prompt templates for various AI tasks."""
 
+import json
 from typing import Dict, List, Any
 from src.models.common import KnowledgeNodeInfo, NodeProgress
 
+# Item fields a missing-field follow-up needs to refer back to the existing response
+OUTLINE_KEYS = (
+    "id", "node_id", "question_id", "item_id", "title", "question_type", "difficulty",
+    "day", "date", "score", "max_score"
+)
+
+# Longest string value and most array items repeated in a missing-field follow-up
+OUTLINE_MAX_STRING = 200
+OUTLINE_MAX_ITEMS = 50
+
+
+def _outline(value: Any) -> Any:
+    """Shrink a parsed response to the identifying values a follow-up needs, keeping it valid JSON."""
+    if isinstance(value, dict):
+        kept = {key: value[key] for key in OUTLINE_KEYS if key in value}
+        return {key: _outline(item) for key, item in kept.items()}
+    if isinstance(value, list):
+        items = [_outline(item) for item in value[:OUTLINE_MAX_ITEMS]]
+        if len(value) > OUTLINE_MAX_ITEMS:
+            items.append(f"... {len(value) - OUTLINE_MAX_ITEMS} more")
+        return items
+    if isinstance(value, str) and len(value) > OUTLINE_MAX_STRING:
+        return value[:OUTLINE_MAX_STRING] + "..."
+    return value
+
 
 class PromptTemplates:
     """Collection of prompt templates for AI tasks."""
@@ -82,12 +108,11 @@ Generate diverse, challenging questions that accurately assess understanding of
     ) -> str:
         """Generate prompt for assessment evaluation."""
 
+        answers_by_question = {ans['question_id']: ans for ans in user_answers}
+
         qa_pairs = []
         for question in questions:
-            user_answer = next(
-                (ans for ans in user_answers if ans['question_id'] == question['id']),
-                None
-            )
+            user_answer = answers_by_question.get(question['id'])
 
             qa_pairs.append(f"""
 Question ID: {question['id']}
@@ -144,6 +169,184 @@ RESPONSE FORMAT (JSON):
 Provide constructive feedback that helps the student improve their understanding.
 """
 
+    @staticmethod
+    def batch_grading_prompt(items: List[Dict[str, Any]]) -> str:
+        """Generate prompt for grading independent answers in one request."""
+
+        item_text = "\n".join([
+            f"""
+Item ID: {item['item_id']}
+Question: {item['question']}
+Type: {item['question_type']}
+Reference Answer: {item.get('correct_answer') or 'N/A'}
+Key Concepts: {', '.join(item.get('keywords', []))}
+Points: {item['points']}
+Student Answer: {item['answer']}
+"""
+            for item in items
+        ])
+
+        return f"""
+You are an intelligent learning assistant. Grade each student answer below independently.
+The items come from different students; do not compare answers with each other.
+
+ITEMS:
+{item_text}
+
+GRADING REQUIREMENTS:
+1. Score each answer from 0 up to its points value (partial credit allowed)
+2. Provide specific, constructive feedback addressed to the student
+3. Mark the answer correct if it demonstrates understanding of the key concepts
+4. Return exactly one result per item ID
+
+RESPONSE FORMAT (JSON):
+{{
+    "results": [
+        {{
+            "item_id": "item_id",
+            "score": 8.5,
+            "feedback": "Detailed feedback on the answer",
+            "is_correct": true
+        }}
+    ]
+}}
+"""
+
+    @staticmethod
+    def question_top_up_prompt(
+        nodes: List[KnowledgeNodeInfo],
+        existing_questions: List[str],
+        difficulty_level: str,
+        missing_count: int
+    ) -> str:
+        """Generate prompt for the questions missing from a partially valid assessment."""
+
+        node_info = "\n".join([
+            f"- {node.id}: {node.title} - {node.description}"
+            for node in nodes
+        ])
+        existing_text = "\n".join([f"- {question}" for question in existing_questions]) or "- None"
+
+        return f"""
+You are a professional educational assessment expert. An assessment is missing {missing_count} question(s).
+
+KNOWLEDGE NODES (use only these node_id values):
+{node_info}
+
+QUESTIONS ALREADY INCLUDED (do not repeat them):
+{existing_text}
+
+Generate exactly {missing_count} additional {difficulty_level} question(s) in the same format as before,
+favouring nodes that have the fewest questions so far.
+
+RESPONSE FORMAT (JSON):
+{{
+    "questions": [
+        {{
+            "id": "unique_question_id",
+            "node_id": "node_id",
+            "question": "Question text",
+            "question_type": "multiple_choice|short_answer|true_false|coding|essay",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": "Correct answer",
+            "points": 10,
+            "difficulty": "{difficulty_level}",
+            "explanation": "Why this is the correct answer",
+            "keywords": ["key", "concepts"]
+        }}
+    ]
+}}
+"""
+
+    @staticmethod
+    def roadmap_nodes_top_up_prompt(
+        course_title: str,
+        existing_nodes: List[Dict[str, Any]],
+        missing_node_ids: List[str]
+    ) -> str:
+        """Generate prompt for roadmap nodes that are referenced but missing."""
+
+        existing_text = "\n".join([
+            f"- {node['id']}: {node['title']} (prerequisites: {', '.join(node['prerequisites']) or 'none'})"
+            for node in existing_nodes
+        ])
+
+        return f"""
+You are an expert curriculum designer. A roadmap for "{course_title}" references nodes that were not defined.
+
+EXISTING NODES:
+{existing_text}
+
+MISSING NODE IDS:
+{', '.join(missing_node_ids)}
+
+Define exactly one node for each missing node ID, keeping the ID unchanged. Prerequisites may only
+reference existing or missing node IDs listed above.
+
+RESPONSE FORMAT (JSON):
+{{
+    "nodes": [
+        {{
+            "id": "missing_node_id",
+            "title": "Node Title",
+            "description": "Detailed description of what will be learned",
+            "prerequisites": ["prerequisite_node_id"],
+            "estimated_hours": 8.0,
+            "difficulty": "easy|medium|hard",
+            "resources": ["recommended_resource_1"]
+        }}
+    ]
+}}
+"""
+
+    @staticmethod
+    def missing_fields_prompt(
+        original_prompt: str,
+        partial_response: Dict[str, Any],
+        missing_fields: List[str],
+        schema: Dict[str, Any]
+    ) -> str:
+        """
+        Generate a small follow-up asking only for scalar fields omitted from an otherwise valid JSON response.
+
+        Only the original instruction line and an outline of the response are
+        sent, not the original data, so callers must not use this for arrays
+        or objects that need it.
+        """
+
+        field_schemas = {
+            field: schema.get("properties", {}).get(field, {})
+            for field in missing_fields
+        }
+        task = next((line.strip() for line in original_prompt.splitlines() if line.strip()), "")
+        # Top-level scalars are kept whole; arrays and objects shrink to the ids and titles they refer to
+        existing = {
+            field: _outline(value) if isinstance(value, (dict, list)) else value
+            for field, value in partial_response.items()
+        }
+
+        return f"""
+A previous JSON response to this task was valid but omitted these fields: {', '.join(missing_fields)}.
+Task: {task}
+
+EXISTING RESPONSE (identifying fields only):
+{json.dumps(existing, default=str)}
+
+MISSING FIELD SCHEMAS:
+{json.dumps(field_schemas)}
+
+Respond with a JSON object containing ONLY the missing fields, consistent with the existing response.
+"""
+
+    @staticmethod
+    def continuation_prompt() -> str:
+        """Generate the follow-up message for a response cut off by the token limit."""
+
+        return (
+            "Your previous response was cut off by the length limit. Continue exactly from the last "
+            "character, without repeating anything, restarting the document or adding commentary."
+        )
+
     @staticmethod
     def study_plan_generation_prompt(
         course_info: Dict[str, Any],
@@ -0,0 +1,73 @@
+"""Per-request context shared with code running on behalf of the request."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional
+from uuid import uuid4
+
+
+def new_trace_id() -> str:
+    """Return a random 128-bit W3C trace id."""
+    return uuid4().hex
+
+
+def new_span_id() -> str:
+    """Return a random 64-bit W3C span id."""
+    return uuid4().hex[:16]
+
+
+@dataclass
+class RequestContext:
+    """What a unit of work is being done for: an HTTP request or a background job."""
+
+    request_id: str
+    scope: Optional[MutableMapping[str, Any]] = None  # ASGI scope, read once routing has matched
+    name: Optional[str] = None  # Explicit route name for work outside HTTP, e.g. ``job:roadmap``
+    user_key: Optional[str] = None
+    client: Optional[str] = None  # Caller identity used for rate limits and idempotency keys
+    usage: Dict[str, float] = field(default_factory=dict)  # Token and cost totals for this request
+    spans: List[Any] = field(default_factory=list)  # Timed stages (``src.utils.timing.Span``)
+    trace_id: str = field(default_factory=new_trace_id)
+    span_id: str = field(default_factory=new_span_id)  # Root span of this request
+    parent_span_id: Optional[str] = None  # Caller's span from an incoming ``traceparent``
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def route(self) -> str:
+        """Route template the work is attributed to."""
+        if self.name:
+            return self.name
+        if self.scope is not None:
+            route = self.scope.get("route")
+            if route is not None:
+                return getattr(route, "path", "unmatched")
+            return "unmatched"
+        return "unknown"
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def current_request() -> Optional[RequestContext]:
+    """Return the context of the request being served, if any."""
+    return _current.get()
+
+
+@contextmanager
+def request_scope(context: RequestContext) -> Iterator[RequestContext]:
+    """
+    Make ``context`` current for the enclosed block and tasks it starts.
+
+    Args:
+        context: Request or job context
+
+    Yields:
+        The same context
+    """
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
@@ -0,0 +1,217 @@
+"""Compiled validation for the JSON-schema subset used in LLM prompts."""
+
+import copy
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (value, path, errors, prune) -> value with invalid array items removed when pruning
+_Check = Callable[[Any, str, List[str], bool], Any]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool))
+        or (isinstance(value, float) and value.is_integer())
+    ),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+_compiled_cache: Dict[str, "CompiledSchema"] = {}
+
+
+class CompiledSchema:
+    """A schema compiled once into nested validator closures."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Compile a schema.
+
+        Supports ``type`` (including type lists), ``required``, ``properties``,
+        ``additionalProperties: false``, ``items``, ``enum``, ``minItems``,
+        ``maxItems``, ``minimum`` and ``maximum``.
+
+        Args:
+            schema: JSON schema dict
+        """
+        self.schema = schema
+        self._check = _compile(schema)
+        self.strict_schema = _to_strict(schema)
+
+    def validate(self, data: Any) -> List[str]:
+        """Return validation errors (empty if valid)."""
+        errors: List[str] = []
+        self._check(data, "$", errors, False)
+        return errors
+
+    def prune(self, data: Any) -> Tuple[Any, int, List[str]]:
+        """
+        Drop invalid items from arrays and validate what remains.
+
+        Array items are independent units (questions, nodes, scores), so one
+        bad item should not invalidate the whole response.
+
+        Args:
+            data: Parsed JSON
+
+        Returns:
+            Tuple of (pruned data, number of items dropped, remaining errors)
+        """
+        errors: List[str] = []
+        pruned = self._check(data, "$", errors, True)
+        dropped = sum(1 for error in errors if error.startswith("dropped "))
+        return pruned, dropped, [error for error in errors if not error.startswith("dropped ")]
+
+    def strip_optional_nulls(self, data: Any) -> Any:
+        """Remove nulls a strict-mode response used for optional properties."""
+        return _strip_nulls(data, self.schema)
+
+    @property
+    def strict_compatible(self) -> bool:
+        """Whether the schema can be sent in OpenAI strict mode."""
+        return self.strict_schema is not None
+
+
+def compile_schema(schema: Dict[str, Any]) -> CompiledSchema:
+    """
+    Return the compiled form of ``schema``, compiling it on first use.
+
+    Args:
+        schema: JSON schema dict
+
+    Returns:
+        Cached compiled schema
+    """
+    key = json.dumps(schema, sort_keys=True)
+    compiled = _compiled_cache.get(key)
+    if compiled is None:
+        compiled = CompiledSchema(schema)
+        _compiled_cache[key] = compiled
+    return compiled
+
+
+def _compile(schema: Dict[str, Any]) -> _Check:
+    """Build a validator closure for one schema node."""
+    types = schema.get("type")
+    type_names = [types] if isinstance(types, str) else list(types or [])
+    type_checks = [_TYPE_CHECKS[name] for name in type_names if name in _TYPE_CHECKS]
+    enum = schema.get("enum")
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    required = schema.get("required", [])
+    properties = {name: _compile(sub) for name, sub in schema.get("properties", {}).items()}
+    closed = schema.get("additionalProperties") is False
+    item_check = _compile(schema["items"]) if isinstance(schema.get("items"), dict) else None
+
+    def check(value: Any, path: str, errors: List[str], prune: bool) -> Any:
+        if type_checks and not any(type_check(value) for type_check in type_checks):
+            errors.append(f"{path}: expected {'/'.join(type_names)}, got {type(value).__name__}")
+            return value
+
+        if enum is not None and value not in enum:
+            errors.append(f"{path}: {value!r} not in {enum}")
+
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if minimum is not None and value < minimum:
+                errors.append(f"{path}: {value} below minimum {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path}: {value} above maximum {maximum}")
+
+        if isinstance(value, dict):
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required field '{name}'")
+            for name, property_check in properties.items():
+                if name in value:
+                    value[name] = property_check(value[name], f"{path}.{name}", errors, prune)
+            if closed:
+                for name in value:
+                    if name not in properties:
+                        errors.append(f"{path}: unexpected field '{name}'")
+
+        elif isinstance(value, list):
+            if item_check is not None:
+                kept = []
+                for index, item in enumerate(value):
+                    item_errors: List[str] = []
+                    item = item_check(item, f"{path}[{index}]", item_errors, prune)
+                    item_failures = [error for error in item_errors if not error.startswith("dropped ")]
+                    if item_failures and prune:
+                        errors.append(f"dropped {path}[{index}]: {item_failures[0]}")
+                        continue
+                    errors.extend(item_errors)
+                    kept.append(item)
+                value = kept
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: expected at most {max_items} items")
+
+        return value
+
+    return check
+
+
+def _to_strict(schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a schema to OpenAI strict-mode form, or None if it cannot be.
+
+    Strict mode needs every object to list its properties (all required,
+    no additional properties) and every array to declare its items. Optional
+    properties become nullable.
+    """
+    strict = copy.deepcopy(schema)
+
+    def convert(node: Dict[str, Any]) -> bool:
+        types = node.get("type")
+        type_names = [types] if isinstance(types, str) else list(types or [])
+
+        if "object" in type_names:
+            properties = node.get("properties")
+            if not properties:
+                return False
+            required = set(node.get("required", []))
+            for name, sub in properties.items():
+                if not convert(sub):
+                    return False
+                if name not in required:
+                    sub_types = sub.get("type")
+                    sub["type"] = ([sub_types] if isinstance(sub_types, str) else list(sub_types or [])) + ["null"]
+                    if "enum" in sub:
+                        sub["enum"] = list(sub["enum"]) + [None]
+            node["required"] = list(properties)
+            node["additionalProperties"] = False
+
+        if "array" in type_names:
+            items = node.get("items")
+            if not isinstance(items, dict) or not convert(items):
+                return False
+            # Size constraints are not supported in strict mode
+            node.pop("minItems", None)
+            node.pop("maxItems", None)
+
+        node.pop("minimum", None)
+        node.pop("maximum", None)
+        return bool(type_names)
+
+    return strict if convert(strict) else None
+
+
+def _strip_nulls(data: Any, schema: Dict[str, Any]) -> Any:
+    """Remove null values for optional properties, recursively."""
+    if isinstance(data, dict):
+        required = set(schema.get("required", []))
+        properties = schema.get("properties", {})
+        for name in list(data):
+            if data[name] is None and name not in required:
+                del data[name]
+            elif name in properties:
+                data[name] = _strip_nulls(data[name], properties[name])
+    elif isinstance(data, list) and isinstance(schema.get("items"), dict):
+        return [_strip_nulls(item, schema["items"]) for item in data]
+    return data
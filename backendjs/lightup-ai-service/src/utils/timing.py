@@ -0,0 +1,111 @@
+"""Lightweight stage timing for generation pipelines."""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.request_context import RequestContext, current_request
+
+
+@dataclass
+class Span:
+    """A timed stage of the work done for a request."""
+
+    name: str
+    start: float  # time.perf_counter() value
+    duration: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the enclosed block as a stage of the current request.
+
+    Outside a request (tests, scripts) nothing is recorded.
+
+    Args:
+        name: Stage name, dotted by component, e.g. ``study_plan.sequence``
+        **attributes: Extra details kept with the span
+
+    Yields:
+        The span being recorded, or None outside a request
+    """
+    context = current_request()
+    if context is None:
+        yield None
+        return
+
+    recorded = Span(name=name, start=time.perf_counter(), attributes=attributes)
+    try:
+        yield recorded
+    finally:
+        recorded.duration = time.perf_counter() - recorded.start
+        context.spans.append(recorded)
+
+
+class StageClock:
+    """Record consecutive pipeline stages, each ending where the next begins."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._context = current_request()
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str, **attributes: Any) -> float:
+        """
+        Close the stage that ran since the previous lap.
+
+        Args:
+            stage: Stage name, appended to the prefix
+            **attributes: Extra details kept with the span
+
+        Returns:
+            Stage duration in seconds
+        """
+        now = time.perf_counter()
+        duration = now - self._last
+        if self._context is not None:
+            self._context.spans.append(
+                Span(name=f"{self.prefix}.{stage}", start=self._last, duration=duration, attributes=attributes)
+            )
+        self._last = now
+        return duration
+
+
+def stage_breakdown(context: Optional[RequestContext] = None) -> Dict[str, float]:
+    """
+    Sum span durations by stage name, in the order stages first ran.
+
+    Args:
+        context: Request context (defaults to the current one)
+
+    Returns:
+        Milliseconds per stage name
+    """
+    context = context or current_request()
+    if context is None:
+        return {}
+
+    totals: Dict[str, float] = {}
+    for recorded in context.spans:
+        totals[recorded.name] = totals.get(recorded.name, 0.0) + recorded.duration * 1000
+    return {name: round(ms, 1) for name, ms in totals.items()}
+
+
+def server_timing_header(breakdown: Dict[str, float], total_ms: Optional[float] = None) -> str:
+    """
+    Format a stage breakdown as a ``Server-Timing`` header value.
+
+    Args:
+        breakdown: Milliseconds per stage name
+        total_ms: Whole-request duration, sent as ``total``
+
+    Returns:
+        Header value, e.g. ``study_plan.llm;dur=812.4, total;dur=903.0``
+    """
+    metrics: List[str] = [f"{name};dur={ms}" for name, ms in breakdown.items()]
+    if total_ms is not None:
+        metrics.append(f"total;dur={round(total_ms, 1)}")
+    return ", ".join(metrics)
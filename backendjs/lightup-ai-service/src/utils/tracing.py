@@ -0,0 +1,213 @@
+"""Trace context propagation and a local span exporter."""
+
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.request_context import RequestContext, current_request, new_span_id
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+# Longest incoming X-Request-ID reused as-is
+MAX_REQUEST_ID_LENGTH = 128
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a W3C ``traceparent`` header.
+
+    Args:
+        value: Raw header value
+
+    Returns:
+        Tuple of (trace_id, parent span id), or None if absent or malformed
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    """Format a sampled W3C ``traceparent`` header."""
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def outbound_trace_headers() -> Dict[str, str]:
+    """
+    Headers forwarding the current request's identity to an upstream provider.
+
+    Returns:
+        ``X-Request-ID`` and ``traceparent`` headers, or an empty dict outside a request
+    """
+    context = current_request()
+    if context is None:
+        return {}
+    return {
+        "X-Request-ID": context.request_id,
+        "traceparent": format_traceparent(context.trace_id, context.span_id)
+    }
+
+
+def client_identity(headers: Any, peer: Optional[str]) -> str:
+    """
+    Identify the caller of a request.
+
+    Clients control their headers, so one names the client only when a
+    trusted proxy sets it (``rate_limit_client_header``).
+
+    Args:
+        headers: Request headers
+        peer: Address of the connecting peer, if known
+
+    Returns:
+        Client header value, peer address, or ``unknown``
+    """
+    client = headers.get(settings.rate_limit_client_header) if settings.rate_limit_client_header else None
+    return client or peer or "unknown"
+
+
+def request_context_from_headers(
+    headers: Any,
+    generated_id: str,
+    scope: Any = None,
+    peer: Optional[str] = None
+) -> RequestContext:
+    """
+    Build the context of an incoming request, continuing the caller's trace if given.
+
+    Args:
+        headers: Request headers
+        generated_id: Request id to use when the caller sent none
+        scope: ASGI scope of the request
+        peer: Address of the connecting peer
+
+    Returns:
+        New request context
+    """
+    request_id = headers.get("X-Request-ID") or ""
+    if not request_id or len(request_id) > MAX_REQUEST_ID_LENGTH or not request_id.isprintable():
+        request_id = generated_id
+
+    context = RequestContext(request_id=request_id, scope=scope, client=client_identity(headers, peer))
+    parent = parse_traceparent(headers.get("traceparent"))
+    if parent is not None:
+        context.trace_id, context.parent_span_id = parent
+    return context
+
+
+class FileTraceExporter:
+    """Append finished request traces to a JSON-lines file from a background thread."""
+
+    def __init__(self, path: str, max_queue: int = 10000):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: File spans are appended to, one JSON object per line
+            max_queue: Spans buffered before new ones are dropped
+        """
+        self.path = path
+        # Each item is one request's list of span dicts; None stops the writer thread
+        self._queue: "queue.Queue[Optional[list]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"exported": 0, "dropped": 0, "write_errors": 0}
+
+    def export(self, context: RequestContext, name: str, duration: float, attributes: Dict[str, Any]) -> None:
+        """
+        Queue a request's root span and its stage spans for writing.
+
+        Stage spans are children of the root span; nesting between stages is
+        not recorded.
+
+        Args:
+            context: Finished request or job context
+            name: Root span name, e.g. ``POST /ai/generate-roadmap``
+            duration: Root span duration in seconds
+            attributes: Root span attributes
+        """
+        # Convert perf_counter offsets to wall-clock time once per trace
+        epoch_offset = time.time() - time.perf_counter()
+        base = {"trace_id": context.trace_id, "request_id": context.request_id}
+        records = [{
+            **base,
+            "span_id": context.span_id,
+            "parent_span_id": context.parent_span_id,
+            "name": name,
+            "start_time": round(epoch_offset + context.started_at, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "attributes": attributes
+        }]
+        for recorded in context.spans:
+            records.append({
+                **base,
+                "span_id": new_span_id(),
+                "parent_span_id": context.span_id,
+                "name": recorded.name,
+                "start_time": round(epoch_offset + recorded.start, 6),
+                "duration_ms": round(recorded.duration * 1000, 3),
+                "attributes": recorded.attributes
+            })
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(records)
+        except queue.Full:
+            self.stats["dropped"] += len(records)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued spans and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def _write_loop(self) -> None:
+        """Write queued traces until the close sentinel arrives."""
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty() and batch[-1] is not None:
+                batch.append(self._queue.get_nowait())
+
+            traces = [records for records in batch if records is not None]
+            if traces:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as trace_file:
+                        for records in traces:
+                            for record in records:
+                                trace_file.write(json.dumps(record, default=str) + "\n")
+                    self.stats["exported"] += sum(len(records) for records in traces)
+                except OSError as e:
+                    self.stats["write_errors"] += 1
+                    logger.warning(f"Failed to write traces to {self.path}: {e}")
+
+            if batch[-1] is None:
+                return
+
+
+def export_trace(context: RequestContext, name: str, duration: float, **attributes: Any) -> None:
+    """Export a finished trace if a trace file is configured."""
+    if trace_exporter is not None:
+        trace_exporter.export(context, name, duration, attributes)
+
+
+# Global trace exporter, enabled by TRACE_EXPORT_PATH
+trace_exporter: Optional[FileTraceExporter] = (
+    FileTraceExporter(settings.trace_export_path) if settings.trace_export_path else None
+)
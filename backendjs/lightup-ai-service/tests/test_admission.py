@@ -0,0 +1,115 @@
+"""Test rate limiting and load shedding."""
+
+from src.config.settings import settings
+from src.services import admission
+from src.services.admission import AdmissionController, TokenBucket, admission_controller
+from src.utils.cache import LRUCache
+
+
+class TestTokenBucket:
+    """Test token bucket refill."""
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(capacity=2, rate=1.0)
+        assert bucket.take() == 0.0
+        assert bucket.take() == 0.0
+        assert 0.0 < bucket.take() <= 1.0
+
+
+class TestAdmissionController:
+    """Test admission decisions."""
+
+    def test_rate_limit_is_per_client_and_route(self):
+        controller = AdmissionController(rate_requests=1, rate_period=60)
+
+        assert controller.check("a", "/ai/generate-roadmap").admitted
+        limited = controller.check("a", "/ai/generate-roadmap")
+        assert (limited.admitted, limited.status_code) == (False, 429)
+        assert 1 <= limited.retry_after <= 60
+
+        assert controller.check("b", "/ai/generate-roadmap").admitted
+        assert controller.check("a", "/ai/generate-assessment").admitted
+
+    def test_sheds_when_in_flight_limit_reached(self):
+        controller = AdmissionController(rate_requests=0, max_in_flight=2)
+
+        assert controller.check("a", "/r").admitted
+        assert controller.check("a", "/r").admitted
+        shed = controller.check("a", "/r")
+        assert (shed.admitted, shed.status_code) == (False, 503)
+
+        controller.release(0.1)
+        assert controller.check("a", "/r").admitted
+
+    def test_slow_requests_halve_in_flight_limit(self):
+        controller = AdmissionController(rate_requests=0, max_in_flight=4, latency_target=1.0)
+        controller.check("a", "/r")
+        controller.release(5.0)
+
+        assert controller.in_flight_limit == 2
+        assert controller.check("a", "/r").admitted
+        assert controller.check("a", "/r").admitted
+        shed = controller.check("a", "/r")
+        assert not shed.admitted and shed.retry_after == 5
+
+    def test_sheds_when_llm_queue_is_full(self, monkeypatch):
+        class _Limiter:
+            waiting = 3
+
+        monkeypatch.setattr(admission, "llm_limiter", _Limiter())
+        controller = AdmissionController(rate_requests=0, max_llm_queue=3)
+        assert controller.check("a", "/r").status_code == 503
+
+
+class TestAdmissionMiddleware:
+    """Test admission over HTTP."""
+
+    def test_rate_limited_request_gets_retry_after(self, client, monkeypatch):
+        monkeypatch.setattr(admission_controller, "rate_requests", 1)
+        monkeypatch.setattr(admission_controller, "_buckets", LRUCache())
+        headers = {"X-Client-ID": "client-429"}
+
+        client.post("/ai/validate-roadmap", json={}, headers=headers)
+        response = client.post("/ai/validate-roadmap", json={}, headers=headers)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert admission_controller.in_flight == 0
+
+    def test_client_header_is_ignored_unless_configured(self, client, monkeypatch):
+        monkeypatch.setattr(admission_controller, "rate_requests", 1)
+        monkeypatch.setattr(admission_controller, "_buckets", LRUCache())
+        monkeypatch.setattr(settings, "rate_limit_client_header", None)
+
+        client.post("/ai/validate-roadmap", json={}, headers={"X-Client-ID": "first"})
+        response = client.post("/ai/validate-roadmap", json={}, headers={"X-Client-ID": "second"})
+
+        assert response.status_code == 429
+
+    def test_configured_client_header_keys_the_limit(self, client, monkeypatch):
+        monkeypatch.setattr(admission_controller, "rate_requests", 1)
+        monkeypatch.setattr(admission_controller, "_buckets", LRUCache())
+        monkeypatch.setattr(settings, "rate_limit_client_header", "X-Client-ID")
+
+        client.post("/ai/validate-roadmap", json={}, headers={"X-Client-ID": "first"})
+        response = client.post("/ai/validate-roadmap", json={}, headers={"X-Client-ID": "second"})
+
+        assert response.status_code != 429
+
+    def test_limit_is_shared_across_path_parameters(self, client, monkeypatch):
+        monkeypatch.setattr(admission_controller, "rate_requests", 1)
+        monkeypatch.setattr(admission_controller, "_buckets", LRUCache())
+
+        client.delete("/ai/assessment/first")
+        response = client.delete("/ai/assessment/second")
+
+        assert response.status_code == 429
+        assert len(admission_controller._buckets) == 1
+
+    def test_reads_are_not_limited(self, client, monkeypatch):
+        monkeypatch.setattr(admission_controller, "max_in_flight", 1)
+        monkeypatch.setattr(admission_controller, "_in_flight", 1)
+
+        assert client.get("/health").status_code == 200
+        assert client.get("/ai/jobs/job_missing").status_code == 404
+        assert client.post("/ai/validate-roadmap", json={}).status_code == 503
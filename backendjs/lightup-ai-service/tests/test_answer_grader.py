@@ -0,0 +1,198 @@
+"""Test local answer grading, score caching and the hybrid assessment evaluator."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.models.assessment import (
+    AssessmentEvaluationRequest,
+    EvaluationCriteria,
+    GeneratedQuestion,
+    UserAnswer
+)
+from src.services.ai_assessment import AIAssessmentService
+from src.utils.answer_grader import AnswerGrader
+from src.utils.cache import LRUCache
+
+
+def _question(question_id, question_type, correct_answer=None, options=None, keywords=None, node_id="node1", text=None):
+    return GeneratedQuestion(
+        id=question_id,
+        node_id=node_id,
+        question=text or f"Question {question_id}",
+        question_type=question_type,
+        options=options,
+        correct_answer=correct_answer,
+        points=10,
+        difficulty="medium",
+        explanation="",
+        keywords=keywords or []
+    )
+
+
+class TestAnswerGrader:
+    """Test scoring of objective answers."""
+
+    def test_multiple_choice_accepts_option_letters(self):
+        question = _question("q1", "multiple_choice", "A language", ["A snake", "A language", "A tool"])
+
+        assert AnswerGrader.grade(question, "b").is_correct
+        assert AnswerGrader.grade(question, "(B)").is_correct
+        assert AnswerGrader.grade(question, "  a LANGUAGE. ").is_correct
+        assert AnswerGrader.grade(question, "A").score == 0
+
+    def test_true_false_synonyms(self):
+        question = _question("q1", "true_false", "True")
+
+        assert AnswerGrader.grade(question, "yes").is_correct
+        assert not AnswerGrader.grade(question, "false").is_correct
+        assert not AnswerGrader.grade(question, "maybe").is_correct
+
+    def test_short_answer_uses_keyword_weights(self):
+        question = _question("q1", "short_answer", "A dynamic programming language", keywords=["dynamic", "language"])
+
+        score = AnswerGrader.grade(question, "It is a language", keyword_weights={"dynamic": 3.0, "language": 1.0})
+
+        assert score.score == pytest.approx(2.5)
+        assert not score.is_correct
+        assert "dynamic" in score.feedback
+
+    def test_short_answer_without_partial_credit(self):
+        question = _question("q1", "short_answer", keywords=["stack", "queue", "heap"])
+
+        score = AnswerGrader.grade(question, "a stack and a queue", partial_credit=False)
+
+        assert score.is_correct
+        assert score.score == 10
+
+    def test_open_ended_types_need_llm(self):
+        essay = _question("q1", "essay")
+
+        assert not AnswerGrader.can_grade_locally(essay, "A long answer")
+        assert AnswerGrader.can_grade_locally(essay, "")
+        assert AnswerGrader.grade(essay, None).score == 0
+
+
+class TestHybridEvaluation:
+    """Test that only open-ended answers reach the LLM."""
+
+    @pytest.mark.asyncio
+    async def test_objective_assessment_skips_llm(self):
+        service = AIAssessmentService()
+        questions = [
+            _question("q1", "multiple_choice", "A language", ["A snake", "A language"]),
+            _question("q2", "true_false", "False", node_id="node2")
+        ]
+        request = AssessmentEvaluationRequest(
+            assessment_id="a1",
+            answers=[UserAnswer(question_id="q1", answer="B"), UserAnswer(question_id="q2", answer="true")]
+        )
+
+        with patch("src.services.ai_assessment.llm_client.generate_json_completion", new=AsyncMock()) as mock_llm:
+            result = await service.evaluate_assessment(request, questions, EvaluationCriteria())
+
+        mock_llm.assert_not_called()
+        assert result.total_score == 10
+        assert result.max_score == 20
+        assert result.percentage == 50.0
+        assert {node.node_id: node.recommended_action for node in result.node_scores} == {
+            "node1": "continue",
+            "node2": "review"
+        }
+
+    @pytest.mark.asyncio
+    async def test_open_ended_answers_share_one_request(self, monkeypatch):
+        monkeypatch.setattr("src.services.ai_assessment.settings.grading_batch_window_ms", 0)
+        service = AIAssessmentService()
+        questions = [
+            _question("q1", "multiple_choice", "A language", ["A snake", "A language"]),
+            _question("q2", "essay"),
+            _question("q3", "coding")
+        ]
+        request = AssessmentEvaluationRequest(
+            assessment_id="a1",
+            answers=[
+                UserAnswer(question_id="q1", answer="A language"),
+                UserAnswer(question_id="q2", answer="An essay"),
+                UserAnswer(question_id="q3", answer="print('hi')")
+            ]
+        )
+        ai_response = {
+            "question_scores": [
+                {"question_id": "q2", "score": 5, "max_score": 10, "feedback": "Partly", "is_correct": False},
+                {"question_id": "q3", "score": 10, "max_score": 10, "feedback": "Good", "is_correct": True}
+            ],
+            "node_scores": [
+                {"node_id": "node1", "score": 80, "feedback": "Solid", "recommended_action": "continue"}
+            ],
+            "overall_feedback": "Nice work"
+        }
+
+        with patch(
+            "src.services.ai_assessment.llm_client.generate_json_completion",
+            new=AsyncMock(return_value=ai_response)
+        ) as mock_llm:
+            result = await service.evaluate_assessment(request, questions, EvaluationCriteria())
+
+        mock_llm.assert_called_once()
+        prompt = mock_llm.call_args.kwargs["prompt"]
+        assert "Question ID: q2" in prompt and "Question ID: q3" in prompt
+        assert "Question ID: q1" not in prompt
+
+        assert [score.question_id for score in result.question_scores] == ["q1", "q2", "q3"]
+        assert result.total_score == 25
+        assert result.node_scores[0].score == 83
+        assert result.node_scores[0].feedback == "Solid"
+        assert result.overall_feedback == "Nice work"
+
+
+class TestScoreCache:
+    """Test per-question score reuse across assessments and users."""
+
+    def test_lru_cache_evicts_and_counts(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.stats["evictions"] == 1
+        assert cache.snapshot()["hits"] == 2
+
+    def test_answer_key_normalizes_option_letters(self):
+        question = _question("q1", "multiple_choice", "Yes", ["No", "Yes"])
+
+        assert AnswerGrader.answer_key(question, " b) ") == AnswerGrader.answer_key(question, "YES")
+
+    @pytest.mark.asyncio
+    async def test_same_answer_reuses_llm_score(self, monkeypatch):
+        monkeypatch.setattr("src.services.ai_assessment.settings.grading_batch_window_ms", 0)
+        service = AIAssessmentService()
+        ai_response = {
+            "question_scores": [
+                {"question_id": "q1", "score": 7, "max_score": 10, "feedback": "Good", "is_correct": True}
+            ],
+            "node_scores": [],
+            "overall_feedback": "Fine"
+        }
+
+        with patch(
+            "src.services.ai_assessment.llm_client.generate_json_completion",
+            new=AsyncMock(return_value=ai_response)
+        ) as mock_llm:
+            first = AssessmentEvaluationRequest(
+                assessment_id="a1", answers=[UserAnswer(question_id="q1", answer="Recursion  calls itself")]
+            )
+            await service.evaluate_assessment(first, [_question("q1", "essay", text="Explain recursion")])
+
+            # Same question content under a different id, answered by another user
+            second = AssessmentEvaluationRequest(
+                assessment_id="a2", answers=[UserAnswer(question_id="other", answer="recursion calls itself")]
+            )
+            result = await service.evaluate_assessment(second, [_question("other", "essay", text="Explain recursion")])
+
+        mock_llm.assert_called_once()
+        assert result.question_scores[0].question_id == "other"
+        assert result.question_scores[0].score == 7
+        assert service.clear_cache()["cleared_question_scores"] == 1
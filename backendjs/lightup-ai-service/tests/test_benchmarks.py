@@ -0,0 +1,45 @@
+"""Test the benchmark generators and runner."""
+
+import pytest
+
+from benchmarks import generators
+from benchmarks.cases import select_cases
+from benchmarks.runner import compare, run_case
+from src.utils.graph_analyzer import GraphAnalyzer
+
+
+@pytest.mark.parametrize("shape", generators.SHAPES)
+def test_generated_roadmaps_are_consistent(shape):
+    roadmap = generators.make_roadmap(shape, 60)
+
+    assert len(roadmap.nodes) == 60
+    assert GraphAnalyzer.validate_prerequisites(roadmap.nodes, roadmap.edges) == []
+    has_cycles = bool(GraphAnalyzer.detect_cycles(roadmap.nodes, roadmap.edges))
+    assert has_cycles == (shape == "planted_cycles")
+
+
+def test_run_case_records_time_memory_and_growth():
+    case = select_cases("calculate_critical_path[chain]")[0]
+    result = run_case(case, [10, 100], max_seconds=10, log=lambda line: None)
+
+    assert set(result["sizes"]) == {"10", "100"}
+    assert result["sizes"]["100"]["seconds"] > 0
+    assert result["sizes"]["100"]["peak_kb"] > 0
+    assert result["growth_exponent"] is not None
+
+
+def test_run_case_skips_sizes_over_budget():
+    case = select_cases("detect_cycles[random_dag]")[0]
+    result = run_case(case, [10, 100, 100000], max_seconds=1e-9, memory=False, log=lambda line: None)
+
+    assert "seconds" in result["sizes"]["10"]
+    assert "skipped" in result["sizes"]["100000"]
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = {"results": {"case": {"sizes": {"1000": {"seconds": 0.010, "peak_kb": 100.0}}}}}
+    slower = {"results": {"case": {"sizes": {"1000": {"seconds": 0.020, "peak_kb": 100.0}}}}}
+    similar = {"results": {"case": {"sizes": {"1000": {"seconds": 0.011, "peak_kb": 110.0}}}}}
+
+    assert [r["metric"] for r in compare(slower, baseline)] == ["seconds"]
+    assert compare(similar, baseline) == []
@@ -0,0 +1,100 @@
+"""Test request deadlines and degraded results."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.models.assessment import AssessmentEvaluationRequest, GeneratedQuestion, UserAnswer
+from src.models.study_plan import StudyPlanRequest
+from src.services.ai_assessment import AIAssessmentService
+from src.services.ai_study_plan import AIStudyPlanService
+from src.services.llm_client import LLMClient
+from src.utils.deadline import (
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    detached_context,
+    within_deadline
+)
+
+
+class TestDeadlineScope:
+    """Test deadline propagation primitives."""
+
+    def test_nested_scope_cannot_extend_deadline(self):
+        with deadline_scope(1) as outer:
+            with deadline_scope(60) as inner:
+                assert inner is outer
+            with deadline_scope(0.5) as shorter:
+                assert shorter.expires_at < outer.expires_at
+        assert current_deadline() is None
+
+    def test_detached_context_has_no_deadline(self):
+        with deadline_scope(1):
+            assert detached_context().run(current_deadline) is None
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_cancelled_at_deadline(self):
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await within_deadline(asyncio.sleep(1))
+
+    @pytest.mark.asyncio
+    async def test_retry_backoff_stops_at_deadline(self):
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=RuntimeError("provider down"))
+
+        with deadline_scope(0.5):
+            with pytest.raises(DeadlineExceeded):
+                await client.generate_with_retry("Hello", max_retries=3, backoff_factor=1.0)
+
+        client.generate_completion.assert_awaited_once()
+
+
+class TestDegradedResults:
+    """Test fallbacks returned when the LLM runs out of time."""
+
+    @pytest.mark.asyncio
+    async def test_study_plan_falls_back_to_algorithmic_plan(self, sample_study_plan_request):
+        service = AIStudyPlanService()
+        request = StudyPlanRequest(**sample_study_plan_request)
+
+        with patch(
+            "src.services.ai_study_plan.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=DeadlineExceeded("out of time"))
+        ):
+            plan = await service.generate_study_plan(request)
+
+        assert plan.degraded
+        assert plan.daily_schedule
+        assert {activity.node_id for day in plan.daily_schedule for activity in day.activities} == {"node1"}
+
+    @pytest.mark.asyncio
+    async def test_open_ended_answers_get_provisional_scores(self, monkeypatch):
+        monkeypatch.setattr("src.services.ai_assessment.settings.grading_batch_window_ms", 0)
+        service = AIAssessmentService()
+        question = GeneratedQuestion(
+            id="q1",
+            node_id="n1",
+            question="Explain recursion.",
+            question_type="essay",
+            points=10,
+            difficulty="medium",
+            explanation="",
+            keywords=["base case", "calls itself"]
+        )
+        request = AssessmentEvaluationRequest(
+            assessment_id="a1",
+            answers=[UserAnswer(question_id="q1", answer="A function that calls itself until a base case.")]
+        )
+
+        with patch(
+            "src.services.ai_assessment.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=DeadlineExceeded("out of time"))
+        ):
+            result = await service.evaluate_assessment(request, [question])
+
+        assert result.degraded
+        assert result.question_scores[0].score == 10
+        assert result.question_scores[0].feedback.startswith("Provisional")
@@ -0,0 +1,110 @@
+"""Test the offline fake LLM provider."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.services.ai_assessment import ASSESSMENT_GENERATION_SCHEMA, EVALUATION_SCHEMA
+from src.services.ai_roadmap import ROADMAP_GENERATION_SCHEMA
+from src.services.ai_study_plan import PLAN_ADJUSTMENT_SCHEMA, PLAN_GENERATION_SCHEMA
+from src.services.fake_llm import CassetteMiss, FakeLLMProvider
+from src.services.grading_batcher import BATCH_GRADING_SCHEMA
+from src.services.llm_client import CompletionResult, LLMClient, _is_rate_limit_error
+from src.utils.schema_validator import compile_schema
+
+
+def _provider(**kwargs) -> FakeLLMProvider:
+    options = {"latency_ms": 0, "tokens_per_second": 0, "seed": 7}
+    options.update(kwargs)
+    return FakeLLMProvider(**options)
+
+
+async def _complete(provider, prompt="Generate", schema=None, max_tokens=4000, partial=None, real_call=None):
+    return await provider.complete(
+        prompt, "system", "json" if schema else None, max_tokens, schema, partial, real_call=real_call
+    )
+
+
+@pytest.mark.parametrize("schema", [
+    ASSESSMENT_GENERATION_SCHEMA, EVALUATION_SCHEMA, ROADMAP_GENERATION_SCHEMA,
+    PLAN_GENERATION_SCHEMA, PLAN_ADJUSTMENT_SCHEMA, BATCH_GRADING_SCHEMA
+])
+@pytest.mark.asyncio
+async def test_synthesized_output_matches_service_schemas(schema):
+    compiled = compile_schema(schema)
+
+    result = await _complete(_provider(), schema=compiled)
+
+    assert compiled.validate(json.loads(result.text)) == []
+    assert result.output_tokens > 0 and not result.truncated
+
+
+@pytest.mark.asyncio
+async def test_recorded_completions_are_replayed(tmp_path):
+    real_call = AsyncMock(return_value=CompletionResult(text='{"answer": 42}', output_tokens=4, input_tokens=10))
+    recorder = _provider(mode="record", cassette_dir=str(tmp_path))
+
+    recorded = await _complete(recorder, real_call=real_call)
+    replayed = await _complete(_provider(mode="replay", cassette_dir=str(tmp_path), strict=True, replay_timing=False))
+
+    real_call.assert_awaited_once()
+    assert recorded.text == replayed.text == '{"answer": 42}'
+
+
+@pytest.mark.asyncio
+async def test_strict_replay_raises_on_a_miss(tmp_path):
+    provider = _provider(mode="replay", cassette_dir=str(tmp_path), strict=True)
+
+    with pytest.raises(CassetteMiss):
+        await _complete(provider)
+
+
+@pytest.mark.asyncio
+async def test_simulated_429_looks_like_a_provider_rate_limit():
+    provider = _provider(rate_limit_rate=1.0, retry_after=2.0)
+
+    with pytest.raises(Exception) as excinfo:
+        await _complete(provider)
+
+    assert _is_rate_limit_error(excinfo.value)
+    assert excinfo.value.response.headers["retry-after"] == "2"
+    assert provider.stats["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_output_is_finished_by_the_continuation():
+    provider = _provider(truncation_rate=1.0)
+    schema = compile_schema(PLAN_GENERATION_SCHEMA)
+
+    first = await _complete(provider, schema=schema)
+    provider.truncation_rate = 0.0
+    rest = await _complete(provider, schema=schema, partial=first.text)
+
+    assert first.truncated
+    assert schema.validate(json.loads(first.text + rest.text)) == []
+
+
+@pytest.mark.asyncio
+async def test_client_serves_json_completions_from_the_fake():
+    client = LLMClient()
+    client.fake_provider = _provider()
+    client._generate_openai_completion = AsyncMock()
+
+    result = await client.generate_json_completion(
+        "Generate", expected_schema=ASSESSMENT_GENERATION_SCHEMA, output_task="assessment", output_units=3
+    )
+
+    assert compile_schema(ASSESSMENT_GENERATION_SCHEMA).validate(result) == []
+    assert client.fake_provider.stats["synthesized"] == 1
+    client._generate_openai_completion.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_synthesized_ids_refer_back_to_the_prompt():
+    prompt = "Question ID: q_a\nNode ID: python\nQuestion: ...\n\nQuestion ID: q_b\nNode ID: loops\n"
+
+    result = await _complete(_provider(), prompt=prompt, schema=compile_schema(EVALUATION_SCHEMA))
+
+    scores = json.loads(result.text)["question_scores"]
+    assert {score["question_id"] for score in scores} == {"q_a", "q_b"}
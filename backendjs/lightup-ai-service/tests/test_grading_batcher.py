@@ -0,0 +1,110 @@
+"""Test cross-request micro-batching of open-ended grading."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.models.assessment import AssessmentEvaluationRequest, GeneratedQuestion, UserAnswer
+from src.services.ai_assessment import AIAssessmentService
+from src.services.grading_batcher import GradingBatcher
+
+
+def _essay(question_id, text):
+    return GeneratedQuestion(
+        id=question_id,
+        node_id="node1",
+        question=text,
+        question_type="essay",
+        points=10,
+        difficulty="medium",
+        explanation="",
+        keywords=["recursion"]
+    )
+
+
+def _echo_results(**kwargs):
+    """Fake LLM that gives every batched item the same score."""
+    prompt = kwargs["prompt"]
+    item_ids = [line.split(": ", 1)[1] for line in prompt.splitlines() if line.startswith("Item ID: ")]
+    return {"results": [{"item_id": item_id, "score": 6, "feedback": "ok", "is_correct": True} for item_id in item_ids]}
+
+
+class TestGradingBatcher:
+    """Test batching, de-duplication and fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_answers_share_one_call(self):
+        batcher = GradingBatcher(max_wait_ms=20, max_items=10)
+        question = _essay("q1", "Explain recursion")
+
+        with patch(
+            "src.services.grading_batcher.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=_echo_results)
+        ) as mock_llm:
+            results = await asyncio.gather(
+                batcher.grade(question, "It calls itself"),
+                batcher.grade(question, "it  calls itself."),
+                batcher.grade(_essay("q2", "Explain iteration"), "Loops")
+            )
+
+        mock_llm.assert_called_once()
+        assert all(result["score"] == 6 for result in results)
+        assert batcher.stats["items"] == 2
+        assert batcher.stats["deduplicated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_early(self):
+        batcher = GradingBatcher(max_wait_ms=10000, max_items=2)
+
+        with patch(
+            "src.services.grading_batcher.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=_echo_results)
+        ):
+            results = await asyncio.wait_for(asyncio.gather(
+                batcher.grade(_essay("q1", "A"), "one"),
+                batcher.grade(_essay("q2", "B"), "two")
+            ), timeout=1)
+
+        assert len(results) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self):
+        batcher = GradingBatcher(max_wait_ms=5)
+
+        with patch(
+            "src.services.grading_batcher.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=RuntimeError("provider down"))
+        ):
+            results = await asyncio.gather(
+                batcher.grade(_essay("q1", "A"), "one"),
+                batcher.grade(_essay("q2", "B"), "two"),
+                return_exceptions=True
+            )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert batcher.stats["failed_batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evaluations_from_different_users_are_batched(self, monkeypatch):
+        monkeypatch.setattr("src.services.ai_assessment.grading_batcher", GradingBatcher(max_wait_ms=20))
+        service = AIAssessmentService()
+
+        def request(assessment_id, answer):
+            return AssessmentEvaluationRequest(
+                assessment_id=assessment_id,
+                answers=[UserAnswer(question_id="q1", answer=answer)]
+            )
+
+        with patch(
+            "src.services.grading_batcher.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=_echo_results)
+        ) as mock_llm:
+            first, second = await asyncio.gather(
+                service.evaluate_assessment(request("a1", "Calls itself"), [_essay("q1", "Explain recursion")]),
+                service.evaluate_assessment(request("a2", "Uses a base case"), [_essay("q1", "Explain recursion")])
+            )
+
+        mock_llm.assert_called_once()
+        assert first.total_score == 6
+        assert second.question_scores[0].is_correct
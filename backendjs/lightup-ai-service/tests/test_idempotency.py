@@ -0,0 +1,205 @@
+"""Test Idempotency-Key replay for generation endpoints."""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from src.api import roadmap as roadmap_api
+from src.models.roadmap import RoadmapGenerationResponse
+from src.config.settings import settings
+from src.services.idempotency import IdempotencyCache, IdempotencyKeyReused, idempotency_cache
+from src.utils.request_context import RequestContext, request_scope
+
+
+class _Request(BaseModel):
+    value: int
+
+
+class _Result(BaseModel):
+    value: int
+    degraded: bool = False
+
+
+class TestIdempotencyCache:
+    """Test replay, in-flight sharing and key reuse detection."""
+
+    @pytest.mark.asyncio
+    async def test_completed_response_is_replayed(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            return _Result(value=len(calls))
+
+        first, replayed_first = await cache.run("scope", "key-1", _Request(value=1), operation)
+        second, replayed_second = await cache.run("scope", "key-1", _Request(value=1), operation)
+
+        assert (first.value, replayed_first) == (1, False)
+        assert (second.value, replayed_second) == (1, True)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_retry_joins_in_flight_request(self):
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            await release.wait()
+            return _Result(value=7)
+
+        first = asyncio.create_task(cache.run("scope", "key", _Request(value=1), operation))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.run("scope", "key", _Request(value=1), operation))
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(first, second)
+        assert [result.value for result, _ in results] == [7, 7]
+        assert [replayed for _, replayed in results] == [False, True]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_key_reused_with_different_body_is_rejected(self):
+        cache = IdempotencyCache()
+
+        async def operation():
+            return _Result(value=1)
+
+        await cache.run("scope", "key", _Request(value=1), operation)
+        with pytest.raises(IdempotencyKeyReused):
+            await cache.run("scope", "key", _Request(value=2), operation)
+
+    @pytest.mark.asyncio
+    async def test_failed_and_degraded_results_are_not_stored(self):
+        cache = IdempotencyCache()
+        outcomes = [RuntimeError("boom"), _Result(value=1, degraded=True), _Result(value=2)]
+
+        async def operation():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with pytest.raises(RuntimeError):
+            await cache.run("scope", "key", _Request(value=1), operation)
+        degraded, _ = await cache.run("scope", "key", _Request(value=1), operation)
+        full, replayed = await cache.run("scope", "key", _Request(value=1), operation)
+
+        assert degraded.degraded and full.value == 2 and not replayed
+        assert cache.snapshot()["executed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_endpoint(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            return _Result(value=len(calls))
+
+        await cache.run("roadmap", "key", _Request(value=1), operation)
+        await cache.run("assessment", "key", _Request(value=1), operation)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_client(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            return _Result(value=len(calls))
+
+        for client in ("client-a", "client-b", "client-a"):
+            with request_scope(RequestContext(request_id="req", client=client)):
+                await cache.run("scope", "key", _Request(value=1), operation)
+
+        assert len(calls) == 2
+        assert cache.snapshot()["replayed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_first_request_is_cancelled(self):
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            await release.wait()
+            return _Result(value=len(calls))
+
+        first = asyncio.create_task(cache.run("scope", "key", _Request(value=1), operation))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.run("scope", "key", _Request(value=1), operation))
+        third = asyncio.create_task(cache.run("scope", "key", _Request(value=1), operation))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        results = await asyncio.gather(second, third)
+        assert [result.value for result, _ in results] == [2, 2]
+        assert len(calls) == 2
+        assert cache.snapshot()["in_flight"] == 0
+
+
+class TestIdempotencyAPI:
+    """Test the Idempotency-Key header on a generation endpoint."""
+
+    def test_retry_replays_roadmap(self, client, monkeypatch, sample_roadmap_request):
+        calls = []
+
+        async def fake_generate(request):
+            calls.append(request)
+            return RoadmapGenerationResponse(
+                roadmap_id=f"roadmap_{len(calls)}", title=request.course_title, nodes=[], edges=[], metadata={}
+            )
+
+        monkeypatch.setattr(roadmap_api.ai_roadmap_service, "generate_roadmap", fake_generate)
+        idempotency_cache.clear()
+        headers = {"Idempotency-Key": "retry-123"}
+
+        first = client.post("/ai/generate-roadmap", json=sample_roadmap_request, headers=headers)
+        second = client.post("/ai/generate-roadmap", json=sample_roadmap_request, headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json()["roadmap_id"] == second.json()["roadmap_id"] == "roadmap_1"
+        assert second.headers.get("Idempotent-Replayed") == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert len(calls) == 1
+
+        sample_roadmap_request["course_title"] = "Something else"
+        conflict = client.post("/ai/generate-roadmap", json=sample_roadmap_request, headers=headers)
+        assert conflict.status_code == 400
+
+    def test_other_clients_do_not_share_keys(self, client, monkeypatch, sample_roadmap_request):
+        calls = []
+
+        async def fake_generate(request):
+            calls.append(request)
+            return RoadmapGenerationResponse(
+                roadmap_id=f"roadmap_{len(calls)}", title=request.course_title, nodes=[], edges=[], metadata={}
+            )
+
+        monkeypatch.setattr(roadmap_api.ai_roadmap_service, "generate_roadmap", fake_generate)
+        monkeypatch.setattr(settings, "rate_limit_client_header", "X-Client-ID")
+        idempotency_cache.clear()
+
+        first = client.post(
+            "/ai/generate-roadmap", json=sample_roadmap_request,
+            headers={"Idempotency-Key": "shared", "X-Client-ID": "first"}
+        )
+        second = client.post(
+            "/ai/generate-roadmap", json=sample_roadmap_request,
+            headers={"Idempotency-Key": "shared", "X-Client-ID": "second"}
+        )
+
+        assert first.json()["roadmap_id"] == "roadmap_1"
+        assert second.json()["roadmap_id"] == "roadmap_2"
+        assert "Idempotent-Replayed" not in second.headers
@@ -0,0 +1,165 @@
+"""Test background generation jobs."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.main import app
+from src.models.jobs import JobStatus
+from src.services.job_manager import InMemoryJobStore, JobManager, JobQueueFull, job_manager
+
+
+class _Request(BaseModel):
+    value: int
+
+
+class _Response(BaseModel):
+    doubled: int
+
+
+async def _double(request: _Request) -> _Response:
+    return _Response(doubled=request.value * 2)
+
+
+async def _wait_until_finished(manager: JobManager, job_id: str):
+    for _ in range(100):
+        job = await manager.get(job_id)
+        if job.finished:
+            return job
+        await manager.wait_for_update(job_id, 0.05)
+    raise AssertionError("job did not finish")
+
+
+class TestJobManager:
+    """Test the worker pool and job lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_and_stores_result(self):
+        manager = JobManager(InMemoryJobStore(), workers=2)
+        manager.register("double", _double)
+
+        job = await manager.submit("double", _Request(value=21), user_key="course_1")
+        assert job.status == JobStatus.QUEUED
+
+        finished = await _wait_until_finished(manager, job.job_id)
+        await manager.stop()
+
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.result == {"doubled": 42}
+        assert finished.started_at is not None and finished.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded_without_internal_details(self):
+        async def broken(request):
+            raise RuntimeError("connection string with secrets")
+
+        manager = JobManager(InMemoryJobStore())
+        manager.register("broken", broken)
+
+        job = await manager.submit("broken", _Request(value=1))
+        finished = await _wait_until_finished(manager, job.job_id)
+        await manager.stop()
+
+        assert finished.status == JobStatus.FAILED
+        assert finished.error == "Generation failed"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_submissions(self):
+        release = asyncio.Event()
+
+        async def blocked(request):
+            await release.wait()
+            return _Response(doubled=0)
+
+        manager = JobManager(InMemoryJobStore(), workers=1, max_queue=1)
+        manager.register("blocked", blocked)
+
+        await manager.submit("blocked", _Request(value=1))
+        await asyncio.sleep(0)  # Let the worker take the first job
+        await manager.submit("blocked", _Request(value=2))
+        with pytest.raises(JobQueueFull):
+            await manager.submit("blocked", _Request(value=3))
+
+        release.set()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions_with_slow_store_respect_queue_size(self):
+        class SlowStore(InMemoryJobStore):
+            async def save(self, job):
+                await asyncio.sleep(0.01)
+                await super().save(job)
+
+        release = asyncio.Event()
+
+        async def blocked(request):
+            await release.wait()
+            return _Response(doubled=0)
+
+        manager = JobManager(SlowStore(), workers=1, max_queue=2)
+        manager.register("blocked", blocked)
+
+        results = await asyncio.gather(
+            *(manager.submit("blocked", _Request(value=index)) for index in range(5)),
+            return_exceptions=True
+        )
+
+        assert sum(isinstance(result, JobQueueFull) for result in results) == 3
+        release.set()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_jobs_still_queued(self):
+        async def blocked(request):
+            await asyncio.Event().wait()
+
+        manager = JobManager(InMemoryJobStore(), workers=1, max_queue=2)
+        manager.register("blocked", blocked)
+
+        running = await manager.submit("blocked", _Request(value=1))
+        await asyncio.sleep(0)  # Let the worker take the first job
+        queued = await manager.submit("blocked", _Request(value=2))
+        await manager.stop()
+
+        assert (await manager.get(running.job_id)).status == JobStatus.FAILED
+        stored = await manager.get(queued.job_id)
+        assert stored.status == JobStatus.FAILED
+        assert stored.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind_is_rejected(self):
+        with pytest.raises(ValueError):
+            await JobManager(InMemoryJobStore()).submit("missing", _Request(value=1))
+
+
+class TestJobAPI:
+    """Test job submission, polling and event streaming over HTTP."""
+
+    def test_submit_poll_and_stream(self, monkeypatch, sample_roadmap_request):
+        async def fake_roadmap(request):
+            return _Response(doubled=1)
+
+        monkeypatch.setitem(job_manager._handlers, "roadmap", fake_roadmap)
+
+        with TestClient(app) as client:
+            response = client.post("/ai/jobs/roadmap", json=sample_roadmap_request)
+            assert response.status_code == 202
+            submission = response.json()
+            assert submission["status"] == "queued"
+
+            for _ in range(50):
+                job = client.get(submission["status_url"]).json()
+                if job["status"] == "succeeded":
+                    break
+                time.sleep(0.02)
+            assert job["result"] == {"doubled": 1}
+
+            events = client.get(submission["events_url"])
+            assert events.headers["content-type"].startswith("text/event-stream")
+            assert "event: succeeded" in events.text
+
+    def test_unknown_job_returns_404(self, client):
+        assert client.get("/ai/jobs/job_missing").status_code == 404
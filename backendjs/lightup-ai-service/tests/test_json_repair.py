@@ -0,0 +1,97 @@
+"""Test local recovery of malformed LLM JSON."""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.services.llm_client import LLMClient
+from src.utils.json_repair import JSONRepair
+
+
+class TestJSONRepair:
+    """Test individual repairs."""
+
+    def test_valid_json_needs_no_repairs(self):
+        assert JSONRepair.parse('{"a": 1}') == ({"a": 1}, [])
+
+    def test_fences_prose_and_trailing_commas(self):
+        parsed, repairs = JSONRepair.parse('Sure! ```json\n{"a": [1, 2,],}\n``` Let me know.')
+
+        assert parsed == {"a": [1, 2]}
+        assert "stripped_fence" in repairs
+        assert "removed_trailing_comma" in repairs
+
+    def test_literals_comments_and_raw_newlines(self):
+        parsed, _ = JSONRepair.parse('{"ok": True, // flag\n "text": "line1\nline2", "none": None}')
+
+        assert parsed == {"ok": True, "text": "line1\nline2", "none": None}
+
+    def test_truncated_inside_string_value_drops_the_value(self):
+        parsed, repairs = JSONRepair.parse('{"questions": [{"id": "q1", "correct_answer": "Lon')
+
+        assert parsed == {"questions": [{"id": "q1"}]}
+        assert repairs == ["closed_truncated", "dropped_partial_element"]
+
+    def test_truncated_inside_key_drops_the_element(self):
+        parsed, repairs = JSONRepair.parse('[{"a": 1}, {"b":')
+
+        assert parsed == [{"a": 1}]
+        assert "dropped_partial_element" in repairs
+
+    def test_truncated_after_complete_value_closes_brackets(self):
+        parsed, repairs = JSONRepair.parse('{"tags": ["alpha", "beta"')
+
+        assert parsed == {"tags": ["alpha", "beta"]}
+        assert repairs == ["closed_truncated"]
+
+    def test_truncated_after_key_drops_partial_member(self):
+        parsed, repairs = JSONRepair.parse('{"questions": [{"id": "q1"}, {"id": "q2", "explan')
+
+        assert parsed == {"questions": [{"id": "q1"}, {"id": "q2"}]}
+        assert "dropped_partial_element" in repairs
+
+    def test_truncation_backoff_keeps_items_with_literals_and_escapes(self):
+        text = (
+            '{"questions":[{"id":"q1","flag":true,"tags":["alpha","beta"]},'
+            '{"id":"q2","flag":False,"note":"a\nb","tags":["gamma","delta"]},{"id":"q3","fl'
+        )
+
+        parsed, repairs = JSONRepair.parse(text)
+
+        assert parsed["questions"][:2] == [
+            {"id": "q1", "flag": True, "tags": ["alpha", "beta"]},
+            {"id": "q2", "flag": False, "note": "a\nb", "tags": ["gamma", "delta"]}
+        ]
+        assert "dropped_partial_element" in repairs
+
+    def test_unrecoverable_text_raises(self):
+        with pytest.raises(ValueError):
+            JSONRepair.parse("I cannot help with that.")
+
+
+class TestLLMClientRecovery:
+    """Test that recoverable output does not trigger a new completion."""
+
+    @pytest.mark.asyncio
+    async def test_truncated_completion_is_recovered_without_retry(self):
+        client = LLMClient()
+        client.generate_completion = AsyncMock(return_value='{"questions": [{"id": "q1"}], "estimated_minutes": 15, "summ')
+
+        result = await client.generate_json_completion(
+            "Generate",
+            expected_schema={"type": "object", "required": ["questions", "estimated_minutes"]}
+        )
+
+        assert result["estimated_minutes"] == 15
+        client.generate_completion.assert_awaited_once()
+        assert client.stats["json_repairs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unrecoverable_completion_is_requested_again(self):
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=["no json here", '{"a": 1}'])
+
+        result = await client.generate_json_completion("Generate", expected_schema={"required": ["a"]})
+
+        assert result == {"a": 1}
+        assert client.generate_completion.await_count == 2
+        assert client.stats["json_repair_failures"] == 1
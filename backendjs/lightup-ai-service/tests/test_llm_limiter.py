@@ -0,0 +1,298 @@
+"""Test the adaptive LLM concurrency limiter against a simulated provider."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.services.llm_client import CompletionResult, LLMClient
+from src.services.llm_limiter import AdaptiveConcurrencyLimiter, LLMPriority, parse_reset_duration
+
+
+class SimulatedRateLimitError(Exception):
+    """429 error shaped like the provider SDK exceptions."""
+
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+class SimulatedProvider:
+    """Provider with a fixed concurrency capacity that answers 429 beyond it."""
+
+    def __init__(self, capacity: int, latency: float = 0.01, retry_after: str = "0.02"):
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak = 0
+        self.rejected = 0
+        self.served = 0
+
+    async def call(self) -> dict:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.in_flight > self.capacity:
+                self.rejected += 1
+                raise SimulatedRateLimitError({"retry-after": self.retry_after})
+            await asyncio.sleep(self.latency)
+            self.served += 1
+            return {"x-ratelimit-remaining-requests": "100"}
+        finally:
+            self.in_flight -= 1
+
+
+async def _drive(limiter: AdaptiveConcurrencyLimiter, provider: SimulatedProvider, calls: int) -> None:
+    """Issue ``calls`` requests through the limiter, retrying on 429."""
+
+    async def one_call() -> None:
+        while True:
+            async with limiter.acquire(estimated_tokens=10) as permit:
+                try:
+                    headers = await provider.call()
+                except SimulatedRateLimitError as e:
+                    permit.record_rate_limited(e.response.headers)
+                    continue
+                permit.record_success(headers)
+                return
+
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+
+
+class TestParseResetDuration:
+    """Test provider reset header parsing."""
+
+    def test_parses_seconds_and_durations(self):
+        assert parse_reset_duration("2") == 2.0
+        assert parse_reset_duration("20ms") == pytest.approx(0.02)
+        assert parse_reset_duration("6m0s") == 360.0
+        assert parse_reset_duration("1.5s") == 1.5
+
+    def test_invalid_values(self):
+        assert parse_reset_duration(None) is None
+        assert parse_reset_duration("soon") is None
+
+    def test_parses_rfc3339_timestamps(self):
+        reset_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+        assert parse_reset_duration(reset_at.isoformat().replace("+00:00", "Z")) == pytest.approx(30, abs=1)
+        assert parse_reset_duration("2000-01-01T00:00:00Z") == 0.0
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD behaviour of the limiter."""
+
+    @pytest.mark.asyncio
+    async def test_backs_off_to_provider_capacity(self):
+        """A burst far above capacity should settle without a 429 storm."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=32, default_retry_after=0.02)
+        provider = SimulatedProvider(capacity=3)
+
+        await _drive(limiter, provider, calls=120)
+
+        assert provider.served == 120
+        assert limiter.limit <= 6
+        # Rejections are bounded by the first burst plus occasional probing
+        assert provider.rejected < 40
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_grows_under_light_load(self):
+        """Spare provider capacity should raise the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=16)
+        provider = SimulatedProvider(capacity=100)
+
+        await _drive(limiter, provider, calls=100)
+
+        assert limiter.limit > 2
+        assert provider.rejected == 0
+
+    @pytest.mark.asyncio
+    async def test_exhausted_request_header_pauses_admission(self):
+        """x-ratelimit-remaining-requests: 0 should hold new calls until reset."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+
+        async with limiter.acquire() as permit:
+            permit.record_success({
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "100ms"
+            })
+
+        started = time.monotonic()
+        async with limiter.acquire():
+            pass
+
+        assert time.monotonic() - started >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_zero_retry_after_does_not_fall_back_to_default(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, default_retry_after=30)
+
+        async with limiter.acquire() as permit:
+            permit.record_rate_limited({"retry-after": "0"})
+
+        assert limiter._blocked_until <= time.monotonic()
+
+    @pytest.mark.asyncio
+    async def test_anthropic_reset_header_sets_pause(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, default_retry_after=30)
+        reset_at = (datetime.now(timezone.utc) + timedelta(seconds=3)).isoformat()
+
+        async with limiter.acquire() as permit:
+            permit.record_rate_limited({"anthropic-ratelimit-requests-reset": reset_at})
+
+        assert limiter._blocked_until - time.monotonic() == pytest.approx(3, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_token_budget_delays_calls(self):
+        """Calls beyond the tokens-per-window budget wait for the window to roll."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, tokens_per_minute=100, budget_window=0.1)
+
+        async with limiter.acquire(estimated_tokens=80):
+            pass
+
+        started = time.monotonic()
+        async with limiter.acquire(estimated_tokens=80):
+            pass
+
+        assert time.monotonic() - started >= 0.05
+        assert limiter.stats["budget_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """Cancelling a queued caller leaves the limiter consistent."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+
+        async def hold():
+            async with limiter.acquire():
+                await asyncio.sleep(0.05)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await holder
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+
+class TestPriorityLanes:
+    """Test weighted fair queuing across priorities and users."""
+
+    async def _run_queued(self, limiter, callers):
+        """Queue ``callers`` behind a held slot and return their service order."""
+        order = []
+        gate = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire():
+                await gate.wait()
+
+        async def call(name, priority, user_key):
+            async with limiter.acquire(estimated_tokens=1000, priority=priority, user_key=user_key):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        tasks = []
+        for name, priority, user_key in callers:
+            tasks.append(asyncio.create_task(call(name, priority, user_key)))
+            await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_queued_standard_work(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        callers = [(f"plan{i}", LLMPriority.STANDARD, f"user{i}") for i in range(4)]
+        callers.append(("eval", LLMPriority.INTERACTIVE, "user9"))
+
+        order = await self._run_queued(limiter, callers)
+
+        assert order.index("eval") <= 1
+
+    @pytest.mark.asyncio
+    async def test_heavy_user_cannot_starve_others(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        callers = [(f"heavy{i}", LLMPriority.STANDARD, "heavy") for i in range(8)]
+        callers.append(("light", LLMPriority.STANDARD, "light"))
+
+        order = await self._run_queued(limiter, callers)
+
+        assert order.index("light") <= 1
+
+    @pytest.mark.asyncio
+    async def test_background_only_uses_slack(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        callers = [("batch", LLMPriority.BACKGROUND, "job")]
+        callers += [(f"plan{i}", LLMPriority.STANDARD, f"user{i}") for i in range(3)]
+
+        order = await self._run_queued(limiter, callers)
+
+        assert order[-1] == "batch"
+
+    @pytest.mark.asyncio
+    async def test_background_share_caps_background_slots(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=4, background_share=0.5)
+        peak = 0
+        gate = asyncio.Event()
+
+        async def background():
+            nonlocal peak
+            async with limiter.acquire(priority=LLMPriority.BACKGROUND):
+                peak = max(peak, limiter.in_flight)
+                await gate.wait()
+
+        tasks = [asyncio.create_task(background()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 2
+        gate.set()
+        await asyncio.gather(*tasks)
+
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+
+class TestLLMClientLimiting:
+    """Test that LLMClient routes calls through the limiter."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_errors_are_reported(self, monkeypatch):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, default_retry_after=0)
+        monkeypatch.setattr("src.services.llm_client.llm_limiter", limiter)
+
+        client = LLMClient()
+        client._generate_openai_completion = AsyncMock(
+            side_effect=SimulatedRateLimitError({"retry-after": "0"})
+        )
+
+        with pytest.raises(SimulatedRateLimitError):
+            await client.generate_completion("hello")
+
+        assert limiter.stats["rate_limited"] == 1
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_successful_call_returns_text(self, monkeypatch):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        monkeypatch.setattr("src.services.llm_client.llm_limiter", limiter)
+
+        client = LLMClient()
+        client._generate_openai_completion = AsyncMock(
+            return_value=CompletionResult(text="OK", total_tokens=12, output_tokens=2)
+        )
+
+        assert await client.generate_completion("hello") == "OK"
+        assert limiter.stats["succeeded"] == 1
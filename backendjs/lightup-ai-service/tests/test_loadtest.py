@@ -0,0 +1,63 @@
+"""Test the load test runner against the app served in-process."""
+
+import random
+
+import httpx
+import pytest
+
+from loadtest.runner import compare, percentile, run_stage, seed_session
+from loadtest.scenarios import Session, parse_stages, select_scenarios
+from src.main import app
+from src.services.fake_llm import FakeLLMProvider
+from src.services.llm_client import llm_client
+
+
+def _stage(p95_ms, throughput_rps=100.0, error_rate=0.0, rss_mb_peak=100.0):
+    return {
+        "latency": {"p50_ms": 10.0, "p95_ms": p95_ms, "p99_ms": p95_ms},
+        "throughput_rps": throughput_rps,
+        "error_rate": error_rate,
+        "rss_mb_peak": rss_mb_peak
+    }
+
+
+def _report(**stage):
+    return {"results": {"mixed": {"stages": {"8": _stage(**stage)}}}}
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) is None
+
+
+def test_parse_stages():
+    assert parse_stages("1:10,8:2.5") == [(1, 10.0), (8, 2.5)]
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = _report(p95_ms=100.0)
+
+    slower = compare(_report(p95_ms=200.0, throughput_rps=40.0, error_rate=0.05, rss_mb_peak=200.0), baseline)
+    similar = compare(_report(p95_ms=120.0, throughput_rps=90.0, error_rate=0.005, rss_mb_peak=110.0), baseline)
+
+    assert [r["metric"] for r in slower] == ["p95_ms", "p99_ms", "throughput_rps", "error_rate", "rss_mb_peak"]
+    assert similar == []
+
+
+@pytest.mark.asyncio
+async def test_stage_drives_the_api_with_the_fake_provider(monkeypatch):
+    monkeypatch.setattr(llm_client, "fake_provider", FakeLLMProvider(latency_ms=0, tokens_per_second=0, seed=0))
+    scenario = select_scenarios("generate")[0]
+    session = Session(rng=random.Random(0), variants=scenario.variants)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        assert await seed_session(client, session) == []
+        stage = await run_stage(client, scenario, session, users=2, seconds=0.5)
+
+    assert stage["requests"] > 0
+    assert stage["error_rate"] == 0.0
+    assert stage["latency"]["p50_ms"] is not None
+    assert "evaluate_assessment" in stage["operations"]
@@ -0,0 +1,75 @@
+"""Test structured, queued logging."""
+
+import json
+import logging
+import logging.handlers
+import queue
+
+from src.utils.logging_config import JSONFormatter, RequestContextFilter, StructuredQueueHandler
+from src.utils.request_context import RequestContext, request_scope
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def _record(msg="message", args=None, exc_info=None, **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_emits_valid_json_with_extras():
+    line = JSONFormatter().format(_record('said "hi" it\'s', detail={"quote": "'\""}, count=3))
+    data = json.loads(line)
+
+    assert data["message"] == 'said "hi" it\'s'
+    assert data["detail"] == {"quote": "'\""}
+    assert data["count"] == 3
+    assert "msg" not in data and "args" not in data and "levelno" not in data
+
+
+def test_queued_records_keep_extras_exception_and_request_context():
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    sink = _ListHandler()
+    sink.setFormatter(JSONFormatter())
+    listener = logging.handlers.QueueListener(log_queue, sink)
+    listener.start()
+
+    logger = logging.getLogger("test_queued_records")
+    logger.propagate = False
+    logger.addHandler(queue_handler)
+    try:
+        with request_scope(RequestContext(request_id="req_5")):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.error("Failed %s", "badly", exc_info=True, extra={"stage": "parse"})
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+
+    data = json.loads(sink.lines[0])
+    assert data["message"] == "Failed badly"
+    assert data["stage"] == "parse"
+    assert data["request_id"] == "req_5"
+    assert "ValueError: boom" in data["exception"]
+
+
+def test_request_lines_are_sampled_but_errors_are_kept(client, monkeypatch, caplog):
+    monkeypatch.setattr("src.main.settings.log_request_sample_rate", 0.0)
+    caplog.set_level(logging.INFO, logger="src.main")
+
+    client.get("/health")
+    client.get("/ai/jobs/job_missing")
+
+    messages = [(record.getMessage(), getattr(record, "status_code", None)) for record in caplog.records]
+    assert ("Request started", None) not in messages
+    assert messages == [("Request completed", 404)]
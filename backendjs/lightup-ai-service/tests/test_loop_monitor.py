@@ -0,0 +1,54 @@
+"""Test event loop lag monitoring and blocking-call detection."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from src.utils.loop_monitor import LoopMonitor
+from src.utils.metrics import ServiceMetrics
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_logged_with_its_stack(caplog):
+    monitor = LoopMonitor(ServiceMetrics(enabled=False), interval=0.05, block_threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        with caplog.at_level(logging.WARNING, logger="src.utils.loop_monitor"):
+            _block_the_loop(0.4)
+            await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    blocked = [record for record in caplog.records if "Event loop blocked" in record.getMessage()]
+    assert len(blocked) == 1
+    assert "_block_the_loop" in blocked[0].stack
+    assert monitor.stats["blocks"] == 1
+    assert monitor.stats["max_lag"] >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_reports_no_blocks(caplog):
+    monitor = LoopMonitor(ServiceMetrics(enabled=False), interval=0.02, block_threshold=0.2)
+    monitor.start()
+    with caplog.at_level(logging.WARNING, logger="src.utils.loop_monitor"):
+        await asyncio.sleep(0.15)
+    await monitor.stop()
+
+    assert monitor.stats["samples"] >= 3
+    assert monitor.stats["blocks"] == 0
+    assert not monitor.running
+
+
+@pytest.mark.asyncio
+async def test_disabled_monitor_does_not_start():
+    monitor = LoopMonitor(ServiceMetrics(enabled=False), interval=0)
+    monitor.start()
+    assert not monitor.running
+    await monitor.stop()
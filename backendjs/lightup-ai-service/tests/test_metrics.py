@@ -0,0 +1,52 @@
+"""Test Prometheus metrics."""
+
+import pytest
+
+from src.utils import metrics as metrics_module
+from src.utils.cache import LRUCache
+from src.utils.metrics import ServiceMetrics
+
+
+def test_disabled_metrics_are_no_ops():
+    service_metrics = ServiceMetrics(enabled=False)
+
+    service_metrics.observe_request("GET", "/health", 200, 0.01)
+    service_metrics.observe_llm_call("openai", "gpt-4", "success", 1.0, 100, 50)
+    service_metrics.register_cache("cache", {})
+
+    assert not service_metrics.enabled
+    with pytest.raises(RuntimeError):
+        service_metrics.render()
+
+
+def test_metrics_endpoint_hidden_when_disabled(client, monkeypatch):
+    monkeypatch.setattr(metrics_module.metrics, "enabled", False)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_render_includes_llm_and_cache_metrics():
+    pytest.importorskip("prometheus_client")
+    service_metrics = ServiceMetrics(enabled=True)
+    cache = LRUCache(max_entries=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("b")
+    cache.get("a")
+
+    service_metrics.register_cache("questions", cache)
+    service_metrics.register_gauge("ai_llm_in_flight", "LLM calls currently running", lambda: 3)
+    service_metrics.observe_llm_call("openai", "gpt-4", "success", 1.2, 800, 200)
+    service_metrics.observe_llm_retries("openai", "gpt-4", "invalid_json", 1)
+    service_metrics.count_json_parse_failure("repaired")
+    service_metrics.observe_request("POST", "/ai/generate-roadmap", 200, 2.0)
+
+    body, content_type = service_metrics.render()
+    text = body.decode()
+
+    assert content_type.startswith("text/plain")
+    assert 'ai_cache_entries{cache="questions"} 1.0' in text
+    assert 'ai_cache_events_total{cache="questions",event="evictions"} 1.0' in text
+    assert "ai_llm_in_flight 3.0" in text
+    assert 'ai_llm_tokens_count{direction="input",model="gpt-4",provider="openai"} 1.0' in text
+    assert 'ai_llm_json_parse_failures_total{outcome="repaired"} 1.0' in text
+    assert 'route="/ai/generate-roadmap"' in text
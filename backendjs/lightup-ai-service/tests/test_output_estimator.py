@@ -0,0 +1,77 @@
+"""Test output-size prediction and continuation of truncated completions."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.services.llm_client import CompletionResult, LLMClient
+from src.services.output_estimator import MIN_SAMPLES, OutputSizeEstimator
+from src.utils.schema_validator import compile_schema
+
+
+class TestOutputSizeEstimator:
+    """Test the per-task output-size model."""
+
+    def test_prior_is_used_until_fitted(self):
+        estimator = OutputSizeEstimator(priors={"assessment": (300.0, 250.0)}, headroom=1.0, min_tokens=0)
+
+        assert estimator.max_tokens("assessment", 10, ceiling=10000) == 2800
+
+    def test_fit_follows_recorded_usage(self):
+        estimator = OutputSizeEstimator(priors={"assessment": (300.0, 250.0)}, headroom=1.0, min_tokens=0)
+        for questions in range(1, MIN_SAMPLES + 1):
+            estimator.record("assessment", questions, 100 + 150 * questions)
+
+        assert estimator.predict("assessment", 20) == pytest.approx(3100)
+        assert estimator.snapshot()["tasks"]["assessment"]["fitted"]
+
+    def test_constant_units_fit_the_mean(self):
+        estimator = OutputSizeEstimator(priors={}, headroom=1.0)
+        for tokens in [1000, 1200] * (MIN_SAMPLES // 2):
+            estimator.record("roadmap", 1, tokens)
+
+        assert estimator.predict("roadmap") == pytest.approx(1100)
+
+    def test_limit_is_clamped(self):
+        estimator = OutputSizeEstimator(priors={"study_plan": (300.0, 250.0)}, headroom=1.3, min_tokens=256)
+
+        assert estimator.max_tokens("study_plan", 90, ceiling=4000) == 4000
+        assert estimator.max_tokens("study_plan", 0, ceiling=4000) == 390
+        assert OutputSizeEstimator(priors={"x": (10.0, 0.0)}).max_tokens("x", ceiling=4000) == 256
+
+
+class TestTruncatedCompletions:
+    """Test finish_reason=length handling in LLMClient."""
+
+    @pytest.mark.asyncio
+    async def test_truncated_completion_is_continued(self):
+        client = LLMClient()
+        client._generate_openai_completion = AsyncMock(side_effect=[
+            CompletionResult(text='{"questions": [1, ', output_tokens=5, truncated=True),
+            CompletionResult(text='2], "estimated_minutes": 5}', output_tokens=7)
+        ])
+
+        result = await client.generate_json_completion(
+            "Generate", output_task="assessment", output_units=2
+        )
+
+        assert result == {"questions": [1, 2], "estimated_minutes": 5}
+        second_call = client._generate_openai_completion.call_args_list[1]
+        assert second_call.args[-1] == '{"questions": [1, '
+        assert client.stats["continuations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_structured_outputs_are_not_continued(self):
+        client = LLMClient()
+        client._generate_openai_completion = AsyncMock(
+            return_value=CompletionResult(text='{"a": 1', output_tokens=5, truncated=True)
+        )
+
+        response = await client.generate_completion(
+            "Generate", response_format="json", json_schema=compile_schema({"type": "object"})
+        )
+
+        assert json.loads(response + "}") == {"a": 1}
+        client._generate_openai_completion.assert_awaited_once()
+        assert client.stats["truncated_completions"] == 1
@@ -0,0 +1,106 @@
+"""Test on-demand profiling and debug endpoints."""
+
+import json
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from src.config.settings import settings
+from src.utils.cache import LRUCache
+from src.utils.profiling import approximate_size, request_profiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_enabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(request_profiler, "output_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_cprofile_request_stores_pstats(client, admin_enabled):
+    response = client.get("/health", headers={**ADMIN, "X-Profile": "cprofile"})
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert profile_id.endswith(".pstats")
+    stats = pstats.Stats(os.path.join(admin_enabled, profile_id))
+    assert stats.total_calls > 0
+
+    listed = client.get("/ai/debug/profiles", headers=ADMIN).json()
+    assert [item["id"] for item in listed["profiles"]] == [profile_id]
+    assert client.get(f"/ai/debug/profiles/{profile_id}", headers=ADMIN).status_code == 200
+
+
+def test_sampling_request_stores_speedscope(client, admin_enabled):
+    response = client.get("/health?profile=sample", headers=ADMIN)
+
+    profile_id = response.headers["X-Profile-Id"]
+    assert profile_id.endswith(".speedscope.json")
+    with open(os.path.join(admin_enabled, profile_id)) as profile_file:
+        document = json.load(profile_file)
+    profile = document["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+
+
+def test_profiling_requires_admin_token(client, admin_enabled):
+    assert client.get("/health", headers={"X-Profile": "cprofile"}).status_code == 403
+    assert client.get("/health", headers={**ADMIN, "X-Profile": "perf"}).status_code == 400
+    assert os.listdir(admin_enabled) == []
+
+
+def test_profile_flag_ignored_when_disabled(client, admin_enabled, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+    response = client.get("/health", headers={**ADMIN, "X-Profile": "cprofile"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_debug_endpoints_hidden_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/ai/debug/memory/caches", headers=ADMIN).status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    assert client.get("/ai/debug/memory/caches", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_profile_download_rejects_path_traversal(client, admin_enabled):
+    assert client.get("/ai/debug/profiles/..%2Fsettings.py", headers=ADMIN).status_code == 404
+
+
+def test_cache_sizes_report(client, admin_enabled):
+    caches = client.get("/ai/debug/memory/caches", headers=ADMIN).json()["caches"]
+    assert {"roadmaps", "study_plans", "idempotency", "question_bank"} <= set(caches)
+    assert all(report["approx_bytes"] > 0 for report in caches.values())
+
+
+def test_tracemalloc_endpoints(client, admin_enabled):
+    assert client.get("/ai/debug/memory/top", headers=ADMIN).status_code == 409
+    try:
+        assert client.post("/ai/debug/memory/tracemalloc/start", headers=ADMIN).json()["tracing"]
+        snapshot_id = client.post("/ai/debug/memory/snapshot", headers=ADMIN).json()["snapshot_id"]
+        assert os.path.exists(os.path.join(admin_enabled, snapshot_id))
+
+        retained = [bytearray(1024) for _ in range(100)]
+        top = client.get("/ai/debug/memory/top?since_snapshot=true&limit=5", headers=ADMIN).json()
+        assert top["allocations"] and "size_diff_kb" in top["allocations"][0]
+        assert retained
+    finally:
+        client.post("/ai/debug/memory/tracemalloc/stop", headers=ADMIN)
+    assert not tracemalloc.is_tracing()
+
+
+def test_approximate_size_follows_cache_contents():
+    small, large = LRUCache(max_entries=1000), LRUCache(max_entries=1000)
+    small.set("a", "x")
+    for i in range(500):
+        large.set(i, {"title": f"{i:0100d}", "items": list(range(20))})
+
+    assert approximate_size(large) > approximate_size(small) + 500 * 100
+    assert approximate_size(large, sample=50) == pytest.approx(approximate_size(large), rel=0.2)
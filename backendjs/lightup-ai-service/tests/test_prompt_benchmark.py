@@ -0,0 +1,113 @@
+"""Test the prompt cost benchmark."""
+
+import pytest
+
+from benchmarks.prompts.corpus import CASES, select_cases
+from benchmarks.prompts.runner import (
+    TokenCounter, classify, compare, measure_case, replay_case, section_changes, split_sections
+)
+from src.services.ai_assessment import EVALUATION_SCHEMA
+from src.services.fake_llm import CassetteStore, cassette_key
+from src.services.llm_client import schema_instructions
+
+
+def test_every_case_renders_with_sections():
+    counter = TokenCounter("gpt-4")
+    for case in CASES:
+        result = measure_case(case, counter, structured=False)
+
+        assert result["input_tokens"] == sum(result["sections"].values())
+        assert result["input_tokens"] > 0
+        if case.schema is not None:
+            assert result["sections"]["schema"] > 0
+
+
+def test_split_sections_names_headings():
+    prompt = "Grade these answers.\n\nQUESTIONS:\n1. What?\n\nRESPONSE FORMAT (JSON):\n{}\nNote: keep it short"
+
+    sections = split_sections(prompt)
+
+    assert [name for name, _ in sections] == ["preamble", "questions", "response_format_json"]
+    assert "".join(text for _, text in sections) == prompt
+
+
+def test_larger_cases_cost_more_tokens():
+    counter = TokenCounter("gpt-4")
+    small, large = select_cases("study_plan_generation_prompt[small]")[0], select_cases("study_plan_generation_prompt[large]")[0]
+
+    assert measure_case(large, counter, False)["input_tokens"] > measure_case(small, counter, False)["input_tokens"]
+
+
+EVALUATION = '{"question_scores": [], "node_scores": [], "overall_feedback": "Good work"}'
+
+
+@pytest.mark.parametrize("text, outcome", [
+    (EVALUATION, "clean"),
+    ('```json\n{"question_scores": [], "node_scores": [], "overall_feedback": "Good work",}\n```', "repaired"),
+    ('{"question_scores": [{"question_id": "q1"}], "node_scores": [], "overall_feedback": "Good work"}', "pruned"),
+    ('{"question_scores": []}', "missing_fields"),
+    ("not json at all", "unparseable"),
+])
+def test_classify(text, outcome):
+    assert classify(text, EVALUATION_SCHEMA) == outcome
+
+
+async def test_replay_follows_continuations(tmp_path):
+    case = select_cases("assessment_evaluation_prompt[small]")[0]
+    prompt, system_message = case.render(), schema_instructions(case.schema)
+    store = CassetteStore(str(tmp_path))
+    key = cassette_key(prompt, system_message, "json")
+
+    await store.append(key, {"text": EVALUATION, "truncated": False})
+    head = '{"question_scores": [], "node_scores": [], '
+    await store.append(key, {"text": head, "truncated": True})
+    await store.append(cassette_key(prompt, system_message, "json", head), {
+        "text": '"overall_feedback": "Good work"}', "truncated": False
+    })
+    await store.append(key, {"text": "I cannot grade these answers.", "truncated": False})
+
+    replay = await replay_case(case, CassetteStore(str(tmp_path)), TokenCounter("gpt-4"), structured=False)
+
+    assert replay["samples"] == 3
+    assert replay["continuations"] == 1
+    assert replay["outcomes"] == {"clean": 2, "unparseable": 1}
+    assert replay["success_rate"] == pytest.approx(0.667)
+
+
+async def test_replay_without_recordings(tmp_path):
+    case = select_cases("batch_grading_prompt[small]")[0]
+
+    replay = await replay_case(case, CassetteStore(str(tmp_path)), TokenCounter("gpt-4"), structured=False)
+
+    assert replay["samples"] == 0
+    assert replay["success_rate"] is None
+
+
+def _report(tokens, success_rate, tokenizer="estimate/4-chars"):
+    return {
+        "environment": {"tokenizer": tokenizer},
+        "results": {"case": {
+            "chars": tokens * 4, "input_tokens": tokens, "sections": {"preamble": tokens},
+            "replay": {"samples": 10, "success_rate": success_rate, "output_tokens_mean": 500.0}
+        }}
+    }
+
+
+def test_compare_flags_token_growth_and_success_drop():
+    baseline = _report(1000, 0.9)
+
+    assert compare(_report(1010, 0.88), baseline) == []
+    metrics = {regression["metric"] for regression in compare(_report(1100, 0.7), baseline)}
+    assert metrics == {"input_tokens", "success_rate"}
+
+
+def test_compare_uses_chars_across_tokenizers():
+    regressions = compare(_report(1100, 0.9, tokenizer="tiktoken/cl100k_base"), _report(1000, 0.9))
+
+    assert [regression["metric"] for regression in regressions] == ["chars"]
+
+
+def test_section_changes():
+    changes = section_changes(_report(1100, 0.9), _report(1000, 0.9))
+
+    assert changes == [{"case": "case", "section": "preamble", "baseline": 1000, "current": 1100}]
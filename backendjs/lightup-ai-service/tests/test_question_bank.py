@@ -0,0 +1,166 @@
+"""Test the pre-generated question bank."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.models.assessment import AssessmentGenerationRequest, GeneratedQuestion
+from src.models.common import DifficultyLevel, KnowledgeNodeInfo
+from src.services.ai_assessment import AIAssessmentService
+from src.services.question_bank import QuestionBank
+
+
+def _node(node_id):
+    return KnowledgeNodeInfo(
+        id=node_id,
+        title=f"Node {node_id}",
+        description="Test node",
+        prerequisites=[],
+        estimated_hours=2.0,
+        current_user_status="not_started"
+    )
+
+
+def _questions(node_id, count, question_type="short_answer", prefix=""):
+    return [
+        GeneratedQuestion(
+            id=f"q{i}",
+            node_id=node_id,
+            question=f"{prefix}Question {i} about {node_id}",
+            question_type=question_type,
+            correct_answer="answer",
+            points=10,
+            difficulty="medium",
+            explanation="",
+            keywords=[node_id]
+        )
+        for i in range(count)
+    ]
+
+
+class TestQuestionBank:
+    """Test sampling, seen-filtering and refill."""
+
+    def test_sample_spreads_across_nodes_and_types(self):
+        bank = QuestionBank(generator=AsyncMock(), seed=1)
+        bank.add_questions(_questions("n1", 3) + _questions("n1", 3, "true_false", "TF "))
+        bank.add_questions(_questions("n2", 3))
+
+        questions = bank.sample([_node("n1"), _node("n2")], "medium", 4)
+
+        assert len(questions) == 4
+        assert len({q.id for q in questions}) == 4
+        assert [q.node_id for q in questions].count("n1") == 2
+        assert {q.question_type for q in questions if q.node_id == "n1"} == {"short_answer", "true_false"}
+
+    def test_duplicates_are_ignored(self):
+        bank = QuestionBank(generator=AsyncMock())
+
+        assert bank.add_questions(_questions("n1", 3)) == 3
+        assert bank.add_questions(_questions("n1", 3)) == 0
+
+    def test_seen_questions_are_not_repeated(self):
+        bank = QuestionBank(generator=AsyncMock())
+        bank.add_questions(_questions("n1", 6))
+
+        first = bank.sample([_node("n1")], "medium", 3, user_key="user1")
+        second = bank.sample([_node("n1")], "medium", 3, user_key="user1")
+
+        assert not {q.question for q in first} & {q.question for q in second}
+        assert bank.sample([_node("n1")], "medium", 3, user_key="user1") is None
+        assert bank.sample([_node("n1")], "medium", 3, user_key="user2") is not None
+
+    def test_seen_history_is_bounded_by_learner(self):
+        bank = QuestionBank(generator=AsyncMock(), max_users=1)
+        bank.add_questions(_questions("n1", 3))
+
+        bank.sample([_node("n1")], "medium", 3, user_key="user1")
+        bank.sample([_node("n1")], "medium", 3, user_key="user2")
+
+        assert bank.sample([_node("n1")], "medium", 3, user_key="user2") is None
+        # user1 was the least recently seen learner and has been forgotten
+        assert bank.sample([_node("n1")], "medium", 3, user_key="user1") is not None
+
+    def test_nodes_are_bounded_least_recently_used(self):
+        bank = QuestionBank(generator=AsyncMock(), max_nodes=2)
+        bank.add_questions(_questions("n1", 3), [_node("n1")])
+        bank.add_questions(_questions("n2", 3), [_node("n2")])
+        bank.request_refill([_node("n1")], "medium")
+
+        bank.add_questions(_questions("n3", 3), [_node("n3")])
+
+        # n2 was the least recently used node, so it and its questions are gone
+        assert bank.stock("n1", "medium") == 3
+        assert bank.stock("n2", "medium") == 0
+        assert len(bank) == 6
+        assert bank.snapshot()["nodes"] == 2
+        assert bank.add_questions(_questions("n2", 3)) == 3
+
+    def test_stock_counts_only_the_node_and_difficulty(self):
+        bank = QuestionBank(generator=AsyncMock())
+        bank.add_questions(_questions("n1", 2) + _questions("n1", 3, "true_false", "TF "))
+        bank.add_questions([q.model_copy(update={"difficulty": "hard"}) for q in _questions("n1", 4, prefix="Hard ")])
+        bank.add_questions(_questions("n2", 1))
+
+        assert bank.stock("n1", "medium") == 5
+        assert bank.stock("n1", "hard") == 4
+        assert bank.stock("n3", "medium") == 0
+
+    def test_sampling_reuses_stored_fingerprints(self, monkeypatch):
+        bank = QuestionBank(generator=AsyncMock())
+        bank.add_questions(_questions("n1", 6))
+        fingerprint = MagicMock(side_effect=AssertionError("fingerprint recomputed"))
+        monkeypatch.setattr("src.services.question_bank.AnswerGrader.question_fingerprint", fingerprint)
+
+        assert len(bank.sample([_node("n1")], "medium", 3, user_key="user1")) == 3
+        assert len(bank.sample([_node("n1")], "medium", 3, user_key="user1")) == 3
+
+    @pytest.mark.asyncio
+    async def test_refill_worker_tops_up_low_stock(self):
+        generator = AsyncMock(return_value=_questions("n1", 5, prefix="Fresh "))
+        bank = QuestionBank(generator=generator, target_per_node=5)
+        bank.start()
+        try:
+            assert bank.sample([_node("n1")], "medium", 3) is None
+            for _ in range(50):
+                if len(bank) == 5:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await bank.stop()
+
+        generator.assert_awaited_once()
+        assert bank.sample([_node("n1")], "medium", 3) is not None
+
+
+class TestBankedAssessments:
+    """Test assessment generation from the bank."""
+
+    @pytest.mark.asyncio
+    async def test_second_learner_is_served_from_bank(self):
+        service = AIAssessmentService()
+        llm_response = {
+            "questions": [q.model_dump(mode="json") for q in _questions("n1", 6)],
+            "estimated_minutes": 20
+        }
+
+        def request(user_course_id):
+            return AssessmentGenerationRequest(
+                user_course_id=user_course_id,
+                nodes=[_node("n1")],
+                difficulty_level=DifficultyLevel.MEDIUM,
+                question_count=3
+            )
+
+        with patch(
+            "src.services.ai_assessment.llm_client.generate_json_completion",
+            new=AsyncMock(return_value=llm_response)
+        ) as mock_llm:
+            first = await service.generate_assessment(request("course_1"))
+            second = await service.generate_assessment(request("course_2"))
+
+        mock_llm.assert_awaited_once()
+        assert len(first.questions) == 6
+        assert len(second.questions) == 3
+        assert service.assessment_owners.get(second.assessment_id) == "course_2"
@@ -0,0 +1,128 @@
+"""Test compiled schema validation and provider-native structured outputs."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.llm_client import LLMClient, STRUCTURED_OUTPUT_NAME, schema_instructions
+from src.utils.schema_validator import compile_schema
+
+QUESTIONS_SCHEMA = {
+    "type": "object",
+    "required": ["questions"],
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "points"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "points": {"type": "integer", "minimum": 1},
+                    "difficulty": {"type": "string", "enum": ["easy", "medium", "hard"]}
+                }
+            }
+        }
+    }
+}
+
+
+class TestCompiledSchema:
+    """Test the schema compiler."""
+
+    def test_nested_type_errors_are_reported(self):
+        errors = compile_schema(QUESTIONS_SCHEMA).validate({"questions": [{"id": 1, "points": 5}]})
+
+        assert errors == ["$.questions[0].id: expected string, got int"]
+
+    def test_prune_drops_only_invalid_items(self):
+        data = {"questions": [
+            {"id": "q1", "points": 5},
+            {"id": "q2", "points": 0},
+            {"id": "q3", "points": 5, "difficulty": "Medium"}
+        ]}
+
+        pruned, dropped, errors = compile_schema(QUESTIONS_SCHEMA).prune(data)
+
+        assert [question["id"] for question in pruned["questions"]] == ["q1"]
+        assert dropped == 2
+        assert errors == []
+
+    def test_compiled_schemas_are_cached(self):
+        assert compile_schema(QUESTIONS_SCHEMA) is compile_schema(json.loads(json.dumps(QUESTIONS_SCHEMA)))
+
+    def test_strict_form_makes_optional_properties_nullable(self):
+        strict = compile_schema(QUESTIONS_SCHEMA).strict_schema
+        item = strict["properties"]["questions"]["items"]
+
+        assert item["required"] == ["id", "points", "difficulty"]
+        assert item["additionalProperties"] is False
+        assert item["properties"]["difficulty"]["type"] == ["string", "null"]
+        assert None in item["properties"]["difficulty"]["enum"]
+        assert "minimum" not in item["properties"]["points"]
+
+    def test_open_objects_are_not_strict_compatible(self):
+        schema = compile_schema({"type": "object", "properties": {"metadata": {"type": "object"}}})
+
+        assert not schema.strict_compatible
+
+
+class TestStructuredOutputs:
+    """Test how LLMClient uses schemas."""
+
+    @pytest.mark.asyncio
+    async def test_openai_receives_json_schema_response_format(self, monkeypatch):
+        monkeypatch.setattr("src.services.llm_client.settings.llm_structured_outputs", True)
+        client = LLMClient()
+        response = MagicMock(usage=None)
+        response.choices[0].message.content = json.dumps(
+            {"questions": [{"id": "q1", "points": 5, "difficulty": None}]}
+        )
+        raw_response = MagicMock(headers={})
+        raw_response.parse.return_value = response
+        create = AsyncMock(return_value=raw_response)
+        client.openai_client = MagicMock()
+        client.openai_client.chat.completions.with_raw_response.create = create
+
+        result = await client.generate_json_completion("Generate", expected_schema=QUESTIONS_SCHEMA)
+
+        response_format = create.call_args.kwargs["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["name"] == STRUCTURED_OUTPUT_NAME
+        assert response_format["json_schema"]["strict"] is True
+        assert "schema" not in create.call_args.kwargs["messages"][0]["content"]
+        assert result == {"questions": [{"id": "q1", "points": 5}]}
+
+    @pytest.mark.asyncio
+    async def test_anthropic_without_tool_use_falls_back_to_schema_instructions(self):
+        client = LLMClient()
+        response = MagicMock(usage=None, stop_reason="end_turn")
+        response.content = [MagicMock(type="text", text=json.dumps({"questions": []}))]
+        raw_response = MagicMock(headers={})
+        raw_response.parse.return_value = response
+        create = AsyncMock(side_effect=[TypeError("tools"), raw_response, raw_response])
+        client.anthropic_client = MagicMock()
+        client.anthropic_client.messages.with_raw_response.create = create
+        compiled = compile_schema(QUESTIONS_SCHEMA)
+
+        for _ in range(2):
+            await client._generate_anthropic_completion("Generate", None, None, None, "Be brief.", compiled)
+
+        expected = "Be brief." + schema_instructions(QUESTIONS_SCHEMA)
+        assert [call.kwargs.get("system") for call in create.call_args_list[1:]] == [expected, expected]
+        assert "tools" not in create.call_args_list[2].kwargs
+
+    @pytest.mark.asyncio
+    async def test_schema_violation_is_requested_again(self):
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=[
+            json.dumps({"questions": "none"}),
+            json.dumps({"questions": [{"id": "q1", "points": 5}]})
+        ])
+
+        result = await client.generate_json_completion("Generate", expected_schema=QUESTIONS_SCHEMA)
+
+        assert result["questions"][0]["id"] == "q1"
+        assert client.generate_completion.await_count == 2
+        assert client.stats["schema_failures"] == 1
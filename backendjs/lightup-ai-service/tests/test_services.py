@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
+from src.config.settings import settings
 from src.services.ai_assessment import AIAssessmentService
 from src.services.ai_study_plan import AIStudyPlanService
 from src.services.ai_roadmap import AIRoadmapService
@@ -207,9 +208,20 @@ class TestAIServices:
         """Test study plan service initialization."""
         service = AIStudyPlanService()
 
-        assert service.plan_cache == {}
+        assert len(service.plan_cache) == 0
         assert len(service.color_themes) > 0
 
+    def test_owner_maps_are_bounded(self, monkeypatch):
+        """Test that remembered owners cannot grow without limit."""
+        monkeypatch.setattr(settings, "owner_cache_max_entries", 2)
+        service = AIStudyPlanService()
+
+        for index in range(3):
+            service.plan_owners.set(f"plan_{index}", f"course_{index}")
+
+        assert len(service.plan_owners) == 2
+        assert service.plan_owners.get("plan_0") is None
+
     def test_roadmap_service_cache_operations(self):
         """Test roadmap service cache operations."""
         service = AIRoadmapService()
@@ -219,6 +231,17 @@ class TestAIServices:
         assert "cleared_roadmaps" in stats
         assert isinstance(stats["cleared_roadmaps"], int)
 
+    def test_service_cache_lookups_are_counted(self):
+        """Test that cached plan and roadmap lookups report hits and misses."""
+        plan_service = AIStudyPlanService()
+        roadmap_service = AIRoadmapService()
+
+        assert plan_service.get_cached_plan("plan_missing") is None
+        assert roadmap_service.get_cached_roadmap("roadmap_missing") is None
+
+        assert plan_service.plan_cache.snapshot()["misses"] == 1
+        assert roadmap_service.roadmap_cache.snapshot()["misses"] == 1
+
     @pytest.mark.asyncio
     async def test_llm_client_health_check(self, mock_llm_client):
         """Test LLM client health check."""
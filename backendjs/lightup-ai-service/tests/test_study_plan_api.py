@@ -6,6 +6,8 @@ from fastapi.testclient import TestClient
 
 from src.models.study_plan import StudyPlanResponse, DailyStudyPlan, StudyActivity, PlanSummary
 from src.models.common import ActivityType, Priority
+from src.config.settings import settings
+from src.services.ai_study_plan import AIStudyPlanService
 
 
 @patch('src.services.ai_study_plan.ai_study_plan_service.generate_study_plan')
@@ -249,4 +251,15 @@ def test_clear_study_plan_cache(client: TestClient):
     assert response.status_code == 200
     data = response.json()
 
-    assert "cleared_plans" in data
\ No newline at end of file
+    assert "cleared_plans" in data
+
+def test_plans_are_not_bounded_by_the_response_caches(monkeypatch):
+    """Plans are stored only in memory, so they are kept past the response cache limit."""
+    monkeypatch.setattr(settings, "response_cache_max_entries", 1)
+    service = AIStudyPlanService()
+
+    for plan_id in ("plan_1", "plan_2"):
+        service.plan_cache.set(plan_id, StudyPlanResponse.model_construct(plan_id=plan_id))
+
+    assert service.get_cached_plan("plan_1") is not None
+    assert service.plan_cache.max_entries == settings.plan_store_max_entries
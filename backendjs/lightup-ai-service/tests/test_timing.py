@@ -0,0 +1,60 @@
+"""Test stage timing and the Server-Timing header."""
+
+import time
+
+from src.api import roadmap as roadmap_api
+from src.models.roadmap import RoadmapGenerationResponse
+from src.utils.request_context import RequestContext, request_scope
+from src.utils.timing import StageClock, server_timing_header, span, stage_breakdown
+
+
+def test_span_is_a_no_op_outside_requests():
+    with span("stage") as recorded:
+        pass
+
+    assert recorded is None
+    assert stage_breakdown() == {}
+
+
+def test_spans_and_laps_are_summed_per_stage():
+    context = RequestContext(request_id="req_1")
+
+    with request_scope(context):
+        clock = StageClock("plan")
+        time.sleep(0.01)
+        clock.lap("prompt")
+        for _ in range(2):
+            with span("llm.network", provider="openai"):
+                time.sleep(0.005)
+        clock.lap("generate")
+
+    breakdown = stage_breakdown(context)
+    assert list(breakdown) == ["plan.prompt", "llm.network", "plan.generate"]
+    assert breakdown["plan.prompt"] >= 10
+    assert breakdown["llm.network"] >= 10
+    assert context.spans[1].attributes == {"provider": "openai"}
+
+
+def test_server_timing_header_format():
+    header = server_timing_header({"plan.prompt": 1.5, "llm.network": 800.0}, total_ms=812.34)
+
+    assert header == "plan.prompt;dur=1.5, llm.network;dur=800.0, total;dur=812.3"
+
+
+def test_server_timing_sent_when_requested(client, monkeypatch, sample_roadmap_request):
+    async def fake_generate(request):
+        clock = StageClock("roadmap")
+        clock.lap("prompt")
+        with span("llm.network"):
+            pass
+        return RoadmapGenerationResponse(roadmap_id="r", title="t", nodes=[], edges=[], metadata={})
+
+    monkeypatch.setattr(roadmap_api.ai_roadmap_service, "generate_roadmap", fake_generate)
+
+    plain = client.post("/ai/generate-roadmap", json=sample_roadmap_request)
+    timed = client.post("/ai/generate-roadmap", json=sample_roadmap_request, headers={"X-Request-Timings": "1"})
+
+    assert "Server-Timing" not in plain.headers
+    assert timed.headers["Server-Timing"].startswith("roadmap.prompt;dur=")
+    assert "llm.network;dur=" in timed.headers["Server-Timing"]
+    assert "total;dur=" in timed.headers["Server-Timing"]
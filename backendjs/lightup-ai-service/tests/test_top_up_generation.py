@@ -0,0 +1,216 @@
+"""Test salvaging partially valid LLM output with targeted top-up calls."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.models.assessment import AssessmentGenerationRequest
+from src.models.common import DifficultyLevel, KnowledgeNodeInfo
+from src.services.ai_assessment import ASSESSMENT_GENERATION_SCHEMA, AIAssessmentService
+from src.services.ai_roadmap import AIRoadmapService
+from src.services.ai_study_plan import PLAN_GENERATION_SCHEMA
+from src.services.llm_client import LLMClient
+from src.utils.prompt_templates import PromptTemplates
+
+
+def _question(question_id, node_id):
+    return {
+        "id": question_id,
+        "node_id": node_id,
+        "question": f"What about {question_id}?",
+        "question_type": "short_answer",
+        "correct_answer": "answer",
+        "points": 10,
+        "difficulty": "medium",
+        "explanation": "",
+        "keywords": ["answer"]
+    }
+
+
+def _knowledge_node(node_id):
+    return KnowledgeNodeInfo(
+        id=node_id,
+        title=f"Node {node_id}",
+        description="Test node",
+        prerequisites=[],
+        estimated_hours=2.0,
+        current_user_status="not_started"
+    )
+
+
+def _roadmap_node(node_id, prerequisites=()):
+    return {
+        "id": node_id,
+        "title": f"Node {node_id}",
+        "description": "Description",
+        "prerequisites": list(prerequisites),
+        "estimated_hours": 4.0,
+        "difficulty": "medium"
+    }
+
+
+class TestMissingFieldTopUp:
+    """Test that omitted fields are requested on their own."""
+
+    @pytest.mark.asyncio
+    async def test_only_missing_fields_are_requested(self):
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=[
+            json.dumps({"questions": [1, 2]}),
+            json.dumps({"estimated_minutes": 15})
+        ])
+
+        result = await client.generate_json_completion(
+            "Generate",
+            expected_schema={
+                "type": "object",
+                "required": ["questions", "estimated_minutes"],
+                "properties": {"estimated_minutes": {"type": "integer"}}
+            }
+        )
+
+        assert result == {"questions": [1, 2], "estimated_minutes": 15}
+        assert client.generate_completion.await_count == 2
+        assert "estimated_minutes" in client.generate_completion.call_args.kwargs["prompt"]
+        assert client.stats["field_top_ups"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_missing_scalar_field_follow_up_refers_to_existing_questions(self):
+        prompt = PromptTemplates.assessment_generation_prompt(
+            nodes=[_knowledge_node("n1")], user_progress=[], difficulty_level="medium", question_count=2
+        )
+        questions = [_question("q1", "n1"), _question("q2", "n1")]
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=[
+            json.dumps({"questions": questions}),
+            json.dumps({"estimated_minutes": 10})
+        ])
+
+        result = await client.generate_json_completion(prompt, expected_schema=ASSESSMENT_GENERATION_SCHEMA)
+
+        follow_up = client.generate_completion.call_args.kwargs["prompt"]
+        assert result["estimated_minutes"] == 10
+        assert '"id": "q1"' in follow_up and "estimated_minutes" in follow_up
+        assert len(follow_up) < len(prompt)
+
+    @pytest.mark.asyncio
+    async def test_missing_structural_field_reruns_the_full_prompt(self):
+        prompt = PromptTemplates.study_plan_generation_prompt(
+            course_info={"total_nodes": 1, "completion_percentage": 0.0, "remaining_hours": 2.0},
+            roadmap_data={"nodes": [_knowledge_node("n1").model_dump()]},
+            user_progress=[],
+            target_days=1,
+            daily_hours=2.0,
+            start_date="2025-01-06"
+        )
+        plan = {"daily_schedule": [{
+            "day": 1, "date": "2025-01-06", "total_study_minutes": 120, "activities": [], "daily_goal": "Start n1"
+        }]}
+        client = LLMClient()
+        client.generate_completion = AsyncMock(side_effect=[json.dumps({"summary": {}}), json.dumps(plan)])
+
+        result = await client.generate_json_completion(prompt, expected_schema=PLAN_GENERATION_SCHEMA)
+
+        assert [call.kwargs["prompt"] for call in client.generate_completion.call_args_list] == [prompt, prompt]
+        assert result["daily_schedule"][0]["day"] == 1
+        assert client.stats["field_top_ups"] == 0
+
+    def test_missing_fields_prompt_is_small_and_valid_json(self):
+        original = "Generate an assessment for these nodes.\n\nKNOWLEDGE NODES:\n" + "Node details\n" * 2000
+        partial = {"questions": [_question(f"q{index}", "n1") for index in range(80)]}
+
+        prompt = PromptTemplates.missing_fields_prompt(
+            original, partial, ["estimated_minutes"], {"properties": {"estimated_minutes": {"type": "integer"}}}
+        )
+
+        assert "Generate an assessment for these nodes." in prompt
+        assert "Node details" not in prompt
+        assert len(prompt) < len(json.dumps(partial))
+        existing = json.loads(prompt.split("EXISTING RESPONSE (identifying fields only):\n")[1].split("\n")[0])
+        assert existing["questions"][0] == {
+            "id": "q0", "node_id": "n1", "question_type": "short_answer", "difficulty": "medium"
+        }
+        assert existing["questions"][-1] == "... 30 more"
+        assert '"estimated_minutes": {"type": "integer"}' in prompt
+
+
+class TestQuestionTopUp:
+    """Test that invalid questions are replaced without regenerating the rest."""
+
+    @pytest.mark.asyncio
+    async def test_invalid_questions_are_topped_up(self):
+        service = AIAssessmentService()
+        request = AssessmentGenerationRequest(
+            user_course_id="course_1",
+            nodes=[KnowledgeNodeInfo(
+                id="n1",
+                title="Node 1",
+                description="Test node",
+                prerequisites=[],
+                estimated_hours=2.0,
+                current_user_status="not_started"
+            )],
+            difficulty_level=DifficultyLevel.MEDIUM,
+            question_count=3
+        )
+        responses = [
+            {"questions": [_question("q1", "n1"), _question("q2", "unknown"), _question("q3", "n1")], "estimated_minutes": 10},
+            {"questions": [_question("q1", "n1") | {"question": "Replacement?"}]}
+        ]
+
+        with patch(
+            "src.services.ai_assessment.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=responses)
+        ) as mock_llm:
+            result = await service.generate_assessment(request)
+
+        assert mock_llm.await_count == 2
+        assert "missing 1 question" in mock_llm.call_args.kwargs["prompt"]
+        assert len(result.questions) == 3
+        assert len({question.id for question in result.questions}) == 3
+
+
+class TestRoadmapTopUp:
+    """Test that dangling prerequisites trigger a node-only follow-up."""
+
+    @pytest.mark.asyncio
+    async def test_missing_prerequisite_nodes_are_generated(self):
+        service = AIRoadmapService()
+        ai_response = {
+            "title": "Roadmap",
+            "nodes": [_roadmap_node("n1"), _roadmap_node("n2", ["n1", "n3"])],
+            "edges": [{"from": "n1", "to": "n2"}, {"from": "n3", "to": "n2"}],
+            "metadata": {}
+        }
+
+        with patch(
+            "src.services.ai_roadmap.llm_client.generate_json_completion",
+            new=AsyncMock(return_value={"nodes": [_roadmap_node("n3", ["n1"]), _roadmap_node("n9")]})
+        ) as mock_llm:
+            roadmap = await service._process_generated_roadmap(ai_response, None, course_title="Python")
+
+        mock_llm.assert_awaited_once()
+        assert "n3" in mock_llm.call_args.kwargs["prompt"]
+        assert [node.id for node in roadmap["nodes"]] == ["n1", "n2", "n3"]
+        assert len(roadmap["edges"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_unresolved_references_are_dropped(self):
+        service = AIRoadmapService()
+        ai_response = {
+            "title": "Roadmap",
+            "nodes": [_roadmap_node("n1"), _roadmap_node("n2", ["n1", "n3"])],
+            "edges": [{"from": "n3", "to": "n2"}],
+            "metadata": {}
+        }
+
+        with patch(
+            "src.services.ai_roadmap.llm_client.generate_json_completion",
+            new=AsyncMock(side_effect=ValueError("bad json"))
+        ):
+            roadmap = await service._process_generated_roadmap(ai_response, None, course_title="Python")
+
+        assert roadmap["nodes"][1].prerequisites == ["n1"]
+        assert roadmap["edges"] == []
@@ -0,0 +1,100 @@
+"""Test request id and trace propagation."""
+
+import json
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.llm_client import LLMClient
+from src.utils.logging_config import RequestContextFilter
+from src.utils.request_context import RequestContext, request_scope
+from src.utils.timing import span
+from src.utils.tracing import (
+    FileTraceExporter,
+    format_traceparent,
+    parse_traceparent,
+    request_context_from_headers
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_incoming_headers_continue_the_callers_trace():
+    context = request_context_from_headers(
+        {"X-Request-ID": "node-req-42", "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}, generated_id="req_1"
+    )
+    assert (context.request_id, context.trace_id, context.parent_span_id) == ("node-req-42", TRACE_ID, PARENT_ID)
+
+    fresh = request_context_from_headers({"X-Request-ID": "x" * 500}, generated_id="req_2")
+    assert fresh.request_id == "req_2"
+    assert fresh.parent_span_id is None and len(fresh.trace_id) == 32
+
+
+def test_log_records_are_tagged_with_request_context():
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    RequestContextFilter().filter(record)
+    assert record.request_id == "-"
+
+    context = RequestContext(request_id="req_7")
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    with request_scope(context):
+        RequestContextFilter().filter(record)
+    assert (record.request_id, record.trace_id) == ("req_7", context.trace_id)
+
+
+@pytest.mark.asyncio
+async def test_provider_calls_carry_request_headers():
+    client = LLMClient()
+    response = MagicMock(usage=None)
+    response.choices[0].message.content = "ok"
+    raw_response = MagicMock(headers={})
+    raw_response.parse.return_value = response
+    create = AsyncMock(return_value=raw_response)
+    client.openai_client = MagicMock()
+    client.openai_client.chat.completions.with_raw_response.create = create
+
+    context = RequestContext(request_id="req_9")
+    with request_scope(context):
+        await client.generate_completion("Hello", max_tokens=10)
+
+    assert create.call_args.kwargs["extra_headers"] == {
+        "X-Request-ID": "req_9",
+        "traceparent": format_traceparent(context.trace_id, context.span_id)
+    }
+
+
+def test_exporter_writes_root_and_stage_spans(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = FileTraceExporter(str(path))
+    context = RequestContext(request_id="req_3", parent_span_id=PARENT_ID)
+    with request_scope(context):
+        with span("llm.network", provider="openai"):
+            pass
+
+    exporter.export(context, "POST /ai/generate-roadmap", 0.25, {"status_code": 200})
+    exporter.close()
+
+    root, stage = [json.loads(line) for line in path.read_text().splitlines()]
+    assert root["span_id"] == context.span_id and root["parent_span_id"] == PARENT_ID
+    assert root["duration_ms"] == 250.0 and root["attributes"] == {"status_code": 200}
+    assert stage["parent_span_id"] == context.span_id
+    assert stage["name"] == "llm.network" and stage["attributes"] == {"provider": "openai"}
+    assert {root["trace_id"], stage["trace_id"]} == {context.trace_id}
+
+
+def test_response_carries_request_id_and_traceparent(client):
+    response = client.get(
+        "/health", headers={"X-Request-ID": "node-req-1", "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    )
+
+    assert response.headers["X-Request-ID"] == "node-req-1"
+    assert parse_traceparent(response.headers["traceparent"])[0] == TRACE_ID
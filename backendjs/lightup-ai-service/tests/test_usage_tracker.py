@@ -0,0 +1,108 @@
+"""Test token usage and cost accounting."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.settings import settings
+from src.services import llm_client as llm_client_module
+from src.services.llm_client import LLMClient
+from src.services.usage_tracker import TokenUsage, UsageTracker
+from src.utils.request_context import RequestContext, request_scope
+
+PRICES = {"gpt-4o": (2.0, 1.0, 8.0), "gpt-4o-mini": (0.2, 0.1, 0.8)}
+
+
+class TestUsageTracker:
+    """Test pricing and attribution."""
+
+    def test_cost_uses_longest_prefix_and_cached_price(self):
+        tracker = UsageTracker(PRICES)
+
+        cost = tracker.cost("gpt-4o-mini-2024-07-18", TokenUsage(input_tokens=1_000_000, cached_tokens=500_000))
+        assert cost == pytest.approx(0.5 * 0.2 + 0.5 * 0.1)
+        assert tracker.cost("gpt-4o", TokenUsage(output_tokens=1_000_000)) == pytest.approx(8.0)
+
+    def test_unknown_model_costs_nothing_and_is_reported(self):
+        tracker = UsageTracker(PRICES)
+
+        tracker.record("openai", "mystery-model", "roadmap", TokenUsage(input_tokens=10))
+
+        summary = tracker.summary()
+        assert summary["totals"]["cost_usd"] == 0.0
+        assert summary["unpriced_models"] == ["mystery-model"]
+
+    def test_usage_is_attributed_to_request_route_and_user(self):
+        tracker = UsageTracker(PRICES)
+        context = RequestContext(request_id="req_1", name="/ai/generate-assessment")
+
+        with request_scope(context):
+            tracker.record("openai", "gpt-4o", "assessment", TokenUsage(input_tokens=1000, output_tokens=500), "course_1")
+            tracker.record("openai", "gpt-4o", "question_top_up", TokenUsage(input_tokens=200, output_tokens=100))
+        tracker.record("openai", "gpt-4o", "assessment", TokenUsage(input_tokens=10), "question_bank")
+
+        summary = tracker.summary()
+        assert summary["totals"]["calls"] == 3
+        assert summary["by_route"]["/ai/generate-assessment"]["input_tokens"] == 1200
+        assert summary["by_route"]["background"]["calls"] == 1
+        assert summary["by_operation"]["assessment"]["calls"] == 2
+        assert list(summary["top_users"]) == ["course_1", "unattributed", "question_bank"]
+        assert context.usage["output_tokens"] == 600
+        assert context.usage["calls"] == 2
+
+
+class TestClientUsage:
+    """Test that provider usage reaches the tracker."""
+
+    @pytest.mark.asyncio
+    async def test_openai_cached_and_reasoning_tokens_are_recorded(self, monkeypatch):
+        tracker = UsageTracker(PRICES)
+        monkeypatch.setattr(llm_client_module, "usage_tracker", tracker)
+
+        client = LLMClient()
+        response = MagicMock()
+        response.usage = SimpleNamespace(
+            prompt_tokens=1200,
+            completion_tokens=300,
+            total_tokens=1500,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1000),
+            completion_tokens_details=SimpleNamespace(reasoning_tokens=120)
+        )
+        response.choices[0].message.content = "ok"
+        response.choices[0].finish_reason = "stop"
+        raw_response = MagicMock(headers={})
+        raw_response.parse.return_value = response
+        client.openai_client = MagicMock()
+        client.openai_client.chat.completions.with_raw_response.create = AsyncMock(return_value=raw_response)
+
+        await client.generate_completion("Hello", model="gpt-4o", max_tokens=500, output_task="roadmap", user_key="course_9")
+
+        summary = tracker.summary()
+        assert summary["by_operation"]["roadmap"] == {
+            "input_tokens": 1200,
+            "output_tokens": 300,
+            "cached_tokens": 1000,
+            "reasoning_tokens": 120,
+            "calls": 1,
+            "cost_usd": round((200 * 2.0 + 1000 * 1.0 + 300 * 8.0) / 1e6, 6)
+        }
+        assert "course_9" in summary["top_users"]
+
+
+def test_usage_endpoint(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    response = client.get("/ai/usage", params={"top_users": 5}, headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    assert {"totals", "by_route", "by_operation", "by_model", "top_users"} <= set(response.json())
+
+
+def test_usage_endpoints_require_admin_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/ai/usage").status_code == 404
+    assert client.post("/ai/usage/reset").status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    assert client.get("/ai/usage", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post("/ai/usage/reset").status_code == 403